@@ -0,0 +1,371 @@
+"""Модуль с неинтерактивным пакетным режимом работы с библиотекой."""
+
+import json
+import shlex
+import sys
+from src.book import Book
+from src.bulk_io import (BulkImportError, export_columnar, export_csv, import_columnar,
+                         import_csv)
+from src.inventory import InventoryError
+from src.library import Library
+
+SEARCH_FIELDS = ('isbn', 'author', 'year', 'genre')
+
+USAGE = {
+    "add": "add <название> <автор> <год> <жанр> <isbn>",
+    "remove": "remove <isbn>",
+    "search": "search <isbn|author|year|genre> <значение> [limit] [offset]",
+    "checkout": "checkout <isbn> [количество]",
+    "return": "return <isbn> [количество]",
+    "facet": "facet <genre|author|year|decade> [top]",
+    "export": "export [файл.csv|файл.tsv|файл.lbc]",
+    "import": "import <файл.csv|файл.tsv|файл.lbc> [dedupe]",
+    "explain": "explain <поле>=<значение>|<поле>=<от>..<до> ...",
+}
+
+
+class BatchError(Exception):
+    """Ошибка выполнения пакетной команды."""
+
+
+def _parse_int(value: str, name: str) -> int:
+    """
+    Преобразует аргумент команды в целое число
+
+    :param value: Строковое значение
+    :type value: str
+    :param name: Имя аргумента для сообщения об ошибке
+    :type name: str
+    :return: Целое число
+    :rtype: int
+    :raises BatchError: Если значение не является целым числом
+    """
+    try:
+        return int(value)
+    except ValueError:
+        raise BatchError(f"{name} должен быть числом: {value!r}")
+
+
+def _command_add(library: Library, args: list) -> dict:
+    """
+    Команда add: добавление книги
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    if len(args) != 5:
+        raise BatchError(f"Использование: {USAGE['add']}")
+    title, author, year, genre, isbn = args
+    book = Book(title, author, _parse_int(year, "Год"), genre, isbn)
+    try:
+        library.add_book(book)
+    except ValueError as e:
+        raise BatchError(str(e))
+    return {"book": book.to_dict()}
+
+
+def _command_remove(library: Library, args: list) -> dict:
+    """
+    Команда remove: удаление книги по ISBN
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    if len(args) != 1:
+        raise BatchError(f"Использование: {USAGE['remove']}")
+    book = library.search_by_isbn(args[0])
+    if book is None:
+        raise BatchError(f"Книга с ISBN '{args[0]}' не найдена")
+    library.remove_book(book)
+    return {"book": book.to_dict()}
+
+
+def _command_search(library: Library, args: list) -> dict:
+    """
+    Команда search: постраничный поиск по полю
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    if not 2 <= len(args) <= 4 or args[0] not in SEARCH_FIELDS:
+        raise BatchError(f"Использование: {USAGE['search']}")
+    field, value = args[0], args[1]
+    if field == 'year':
+        value = _parse_int(value, "Год")
+    limit = _parse_int(args[2], "limit") if len(args) > 2 else len(library.books)
+    offset = _parse_int(args[3], "offset") if len(args) > 3 else 0
+    try:
+        page = library.search_page(field, value, limit, offset)
+    except ValueError as e:
+        raise BatchError(str(e))
+    return {
+        "total": page.total,
+        "next_offset": page.next_offset,
+        "books": [book.to_dict() for book in page],
+    }
+
+
+def _inventory_command(name: str, operation, args: list) -> dict:
+    """
+    Общая часть команд checkout и return
+
+    :param name: Имя команды
+    :type name: str
+    :param operation: Метод библиотеки, принимающий ISBN и количество
+    :type operation: Callable
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    if not 1 <= len(args) <= 2:
+        raise BatchError(f"Использование: {USAGE[name]}")
+    count = _parse_int(args[1], "Количество") if len(args) > 1 else 1
+    try:
+        available = operation(args[0], count)
+    except InventoryError as e:
+        raise BatchError(str(e))
+    return {"isbn": args[0], "available": available}
+
+
+def _command_checkout(library: Library, args: list) -> dict:
+    """
+    Команда checkout: выдача экземпляров книги
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    return _inventory_command("checkout", library.checkout, args)
+
+
+def _command_return(library: Library, args: list) -> dict:
+    """
+    Команда return: возврат экземпляров книги
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    return _inventory_command("return", library.return_copies, args)
+
+
+def _command_facet(library: Library, args: list) -> dict:
+    """
+    Команда facet: количество книг по значениям фасета
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    if not 1 <= len(args) <= 2:
+        raise BatchError(f"Использование: {USAGE['facet']}")
+    top = _parse_int(args[1], "top") if len(args) > 1 else None
+    try:
+        counts = library.facet(args[0], top)
+    except KeyError:
+        raise BatchError(f"Неизвестный фасет: {args[0]}")
+    return {
+        "facet": args[0],
+        "counts": [{"value": value, "count": count} for value, count in counts.items()],
+    }
+
+
+def _command_export(library: Library, args: list) -> dict:
+    """
+    Команда export: выгрузка всех книг в ответ или в файл
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    if len(args) > 1:
+        raise BatchError(f"Использование: {USAGE['export']}")
+    if not args:
+        return {"books": [book.to_dict() for book in library.books]}
+    path = args[0]
+    try:
+        if path.endswith(".lbc"):
+            count = export_columnar(library.books, path)
+        else:
+            count = export_csv(library.books, path, "\t" if path.endswith(".tsv") else ",")
+    except OSError as e:
+        raise BatchError(str(e))
+    return {"path": path, "exported": count}
+
+
+def _command_import(library: Library, args: list) -> dict:
+    """
+    Команда import: потоковая загрузка каталога из файла, с флагом dedupe — с объединением
+    вероятных дубликатов
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    if len(args) not in (1, 2) or args[1:] not in ([], ["dedupe"]):
+        raise BatchError(f"Использование: {USAGE['import']}")
+    path = args[0]
+    dedupe = len(args) == 2
+    try:
+        if path.endswith(".lbc"):
+            report = import_columnar(library, path, dedupe=dedupe)
+        else:
+            report = import_csv(library, path, "\t" if path.endswith(".tsv") else ",",
+                                dedupe=dedupe)
+    except (OSError, BulkImportError) as e:
+        raise BatchError(str(e))
+    result = {
+        "path": path,
+        "imported": report.imported,
+        "duplicates": report.duplicates,
+        "invalid": report.invalid,
+        "errors": [{"row": row, "error": message} for row, message in report.errors],
+    }
+    if report.dedupe is not None:
+        result["merged"] = report.merged
+        result["clusters"] = report.dedupe.as_dict()["clusters"]
+    return result
+
+
+def _parse_condition(arg: str) -> tuple:
+    """
+    Разбирает условие команды explain: поле=значение или поле=от..до
+
+    :param arg: Аргумент команды
+    :type arg: str
+    :return: Кортеж (поле, значение или (low, high))
+    :rtype: tuple
+    :raises BatchError: Если аргумент не содержит '='
+    """
+    field, sep, value = arg.partition("=")
+    if not sep or not field:
+        raise BatchError(f"Использование: {USAGE['explain']}")
+    convert = (lambda text: _parse_int(text, "Год")) if field == 'year' else str
+    if ".." in value:
+        low, high = value.split("..", 1)
+        return field, (convert(low) if low else None, convert(high) if high else None)
+    return field, convert(value)
+
+
+def _command_explain(library: Library, args: list) -> dict:
+    """
+    Команда explain: план запроса с оценкой и фактическим числом просмотренных книг
+
+    :param library: Библиотека
+    :type library: Library
+    :param args: Аргументы команды
+    :type args: list
+    :return: Результат команды
+    :rtype: dict
+    """
+    if not args:
+        raise BatchError(f"Использование: {USAGE['explain']}")
+    conditions = dict(_parse_condition(arg) for arg in args)
+    try:
+        return library.explain(**conditions).as_dict()
+    except KeyError as e:
+        raise BatchError(e.args[0])
+    except ValueError as e:
+        raise BatchError(str(e))
+
+
+COMMANDS = {
+    "add": _command_add,
+    "remove": _command_remove,
+    "search": _command_search,
+    "checkout": _command_checkout,
+    "return": _command_return,
+    "facet": _command_facet,
+    "export": _command_export,
+    "import": _command_import,
+    "explain": _command_explain,
+}
+
+# Команды, которые только читают библиотеку (их выполняет POST /batch сервера).
+READ_COMMANDS = ("search", "facet", "explain")
+
+
+def execute_command(library: Library, line: str) -> dict:
+    """
+    Выполняет одну команду и возвращает машиночитаемый результат
+
+    :param library: Библиотека
+    :type library: Library
+    :param line: Строка команды в синтаксисе shell (аргументы с пробелами берутся в кавычки)
+    :type line: str
+    :return: Словарь с ключами command, ok и данными результата или error
+    :rtype: dict
+    """
+    try:
+        parts = shlex.split(line)
+    except ValueError as e:
+        return {"command": None, "ok": False, "error": f"Ошибка разбора команды: {e}"}
+    if not parts:
+        return {"command": None, "ok": False, "error": "Пустая команда"}
+    name, args = parts[0], parts[1:]
+    handler = COMMANDS.get(name)
+    if handler is None:
+        return {"command": name, "ok": False, "error": f"Неизвестная команда: {name}"}
+    try:
+        result = handler(library, args)
+    except BatchError as e:
+        return {"command": name, "ok": False, "error": str(e)}
+    return {"command": name, "ok": True, **result}
+
+
+def run_batch(lines, library=None, output=None) -> int:
+    """
+    Выполняет команды построчно и выводит результаты в формате JSON Lines
+
+    Пустые строки и строки, начинающиеся с '#', пропускаются.
+
+    :param lines: Итерируемый объект со строками команд
+    :type lines: iterable
+    :param library: Библиотека (по умолчанию пустая)
+    :type library: Library, optional
+    :param output: Поток вывода (по умолчанию sys.stdout)
+    :type output: TextIO, optional
+    :return: Код завершения: 0 если все команды успешны, иначе 1
+    :rtype: int
+    """
+    library = library if library is not None else Library()
+    output = output if output is not None else sys.stdout
+    exit_code = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        result = execute_command(library, line)
+        if not result["ok"]:
+            exit_code = 1
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    output.flush()
+    return exit_code
@@ -53,3 +53,31 @@ class Book:
         """
         return (f"Book(title={self.title!r}, author={self.author!r}, "
                 f"year={self.year}, genre={self.genre!r}, isbn={self.isbn!r})")
+
+    def to_dict(self) -> dict:
+        """
+        Представление книги в виде словаря для сериализации
+
+        :return: Словарь с полями книги
+        :rtype: dict
+        """
+        return {
+            "title": self.title,
+            "author": self.author,
+            "year": self.year,
+            "genre": self.genre,
+            "isbn": self.isbn,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Book":
+        """
+        Создаёт книгу из словаря с полями title, author, year, genre, isbn
+
+        :param data: Словарь с полями книги
+        :type data: dict
+        :return: Новая книга
+        :rtype: Book
+        :raises KeyError: Если в словаре нет обязательного поля
+        """
+        return cls(data["title"], data["author"], data["year"], data["genre"], data["isbn"])
@@ -1,5 +1,9 @@
+import zlib
 from abc import ABC, abstractmethod
+from collections import Counter
 from src.book import Book
+from src.indexes import BaseIndex, HashIndex, MultiValueIndex
+from src.instrumentation import instrumented
 
 
 class BaseCollection(ABC):
@@ -59,8 +63,23 @@ class BaseCollection(ABC):
         return False
 
 
+def _isbn_hash(isbn) -> int:
+    """
+    Стабильный между запусками хеш ISBN для отпечатка содержимого коллекции
+
+    :param isbn: ISBN книги
+    :return: Беззнаковое 32-битное значение
+    :rtype: int
+    """
+    return zlib.crc32(str(isbn).encode("utf-8"))
+
+
 class BookCollection(BaseCollection):
-    """Пользовательская списковая коллекция книг с поддержкой индексов и срезов."""
+    """Пользовательская списковая коллекция книг с поддержкой индексов и срезов.
+
+    Рядом со списком поддерживается счётчик ISBN для проверки вхождения за O(1)
+    и отпечаток содержимого (сумма хешей ISBN) для быстрого сравнения коллекций.
+    """
 
     def __init__(self, data=None):
         """
@@ -70,6 +89,7 @@ class BookCollection(BaseCollection):
         :type data: iterable, optional
         :raises TypeError: Если data не является итерируемым объектом
         """
+        self._shared = False
         if data is None:
             self._books = []
         else:
@@ -77,6 +97,43 @@ class BookCollection(BaseCollection):
                 self._books = list(data)
             except TypeError:
                 raise TypeError("data должен быть итерируемым объектом")
+        self._isbns = Counter(book.isbn for book in self._books)
+        self._fingerprint = sum(_isbn_hash(isbn) * count for isbn, count in self._isbns.items())
+
+    def snapshot(self) -> "BookCollection":
+        """
+        Снимок коллекции за O(1) с копированием при записи
+
+        Снимок и исходная коллекция разделяют один список, пока одна из них
+        не будет изменена: тогда изменяемая сторона сначала копирует список.
+
+        :return: Коллекция с тем же содержимым
+        :rtype: BookCollection
+        """
+        snapshot = BookCollection.__new__(BookCollection)
+        snapshot._books = self._books
+        snapshot._isbns = self._isbns
+        snapshot._fingerprint = self._fingerprint
+        snapshot._shared = True
+        self._shared = True
+        return snapshot
+
+    def _own(self) -> None:
+        """Копирует разделяемые со снимком список и счётчик перед изменением"""
+        if self._shared:
+            self._books = list(self._books)
+            self._isbns = Counter(self._isbns)
+            self._shared = False
+
+    @property
+    def fingerprint(self) -> int:
+        """
+        Отпечаток содержимого: сумма хешей ISBN книг (не зависит от порядка)
+
+        :return: Отпечаток
+        :rtype: int
+        """
+        return self._fingerprint
 
     def __iter__(self):
         """
@@ -137,28 +194,91 @@ class BookCollection(BaseCollection):
         :param book: Книга для добавления
         :type book: Book
         """
+        self._own()
         self._books.append(book)
+        self._isbns[book.isbn] += 1
+        self._fingerprint += _isbn_hash(book.isbn)
+
+    def extend(self, books) -> None:
+        """
+        Добавляет книги в конец коллекции одной операцией
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        """
+        books = list(books)
+        self._own()
+        self._books.extend(books)
+        for book in books:
+            self._isbns[book.isbn] += 1
+            self._fingerprint += _isbn_hash(book.isbn)
 
     def remove(self, book: Book):
         """
         Удаляет книгу из коллекции
 
+        Отсутствие книги определяется за O(1) по счётчику ISBN без просмотра списка.
+
         :param book: Книга для удаления
         :type book: Book
         """
-        if book in self._books:
-            self._books.remove(book)
+        if book not in self:
+            return
+        self._own()
+        self._books.remove(book)
+        count = self._isbns[book.isbn] - 1
+        if count:
+            self._isbns[book.isbn] = count
+        else:
+            del self._isbns[book.isbn]
+        self._fingerprint -= _isbn_hash(book.isbn)
+
+    def remove_many(self, books) -> int:
+        """
+        Удаляет все вхождения книг с ISBN из books одним проходом по списку
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        :return: Количество удалённых элементов
+        :rtype: int
+        """
+        isbns = {book.isbn for book in books if book.isbn in self._isbns}
+        if not isbns:
+            return 0
+        before = len(self._books)
+        self._books = [book for book in self._books if book.isbn not in isbns]
+        if self._shared:
+            self._isbns = Counter(self._isbns)
+            self._shared = False
+        for isbn in isbns:
+            self._fingerprint -= _isbn_hash(isbn) * self._isbns.pop(isbn)
+        return before - len(self._books)
 
     def __contains__(self, item: Book):
         """
-        Проверяет наличие книги в коллекции
+        Проверяет наличие книги в коллекции за O(1)
 
         :param item: Книга для проверки
         :type item: Book
         :return: True если книга найдена, False иначе
         :rtype: bool
         """
-        return item in self._books
+        if not isinstance(item, Book):
+            return False
+        return item.isbn in self._isbns
+
+    def count(self, book: Book) -> int:
+        """
+        Количество книг с тем же ISBN в коллекции за O(1)
+
+        :param book: Книга
+        :type book: Book
+        :return: Количество вхождений
+        :rtype: int
+        """
+        if not isinstance(book, Book):
+            return 0
+        return self._isbns.get(book.isbn, 0)
 
     def __str__(self) -> str:
         """
@@ -180,6 +300,10 @@ class BookCollection(BaseCollection):
         """
         if not isinstance(other, BookCollection):
             return False
+        if self._books is other._books:
+            return True
+        if len(self._books) != len(other._books) or self._fingerprint != other._fingerprint:
+            return False
         return self._books == other._books
 
     def __repr__(self) -> str:
@@ -193,7 +317,7 @@ class BookCollection(BaseCollection):
 
 
 class IndexDict(BaseCollection):
-    """Пользовательская словарная коллекция для индексации книг по ISBN, автору и году."""
+    """Пользовательская словарная коллекция для индексации книг по ISBN, автору, году и др."""
 
     def __init__(self, books=None):
         """
@@ -202,13 +326,161 @@ class IndexDict(BaseCollection):
         :param books: Итерируемый объект с книгами для построения индексов (необязательно)
         :type books: iterable, optional
         """
-        self._index_by_isbn = {}
-        self._index_by_author = {}
-        self._index_by_year = {}
+        self._indexes = {
+            'isbn': HashIndex('isbn'),
+            'author': MultiValueIndex('author'),
+            'year': MultiValueIndex('year'),
+        }
+        self._shared = False
+        self.instrumentation = None
 
         if books is not None:
             self._build_indexes(books)
 
+    @property
+    def _primary(self) -> HashIndex:
+        """
+        Первичный уникальный индекс по ISBN
+
+        :return: Индекс по ISBN
+        :rtype: HashIndex
+        """
+        return self._indexes['isbn']
+
+    def snapshot(self) -> "IndexDict":
+        """
+        Снимок индексов за O(1) с копированием при записи
+
+        Снимок разделяет индексы с исходной коллекцией. Первое изменение
+        после снятия снимка копирует индексы изменяемой стороны.
+
+        :return: Индексная коллекция с тем же содержимым
+        :rtype: IndexDict
+        """
+        snapshot = IndexDict.__new__(IndexDict)
+        snapshot._indexes = self._indexes
+        snapshot._shared = True
+        snapshot.instrumentation = None
+        self._shared = True
+        return snapshot
+
+    def _own(self) -> None:
+        """Копирует разделяемые со снимком индексы перед изменением"""
+        if self._shared:
+            self._indexes = {name: index.copy() for name, index in self._indexes.items()}
+            self._shared = False
+
+    def empty(self) -> "IndexDict":
+        """
+        Пустая индексная коллекция с тем же набором индексов
+
+        :return: Индексная коллекция без книг
+        :rtype: IndexDict
+        """
+        clone = IndexDict()
+        clone._indexes = {name: index.empty() for name, index in self._indexes.items()}
+        return clone
+
+    def verify(self, books) -> list:
+        """
+        Проверяет индексы на соответствие первичному хранилищу книг
+
+        Каждый индекс сравнивается с индексом того же типа, построенным заново по books.
+
+        :param books: Первичное хранилище (например, BookCollection библиотеки)
+        :type books: iterable
+        :return: Список описаний расхождений (пустой, если индексы согласованы)
+        :rtype: list
+        """
+        books = list(books)
+        problems = []
+        counts = Counter(book.isbn for book in books)
+        for isbn, count in counts.items():
+            if count > 1:
+                problems.append(f"ISBN '{isbn}' встречается в коллекции {count} раз(а)")
+        for name, index in self._indexes.items():
+            expected_index = index.empty()
+            expected_index.build(books)
+            expected = expected_index.entries()
+            actual = index.entries()
+            for key in expected.keys() - actual.keys():
+                problems.append(f"Индекс '{name}': нет ключа {key!r}")
+            for key in actual.keys() - expected.keys():
+                problems.append(f"Индекс '{name}': лишний ключ {key!r}")
+            for key in expected.keys() & actual.keys():
+                if expected[key] != actual[key]:
+                    problems.append(f"Индекс '{name}': ключ {key!r} содержит {list(actual[key])}, "
+                                    f"ожидалось {list(expected[key])}")
+        return problems
+
+    def register(self, name: str, index: BaseIndex) -> None:
+        """
+        Подключает новый индекс и строит его по текущим книгам
+
+        :param name: Имя индекса, используемое в запросах
+        :type name: str
+        :param index: Пустой индекс
+        :type index: BaseIndex
+        :raises ValueError: Если индекс с таким именем уже подключён
+        :raises TypeError: Если index не является BaseIndex
+        """
+        if not isinstance(index, BaseIndex):
+            raise TypeError(f"Ожидался индекс BaseIndex, получен {type(index).__name__}")
+        if name in self._indexes:
+            raise ValueError(f"Индекс '{name}' уже подключён")
+        self._own()
+        index.build(self._primary.values())
+        self._indexes[name] = index
+
+    def unregister(self, name: str) -> None:
+        """
+        Отключает индекс
+
+        :param name: Имя индекса
+        :type name: str
+        :raises ValueError: Если индекс встроенный или не подключён
+        """
+        if name in ('isbn', 'author', 'year'):
+            raise ValueError(f"Встроенный индекс '{name}' нельзя отключить")
+        if name not in self._indexes:
+            raise ValueError(f"Индекс '{name}' не подключён")
+        self._own()
+        del self._indexes[name]
+
+    def has_index(self, name: str) -> bool:
+        """
+        Проверяет, подключён ли индекс
+
+        :param name: Имя индекса
+        :type name: str
+        :return: True если индекс подключён
+        :rtype: bool
+        """
+        return name in self._indexes
+
+    def get_index(self, name: str) -> BaseIndex:
+        """
+        Возвращает подключённый индекс
+
+        :param name: Имя индекса
+        :type name: str
+        :return: Индекс
+        :rtype: BaseIndex
+        :raises KeyError: Если индекс не подключён
+        """
+        if name not in self._indexes:
+            raise KeyError(f"Неизвестный тип индекса: {name}")
+        return self._indexes[name]
+
+    def index_names(self) -> list:
+        """
+        Имена подключённых индексов
+
+        :return: Список имён
+        :rtype: list
+        """
+        return list(self._indexes)
+
     def _build_indexes(self, books) -> None:
         """
         Построение всех индексов из коллекции книг
@@ -217,38 +489,33 @@ class IndexDict(BaseCollection):
         :type books: iterable
         :raises TypeError: Если объект в books не является Book
         """
+        books = list(books)
         for book in books:
             if not isinstance(book, Book):
                 raise TypeError(f"Ожидался объект Book, получен {type(book).__name__}")
-            self._index_by_isbn[book.isbn] = book
-            if book.author not in self._index_by_author:
-                self._index_by_author[book.author] = []
-            self._index_by_author[book.author].append(book)
-            if book.year not in self._index_by_year:
-                self._index_by_year[book.year] = []
-            self._index_by_year[book.year].append(book)
+        self._own()
+        for index in self._indexes.values():
+            index.extend(books)
 
     def __getitem__(self, key):
         """
-        Доступ к индексам по кортежу (тип индекса, значение)
+        Доступ к индексам по кортежу (имя индекса, значение)
 
-        :param key: Кортеж вида ('isbn', значение), ('author', значение) или ('year', значение)
+        :param key: Кортеж вида ('isbn', значение), ('author', значение), ('year', значение)
+            или (имя подключённого индекса, значение)
         :type key: tuple
-        :return: Книга для ISBN, коллекция для author/year
+        :return: Книга или None для уникального индекса, коллекция для остальных
         :rtype: Book or BookCollection
         :raises TypeError: Если ключ не является кортежем из двух элементов
         :raises KeyError: Если тип индекса неизвестен.
         """
         if isinstance(key, tuple) and len(key) == 2:
             index_type, value = key
-            if index_type == 'isbn':
-                return self._index_by_isbn.get(value)
-            elif index_type == 'author':
-                return BookCollection(self._index_by_author.get(value, []))
-            elif index_type == 'year':
-                return BookCollection(self._index_by_year.get(value, []))
-            else:
-                raise KeyError(f"Неизвестный тип индекса: {index_type}")
+            index = self.get_index(index_type)
+            if index.unique:
+                found = index.lookup(value)
+                return found[0] if found else None
+            return BookCollection(index.lookup(value))
         raise TypeError("Ключ должен быть кортежем (тип, значение)")
 
     def __iter__(self):
@@ -258,7 +525,7 @@ class IndexDict(BaseCollection):
         :return: Итератор по книгам из индекса ISBN
         :rtype: Iterator
         """
-        return iter(self._index_by_isbn.values())
+        return iter(self._primary.values())
 
     def __len__(self) -> int:
         """
@@ -267,8 +534,9 @@ class IndexDict(BaseCollection):
         :return: Количество уникальных книг по ISBN
         :rtype: int
         """
-        return len(self._index_by_isbn)
+        return len(self._primary)
 
+    @instrumented("index_add_book", sized=False)
     def add_book(self, book: Book) -> None:
         """
         Добавляет книгу во все индексы
@@ -279,14 +547,11 @@ class IndexDict(BaseCollection):
         """
         if not isinstance(book, Book):
             raise TypeError(f"Ожидался объект Book, получен {type(book).__name__}")
-        self._index_by_isbn[book.isbn] = book
-        if book.author not in self._index_by_author:
-            self._index_by_author[book.author] = []
-        self._index_by_author[book.author].append(book)
-        if book.year not in self._index_by_year:
-            self._index_by_year[book.year] = []
-        self._index_by_year[book.year].append(book)
+        self._own()
+        for index in self._indexes.values():
+            index.add(book)
 
+    @instrumented("index_remove_book", sized=False)
     def remove_book(self, book: Book) -> None:
         """
         Удаляет книгу из всех индексов
@@ -294,18 +559,48 @@ class IndexDict(BaseCollection):
         :param book: Книга для удаления
         :type book: Book
         """
-        if book.isbn in self._index_by_isbn:
-            del self._index_by_isbn[book.isbn]
-        if book.author in self._index_by_author:
-            if book in self._index_by_author[book.author]:
-                self._index_by_author[book.author].remove(book)
-            if not self._index_by_author[book.author]:
-                del self._index_by_author[book.author]
-        if book.year in self._index_by_year:
-            if book in self._index_by_year[book.year]:
-                self._index_by_year[book.year].remove(book)
-            if not self._index_by_year[book.year]:
-                del self._index_by_year[book.year]
+        self._own()
+        for index in self._indexes.values():
+            index.remove(book)
+
+    @instrumented("index_remove_books", sized=False)
+    def remove_books(self, books) -> None:
+        """
+        Удаляет несколько книг из всех индексов, компактируя каждую корзину один раз
+
+        :param books: Список книг для удаления
+        :type books: list
+        """
+        self._own()
+        for index in self._indexes.values():
+            index.remove_many(books)
+
+    def bucket(self, index_type: str, value) -> list:
+        """
+        Книги индекса для значения без копирования в BookCollection
+
+        Возвращаемый список нельзя изменять: он может быть внутренней корзиной индекса.
+
+        :param index_type: Имя индекса
+        :type index_type: str
+        :param value: Значение для поиска
+        :return: Список книг
+        :rtype: list
+        :raises KeyError: Если тип индекса неизвестен
+        """
+        return self.get_index(index_type).lookup(value)
+
+    def bucket_sizes(self, index_type: str) -> dict:
+        """
+        Размеры корзин индекса
+
+        :param index_type: Имя индекса
+        :type index_type: str
+        :return: Словарь {значение: количество книг}
+        :rtype: dict
+        :raises KeyError: Если тип индекса неизвестен
+        """
+        return self.get_index(index_type).bucket_sizes()
 
     def __contains__(self, item) -> bool:
         """
@@ -317,9 +612,9 @@ class IndexDict(BaseCollection):
         :rtype: bool
         """
         if isinstance(item, Book):
-            return item.isbn in self._index_by_isbn
+            return item.isbn in self._primary
         elif isinstance(item, str):
-            return item in self._index_by_isbn
+            return item in self._primary
         return False
 
     def __str__(self) -> str:
@@ -342,7 +637,7 @@ class IndexDict(BaseCollection):
         """
         if not isinstance(other, IndexDict):
             return False
-        return self._index_by_isbn == other._index_by_isbn
+        return self._primary._map == other._primary._map
 
     def __repr__(self) -> str:
         """
@@ -351,6 +646,8 @@ class IndexDict(BaseCollection):
         :return: Строка с информацией об индексах
         :rtype: str
         """
-        return (f"IndexDict(isbn_count={len(self._index_by_isbn)}, "
-                f"authors={len(self._index_by_author)}, "
-                f"years={len(self._index_by_year)})")
+        extra = "".join(f", {name}={len(index)}" for name, index in self._indexes.items()
+                        if name not in ('isbn', 'author', 'year'))
+        return (f"IndexDict(isbn_count={len(self._primary)}, "
+                f"authors={len(self._indexes['author'])}, "
+                f"years={len(self._indexes['year'])}{extra})")
@@ -0,0 +1,524 @@
+"""Модуль с потоковым импортом и экспортом каталога в CSV/TSV и колоночном бинарном формате."""
+
+import csv
+import os
+import struct
+import threading
+from array import array
+from itertools import islice
+from weakref import WeakKeyDictionary
+from src.book import Book
+from src.changefeed import ChangeFeedOverflow
+from src.dedupe import DuplicateIndex, find_duplicates
+
+CSV_FIELDS = ("title", "author", "year", "genre", "isbn")
+DEFAULT_CHUNK_SIZE = 10000
+MIN_YEAR = 0
+MAX_YEAR = 2025
+MAX_REPORTED_ERRORS = 100
+
+COLUMNAR_MAGIC = b"LBC1"
+_ROW_GROUP_HEADER = struct.Struct("<I")
+
+# Индексы дубликатов книг библиотек с версией, по которой они построены: импорт
+# с dedupe считает сигнатуры только новых записей, а индекс догоняет библиотеку
+# по ленте изменений.
+_duplicate_indexes: WeakKeyDictionary = WeakKeyDictionary()
+_duplicate_lock = threading.Lock()
+
+
+class BulkImportError(ValueError):
+    """Ошибка в данных импортируемого каталога."""
+
+
+class ImportReport:
+    """Итог импорта: количество добавленных, пропущенных и ошибочных записей."""
+
+    def __init__(self):
+        """Инициализация пустого отчёта"""
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.merged = 0
+        self.dedupe = None
+        self.errors = []
+
+    def add_error(self, row: int, message: str) -> None:
+        """
+        Учитывает некорректную запись
+
+        Сохраняются только первые MAX_REPORTED_ERRORS сообщений, чтобы отчёт
+        не рос вместе с размером файла.
+
+        :param row: Номер записи
+        :type row: int
+        :param message: Описание ошибки
+        :type message: str
+        """
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, message))
+
+    def __repr__(self) -> str:
+        """
+        Представление отчёта для отладки
+
+        :return: Строка со счётчиками отчёта
+        :rtype: str
+        """
+        return (f"ImportReport(imported={self.imported}, duplicates={self.duplicates}, "
+                f"invalid={self.invalid}, merged={self.merged})")
+
+
+def is_valid_isbn(isbn: str, check_digit: bool = False) -> bool:
+    """
+    Проверяет формат ISBN-10 или ISBN-13 (дефисы и пробелы допускаются)
+
+    :param isbn: Проверяемый ISBN
+    :type isbn: str
+    :param check_digit: Проверять ли контрольную цифру
+    :type check_digit: bool
+    :return: True если ISBN корректен
+    :rtype: bool
+    """
+    digits = isbn.replace("-", "").replace(" ", "")
+    if len(digits) == 13:
+        if not digits.isdigit():
+            return False
+        if check_digit:
+            total = sum(int(c) * (1 if i % 2 == 0 else 3) for i, c in enumerate(digits[:12]))
+            return (10 - total % 10) % 10 == int(digits[12])
+        return True
+    if len(digits) == 10:
+        if not digits[:9].isdigit() or not (digits[9].isdigit() or digits[9] in "Xx"):
+            return False
+        if check_digit:
+            values = [int(c) for c in digits[:9]] + [10 if digits[9] in "Xx" else int(digits[9])]
+            return sum((10 - i) * value for i, value in enumerate(values)) % 11 == 0
+        return True
+    return False
+
+
+def parse_book(record: dict, check_digit: bool = False) -> Book:
+    """
+    Создаёт книгу из записи каталога с проверкой ISBN и года
+
+    :param record: Словарь с полями title, author, year, genre, isbn
+    :type record: dict
+    :param check_digit: Проверять ли контрольную цифру ISBN
+    :type check_digit: bool
+    :return: Книга
+    :rtype: Book
+    :raises BulkImportError: Если запись некорректна
+    """
+    missing = [field for field in CSV_FIELDS if not record.get(field)]
+    if missing:
+        raise BulkImportError(f"Отсутствуют поля: {', '.join(missing)}")
+    try:
+        year = int(record["year"])
+    except (TypeError, ValueError):
+        raise BulkImportError(f"Год должен быть числом: {record['year']!r}")
+    book = Book(record["title"].strip(), record["author"].strip(), year,
+                record["genre"].strip(), record["isbn"].strip())
+    validate_book(book, check_digit)
+    return book
+
+
+def validate_book(book: Book, check_digit: bool = False) -> None:
+    """
+    Проверяет ISBN и год издания книги
+
+    :param book: Проверяемая книга
+    :type book: Book
+    :param check_digit: Проверять ли контрольную цифру ISBN
+    :type check_digit: bool
+    :raises BulkImportError: Если ISBN или год некорректны
+    """
+    if not is_valid_isbn(book.isbn, check_digit):
+        raise BulkImportError(f"Некорректный ISBN: {book.isbn!r}")
+    if book.year < MIN_YEAR or book.year > MAX_YEAR:
+        raise BulkImportError(f"Некорректный год: {book.year}")
+
+
+def iter_csv_chunks(path, chunk_size: int = DEFAULT_CHUNK_SIZE, delimiter: str = ",",
+                    check_digit: bool = False, report=None):
+    """
+    Читает CSV/TSV файл блоками проверенных книг
+
+    Некорректные строки пропускаются и учитываются в отчёте.
+
+    :param path: Путь к файлу с заголовком title,author,year,genre,isbn
+    :type path: str or PathLike
+    :param chunk_size: Количество строк в блоке
+    :type chunk_size: int
+    :param delimiter: Разделитель полей (',' для CSV, '\\t' для TSV)
+    :type delimiter: str
+    :param check_digit: Проверять ли контрольную цифру ISBN
+    :type check_digit: bool
+    :param report: Отчёт для учёта ошибок (необязательно)
+    :type report: ImportReport, optional
+    :return: Генератор списков книг
+    :rtype: Iterator[list]
+    :raises BulkImportError: Если в заголовке нет обязательных столбцов, файл не в UTF-8
+        или не разбирается как CSV
+    """
+    report = report if report is not None else ImportReport()
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        reader = csv.DictReader(file, delimiter=delimiter)
+        try:
+            header = reader.fieldnames or []
+            missing = [field for field in CSV_FIELDS if field not in header]
+            if missing:
+                raise BulkImportError(f"В заголовке нет столбцов: {', '.join(missing)}")
+            chunk = []
+            for row_number, record in enumerate(reader, 2):
+                try:
+                    chunk.append(parse_book(record, check_digit))
+                except BulkImportError as e:
+                    report.add_error(row_number, str(e))
+                    continue
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise BulkImportError(f"Файл повреждён (строка {reader.line_num + 1}): {e}") from e
+        if chunk:
+            yield chunk
+
+
+def _load_chunks(library, chunks, report):
+    """
+    Добавляет блоки книг в библиотеку, пропуская дубликаты ISBN
+
+    :param library: Библиотека
+    :type library: Library
+    :param chunks: Итерируемый объект со списками книг
+    :type chunks: iterable
+    :param report: Отчёт импорта
+    :type report: ImportReport
+    :return: Отчёт импорта
+    :rtype: ImportReport
+    """
+    for chunk in chunks:
+        added = library.add_books(chunk, skip_duplicates=True)
+        report.imported += added
+        report.duplicates += len(chunk) - added
+    return report
+
+
+def _duplicate_index(library) -> DuplicateIndex:
+    """
+    Индекс дубликатов книг библиотеки, обновлённый до её текущей версии
+
+    Строится при первом вызове; далее применяются изменения из changes_since,
+    а при переполнении ленты индекс строится заново. Вызывается под _duplicate_lock.
+
+    :param library: Библиотека
+    :type library: Library
+    :return: Индекс дубликатов
+    :rtype: DuplicateIndex
+    """
+    # Версия читается до обхода книг: изменения после неё применятся повторно,
+    # а DuplicateIndex.add и remove идемпотентны по ISBN.
+    version = library.version
+    cached = _duplicate_indexes.get(library)
+    index = None
+    if cached is not None:
+        index, known = cached
+        try:
+            changes = library.changes_since(known)
+        except ChangeFeedOverflow:
+            index = None
+        else:
+            for change in changes:
+                index.apply(change)
+    if index is None:
+        index = DuplicateIndex(library.books)
+    _duplicate_indexes[library] = (index, version)
+    return index
+
+
+def _dedupe_chunks(library, chunks, report) -> list:
+    """
+    Собирает все блоки и объединяет вероятные дубликаты перед загрузкой
+
+    Книги библиотеки участвуют в сравнении и остаются каноническими, поэтому
+    запись, похожая на уже загруженную книгу, не добавляется. Их сигнатуры
+    берутся из индекса дубликатов библиотеки (см. _duplicate_index). Отчёт об
+    объединении сохраняется в report.dedupe.
+
+    :param library: Библиотека
+    :type library: Library
+    :param chunks: Итерируемый объект со списками книг
+    :type chunks: iterable
+    :param report: Отчёт импорта
+    :type report: ImportReport
+    :return: Список из одного блока с уникальными книгами
+    :rtype: list
+    """
+    books = [book for chunk in chunks for book in chunk]
+    with _duplicate_lock:
+        report.dedupe = find_duplicates(books, index=_duplicate_index(library))
+    report.merged = report.dedupe.merged
+    return [report.dedupe.unique]
+
+
+def import_csv(library, path, delimiter: str = ",", chunk_size: int = DEFAULT_CHUNK_SIZE,
+               check_digit: bool = False, dedupe: bool = False):
+    """
+    Потоково импортирует CSV/TSV файл в библиотеку
+
+    При dedupe=True файл сначала читается целиком, и записи, совпадающие по
+    нормализованному ISBN, названию и автору или близкие по MinHash, объединяются
+    (см. src.dedupe.find_duplicates).
+
+    :param library: Библиотека
+    :type library: Library
+    :param path: Путь к файлу
+    :type path: str or PathLike
+    :param delimiter: Разделитель полей
+    :type delimiter: str
+    :param chunk_size: Количество строк в блоке вставки
+    :type chunk_size: int
+    :param check_digit: Проверять ли контрольную цифру ISBN
+    :type check_digit: bool
+    :param dedupe: Объединять ли вероятные дубликаты перед загрузкой
+    :type dedupe: bool
+    :return: Отчёт импорта
+    :rtype: ImportReport
+    """
+    report = ImportReport()
+    chunks = iter_csv_chunks(path, chunk_size, delimiter, check_digit, report)
+    if dedupe:
+        chunks = _dedupe_chunks(library, chunks, report)
+    return _load_chunks(library, chunks, report)
+
+
+def export_csv(books, path, delimiter: str = ",") -> int:
+    """
+    Экспортирует книги в CSV/TSV файл с заголовком
+
+    :param books: Итерируемый объект с книгами (например, library.books)
+    :type books: iterable
+    :param path: Путь к файлу
+    :type path: str or PathLike
+    :param delimiter: Разделитель полей
+    :type delimiter: str
+    :return: Количество записанных книг
+    :rtype: int
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, delimiter=delimiter)
+        writer.writerow(CSV_FIELDS)
+        for book in books:
+            writer.writerow((book.title, book.author, book.year, book.genre, book.isbn))
+            count += 1
+    return count
+
+
+def _write_strings(file, values) -> None:
+    """
+    Записывает строковый столбец: массив длин и блок UTF-8
+
+    :param file: Бинарный файл
+    :type file: BinaryIO
+    :param values: Список строк
+    :type values: list
+    """
+    encoded = [value.encode("utf-8") for value in values]
+    lengths = array("I", (len(value) for value in encoded))
+    file.write(lengths.tobytes())
+    file.write(b"".join(encoded))
+
+
+def _read_strings(file, count: int) -> list:
+    """
+    Читает строковый столбец, записанный _write_strings
+
+    :param file: Бинарный файл
+    :type file: BinaryIO
+    :param count: Количество строк
+    :type count: int
+    :return: Список строк
+    :rtype: list
+    :raises BulkImportError: Если столбец не помещается в остаток файла или не в UTF-8
+    """
+    lengths = array("I")
+    lengths.frombytes(_read_exact(file, count * lengths.itemsize))
+    blob = _read_exact(file, sum(lengths))
+    values = []
+    position = 0
+    try:
+        for length in lengths:
+            values.append(blob[position:position + length].decode("utf-8"))
+            position += length
+    except UnicodeDecodeError as e:
+        raise BulkImportError(f"Файл колоночного формата повреждён: {e}") from e
+    return values
+
+
+def _write_dictionary(file, values) -> None:
+    """
+    Записывает столбец со словарным кодированием: словарь и массив кодов
+
+    :param file: Бинарный файл
+    :type file: BinaryIO
+    :param values: Список строк
+    :type values: list
+    """
+    dictionary: dict[str, int] = {}
+    codes = array("I", (dictionary.setdefault(value, len(dictionary)) for value in values))
+    file.write(_ROW_GROUP_HEADER.pack(len(dictionary)))
+    _write_strings(file, list(dictionary))
+    file.write(codes.tobytes())
+
+
+def _read_dictionary(file, count: int) -> list:
+    """
+    Читает столбец, записанный _write_dictionary
+
+    :param file: Бинарный файл
+    :type file: BinaryIO
+    :param count: Количество значений
+    :type count: int
+    :return: Список строк (одинаковые значения разделяют один объект str)
+    :rtype: list
+    :raises BulkImportError: Если столбец повреждён или код вне словаря
+    """
+    (size,) = _ROW_GROUP_HEADER.unpack(_read_exact(file, _ROW_GROUP_HEADER.size))
+    dictionary = _read_strings(file, size)
+    codes = array("I")
+    codes.frombytes(_read_exact(file, count * codes.itemsize))
+    if codes and max(codes) >= len(dictionary):
+        raise BulkImportError("Файл колоночного формата повреждён: код вне словаря")
+    return [dictionary[code] for code in codes]
+
+
+def _read_exact(file, size: int) -> bytes:
+    """
+    Читает ровно size байт
+
+    Размер сверяется с остатком файла до чтения, поэтому повреждённый счётчик
+    не приводит к попытке выделить память под гигабайты.
+
+    :param file: Бинарный файл с произвольным доступом
+    :type file: BinaryIO
+    :param size: Количество байт
+    :type size: int
+    :return: Прочитанные байты
+    :rtype: bytes
+    :raises BulkImportError: Если файл обрывается раньше
+    """
+    position = file.tell()
+    if size > file.seek(0, os.SEEK_END) - position:
+        raise BulkImportError("Файл колоночного формата повреждён или обрезан")
+    file.seek(position)
+    data = file.read(size)
+    if len(data) != size:
+        raise BulkImportError("Файл колоночного формата повреждён или обрезан")
+    return data
+
+
+def export_columnar(books, path, row_group_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Экспортирует книги в компактный колоночный бинарный формат
+
+    Файл состоит из сигнатуры и групп строк. В каждой группе столбцы хранятся
+    отдельно: названия и ISBN — как массив длин и блок UTF-8, автор и жанр —
+    со словарным кодированием, год — массивом int32.
+
+    :param books: Итерируемый объект с книгами
+    :type books: iterable
+    :param path: Путь к файлу
+    :type path: str or PathLike
+    :param row_group_size: Количество книг в группе строк
+    :type row_group_size: int
+    :return: Количество записанных книг
+    :rtype: int
+    """
+    count = 0
+    iterator = iter(books)
+    with open(path, "wb") as file:
+        file.write(COLUMNAR_MAGIC)
+        while True:
+            group = list(islice(iterator, row_group_size))
+            if not group:
+                break
+            file.write(_ROW_GROUP_HEADER.pack(len(group)))
+            _write_strings(file, [book.title for book in group])
+            _write_dictionary(file, [book.author for book in group])
+            file.write(array("i", (book.year for book in group)).tobytes())
+            _write_dictionary(file, [book.genre for book in group])
+            _write_strings(file, [book.isbn for book in group])
+            count += len(group)
+    return count
+
+
+def iter_columnar_chunks(path, check_digit: bool = False, report=None):
+    """
+    Читает файл колоночного формата по одной группе строк
+
+    Книги с некорректным ISBN или годом пропускаются и учитываются в отчёте.
+
+    :param path: Путь к файлу
+    :type path: str or PathLike
+    :param check_digit: Проверять ли контрольную цифру ISBN
+    :type check_digit: bool
+    :param report: Отчёт для учёта ошибок (необязательно)
+    :type report: ImportReport, optional
+    :return: Генератор списков книг
+    :rtype: Iterator[list]
+    :raises BulkImportError: Если файл не в колоночном формате или повреждён
+    """
+    report = report if report is not None else ImportReport()
+    row_number = 0
+    with open(path, "rb") as file:
+        if file.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise BulkImportError("Файл не является файлом колоночного формата")
+        while True:
+            header = file.read(_ROW_GROUP_HEADER.size)
+            if not header:
+                return
+            if len(header) != _ROW_GROUP_HEADER.size:
+                raise BulkImportError("Файл колоночного формата повреждён или обрезан")
+            (count,) = _ROW_GROUP_HEADER.unpack(header)
+            titles = _read_strings(file, count)
+            authors = _read_dictionary(file, count)
+            years = array("i")
+            years.frombytes(_read_exact(file, count * years.itemsize))
+            genres = _read_dictionary(file, count)
+            isbns = _read_strings(file, count)
+            chunk = []
+            for fields in zip(titles, authors, years, genres, isbns):
+                row_number += 1
+                book = Book(*fields)
+                try:
+                    validate_book(book, check_digit)
+                except BulkImportError as e:
+                    report.add_error(row_number, str(e))
+                    continue
+                chunk.append(book)
+            yield chunk
+
+
+def import_columnar(library, path, check_digit: bool = False, dedupe: bool = False):
+    """
+    Потоково импортирует файл колоночного формата в библиотеку
+
+    :param library: Библиотека
+    :type library: Library
+    :param path: Путь к файлу
+    :type path: str or PathLike
+    :param check_digit: Проверять ли контрольную цифру ISBN
+    :type check_digit: bool
+    :param dedupe: Объединять ли вероятные дубликаты перед загрузкой
+    :type dedupe: bool
+    :return: Отчёт импорта
+    :rtype: ImportReport
+    """
+    report = ImportReport()
+    chunks = iter_columnar_chunks(path, check_digit, report)
+    if dedupe:
+        chunks = _dedupe_chunks(library, chunks, report)
+    return _load_chunks(library, chunks, report)
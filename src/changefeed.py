@@ -0,0 +1,144 @@
+"""Модуль с лентой изменений библиотеки для инкрементальных обновлений."""
+
+from collections import deque
+from collections.abc import Callable
+from itertools import islice
+
+DEFAULT_CAPACITY = 10000
+
+
+class ChangeFeedOverflow(Exception):
+    """Запрошенные изменения уже вытеснены из буфера, нужна полная пересинхронизация."""
+
+
+class Change:
+    """Одно изменение библиотеки."""
+
+    __slots__ = ("version", "kind", "book")
+
+    def __init__(self, version: int, kind: str, book):
+        """
+        Инициализация изменения
+
+        :param version: Версия библиотеки после изменения
+        :type version: int
+        :param kind: Тип изменения: 'add' или 'remove'
+        :type kind: str
+        :param book: Добавленная или удалённая книга
+        :type book: Book
+        """
+        self.version = version
+        self.kind = kind
+        self.book = book
+
+    def __eq__(self, other) -> bool:
+        """
+        Сравнение изменений по версии, типу и книге
+
+        :param other: Объект для сравнения
+        :return: True если изменения совпадают
+        :rtype: bool
+        """
+        if not isinstance(other, Change):
+            return False
+        return (self.version, self.kind, self.book) == (other.version, other.kind, other.book)
+
+    def __repr__(self) -> str:
+        """
+        Представление изменения для отладки
+
+        :return: Строка с версией, типом и ISBN книги
+        :rtype: str
+        """
+        return f"Change(version={self.version}, kind={self.kind!r}, isbn={self.book.isbn!r})"
+
+
+class ChangeFeed:
+    """Лента изменений с монотонными версиями, кольцевым буфером и подписчиками."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Инициализация ленты
+
+        :param capacity: Сколько последних изменений хранить в буфере
+        :type capacity: int
+        :raises ValueError: Если capacity отрицательна
+        """
+        if capacity < 0:
+            raise ValueError("Ёмкость буфера не может быть отрицательной")
+        self._buffer: deque[Change] = deque(maxlen=capacity)
+        self._version = 0
+        self._subscribers: list[Callable[[Change], None]] = []
+
+    @property
+    def version(self) -> int:
+        """
+        Текущая версия (номер последнего изменения)
+
+        :return: Версия
+        :rtype: int
+        """
+        return self._version
+
+    def publish(self, kind: str, book) -> Change:
+        """
+        Регистрирует изменение и уведомляет подписчиков
+
+        :param kind: Тип изменения: 'add' или 'remove'
+        :type kind: str
+        :param book: Книга
+        :type book: Book
+        :return: Зарегистрированное изменение
+        :rtype: Change
+        """
+        self._version += 1
+        change = Change(self._version, kind, book)
+        self._buffer.append(change)
+        for callback in list(self._subscribers):
+            callback(change)
+        return change
+
+    def subscribe(self, callback):
+        """
+        Подписывает функцию на изменения
+
+        Подписчики вызываются синхронно внутри операции изменения библиотеки.
+
+        :param callback: Функция, принимающая Change
+        :type callback: Callable
+        :return: Та же функция (для последующей отписки)
+        :rtype: Callable
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback) -> None:
+        """
+        Отписывает функцию от изменений
+
+        :param callback: Ранее подписанная функция
+        :type callback: Callable
+        """
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def changes_since(self, version: int) -> list:
+        """
+        Изменения с версиями строго больше version
+
+        :param version: Последняя версия, известная потребителю
+        :type version: int
+        :return: Список изменений в порядке версий
+        :rtype: list
+        :raises ValueError: Если version больше текущей версии или отрицательна
+        :raises ChangeFeedOverflow: Если часть нужных изменений уже вытеснена из буфера
+        """
+        if version < 0 or version > self._version:
+            raise ValueError(f"Некорректная версия: {version} (текущая {self._version})")
+        missing = self._version - version
+        if missing > len(self._buffer):
+            raise ChangeFeedOverflow(
+                f"Изменения после версии {version} вытеснены из буфера, "
+                f"доступны версии начиная с {self._version - len(self._buffer) + 1}"
+            )
+        return list(islice(self._buffer, len(self._buffer) - missing, None))
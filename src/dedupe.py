@@ -0,0 +1,597 @@
+"""Модуль с поиском дубликатов и почти-дубликатов книг при загрузке каталога."""
+
+import random
+import re
+import zlib
+from src.book import Book
+from src.fuzzy import normalize
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.7
+SHINGLE_SIZE = 3
+TITLE_WEIGHT = 2
+MAX_REPORTED_CLUSTERS = 100
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_NON_WORD = re.compile(r"[^\w ]+")
+
+
+def normalize_isbn(isbn: str) -> str:
+    """
+    Приводит ISBN к 13 цифрам: без дефисов и пробелов, ISBN-10 переводится в ISBN-13
+
+    Значения, не похожие на ISBN, возвращаются без разделителей в верхнем регистре.
+
+    :param isbn: ISBN в любом формате
+    :type isbn: str
+    :return: Нормализованный ISBN
+    :rtype: str
+    """
+    digits = str(isbn).replace("-", "").replace(" ", "").upper()
+    if len(digits) == 10 and digits[:9].isdigit() and (digits[9].isdigit() or digits[9] == "X"):
+        body = "978" + digits[:9]
+        total = sum(int(c) * (1 if i % 2 == 0 else 3) for i, c in enumerate(body))
+        return body + str((10 - total % 10) % 10)
+    return digits
+
+
+def normalized_key(book) -> str:
+    """
+    Ключ книги для точного совпадения: название и автор без регистра, пунктуации и 'ё'
+
+    :param book: Книга
+    :type book: Book
+    :return: Ключ
+    :rtype: str
+    """
+    title = normalize(_NON_WORD.sub(" ", normalize(book.title)))
+    author = normalize(_NON_WORD.sub(" ", normalize(book.author)))
+    return f"{title}|{author}"
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE, salt: int = 0) -> set:
+    """
+    Множество символьных k-грамм строки
+
+    :param text: Строка
+    :type text: str
+    :param size: Длина k-граммы
+    :type size: int
+    :param salt: Начальное значение CRC32: k-граммы с разной солью не совпадают
+    :type salt: int
+    :return: Множество хешей k-грамм
+    :rtype: set
+    """
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8"), salt)}
+    return {zlib.crc32(text[i:i + size].encode("utf-8"), salt)
+            for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """MinHash-сигнатуры множеств k-грамм для оценки сходства Жаккара."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        """
+        Инициализация семейства хеш-функций h(x) = (a * x + b) mod p
+
+        :param num_perm: Длина сигнатуры
+        :type num_perm: int
+        :param seed: Seed для выбора коэффициентов
+        :type seed: int
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                        for _ in range(num_perm)]
+
+    def signature(self, values: set) -> tuple:
+        """
+        Сигнатура множества
+
+        :param values: Множество целых чисел (хешей k-грамм)
+        :type values: set
+        :return: Кортеж из num_perm минимумов
+        :rtype: tuple
+        """
+        return tuple(min((a * value + b) % _MERSENNE_PRIME for value in values)
+                     for a, b in self._params)
+
+    @staticmethod
+    def similarity(first: tuple, second: tuple) -> float:
+        """
+        Оценка сходства Жаккара по двум сигнатурам
+
+        :param first: Первая сигнатура
+        :type first: tuple
+        :param second: Вторая сигнатура
+        :type second: tuple
+        :return: Доля совпадающих позиций
+        :rtype: float
+        """
+        return sum(x == y for x, y in zip(first, second)) / len(first)
+
+
+class DisjointSet:
+    """Система непересекающихся множеств со сжатием путей и объединением по размеру."""
+
+    def __init__(self, size: int):
+        """
+        Инициализация: каждый элемент в своём множестве
+
+        :param size: Количество элементов
+        :type size: int
+        """
+        self._parent = list(range(size))
+        self._size = [1] * size
+
+    def add(self) -> int:
+        """
+        Добавляет новый элемент в отдельное множество
+
+        :return: Номер элемента
+        :rtype: int
+        """
+        self._parent.append(len(self._parent))
+        self._size.append(1)
+        return len(self._parent) - 1
+
+    def find(self, item: int) -> int:
+        """
+        Представитель множества элемента
+
+        :param item: Элемент
+        :type item: int
+        :return: Представитель
+        :rtype: int
+        """
+        root = item
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[item] != root:
+            self._parent[item], item = root, self._parent[item]
+        return root
+
+    def union(self, first: int, second: int) -> bool:
+        """
+        Объединяет множества двух элементов
+
+        :param first: Первый элемент
+        :type first: int
+        :param second: Второй элемент
+        :type second: int
+        :return: True если множества были разными
+        :rtype: bool
+        """
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self._size[first] < self._size[second]:
+            first, second = second, first
+        self._parent[second] = first
+        self._size[first] += self._size[second]
+        return True
+
+
+def signature_shingles(book) -> set:
+    """
+    Множество, по которому строится MinHash-сигнатура книги
+
+    K-граммы названия и автора берутся отдельно (с разной солью), и k-граммы
+    названия входят TITLE_WEIGHT раз, поэтому общий автор не делает похожими
+    книги с разными названиями.
+
+    :param book: Книга
+    :type book: Book
+    :return: Множество хешей k-грамм
+    :rtype: set
+    """
+    title, author = normalized_key(book).split("|")
+    values = shingles(author)
+    for copy in range(1, TITLE_WEIGHT + 1):
+        values |= shingles(title, salt=copy)
+    return values
+
+
+def is_near_duplicate(first, second, threshold: float = DEFAULT_THRESHOLD) -> bool:
+    """
+    Точная проверка пары, найденной по MinHash
+
+    Книги считаются одной, если не ниже threshold и сходство Жаккара k-грамм
+    названий, и точное сходство множеств signature_shingles.
+
+    :param first: Первая книга
+    :type first: Book
+    :param second: Вторая книга
+    :type second: Book
+    :param threshold: Минимальное сходство Жаккара
+    :type threshold: float
+    :return: True если книги почти совпадают
+    :rtype: bool
+    """
+    first_title, first_author = (shingles(text) for text in normalized_key(first).split("|"))
+    second_title, second_author = (shingles(text) for text in normalized_key(second).split("|"))
+    title_common = len(first_title & second_title)
+    title_total = len(first_title | second_title)
+    if title_common < threshold * title_total:
+        return False
+    common = TITLE_WEIGHT * title_common + len(first_author & second_author)
+    return common >= threshold * (TITLE_WEIGHT * title_total + len(first_author | second_author))
+
+class DuplicateIndex:
+    """Ключи, MinHash-сигнатуры и корзины LSH принятых книг.
+
+    Позволяет сравнивать новые записи с каталогом, не пересчитывая сигнатуры
+    всех его книг: индекс строится один раз и обновляется по ленте изменений
+    (apply). Корзины полос хранят хеш полосы вместо кортежа значений; коллизия
+    хешей лишь добавляет сравнение сигнатур.
+    """
+
+    def __init__(self, books=(), num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS,
+                 seed: int = 1):
+        """
+        Инициализация индекса
+
+        :param books: Итерируемый объект с принятыми книгами
+        :type books: iterable
+        :param num_perm: Длина MinHash-сигнатуры
+        :type num_perm: int
+        :param bands: Количество полос LSH (должно делить num_perm)
+        :type bands: int
+        :param seed: Seed хеш-функций
+        :type seed: int
+        :raises ValueError: Если bands не делит num_perm
+        """
+        if num_perm % bands:
+            raise ValueError(f"Количество полос {bands} должно делить длину сигнатуры {num_perm}")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.seed = seed
+        self.hasher = MinHasher(num_perm, seed)
+        self._rows = num_perm // bands
+        self._books: dict[str, Book] = {}
+        self._signatures: dict[str, tuple] = {}
+        self._isbns: dict[str, list[Book]] = {}
+        self._keys: dict[str, list[Book]] = {}
+        self._buckets: list[dict[int, list[Book]]] = [{} for _ in range(bands)]
+        for book in books:
+            self.add(book)
+
+    def signature(self, book) -> tuple:
+        """
+        MinHash-сигнатура книги
+
+        :param book: Книга
+        :type book: Book
+        :return: Сигнатура
+        :rtype: tuple
+        """
+        return self.hasher.signature(signature_shingles(book))
+
+    def band_keys(self, signature: tuple) -> list:
+        """
+        Ключи корзин LSH для сигнатуры: по одному на полосу
+
+        :param signature: Сигнатура
+        :type signature: tuple
+        :return: Список хешей полос
+        :rtype: list
+        """
+        rows = self._rows
+        return [hash(signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def _tables(self, book) -> tuple:
+        """
+        Таблицы точного совпадения и ключи книги в них
+
+        :param book: Книга
+        :type book: Book
+        :return: Пары (причина, таблица, ключ) для ISBN и названия с автором
+        :rtype: tuple
+        """
+        return (("isbn", self._isbns, normalize_isbn(book.isbn)),
+                ("key", self._keys, normalized_key(book)))
+
+    def add(self, book) -> None:
+        """
+        Добавляет книгу; повторное добавление того же ISBN заменяет запись
+
+        :param book: Книга
+        :type book: Book
+        """
+        if book.isbn in self._books:
+            self.remove(self._books[book.isbn])
+        signature = self.signature(book)
+        self._books[book.isbn] = book
+        self._signatures[book.isbn] = signature
+        for _, table, key in self._tables(book):
+            table.setdefault(key, []).append(book)
+        for buckets, key in zip(self._buckets, self.band_keys(signature)):
+            buckets.setdefault(key, []).append(book)
+
+    def remove(self, book) -> None:
+        """
+        Удаляет книгу по ISBN; отсутствующая книга игнорируется
+
+        :param book: Книга
+        :type book: Book
+        """
+        book = self._books.pop(book.isbn, None)
+        if book is None:
+            return
+        signature = self._signatures.pop(book.isbn)
+        tables = [(table, key) for _, table, key in self._tables(book)]
+        tables += list(zip(self._buckets, self.band_keys(signature)))
+        for table, key in tables:
+            members = table[key]
+            members.remove(book)
+            if not members:
+                del table[key]
+
+    def apply(self, change) -> None:
+        """
+        Применяет изменение из ленты изменений библиотеки
+
+        :param change: Изменение
+        :type change: Change
+        """
+        if change.kind == 'add':
+            self.add(change.book)
+        else:
+            self.remove(change.book)
+
+    def matches(self, book, signature: tuple, threshold: float = DEFAULT_THRESHOLD) -> list:
+        """
+        Принятые книги, с которыми совпадает запись
+
+        Как и в find_duplicates, запись сравнивается с первой книгой каждой
+        таблицы и каждой корзины LSH.
+
+        :param book: Новая запись
+        :type book: Book
+        :param signature: Сигнатура записи
+        :type signature: tuple
+        :param threshold: Минимальное оценочное сходство Жаккара
+        :type threshold: float
+        :return: Список пар (книга, причина): 'isbn', 'key' или 'minhash'
+        :rtype: list
+        """
+        found = []
+        for reason, table, key in self._tables(book):
+            members = table.get(key)
+            if members:
+                found.append((members[0], reason))
+        checked = set()
+        for buckets, key in zip(self._buckets, self.band_keys(signature)):
+            members = buckets.get(key)
+            if not members or members[0].isbn in checked:
+                continue
+            other = members[0]
+            checked.add(other.isbn)
+            if MinHasher.similarity(self._signatures[other.isbn], signature) >= threshold:
+                found.append((other, "minhash"))
+        return found
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def __contains__(self, book) -> bool:
+        return book.isbn in self._books
+
+
+class DuplicateCluster:
+    """Группа записей, признанных одной книгой."""
+
+    def __init__(self, canonical, duplicates: list, reasons: set):
+        """
+        Инициализация группы
+
+        :param canonical: Сохраняемая книга (первая по порядку)
+        :type canonical: Book
+        :param duplicates: Книги, объединяемые с канонической
+        :type duplicates: list
+        :param reasons: Причины объединения: 'isbn', 'key', 'minhash'
+        :type reasons: set
+        """
+        self.canonical = canonical
+        self.duplicates = duplicates
+        self.reasons = reasons
+
+    def as_dict(self) -> dict:
+        """
+        Представление группы в виде словаря
+
+        :return: Словарь с канонической книгой, дубликатами и причинами
+        :rtype: dict
+        """
+        return {
+            "canonical": self.canonical.to_dict(),
+            "duplicates": [book.to_dict() for book in self.duplicates],
+            "reasons": sorted(self.reasons),
+        }
+
+
+class DedupeReport:
+    """Отчёт об объединении дубликатов."""
+
+    def __init__(self, total: int, unique: list, clusters: list):
+        """
+        Инициализация отчёта
+
+        :param total: Количество просмотренных записей
+        :type total: int
+        :param unique: Книги, оставшиеся после объединения, в исходном порядке
+        :type unique: list
+        :param clusters: Группы дубликатов
+        :type clusters: list
+        """
+        self.total = total
+        self.unique = unique
+        self.clusters = clusters
+
+    @property
+    def merged(self) -> int:
+        """
+        Количество записей, объединённых с другими
+
+        :return: Количество записей
+        :rtype: int
+        """
+        return sum(len(cluster.duplicates) for cluster in self.clusters)
+
+    def as_dict(self, limit: int = MAX_REPORTED_CLUSTERS) -> dict:
+        """
+        Представление отчёта в виде словаря
+
+        :param limit: Сколько групп включить в отчёт
+        :type limit: int
+        :return: Словарь со счётчиками и группами
+        :rtype: dict
+        """
+        return {
+            "total": self.total,
+            "unique": len(self.unique),
+            "merged": self.merged,
+            "clusters": [cluster.as_dict() for cluster in self.clusters[:limit]],
+        }
+
+    def format(self, limit: int = 20) -> str:
+        """
+        Текстовый отчёт
+
+        :param limit: Сколько групп вывести
+        :type limit: int
+        :return: Многострочный текст
+        :rtype: str
+        """
+        lines = [f"Записей: {self.total}, уникальных: {len(self.unique)}, "
+                 f"объединено: {self.merged}, групп: {len(self.clusters)}"]
+        for cluster in self.clusters[:limit]:
+            lines.append(f"{cluster.canonical} [{cluster.canonical.isbn}] "
+                         f"({', '.join(sorted(cluster.reasons))})")
+            for book in cluster.duplicates:
+                lines.append(f"    = {book} [{book.isbn}]")
+        return "\n".join(lines)
+
+
+def find_duplicates(books, existing=(), threshold: float = DEFAULT_THRESHOLD,
+                    num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS,
+                    seed: int = 1, index=None) -> DedupeReport:
+    """
+    Группирует записи, которые вероятно описывают одну книгу
+
+    Записи объединяются при совпадении нормализованного ISBN (ISBN-10 и ISBN-13
+    считаются одинаковыми), нормализованных названия и автора или при сходстве
+    MinHash-сигнатур k-грамм названия и автора (название весит больше, см.
+    signature_shingles) не ниже threshold. Кандидаты ищутся через LSH: сигнатура
+    делится на bands полос, записи с совпадающей полосой попадают в одну корзину
+    и сравниваются с её первой записью, поэтому время работы близко к линейному.
+    Совпадение по MinHash перепроверяется точно (is_near_duplicate) и не
+    транзитивно: группы сливаются, только если каждая запись присоединяемой
+    группы похожа на каноническую книгу общей группы, так что цепочки попарно
+    похожих записей не склеиваются в одну книгу.
+
+    Книги existing (например, уже загруженные в библиотеку) участвуют в
+    сравнении и всегда остаются каноническими, но не попадают в unique.
+    Вместо existing можно передать готовый DuplicateIndex принятых книг:
+    тогда сигнатуры считаются только для новых записей.
+
+    :param books: Итерируемый объект с новыми книгами
+    :type books: iterable
+    :param existing: Уже принятые книги (не используется, если задан index)
+    :type existing: iterable
+    :param threshold: Минимальное оценочное сходство Жаккара
+    :type threshold: float
+    :param num_perm: Длина MinHash-сигнатуры (не используется, если задан index)
+    :type num_perm: int
+    :param bands: Количество полос LSH (должно делить num_perm)
+    :type bands: int
+    :param seed: Seed хеш-функций
+    :type seed: int
+    :param index: Индекс принятых книг
+    :type index: DuplicateIndex, optional
+    :return: Отчёт с уникальными книгами и группами дубликатов
+    :rtype: DedupeReport
+    :raises ValueError: Если bands не делит num_perm
+    """
+    if index is None:
+        index = DuplicateIndex(existing, num_perm, bands, seed)
+    records = list(books)
+    count = len(records)
+    sets = DisjointSet(count)
+    reasons: dict[int, set[str]] = {}
+    signatures = [index.signature(book) for book in records]
+    # Принятые книги, совпавшие с записями, получают номера после записей.
+    anchors: dict[str, int] = {}
+    # Члены и каноническая книга каждой группы из нескольких элементов по её представителю.
+    members: dict[int, list[int]] = {}
+    canonicals: dict[int, int] = {}
+
+    def rank(position: int) -> tuple:
+        # Каноническая книга — принятая, если она есть в группе, иначе первая запись.
+        return position < count, position
+
+    def merge(first: int, second: int, reason: str, verify: bool = False) -> None:
+        first_root, second_root = sets.find(first), sets.find(second)
+        if first_root != second_root:
+            canonical = min(canonicals.get(first_root, first_root),
+                            canonicals.get(second_root, second_root), key=rank)
+            if canonical != canonicals.get(first_root, first_root):
+                first_root, second_root = second_root, first_root
+            # Группа second_root присоединяется к группе канонической книги.
+            if verify and not all(is_near_duplicate(records[member], records[canonical], threshold)
+                                  for member in members.get(second_root, [second_root])):
+                return
+            joined = members.pop(first_root, [first_root]) + members.pop(second_root, [second_root])
+            canonicals.pop(first_root, None)
+            canonicals.pop(second_root, None)
+            sets.union(first_root, second_root)
+            root = sets.find(first_root)
+            members[root] = joined
+            canonicals[root] = canonical
+        reasons.setdefault(first, set()).add(reason)
+        reasons.setdefault(second, set()).add(reason)
+
+    def anchor(book) -> int:
+        position = anchors.get(book.isbn)
+        if position is None:
+            position = anchors[book.isbn] = sets.add()
+            records.append(book)
+        return position
+
+    first_seen: dict[tuple[str, str], int] = {}
+    band_keys = []
+    for position in range(count):
+        book = records[position]
+        signature = signatures[position]
+        band_keys.append(index.band_keys(signature))
+        for match, reason in index.matches(book, signature, threshold):
+            merge(anchor(match), position, reason, verify=reason == "minhash")
+        for kind, value in (("isbn", normalize_isbn(book.isbn)), ("key", normalized_key(book))):
+            other = first_seen.setdefault((kind, value), position)
+            if other != position:
+                merge(other, position, kind)
+
+    for band in range(index.bands):
+        buckets: dict[int, int] = {}
+        for position in range(count):
+            other = buckets.setdefault(band_keys[position][band], position)
+            if other != position and sets.find(other) != sets.find(position):
+                if MinHasher.similarity(signatures[other], signatures[position]) >= threshold:
+                    merge(other, position, "minhash", verify=True)
+
+    unique = [records[position] for position in range(count)
+              if canonicals.get(sets.find(position), position) == position]
+    clusters = []
+    for group in sorted(sorted(group) for group in members.values()):
+        canonical = canonicals[sets.find(group[0])]
+        cluster_reasons: set[str] = set()
+        for member in group:
+            cluster_reasons |= reasons.get(member, set())
+        clusters.append(DuplicateCluster(records[canonical],
+                                         [records[member] for member in group
+                                          if member != canonical],
+                                         cluster_reasons))
+    clusters.sort(key=lambda cluster: -len(cluster.duplicates))
+    return DedupeReport(count, unique, clusters)
@@ -0,0 +1,126 @@
+"""Модуль с агрегатами (фасетами) библиотеки: количество книг по значениям поля."""
+
+import heapq
+from collections import Counter
+
+
+def decade(book) -> int:
+    """
+    Десятилетие издания книги
+
+    :param book: Книга
+    :type book: Book
+    :return: Первый год десятилетия (например, 1860 для 1869)
+    :rtype: int
+    """
+    return book.year // 10 * 10
+
+
+FACET_KEYS = {
+    'genre': lambda book: book.genre,
+    'author': lambda book: book.author,
+    'year': lambda book: book.year,
+    'decade': decade,
+}
+
+
+class FacetCounter:
+    """Счётчик книг по значению ключа, обновляемый при каждом изменении библиотеки."""
+
+    def __init__(self, key, books=None):
+        """
+        Инициализация счётчика
+
+        :param key: Функция, возвращающая значение фасета для книги
+        :type key: Callable
+        :param books: Итерируемый объект с книгами для начального подсчёта (необязательно)
+        :type books: iterable, optional
+        """
+        self._key = key
+        self._counts = Counter()
+        if books is not None:
+            self._counts.update(key(book) for book in books)
+
+    def add(self, book) -> None:
+        """
+        Учитывает книгу
+
+        :param book: Книга
+        :type book: Book
+        """
+        self._counts[self._key(book)] += 1
+
+    def remove(self, book) -> None:
+        """
+        Убирает книгу из подсчёта; значения с нулевым количеством удаляются
+
+        :param book: Книга
+        :type book: Book
+        """
+        value = self._key(book)
+        count = self._counts.get(value, 0)
+        if count <= 1:
+            self._counts.pop(value, None)
+        else:
+            self._counts[value] = count - 1
+
+    def apply(self, change) -> None:
+        """
+        Применяет изменение из ленты изменений библиотеки
+
+        :param change: Изменение
+        :type change: Change
+        """
+        if change.kind == 'add':
+            self.add(change.book)
+        else:
+            self.remove(change.book)
+
+    def get(self, value) -> int:
+        """
+        Количество книг со значением
+
+        :param value: Значение фасета
+        :return: Количество книг
+        :rtype: int
+        """
+        return self._counts.get(value, 0)
+
+    def counts(self) -> dict:
+        """
+        Копия счётчиков
+
+        :return: Словарь {значение: количество книг}
+        :rtype: dict
+        """
+        return dict(self._counts)
+
+    def __len__(self) -> int:
+        """
+        Количество различных значений
+
+        :return: Количество значений
+        :rtype: int
+        """
+        return len(self._counts)
+
+
+def rank(counts: dict, top=None) -> dict:
+    """
+    Упорядочивает счётчики по убыванию количества, при равенстве по значению
+
+    :param counts: Словарь {значение: количество}
+    :type counts: dict
+    :param top: Сколько значений оставить (None — все)
+    :type top: int, optional
+    :return: Упорядоченный словарь {значение: количество}
+    :rtype: dict
+    """
+    def order(item):
+        return -item[1], str(item[0])
+
+    if top is None:
+        items = sorted(counts.items(), key=order)
+    else:
+        items = heapq.nsmallest(top, counts.items(), key=order)
+    return dict(items)
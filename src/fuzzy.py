@@ -0,0 +1,308 @@
+"""Модуль с нечётким поиском по авторам и названиям: фильтр по триграммам и расстояние Майерса."""
+
+import re
+import unicodedata
+from array import array
+from collections import Counter
+
+_SPACES = re.compile(r"\s+")
+_WORDS = re.compile(r"\w+")
+MIN_WORD_LENGTH = 3
+GRAM_SIZE = 3
+_PAD = "\0" * (GRAM_SIZE - 1)
+
+
+def normalize(text: str) -> str:
+    """
+    Нормализует строку для сравнения: NFKC, без учёта регистра, 'ё' как 'е', одинарные пробелы
+
+    :param text: Исходная строка
+    :type text: str
+    :return: Нормализованная строка
+    :rtype: str
+    """
+    text = unicodedata.normalize("NFKC", str(text)).casefold().replace("ё", "е")
+    return _SPACES.sub(" ", text).strip()
+
+
+def pattern_masks(pattern: str) -> dict:
+    """
+    Битовые маски позиций символов образца для алгоритма Майерса
+
+    :param pattern: Образец
+    :type pattern: str
+    :return: Словарь {символ: маска позиций}
+    :rtype: dict
+    """
+    masks: dict[str, int] = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def bounded_distance(masks: dict, length: int, text: str, max_distance: int | None = None) -> int:
+    """
+    Расстояние Левенштейна от образца до текста битово-параллельным алгоритмом Майерса
+
+    Столбец матрицы расстояний хранится в виде битовых векторов приращений,
+    поэтому на символ текста приходится несколько операций над целыми числами.
+    С ограничением вычисление прекращается, как только расстояние заведомо
+    его превысит.
+
+    :param masks: Маски образца из pattern_masks()
+    :type masks: dict
+    :param length: Длина образца
+    :type length: int
+    :param text: Текст
+    :type text: str
+    :param max_distance: Ограничение расстояния (None — без ограничения)
+    :type max_distance: int or None
+    :return: Расстояние; с ограничением — max_distance + 1, если расстояние больше
+    :rtype: int
+    """
+    over = len(text) + length + 1 if max_distance is None else max_distance + 1
+    if length == 0:
+        return min(len(text), over)
+    full = (1 << length) - 1
+    last = 1 << (length - 1)
+    positive, negative, score = full, 0, length
+    remaining = len(text)
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        up = negative | ~(horizontal | positive)
+        down = positive & horizontal
+        if up & last:
+            score += 1
+        elif down & last:
+            score -= 1
+        up = (up << 1) | 1
+        down <<= 1
+        positive = (down | ~(vertical | up)) & full
+        negative = up & vertical & full
+        remaining -= 1
+        if score - remaining >= over:
+            return over
+    return min(score, over)
+
+
+def levenshtein(a: str, b: str, max_distance: int | None = None) -> int:
+    """
+    Расстояние Левенштейна между строками
+
+    :param a: Первая строка
+    :type a: str
+    :param b: Вторая строка
+    :type b: str
+    :param max_distance: Ограничение расстояния (None — без ограничения)
+    :type max_distance: int or None
+    :return: Минимальное число вставок, удалений и замен; с ограничением —
+        max_distance + 1, если расстояние больше max_distance
+    :rtype: int
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    return bounded_distance(pattern_masks(b), len(b), a, max_distance)
+
+
+def grams(text: str) -> set:
+    """
+    Множество триграмм строки, дополненной по краям служебными символами
+
+    :param text: Нормализованная строка
+    :type text: str
+    :return: Множество подстрок длины GRAM_SIZE
+    :rtype: set
+    """
+    padded = f"{_PAD}{text}{_PAD}"
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+class FuzzyIndex:
+    """Нечёткий индекс значений поля: полные значения и отдельные слова со списками триграмм.
+
+    Ключ на расстоянии не больше d от запроса теряет не больше GRAM_SIZE * d
+    триграмм запроса и отличается от него по длине не больше чем на d, поэтому
+    расстояние Левенштейна считается только для ключей подходящей длины,
+    набравших достаточно общих триграмм (для коротких запросов — для всех
+    ключей подходящей длины).
+    """
+
+    def __init__(self, field: str):
+        """
+        Инициализация индекса
+
+        :param field: Имя поля книги ('author', 'title' и т.п.)
+        :type field: str
+        """
+        self.field = field
+        self._values: dict[str, dict[str, int]] = {}
+        self._keys_by_id: list[str] = []
+        self._postings: dict[int, dict[str, array]] = {}
+        self._by_length: dict[int, list[int]] = {}
+
+    def _keys(self, value: str) -> set:
+        """
+        Нормализованные ключи значения: всё значение и его слова
+
+        :param value: Значение поля
+        :type value: str
+        :return: Множество ключей
+        :rtype: set
+        """
+        normalized = normalize(value)
+        keys = {normalized}
+        keys.update(word for word in _WORDS.findall(normalized) if len(word) >= MIN_WORD_LENGTH)
+        return keys
+
+    def _add_key(self, key: str) -> None:
+        """
+        Регистрирует новый ключ в списках триграмм и в группе его длины
+
+        :param key: Нормализованный ключ
+        :type key: str
+        """
+        key_id = len(self._keys_by_id)
+        self._keys_by_id.append(key)
+        postings = self._postings.setdefault(len(key), {})
+        for gram in grams(key):
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array("i")
+            posting.append(key_id)
+        self._by_length.setdefault(len(key), []).append(key_id)
+
+    def add(self, book) -> None:
+        """
+        Учитывает значение поля книги
+
+        :param book: Книга
+        :type book: Book
+        """
+        value = getattr(book, self.field)
+        for key in self._keys(value):
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = {}
+                self._add_key(key)
+            counts[value] = counts.get(value, 0) + 1
+
+    def remove(self, book) -> None:
+        """
+        Убирает значение поля книги
+
+        Ключ без значений остаётся в списках триграмм, но не попадает в результаты.
+
+        :param book: Книга
+        :type book: Book
+        """
+        value = getattr(book, self.field)
+        for key in self._keys(value):
+            counts = self._values.get(key)
+            if counts is None or value not in counts:
+                continue
+            counts[value] -= 1
+            if counts[value] == 0:
+                del counts[value]
+
+    def apply(self, change) -> None:
+        """
+        Применяет изменение из ленты изменений библиотеки
+
+        :param change: Изменение
+        :type change: Change
+        """
+        if change.kind == 'add':
+            self.add(change.book)
+        else:
+            self.remove(change.book)
+
+    def _candidates(self, query: str, max_distance: int) -> list:
+        """
+        Идентификаторы ключей, которые могут быть на расстоянии не больше max_distance
+
+        :param query: Нормализованный запрос
+        :type query: str
+        :param max_distance: Максимальное расстояние
+        :type max_distance: int
+        :return: Список идентификаторов ключей
+        :rtype: list
+        """
+        lengths = range(max(0, len(query) - max_distance), len(query) + max_distance + 1)
+        query_grams = grams(query)
+        threshold = len(query_grams) - GRAM_SIZE * max_distance
+        if threshold <= 0:
+            return [key_id for length in lengths for key_id in self._by_length.get(length, ())]
+        shared: Counter = Counter()
+        for length in lengths:
+            postings = self._postings.get(length)
+            if postings is None:
+                continue
+            for gram in query_grams:
+                posting = postings.get(gram)
+                if posting is not None:
+                    shared.update(posting)
+        return [key_id for key_id, count in shared.items() if count >= threshold]
+
+    def _collect(self, query: str, max_distance: int, best: dict, popularity: dict) -> None:
+        """
+        Добавляет значения, ключи которых на расстоянии не больше max_distance от запроса
+
+        :param query: Нормализованный запрос
+        :type query: str
+        :param max_distance: Максимальное расстояние
+        :type max_distance: int
+        :param best: Лучшее расстояние по значениям (дополняется)
+        :type best: dict
+        :param popularity: Количество книг по значениям (дополняется)
+        :type popularity: dict
+        """
+        if max_distance == 0:
+            matches = [(0, query)] if query in self._values else []
+        else:
+            masks = pattern_masks(query)
+            matches = []
+            for key_id in self._candidates(query, max_distance):
+                key = self._keys_by_id[key_id]
+                if self._values[key]:
+                    distance = bounded_distance(masks, len(query), key, max_distance)
+                    if distance <= max_distance:
+                        matches.append((distance, key))
+        for distance, key in matches:
+            for value, count in self._values[key].items():
+                if value not in best or distance < best[value]:
+                    best[value] = distance
+                popularity[value] = count
+
+    def search(self, query: str, max_distance: int = 2, limit: int = 10) -> list:
+        """
+        Значения поля, похожие на запрос
+
+        Результаты упорядочены по расстоянию, затем по числу книг с этим
+        значением (по убыванию), затем по алфавиту. Расстояние увеличивается
+        постепенно: если на меньшем расстоянии нашлось limit значений, более
+        далёкие ключи не проверяются.
+
+        :param query: Запрос
+        :type query: str
+        :param max_distance: Максимальное расстояние Левенштейна
+        :type max_distance: int
+        :param limit: Максимальное количество результатов
+        :type limit: int
+        :return: Список пар (значение, расстояние)
+        :rtype: list
+        """
+        query = normalize(query)
+        best: dict[str, int] = {}
+        popularity: dict[str, int] = {}
+        for distance in range(max_distance + 1):
+            self._collect(query, distance, best, popularity)
+            if len(best) >= limit:
+                break
+        ranked = sorted(best.items(), key=lambda item: (item[1], -popularity[item[0]], item[0]))
+        return ranked[:limit]
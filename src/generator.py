@@ -0,0 +1,219 @@
+"""Модуль с генератором синтетических каталогов произвольного размера и Zipf-распределением."""
+
+import argparse
+import random
+import sys
+from bisect import bisect_right
+from itertools import accumulate, product
+from src.book import Book
+from src.bulk_io import export_columnar, export_csv
+from src.constants import AUTHORS, BOOK_DATA, GENRES, YEARS
+
+DEFAULT_AUTHOR_SKEW = 1.0
+DEFAULT_GENRE_SKEW = 0.5
+ISBN_PREFIX = "979"
+
+_TITLE_WORDS = sorted({word for title, *_ in BOOK_DATA for word in title.split() if len(word) > 2})
+_SYLLABLES = [consonant + vowel for consonant in "бвгдзклмнпрст" for vowel in "аеиоу"]
+_SERIAL_SYLLABLES = 4
+# Множитель взаимно прост с len(_SYLLABLES) ** _SERIAL_SYLLABLES: умножение переставляет номера.
+_SERIAL_MULTIPLIER = 3 ** 17
+
+
+class ZipfChoice:
+    """Выбор элемента последовательности с вероятностью, обратной рангу в степени skew.
+
+    При skew=0 распределение равномерное; первый элемент самый популярный.
+    """
+
+    def __init__(self, skew: float = 1.0, rng=random):
+        """
+        Инициализация выбора
+
+        :param skew: Показатель Zipf-распределения (0 — равномерно)
+        :type skew: float
+        :param rng: Генератор случайных чисел (по умолчанию модуль random)
+        :type rng: random.Random
+        :raises ValueError: Если skew отрицателен
+        """
+        if skew < 0:
+            raise ValueError(f"Показатель распределения не может быть отрицательным: {skew}")
+        self.skew = skew
+        self._rng = rng
+        self._cumulative: dict[int, list[float]] = {}
+
+    def weights(self, size: int) -> list:
+        """
+        Накопленные веса для последовательности заданной длины
+
+        :param size: Длина последовательности
+        :type size: int
+        :return: Список накопленных весов
+        :rtype: list
+        """
+        cumulative = self._cumulative.get(size)
+        if cumulative is None:
+            cumulative = list(accumulate(1 / rank ** self.skew for rank in range(1, size + 1)))
+            self._cumulative[size] = cumulative
+        return cumulative
+
+    def index(self, size: int) -> int:
+        """
+        Случайная позиция в последовательности длины size
+
+        :param size: Длина последовательности
+        :type size: int
+        :return: Позиция
+        :rtype: int
+        :raises IndexError: Если последовательность пуста
+        """
+        if size <= 0:
+            raise IndexError("Выбор из пустой последовательности")
+        if self.skew == 0:
+            return self._rng.randrange(size)
+        cumulative = self.weights(size)
+        return min(bisect_right(cumulative, self._rng.random() * cumulative[-1]), size - 1)
+
+    def __call__(self, values):
+        """
+        Случайный элемент последовательности
+
+        :param values: Последовательность
+        :type values: Sequence
+        :return: Элемент
+        """
+        return values[self.index(len(values))]
+
+
+def make_isbn(serial: int) -> str:
+    """
+    ISBN-13 с корректной контрольной цифрой для порядкового номера
+
+    :param serial: Порядковый номер (0 <= serial < 10 ** 9)
+    :type serial: int
+    :return: ISBN в формате 979-X-XXXX-XXXX-C
+    :rtype: str
+    """
+    body = f"{ISBN_PREFIX}{serial:09d}"
+    total = sum(int(c) * (1 if i % 2 == 0 else 3) for i, c in enumerate(body))
+    check = (10 - total % 10) % 10
+    return f"{body[:3]}-{body[3]}-{body[4:8]}-{body[8:]}-{check}"
+
+
+def serial_word(serial: int) -> str:
+    """
+    Слово из слогов, взаимно однозначно соответствующее порядковому номеру
+
+    Номера перемешиваются умножением по модулю, поэтому слова соседних номеров
+    не похожи друг на друга.
+
+    :param serial: Порядковый номер (serial >= 0)
+    :type serial: int
+    :return: Слово из _SERIAL_SYLLABLES или более слогов
+    :rtype: str
+    """
+    base = len(_SYLLABLES)
+    block = base ** _SERIAL_SYLLABLES
+    high, low = divmod(serial, block)
+    low = low * _SERIAL_MULTIPLIER % block
+    syllables = []
+    for _ in range(_SERIAL_SYLLABLES):
+        low, digit = divmod(low, base)
+        syllables.append(_SYLLABLES[digit])
+    while high:
+        high, digit = divmod(high, base)
+        syllables.append(_SYLLABLES[digit])
+    return "".join(syllables)
+
+
+def author_pool(count: int | None = None) -> list:
+    """
+    Список авторов: сначала словарь AUTHORS, затем сочетания их имён и фамилий
+
+    :param count: Нужное количество авторов (None — только AUTHORS)
+    :type count: int or None
+    :return: Список имён авторов
+    :rtype: list
+    """
+    if count is None or count <= len(AUTHORS):
+        return list(AUTHORS[:count] if count is not None else AUTHORS)
+    names = list(AUTHORS)
+    first_names = [author.split()[0] for author in AUTHORS]
+    last_names = [author.split()[-1] for author in AUTHORS]
+    names += [f"{first} {last}" for first, last in product(first_names, last_names)
+              if f"{first} {last}" not in AUTHORS]
+    base = list(names)
+    suffix = 2
+    while len(names) < count:
+        names += [f"{name} {suffix}" for name in base]
+        suffix += 1
+    return names[:count]
+
+
+def generate_books(count: int, seed: int | None = None, author_skew: float = DEFAULT_AUTHOR_SKEW,
+                   genre_skew: float = DEFAULT_GENRE_SKEW, authors: int | None = None,
+                   start: int = 0):
+    """
+    Потоково генерирует каталог из count книг
+
+    Авторы и жанры выбираются по Zipf-распределению в порядке словарей
+    (первый автор самый популярный), годы — равномерно из YEARS. Название —
+    слово из названий books_data.json и слово serial_word порядкового номера,
+    поэтому названия всех книг различны. ISBN уникальны и проходят проверку
+    контрольной цифры.
+
+    :param count: Количество книг
+    :type count: int
+    :param seed: Seed генератора
+    :type seed: int or None
+    :param author_skew: Показатель Zipf для авторов
+    :type author_skew: float
+    :param genre_skew: Показатель Zipf для жанров
+    :type genre_skew: float
+    :param authors: Количество различных авторов (None — словарь AUTHORS)
+    :type authors: int or None
+    :param start: Порядковый номер первой книги (для генерации непересекающихся партий)
+    :type start: int
+    :return: Генератор книг
+    :rtype: Iterator[Book]
+    """
+    rng = random.Random(seed)
+    choose_author = ZipfChoice(author_skew, rng)
+    choose_genre = ZipfChoice(genre_skew, rng)
+    names = author_pool(authors)
+    for serial in range(start, start + count):
+        title = f"{rng.choice(_TITLE_WORDS).capitalize()} {serial_word(serial)}"
+        yield Book(title, choose_author(names), rng.choice(YEARS), choose_genre(GENRES),
+                   make_isbn(serial))
+
+
+def main(argv=None) -> int:
+    """
+    Точка входа командной строки: генерирует каталог и записывает его в файл
+
+    Формат выбирается по расширению: .lbc — колоночный бинарный, .tsv — TSV, иначе CSV.
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv[1:])
+    :type argv: list, optional
+    :return: Код завершения
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Генерация синтетического каталога")
+    parser.add_argument("path", help="файл .csv, .tsv или .lbc")
+    parser.add_argument("-n", "--count", type=int, default=100000, help="количество книг")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--authors", type=int, help="количество различных авторов")
+    parser.add_argument("--author-skew", type=float, default=DEFAULT_AUTHOR_SKEW)
+    parser.add_argument("--genre-skew", type=float, default=DEFAULT_GENRE_SKEW)
+    args = parser.parse_args(argv)
+    books = generate_books(args.count, args.seed, args.author_skew, args.genre_skew, args.authors)
+    if args.path.endswith(".lbc"):
+        written = export_columnar(books, args.path)
+    else:
+        written = export_csv(books, args.path, "\t" if args.path.endswith(".tsv") else ",")
+    print(f"Записано книг: {written}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
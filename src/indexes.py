@@ -0,0 +1,658 @@
+"""Модуль с подключаемыми вторичными индексами по полям книги."""
+
+import re
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from operator import attrgetter
+from typing import Any, Self
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class BaseIndex(ABC):
+    """Базовый абстрактный класс индекса по одному полю книги."""
+
+    unique = False
+
+    def __init__(self, field: str, key=None):
+        """
+        Инициализация индекса
+
+        :param field: Имя поля книги
+        :type field: str
+        :param key: Функция получения ключа из книги (по умолчанию атрибут field)
+        :type key: Callable, optional
+        """
+        self.field = field
+        self.key = key if key is not None else attrgetter(field)
+
+    @abstractmethod
+    def add(self, book) -> None:
+        """
+        Добавляет книгу в индекс
+
+        :param book: Книга
+        :type book: Book
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, book) -> None:
+        """
+        Удаляет книгу из индекса
+
+        :param book: Книга
+        :type book: Book
+        """
+        pass
+
+    @abstractmethod
+    def lookup(self, value) -> list:
+        """
+        Книги, соответствующие значению
+
+        Возвращаемый список может быть внутренней корзиной индекса и не должен изменяться.
+
+        :param value: Значение для поиска
+        :return: Список книг
+        :rtype: list
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Очищает индекс"""
+        pass
+
+    @abstractmethod
+    def copy(self) -> Self:
+        """
+        Независимая копия индекса
+
+        :return: Копия индекса
+        :rtype: BaseIndex
+        """
+        pass
+
+    @abstractmethod
+    def bucket_sizes(self) -> dict:
+        """
+        Размеры корзин индекса
+
+        :return: Словарь {ключ: количество книг}
+        :rtype: dict
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Количество различных ключей
+
+        :return: Количество ключей
+        :rtype: int
+        """
+        pass
+
+    def extend(self, books) -> None:
+        """
+        Добавляет несколько книг
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        """
+        for book in books:
+            self.add(book)
+
+    def remove_many(self, books) -> None:
+        """
+        Удаляет несколько книг
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        """
+        for book in books:
+            self.remove(book)
+
+    def build(self, books) -> None:
+        """
+        Строит индекс заново из коллекции книг
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        """
+        self.clear()
+        self.extend(books)
+
+    def empty(self) -> Self:
+        """
+        Пустой индекс того же типа, по тому же полю и с той же функцией ключа
+
+        :return: Пустой индекс
+        :rtype: BaseIndex
+        """
+        return type(self)(self.field, self.key)
+
+    def entries(self) -> dict:
+        """
+        Содержимое индекса в сравнимом виде: ключ -> отсортированные ISBN книг
+
+        :return: Словарь {ключ: кортеж ISBN}
+        :rtype: dict
+        """
+        return {value: tuple(sorted(book.isbn for book in self.lookup_key(value)))
+                for value in self.bucket_sizes()}
+
+    def lookup_key(self, value) -> list:
+        """
+        Книги, хранящиеся под ключом индекса value
+
+        Для большинства индексов совпадает с lookup; текстовый индекс
+        переопределяет метод, так как его lookup принимает текст запроса.
+
+        :param value: Ключ индекса
+        :return: Список книг
+        :rtype: list
+        """
+        return self.lookup(value)
+
+    def __repr__(self) -> str:
+        """
+        Представление индекса для отладки
+
+        :return: Строка с типом, полем и количеством ключей
+        :rtype: str
+        """
+        return f"{type(self).__name__}(field={self.field!r}, keys={len(self)})"
+
+
+class HashIndex(BaseIndex):
+    """Уникальный хеш-индекс: ключ соответствует ровно одной книге."""
+
+    unique = True
+
+    def __init__(self, field: str, key=None):
+        """
+        Инициализация хеш-индекса
+
+        :param field: Имя поля книги
+        :type field: str
+        :param key: Функция получения ключа из книги (необязательно)
+        :type key: Callable, optional
+        """
+        super().__init__(field, key)
+        self._map: dict[Any, Any] = {}
+
+    def add(self, book) -> None:
+        """
+        Добавляет книгу, заменяя книгу с тем же ключом
+
+        :param book: Книга
+        :type book: Book
+        """
+        self._map[self.key(book)] = book
+
+    def remove(self, book) -> None:
+        """
+        Удаляет книгу по её ключу, если под ключом хранится именно она
+
+        Индекс по неуникальному полю хранит последнюю добавленную книгу;
+        удаление другой книги с тем же ключом его не затрагивает.
+
+        :param book: Книга
+        :type book: Book
+        """
+        value = self.key(book)
+        if value in self._map and self._map[value] == book:
+            del self._map[value]
+
+    def lookup(self, value) -> list:
+        """
+        Книга с ключом value
+
+        :param value: Значение ключа
+        :return: Список из одной книги или пустой список
+        :rtype: list
+        """
+        book = self._map.get(value)
+        return [book] if book is not None else []
+
+    def get(self, value):
+        """
+        Книга с ключом value
+
+        :param value: Значение ключа
+        :return: Книга или None
+        :rtype: Book or None
+        """
+        return self._map.get(value)
+
+    def __contains__(self, value) -> bool:
+        """
+        Проверяет наличие ключа
+
+        :param value: Значение ключа
+        :return: True если ключ есть в индексе
+        :rtype: bool
+        """
+        return value in self._map
+
+    def values(self):
+        """
+        Все книги индекса
+
+        :return: Представление значений словаря
+        :rtype: dict_values
+        """
+        return self._map.values()
+
+    def clear(self) -> None:
+        """Очищает индекс"""
+        self._map.clear()
+
+    def copy(self) -> Self:
+        """
+        Независимая копия индекса
+
+        :return: Копия индекса
+        :rtype: HashIndex
+        """
+        clone = self.empty()
+        clone._map = dict(self._map)
+        return clone
+
+    def bucket_sizes(self) -> dict:
+        """
+        Размеры корзин (каждая содержит одну книгу)
+
+        :return: Словарь {ключ: 1}
+        :rtype: dict
+        """
+        return dict.fromkeys(self._map, 1)
+
+    def __len__(self) -> int:
+        """
+        Количество ключей
+
+        :return: Количество ключей
+        :rtype: int
+        """
+        return len(self._map)
+
+
+class MultiValueIndex(BaseIndex):
+    """Неуникальный хеш-индекс: ключ соответствует списку книг."""
+
+    def __init__(self, field: str, key=None):
+        """
+        Инициализация многозначного индекса
+
+        :param field: Имя поля книги
+        :type field: str
+        :param key: Функция получения ключа из книги (необязательно)
+        :type key: Callable, optional
+        """
+        super().__init__(field, key)
+        self._buckets: dict[Any, list] = {}
+
+    def add(self, book) -> None:
+        """
+        Добавляет книгу в корзину её ключа
+
+        :param book: Книга
+        :type book: Book
+        """
+        value = self.key(book)
+        bucket = self._buckets.get(value)
+        if bucket is None:
+            self._on_new_key(value)
+            self._buckets[value] = [book]
+        else:
+            bucket.append(book)
+
+    def remove(self, book) -> None:
+        """
+        Удаляет книгу из корзины её ключа, пустые корзины удаляются
+
+        :param book: Книга
+        :type book: Book
+        """
+        value = self.key(book)
+        bucket = self._buckets.get(value)
+        if bucket is None:
+            return
+        if book in bucket:
+            bucket.remove(book)
+        if not bucket:
+            del self._buckets[value]
+            self._on_removed_key(value)
+
+    def remove_many(self, books) -> None:
+        """
+        Удаляет несколько книг: каждая затронутая корзина фильтруется один раз,
+        поэтому время линейно по размеру корзин, а не квадратично
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        """
+        doomed: dict[Any, set[str]] = {}
+        for book in books:
+            doomed.setdefault(self.key(book), set()).add(book.isbn)
+        removed = []
+        for value, isbns in doomed.items():
+            bucket = self._buckets.get(value)
+            if bucket is None:
+                continue
+            bucket[:] = [book for book in bucket if book.isbn not in isbns]
+            if not bucket:
+                del self._buckets[value]
+                removed.append(value)
+        self._on_removed_keys(removed)
+
+    def lookup(self, value) -> list:
+        """
+        Корзина книг с ключом value
+
+        :param value: Значение ключа
+        :return: Список книг
+        :rtype: list
+        """
+        return self._buckets.get(value, [])
+
+    def clear(self) -> None:
+        """Очищает индекс"""
+        self._buckets.clear()
+
+    def copy(self) -> Self:
+        """
+        Независимая копия индекса (корзины копируются)
+
+        :return: Копия индекса
+        :rtype: MultiValueIndex
+        """
+        clone = self.empty()
+        clone._buckets = {value: list(books) for value, books in self._buckets.items()}
+        return clone
+
+    def bucket_sizes(self) -> dict:
+        """
+        Размеры корзин
+
+        :return: Словарь {ключ: количество книг}
+        :rtype: dict
+        """
+        return {value: len(books) for value, books in self._buckets.items()}
+
+    def __len__(self) -> int:
+        """
+        Количество различных ключей
+
+        :return: Количество ключей
+        :rtype: int
+        """
+        return len(self._buckets)
+
+    def _on_new_key(self, value) -> None:
+        """
+        Вызывается при появлении нового ключа
+
+        :param value: Новый ключ
+        """
+        pass
+
+    def _on_removed_key(self, value) -> None:
+        """
+        Вызывается при исчезновении ключа
+
+        :param value: Удалённый ключ
+        """
+        pass
+
+    def _on_removed_keys(self, values: list) -> None:
+        """
+        Вызывается при исчезновении нескольких ключей после remove_many
+
+        :param values: Удалённые ключи
+        :type values: list
+        """
+        for value in values:
+            self._on_removed_key(value)
+
+
+class SortedIndex(MultiValueIndex):
+    """Многозначный индекс с упорядоченными ключами для диапазонных запросов."""
+
+    def __init__(self, field: str, key=None):
+        """
+        Инициализация упорядоченного индекса
+
+        :param field: Имя поля книги
+        :type field: str
+        :param key: Функция получения ключа из книги (необязательно)
+        :type key: Callable, optional
+        """
+        super().__init__(field, key)
+        self._keys: list[Any] = []
+
+    def _on_new_key(self, value) -> None:
+        """
+        Вставляет новый ключ в упорядоченный список
+
+        :param value: Новый ключ
+        """
+        insort(self._keys, value)
+
+    def _on_removed_key(self, value) -> None:
+        """
+        Удаляет ключ из упорядоченного списка
+
+        :param value: Удалённый ключ
+        """
+        del self._keys[bisect_left(self._keys, value)]
+
+    def _on_removed_keys(self, values: list) -> None:
+        """
+        Удаляет несколько ключей из упорядоченного списка одним проходом
+
+        :param values: Удалённые ключи
+        :type values: list
+        """
+        if len(values) > 1:
+            self._keys = [value for value in self._keys if value in self._buckets]
+        else:
+            super()._on_removed_keys(values)
+
+    def extend(self, books) -> None:
+        """
+        Добавляет несколько книг с одной сортировкой ключей
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        """
+        for book in books:
+            value = self.key(book)
+            bucket = self._buckets.get(value)
+            if bucket is None:
+                self._buckets[value] = [book]
+            else:
+                bucket.append(book)
+        self._keys = sorted(self._buckets)
+
+    def range(self, low=None, high=None) -> list:
+        """
+        Книги с ключами в диапазоне [low, high] в порядке ключей
+
+        :param low: Нижняя граница включительно или None
+        :param high: Верхняя граница включительно или None
+        :return: Список книг
+        :rtype: list
+        """
+        start = 0 if low is None else bisect_left(self._keys, low)
+        stop = len(self._keys) if high is None else bisect_right(self._keys, high)
+        result = []
+        for value in self._keys[start:stop]:
+            result.extend(self._buckets[value])
+        return result
+
+    def keys(self) -> list:
+        """
+        Ключи индекса в порядке возрастания
+
+        :return: Список ключей
+        :rtype: list
+        """
+        return list(self._keys)
+
+    def clear(self) -> None:
+        """Очищает индекс"""
+        super().clear()
+        self._keys = []
+
+    def copy(self) -> Self:
+        """
+        Независимая копия индекса
+
+        :return: Копия индекса
+        :rtype: SortedIndex
+        """
+        clone = super().copy()
+        clone._keys = list(self._keys)
+        return clone
+
+
+class TextIndex(BaseIndex):
+    """Полнотекстовый индекс: слова поля соответствуют спискам книг."""
+
+    def __init__(self, field: str, key=None):
+        """
+        Инициализация текстового индекса
+
+        :param field: Имя текстового поля книги
+        :type field: str
+        :param key: Функция получения текста из книги (необязательно)
+        :type key: Callable, optional
+        """
+        super().__init__(field, key)
+        self._postings: dict[str, list] = {}
+
+    @staticmethod
+    def tokenize(text: str) -> set:
+        """
+        Разбивает текст на слова без учёта регистра
+
+        :param text: Текст
+        :type text: str
+        :return: Множество слов
+        :rtype: set
+        """
+        return set(_TOKEN_PATTERN.findall(str(text).casefold()))
+
+    def add(self, book) -> None:
+        """
+        Добавляет книгу в списки всех слов её поля
+
+        :param book: Книга
+        :type book: Book
+        """
+        for token in self.tokenize(self.key(book)):
+            self._postings.setdefault(token, []).append(book)
+
+    def remove(self, book) -> None:
+        """
+        Удаляет книгу из списков всех слов её поля
+
+        :param book: Книга
+        :type book: Book
+        """
+        for token in self.tokenize(self.key(book)):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            if book in posting:
+                posting.remove(book)
+            if not posting:
+                del self._postings[token]
+
+    def remove_many(self, books) -> None:
+        """
+        Удаляет несколько книг, фильтруя каждый затронутый список слов один раз
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        """
+        doomed: dict[str, set[str]] = {}
+        for book in books:
+            for token in self.tokenize(self.key(book)):
+                doomed.setdefault(token, set()).add(book.isbn)
+        for token, isbns in doomed.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting[:] = [book for book in posting if book.isbn not in isbns]
+            if not posting:
+                del self._postings[token]
+
+    def lookup(self, value) -> list:
+        """
+        Книги, поле которых содержит все слова запроса
+
+        :param value: Текст запроса
+        :type value: str
+        :return: Список книг
+        :rtype: list
+        """
+        tokens = self.tokenize(value)
+        if not tokens:
+            return []
+        postings = sorted((self._postings.get(token, []) for token in tokens), key=len)
+        if len(postings) == 1:
+            return postings[0]
+        result = postings[0]
+        for posting in postings[1:]:
+            isbns = {book.isbn for book in posting}
+            result = [book for book in result if book.isbn in isbns]
+        return result
+
+    def lookup_key(self, value) -> list:
+        """
+        Книги, содержащие слово value
+
+        :param value: Слово индекса
+        :type value: str
+        :return: Список книг
+        :rtype: list
+        """
+        return self._postings.get(value, [])
+
+    def clear(self) -> None:
+        """Очищает индекс"""
+        self._postings.clear()
+
+    def copy(self) -> Self:
+        """
+        Независимая копия индекса
+
+        :return: Копия индекса
+        :rtype: TextIndex
+        """
+        clone = self.empty()
+        clone._postings = {token: list(books) for token, books in self._postings.items()}
+        return clone
+
+    def bucket_sizes(self) -> dict:
+        """
+        Размеры списков книг по словам
+
+        :return: Словарь {слово: количество книг}
+        :rtype: dict
+        """
+        return {token: len(books) for token, books in self._postings.items()}
+
+    def __len__(self) -> int:
+        """
+        Количество различных слов
+
+        :return: Количество слов
+        :rtype: int
+        """
+        return len(self._postings)
@@ -0,0 +1,276 @@
+"""Модуль с необязательной инструментацией горячих путей библиотеки."""
+
+import functools
+import threading
+import time
+
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+RESULT_SIZE_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин в стиле Prometheus."""
+
+    def __init__(self, bounds):
+        """
+        Инициализация гистограммы
+
+        :param bounds: Возрастающие верхние границы корзин
+        :type bounds: tuple
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        """
+        Учитывает одно наблюдение
+
+        :param value: Наблюдаемое значение
+        :type value: int or float
+        """
+        position = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                position = i
+                break
+        self.counts[position] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Накопленные счётчики по границам, последний элемент соответствует +Inf
+
+        :return: Список пар (граница, накопленное количество)
+        :rtype: list
+        """
+        result = []
+        running = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+    def as_dict(self) -> dict:
+        """
+        Представление гистограммы в виде словаря
+
+        :return: Словарь с корзинами, суммой и количеством наблюдений
+        :rtype: dict
+        """
+        return {
+            "buckets": {_format_bound(bound): count for bound, count in self.cumulative()},
+            "sum": self.total,
+            "count": self.count,
+        }
+
+
+class Instrumentation:
+    """Сборщик счётчиков, задержек и размеров результатов операций библиотеки."""
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, size_buckets=RESULT_SIZE_BUCKETS):
+        """
+        Инициализация сборщика
+
+        :param latency_buckets: Границы корзин задержек в секундах
+        :type latency_buckets: tuple
+        :param size_buckets: Границы корзин размеров результатов
+        :type size_buckets: tuple
+        """
+        self._latency_buckets = latency_buckets
+        self._size_buckets = size_buckets
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.latency = {}
+        self.result_sizes = {}
+
+    def record(self, operation: str, elapsed: float, result_size=None) -> None:
+        """
+        Учитывает один вызов операции
+
+        :param operation: Имя операции
+        :type operation: str
+        :param elapsed: Время выполнения в секундах
+        :type elapsed: float
+        :param result_size: Размер результата или None, если он не учитывается
+        :type result_size: int or None
+        """
+        with self._lock:
+            self.counters[operation] = self.counters.get(operation, 0) + 1
+            if operation not in self.latency:
+                self.latency[operation] = Histogram(self._latency_buckets)
+            self.latency[operation].observe(elapsed)
+            if result_size is not None:
+                if operation not in self.result_sizes:
+                    self.result_sizes[operation] = Histogram(self._size_buckets)
+                self.result_sizes[operation].observe(result_size)
+
+    def reset(self) -> None:
+        """Сбрасывает все накопленные данные"""
+        with self._lock:
+            self.counters.clear()
+            self.latency.clear()
+            self.result_sizes.clear()
+
+    @staticmethod
+    def index_stats(indexes, top: int = 5) -> dict:
+        """
+        Статистика размеров корзин всех неуникальных индексов
+
+        :param indexes: Индексная коллекция
+        :type indexes: IndexDict
+        :param top: Сколько самых больших корзин включить в отчёт
+        :type top: int
+        :return: Словарь вида {индекс: {buckets, max, mean, largest}}
+        :rtype: dict
+        """
+        stats = {}
+        for index_type in indexes.index_names():
+            if indexes.get_index(index_type).unique:
+                continue
+            sizes = indexes.bucket_sizes(index_type)
+            largest = sorted(sizes.items(), key=lambda item: item[1], reverse=True)[:top]
+            stats[index_type] = {
+                "buckets": len(sizes),
+                "max": max(sizes.values(), default=0),
+                "mean": sum(sizes.values()) / len(sizes) if sizes else 0.0,
+                "largest": largest,
+            }
+        return stats
+
+    def as_dict(self, indexes=None) -> dict:
+        """
+        Экспорт собранной статистики в виде словаря
+
+        :param indexes: Индексная коллекция для статистики корзин (необязательно)
+        :type indexes: IndexDict, optional
+        :return: Словарь со счётчиками, гистограммами и статистикой индексов
+        :rtype: dict
+        """
+        with self._lock:
+            result = {
+                "counters": dict(self.counters),
+                "latency": {op: hist.as_dict() for op, hist in self.latency.items()},
+                "result_sizes": {op: hist.as_dict() for op, hist in self.result_sizes.items()},
+            }
+        if indexes is not None:
+            result["indexes"] = self.index_stats(indexes)
+        return result
+
+    def to_prometheus(self, indexes=None) -> str:
+        """
+        Экспорт собранной статистики в текстовом формате Prometheus
+
+        :param indexes: Индексная коллекция для статистики корзин (необязательно)
+        :type indexes: IndexDict, optional
+        :return: Текст в формате экспозиции Prometheus
+        :rtype: str
+        """
+        lines = ["# TYPE library_operations_total counter"]
+        with self._lock:
+            for operation, count in sorted(self.counters.items()):
+                lines.append(f'library_operations_total{{operation="{_escape(operation)}"}} {count}')
+            lines.extend(_histogram_lines("library_operation_duration_seconds", self.latency))
+            lines.extend(_histogram_lines("library_result_size", self.result_sizes))
+        if indexes is not None:
+            stats = self.index_stats(indexes)
+            lines.append("# TYPE library_index_buckets gauge")
+            for index_type, data in stats.items():
+                lines.append(f'library_index_buckets{{index="{_escape(index_type)}"}} {data["buckets"]}')
+            lines.append("# TYPE library_index_bucket_size_max gauge")
+            for index_type, data in stats.items():
+                label = _escape(index_type)
+                lines.append(f'library_index_bucket_size_max{{index="{label}"}} {data["max"]}')
+        return "\n".join(lines) + "\n"
+
+
+def instrumented(operation: str, sized: bool = True):
+    """
+    Декоратор метода, учитывающий вызов в атрибуте instrumentation владельца
+
+    Если instrumentation равен None, накладные расходы сводятся к одной проверке атрибута.
+
+    :param operation: Имя операции в статистике
+    :type operation: str
+    :param sized: Учитывать ли размер возвращаемого результата
+    :type sized: bool
+    :return: Декоратор
+    :rtype: Callable
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instrumentation = self.instrumentation
+            if instrumentation is None:
+                return method(self, *args, **kwargs)
+            start = time.perf_counter()
+            result = method(self, *args, **kwargs)
+            elapsed = time.perf_counter() - start
+            instrumentation.record(operation, elapsed, _result_size(result) if sized else None)
+            return result
+        return wrapper
+    return decorator
+
+
+def _result_size(result) -> int:
+    """
+    Размер результата операции: 0 для None, длина для коллекций, иначе 1
+
+    :param result: Результат операции
+    :return: Размер результата
+    :rtype: int
+    """
+    if result is None:
+        return 0
+    if hasattr(result, "__len__"):
+        return len(result)
+    return 1
+
+
+def _histogram_lines(name: str, histograms: dict) -> list:
+    """
+    Строки Prometheus для набора гистограмм одной метрики
+
+    :param name: Имя метрики
+    :type name: str
+    :param histograms: Словарь {операция: Histogram}
+    :type histograms: dict
+    :return: Список строк
+    :rtype: list
+    """
+    lines = [f"# TYPE {name} histogram"]
+    for operation, histogram in sorted(histograms.items()):
+        label = _escape(operation)
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{operation="{label}",le="{_format_bound(bound)}"}} {count}')
+        lines.append(f'{name}_sum{{operation="{label}"}} {histogram.total}')
+        lines.append(f'{name}_count{{operation="{label}"}} {histogram.count}')
+    return lines
+
+
+def _format_bound(bound) -> str:
+    """
+    Форматирует границу корзины для экспорта
+
+    :param bound: Граница корзины
+    :type bound: int or float
+    :return: Строковое представление границы
+    :rtype: str
+    """
+    if bound == float("inf"):
+        return "+Inf"
+    return repr(bound)
+
+
+def _escape(value: str) -> str:
+    """
+    Экранирует значение метки Prometheus
+
+    :param value: Значение метки
+    :type value: str
+    :return: Экранированное значение
+    :rtype: str
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
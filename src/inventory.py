@@ -0,0 +1,236 @@
+"""Модуль с учётом экземпляров книг: количество копий и выдача по ISBN."""
+
+import threading
+
+
+class InventoryError(ValueError):
+    """Операция с экземплярами невозможна: нет книги или свободных копий."""
+
+
+class Inventory:
+    """Счётчики экземпляров и выданных копий по ISBN без хранения объектов копий."""
+
+    def __init__(self):
+        """Инициализация пустого учёта"""
+        self._copies = {}
+        self._checked_out = {}
+        self._total_copies = 0
+        self._total_checked_out = 0
+        self._shared = False
+        self._lock = threading.RLock()
+
+    def snapshot(self) -> "Inventory":
+        """
+        Снимок учёта за O(1) с копированием при записи
+
+        :return: Учёт с теми же счётчиками
+        :rtype: Inventory
+        """
+        with self._lock:
+            snapshot = Inventory()
+            snapshot._copies = self._copies
+            snapshot._checked_out = self._checked_out
+            snapshot._total_copies = self._total_copies
+            snapshot._total_checked_out = self._total_checked_out
+            snapshot._shared = True
+            self._shared = True
+            return snapshot
+
+    def _own(self) -> None:
+        """Копирует разделяемые со снимком словари перед изменением"""
+        if self._shared:
+            self._copies = dict(self._copies)
+            self._checked_out = dict(self._checked_out)
+            self._shared = False
+
+    @staticmethod
+    def _check_count(count: int) -> None:
+        """
+        Проверяет количество экземпляров в операции
+
+        :param count: Количество
+        :type count: int
+        :raises InventoryError: Если количество не положительно
+        """
+        if count <= 0:
+            raise InventoryError(f"Количество экземпляров должно быть положительным: {count}")
+
+    def add_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Добавляет экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество новых экземпляров
+        :type count: int
+        :return: Общее количество экземпляров книги
+        :rtype: int
+        :raises InventoryError: Если количество не положительно
+        """
+        self._check_count(count)
+        with self._lock:
+            self._own()
+            self._copies[isbn] = self._copies.get(isbn, 0) + count
+            self._total_copies += count
+            return self._copies[isbn]
+
+    def remove_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Списывает свободные экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество списываемых экземпляров
+        :type count: int
+        :return: Оставшееся количество экземпляров книги
+        :rtype: int
+        :raises InventoryError: Если свободных экземпляров меньше count
+        """
+        self._check_count(count)
+        with self._lock:
+            if self.available(isbn) < count:
+                raise InventoryError(
+                    f"Нельзя списать {count} экз. книги '{isbn}': свободно {self.available(isbn)}"
+                )
+            self._own()
+            self._copies[isbn] -= count
+            self._total_copies -= count
+            if self._copies[isbn] == 0:
+                del self._copies[isbn]
+            return self._copies.get(isbn, 0)
+
+    def discard(self, isbn: str) -> None:
+        """
+        Удаляет все сведения об экземплярах книги (при удалении книги из каталога)
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        """
+        with self._lock:
+            if isbn not in self._copies:
+                return
+            self._own()
+            self._total_copies -= self._copies.pop(isbn)
+            self._total_checked_out -= self._checked_out.pop(isbn, 0)
+
+    def checkout(self, isbn: str, count: int = 1) -> int:
+        """
+        Атомарно выдаёт экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество выдаваемых экземпляров
+        :type count: int
+        :return: Количество оставшихся свободных экземпляров
+        :rtype: int
+        :raises InventoryError: Если свободных экземпляров меньше count
+        """
+        self._check_count(count)
+        with self._lock:
+            available = self.available(isbn)
+            if available < count:
+                raise InventoryError(
+                    f"Нет свободных экземпляров книги '{isbn}' (свободно {available})"
+                )
+            self._own()
+            self._checked_out[isbn] = self._checked_out.get(isbn, 0) + count
+            self._total_checked_out += count
+            return available - count
+
+    def return_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Атомарно принимает возвращённые экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество возвращаемых экземпляров
+        :type count: int
+        :return: Количество свободных экземпляров после возврата
+        :rtype: int
+        :raises InventoryError: Если выданных экземпляров меньше count
+        """
+        self._check_count(count)
+        with self._lock:
+            checked_out = self._checked_out.get(isbn, 0)
+            if checked_out < count:
+                raise InventoryError(f"Книга '{isbn}' выдана в количестве {checked_out} экз.")
+            self._own()
+            if checked_out == count:
+                del self._checked_out[isbn]
+            else:
+                self._checked_out[isbn] = checked_out - count
+            self._total_checked_out -= count
+            return self.available(isbn)
+
+    def copies(self, isbn: str) -> int:
+        """
+        Общее количество экземпляров книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: Количество экземпляров
+        :rtype: int
+        """
+        return self._copies.get(isbn, 0)
+
+    def checked_out(self, isbn: str) -> int:
+        """
+        Количество выданных экземпляров книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: Количество выданных экземпляров
+        :rtype: int
+        """
+        return self._checked_out.get(isbn, 0)
+
+    def available(self, isbn: str) -> int:
+        """
+        Количество свободных экземпляров книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: Количество свободных экземпляров
+        :rtype: int
+        """
+        return self._copies.get(isbn, 0) - self._checked_out.get(isbn, 0)
+
+    @property
+    def total_copies(self) -> int:
+        """
+        Общее количество экземпляров всех книг
+
+        :return: Количество экземпляров
+        :rtype: int
+        """
+        return self._total_copies
+
+    @property
+    def total_checked_out(self) -> int:
+        """
+        Общее количество выданных экземпляров
+
+        :return: Количество выданных экземпляров
+        :rtype: int
+        """
+        return self._total_checked_out
+
+    def __len__(self) -> int:
+        """
+        Количество ISBN, по которым есть экземпляры
+
+        :return: Количество ISBN
+        :rtype: int
+        """
+        return len(self._copies)
+
+    def __contains__(self, isbn: str) -> bool:
+        """
+        Проверяет, учитываются ли экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: True если книга есть в учёте
+        :rtype: bool
+        """
+        return isbn in self._copies
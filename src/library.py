@@ -1,6 +1,19 @@
 import random
+import threading
 from src.book import Book
 from src.book_collections import BookCollection, IndexDict
+from src.changefeed import ChangeFeed, ChangeFeedOverflow
+from src.facets import FACET_KEYS, FacetCounter, rank
+from src.fuzzy import FuzzyIndex
+from src.indexes import SortedIndex
+from src.inventory import Inventory, InventoryError
+from src.instrumentation import Instrumentation, instrumented
+from src.orderings import BookOrdering
+from src.pagination import Page, paginate, top_k
+from src.query_planner import Explanation, QueryPlanner
+from src.sampling import RandomPool, WeightedSampler, weighted_sample
+
+BOOK_FIELDS = ('title', 'author', 'year', 'genre', 'isbn')
 
 
 class Library:
@@ -15,30 +28,306 @@ class Library:
         """
         self.books = books if books is not None else BookCollection()
         self.indexes = IndexDict(self.books)
+        self.instrumentation = None
+        self.changes = ChangeFeed()
+        self._pool = RandomPool(self.books)
+        self.inventory = Inventory()
+        for book in self.books:
+            self.inventory.add_copies(book.isbn)
+        self._fuzzy = {}
+        self._facets = {}
+        self._orderings = {}
+        self._planner = None
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        """
+        Версия библиотеки: количество изменений с момента создания
+
+        :return: Версия
+        :rtype: int
+        """
+        return self.changes.version
+
+    def changes_since(self, version: int) -> list:
+        """
+        Изменения библиотеки после указанной версии
+
+        :param version: Последняя версия, известная потребителю
+        :type version: int
+        :return: Список изменений (Change) в порядке версий
+        :rtype: list
+        :raises ChangeFeedOverflow: Если изменения уже вытеснены из буфера
+        """
+        return self.changes.changes_since(version)
+
+    def enable_instrumentation(self, instrumentation=None):
+        """
+        Включает сбор статистики по операциям поиска и обновления индексов
+
+        :param instrumentation: Готовый сборщик или None для создания нового
+        :type instrumentation: Instrumentation, optional
+        :return: Подключённый сборщик статистики
+        :rtype: Instrumentation
+        """
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
+        self.indexes.instrumentation = instrumentation
+        return instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """Отключает сбор статистики"""
+        self.instrumentation = None
+        self.indexes.instrumentation = None
 
-    def add_book(self, book: Book):
+    def add_book(self, book: Book, copies: int = 1):
         """
         Добавляет книгу в библиотеку и обновляет индексы
 
         :param book: Книга для добавления
         :type book: Book
-        :raises ValueError: Если книга с таким ISBN уже существует
+        :param copies: Количество экземпляров книги
+        :type copies: int
+        :raises ValueError: Если книга с таким ISBN уже существует или copies не положительно
+        """
+        with self._lock:
+            if book.isbn in self.indexes:
+                raise ValueError(f"Книга с ISBN '{book.isbn}' уже существует в библиотеке")
+            self.inventory.add_copies(book.isbn, copies)
+            self.books.add(book)
+            self.indexes.add_book(book)
+            self._pool.add(book)
+            self.changes.publish('add', book)
+
+    def add_books(self, books, skip_duplicates: bool = False) -> int:
+        """
+        Добавляет несколько книг одной пакетной вставкой
+
+        Без skip_duplicates вставка атомарна: при первом дубликате ISBN
+        ни одна книга не добавляется.
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        :param skip_duplicates: Пропускать книги с уже существующим ISBN вместо ошибки
+        :type skip_duplicates: bool
+        :return: Количество добавленных книг
+        :rtype: int
+        :raises ValueError: Если найден дубликат ISBN и skip_duplicates равен False
         """
-        if book.isbn in self.indexes:
-            raise ValueError(f"Книга с ISBN '{book.isbn}' уже существует в библиотеке")
-        self.books.add(book)
-        self.indexes.add_book(book)
+        with self._lock:
+            accepted = []
+            seen = set()
+            for book in books:
+                if book.isbn in self.indexes or book.isbn in seen:
+                    if skip_duplicates:
+                        continue
+                    raise ValueError(f"Книга с ISBN '{book.isbn}' уже существует в библиотеке")
+                seen.add(book.isbn)
+                accepted.append(book)
+            self.books.extend(accepted)
+            for book in accepted:
+                self.indexes.add_book(book)
+                self._pool.add(book)
+                self.inventory.add_copies(book.isbn)
+                self.changes.publish('add', book)
+            return len(accepted)
 
     def remove_book(self, book: Book):
         """
-        Удаляет книгу из библиотеки и обновляет индексы
+        Удаляет книгу из библиотеки вместе со всеми её экземплярами и обновляет индексы
 
         :param book: Книга для удаления
         :type book: Book
         """
-        self.books.remove(book)
-        self.indexes.remove_book(book)
+        with self._lock:
+            stored = self.indexes.bucket('isbn', book.isbn)
+            self.books.remove(book)
+            self.indexes.remove_book(book)
+            if stored:
+                self._pool.remove(stored[0])
+                self.inventory.discard(book.isbn)
+                self.changes.publish('remove', stored[0])
+
+    def remove_books(self, books) -> int:
+        """
+        Удаляет много книг сразу: книги отмечаются, затем коллекция и затронутые
+        корзины индексов перестраиваются за один проход, поэтому удаление n книг
+        занимает линейное, а не квадратичное время
+
+        :param books: Итерируемый объект с книгами или ISBN либо предикат,
+            вызываемый для каждой книги каталога
+        :type books: iterable or Callable
+        :return: Количество удалённых книг
+        :rtype: int
+        """
+        with self._lock:
+            if callable(books):
+                doomed = [book for book in self.indexes if books(book)]
+            else:
+                by_isbn: dict[str, Book] = {}
+                for item in books:
+                    isbn = item.isbn if isinstance(item, Book) else item
+                    stored = self.indexes.bucket('isbn', isbn)
+                    if stored:
+                        by_isbn.setdefault(isbn, stored[0])
+                doomed = list(by_isbn.values())
+            if not doomed:
+                return 0
+            self.books.remove_many(doomed)
+            self.indexes.remove_books(doomed)
+            for book in doomed:
+                self._pool.remove(book)
+                self.inventory.discard(book.isbn)
+                self.changes.publish('remove', book)
+            return len(doomed)
+
+    def _require_isbn(self, isbn: str) -> None:
+        """
+        Проверяет, что книга есть в каталоге
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :raises InventoryError: Если книги с таким ISBN нет
+        """
+        if isbn not in self.indexes:
+            raise InventoryError(f"Книга с ISBN '{isbn}' не найдена в библиотеке")
+
+    def add_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Добавляет экземпляры книги из каталога
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество новых экземпляров
+        :type count: int
+        :return: Общее количество экземпляров книги
+        :rtype: int
+        :raises InventoryError: Если книги нет в каталоге или count не положительно
+        """
+        with self._lock:
+            self._require_isbn(isbn)
+            return self.inventory.add_copies(isbn, count)
+
+    def remove_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Списывает свободные экземпляры книги; книга остаётся в каталоге
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество списываемых экземпляров
+        :type count: int
+        :return: Оставшееся количество экземпляров книги
+        :rtype: int
+        :raises InventoryError: Если книги нет в каталоге или свободных экземпляров меньше count
+        """
+        with self._lock:
+            self._require_isbn(isbn)
+            return self.inventory.remove_copies(isbn, count)
+
+    def checkout(self, isbn: str, count: int = 1) -> int:
+        """
+        Выдаёт экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество выдаваемых экземпляров
+        :type count: int
+        :return: Количество оставшихся свободных экземпляров
+        :rtype: int
+        :raises InventoryError: Если книги нет в каталоге или свободных экземпляров меньше count
+        """
+        with self._lock:
+            self._require_isbn(isbn)
+            return self.inventory.checkout(isbn, count)
+
+    def return_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Принимает возвращённые экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество возвращаемых экземпляров
+        :type count: int
+        :return: Количество свободных экземпляров после возврата
+        :rtype: int
+        :raises InventoryError: Если книги нет в каталоге или выданных экземпляров меньше count
+        """
+        with self._lock:
+            self._require_isbn(isbn)
+            return self.inventory.return_copies(isbn, count)
+
+    def verify_indexes(self) -> list:
+        """
+        Проверяет согласованность индексов с коллекцией книг
+
+        Проверка выполняется по снимку, поэтому не блокирует изменения библиотеки.
+
+        :return: Список описаний расхождений (пустой, если всё согласовано)
+        :rtype: list
+        """
+        snapshot = self.snapshot()
+        return snapshot.indexes.verify(snapshot.books)
+
+    def rebuild_indexes(self, background: bool = False):
+        """
+        Перестраивает индексы по коллекции книг без долгой блокировки
+
+        Новые индексы строятся по снимку библиотеки, затем под блокировкой
+        к ним применяются изменения, накопленные за время построения,
+        и они атомарно заменяют текущие.
+
+        :param background: Выполнить перестроение в отдельном потоке
+        :type background: bool
+        :return: Запущенный поток при background=True, иначе None
+        :rtype: threading.Thread or None
+        """
+        if background:
+            thread = threading.Thread(target=self._rebuild_indexes, daemon=True)
+            thread.start()
+            return thread
+        self._rebuild_indexes()
+        return None
+
+    def _rebuild_indexes(self) -> None:
+        """Строит индексы по снимку и подменяет ими текущие"""
+        snapshot = self.snapshot()
+        fresh = snapshot.indexes.empty()
+        fresh._build_indexes(snapshot.books)
+        with self._lock:
+            try:
+                changes = self.changes_since(snapshot.version)
+            except ChangeFeedOverflow:
+                changes = None
+            if changes is None or fresh.index_names() != self.indexes.index_names():
+                fresh = self.indexes.empty()
+                fresh._build_indexes(self.books)
+                changes = []
+            for change in changes:
+                if change.kind == 'add':
+                    fresh.add_book(change.book)
+                else:
+                    fresh.remove_book(change.book)
+            fresh.instrumentation = self.indexes.instrumentation
+            self.indexes = fresh
+
+    def snapshot(self) -> "LibrarySnapshot":
+        """
+        Неизменяемый снимок библиотеки на текущий момент за O(1)
+
+        Снимок разделяет данные с библиотекой; первое изменение библиотеки после
+        снятия снимка копирует её коллекцию и индексы, поэтому читатели снимка
+        не блокируют писателей и не видят частично применённых изменений.
+
+        :return: Снимок библиотеки
+        :rtype: LibrarySnapshot
+        """
+        with self._lock:
+            return LibrarySnapshot(self.books.snapshot(), self.indexes.snapshot(), self.version,
+                                   self._pool.snapshot(), self.inventory.snapshot())
 
+    @instrumented("search_by_isbn")
     def search_by_isbn(self, isbn: str):
         """
         Поиск книги по уникальному идентификатору ISBN
@@ -50,6 +339,7 @@ class Library:
         """
         return self.indexes['isbn', isbn]
 
+    @instrumented("search_by_author")
     def search_by_author(self, author: str):
         """
         Поиск всех книг указанного автора
@@ -62,6 +352,7 @@ class Library:
         result = self.indexes['author', author]
         return result if result is not None else BookCollection()
 
+    @instrumented("search_by_year")
     def search_by_year(self, year: int):
         """
         Поиск всех книг изданных в указанном году
@@ -74,6 +365,7 @@ class Library:
         result = self.indexes['year', year]
         return result if result is not None else BookCollection()
 
+    @instrumented("search_by_genre")
     def search_by_genre(self, genre: str):
         """
         Поиск всех книг указанного жанра
@@ -83,12 +375,434 @@ class Library:
         :return: Коллекция книг данного жанра
         :rtype: BookCollection
         """
+        if self.indexes.has_index('genre'):
+            return BookCollection(self.indexes.bucket('genre', genre))
         result = BookCollection()
         for book in self.books:
             if book.genre == genre:
                 result.add(book)
         return result
 
+    def register_index(self, name: str, index) -> None:
+        """
+        Подключает вторичный индекс; он строится по текущим книгам и далее
+        поддерживается при добавлении и удалении
+
+        :param name: Имя индекса, используемое в запросах (обычно имя поля)
+        :type name: str
+        :param index: Пустой индекс (HashIndex, MultiValueIndex, SortedIndex, TextIndex)
+        :type index: BaseIndex
+        :raises ValueError: Если индекс с таким именем уже подключён
+        """
+        with self._lock:
+            self.indexes.register(name, index)
+
+    def unregister_index(self, name: str) -> None:
+        """
+        Отключает вторичный индекс
+
+        :param name: Имя индекса
+        :type name: str
+        :raises ValueError: Если индекс встроенный или не подключён
+        """
+        with self._lock:
+            self.indexes.unregister(name)
+
+    def _candidates(self, field: str, value):
+        """
+        Книги, соответствующие значению по индексу field или по полю книги
+
+        Если индекс с именем field подключён, используется он, иначе
+        выполняется полный просмотр с проверкой равенства поля.
+
+        :param field: Имя индекса или поля книги
+        :type field: str
+        :param value: Значение
+        :return: Список книг
+        :rtype: list
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        if self.indexes.has_index(field):
+            return self.indexes.bucket(field, value)
+        if field not in BOOK_FIELDS:
+            raise KeyError(f"Неизвестный тип индекса: {field}")
+        return [book for book in self.books if getattr(book, field) == value]
+
+    def search(self, field: str, value):
+        """
+        Поиск книг по произвольному индексу или полю книги
+
+        :param field: Имя индекса или поля книги
+        :type field: str
+        :param value: Значение (для текстового индекса — слова запроса)
+        :return: Коллекция найденных книг
+        :rtype: BookCollection
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        return BookCollection(self._candidates(field, value))
+
+    def fuzzy_search(self, field: str, query: str, max_distance: int = 2, limit: int = 10) -> list:
+        """
+        Нечёткий поиск значений поля с учётом опечаток
+
+        Нечёткий индекс поля строится при первом обращении по копии списка книг
+        без удержания блокировки, затем под блокировкой к нему применяются
+        изменения, накопленные за время построения, и далее он обновляется по
+        ленте изменений. Сравниваются как полные значения, так и отдельные слова
+        (например, фамилия автора).
+
+        :param field: Текстовое поле книги: 'author', 'title' или 'genre'
+        :type field: str
+        :param query: Запрос
+        :type query: str
+        :param max_distance: Максимальное расстояние Левенштейна
+        :type max_distance: int
+        :param limit: Максимальное количество результатов
+        :type limit: int
+        :return: Список пар (значение, расстояние), лучшие совпадения первыми
+        :rtype: list
+        :raises KeyError: Если поле не является текстовым полем книги
+        """
+        if field not in ('author', 'title', 'genre'):
+            raise KeyError(f"Нечёткий поиск по полю '{field}' не поддерживается")
+        with self._lock:
+            index = self._fuzzy.get(field)
+            if index is not None:
+                return index.search(query, max_distance, limit)
+            books = list(self.indexes)
+            version = self.version
+        index = FuzzyIndex(field)
+        for book in books:
+            index.add(book)
+        with self._lock:
+            current = self._fuzzy.get(field)
+            if current is None:
+                self._attach_fuzzy_index(index, version)
+                current = index
+            return current.search(query, max_distance, limit)
+
+    def _attach_fuzzy_index(self, index: FuzzyIndex, version: int) -> None:
+        """
+        Догоняет нечёткий индекс, построенный по версии version, и подписывает его
+        на ленту изменений; вызывается под блокировкой
+
+        :param index: Нечёткий индекс
+        :type index: FuzzyIndex
+        :param version: Версия библиотеки, по которой индекс построен
+        :type version: int
+        """
+        if self.changes is not None:
+            try:
+                changes = self.changes_since(version)
+            except ChangeFeedOverflow:
+                index = FuzzyIndex(index.field)
+                changes = []
+                for book in self.indexes:
+                    index.add(book)
+            for change in changes:
+                index.apply(change)
+            self.changes.subscribe(index.apply)
+        self._fuzzy[index.field] = index
+
+    def search_by_author_fuzzy(self, author: str, max_distance: int = 2):
+        """
+        Поиск книг авторов, имя которых похоже на запрос
+
+        :param author: Имя автора, возможно с опечатками
+        :type author: str
+        :param max_distance: Максимальное расстояние Левенштейна
+        :type max_distance: int
+        :return: Коллекция книг найденных авторов, лучшие совпадения первыми
+        :rtype: BookCollection
+        """
+        result = BookCollection()
+        for name, _ in self.fuzzy_search('author', author, max_distance):
+            result.extend(self.indexes.bucket('author', name))
+        return result
+
+    def _facet_counter(self, name: str) -> FacetCounter:
+        """
+        Счётчик фасета; строится при первом обращении и далее обновляется по ленте изменений
+
+        :param name: Имя фасета
+        :type name: str
+        :return: Счётчик фасета
+        :rtype: FacetCounter
+        :raises KeyError: Если фасет неизвестен
+        """
+        counter = self._facets.get(name)
+        if counter is None:
+            if name not in FACET_KEYS:
+                raise KeyError(f"Неизвестный фасет: {name}")
+            counter = FacetCounter(FACET_KEYS[name], self.indexes)
+            self._facets[name] = counter
+            if self.changes is not None:
+                self.changes.subscribe(counter.apply)
+        return counter
+
+    def _facet_index(self, name: str) -> bool:
+        """
+        Можно ли взять фасет из размеров корзин одноимённого неуникального индекса
+
+        :param name: Имя фасета
+        :type name: str
+        :return: True если такой индекс подключён
+        :rtype: bool
+        """
+        return self.indexes.has_index(name) and not self.indexes.get_index(name).unique
+
+    def facet(self, name: str, top=None) -> dict:
+        """
+        Количество книг по значениям фасета за O(числа различных значений)
+
+        :param name: Имя фасета: 'genre', 'author', 'year', 'decade' или имя неуникального индекса
+        :type name: str
+        :param top: Сколько самых частых значений вернуть (None — все)
+        :type top: int, optional
+        :return: Словарь {значение: количество книг} по убыванию количества
+        :rtype: dict
+        :raises KeyError: Если фасет неизвестен
+        """
+        with self._lock:
+            if self._facet_index(name):
+                counts = self.indexes.bucket_sizes(name)
+            else:
+                counts = self._facet_counter(name).counts()
+        return rank(counts, top)
+
+    def facets(self, names=('genre', 'author', 'decade'), top=None) -> dict:
+        """
+        Несколько фасетов одним вызовом
+
+        :param names: Имена фасетов
+        :type names: tuple
+        :param top: Сколько самых частых значений вернуть для каждого фасета
+        :type top: int, optional
+        :return: Словарь {фасет: {значение: количество книг}}
+        :rtype: dict
+        :raises KeyError: Если какой-либо фасет неизвестен
+        """
+        with self._lock:
+            return {name: self.facet(name, top) for name in names}
+
+    def count(self, field=None, value=None) -> int:
+        """
+        Количество книг без построения коллекции результатов
+
+        :param field: Имя фасета (None — все уникальные книги)
+        :type field: str, optional
+        :param value: Значение фасета
+        :return: Количество книг
+        :rtype: int
+        :raises KeyError: Если фасет неизвестен
+        """
+        if field is None:
+            return len(self.indexes)
+        with self._lock:
+            if self._facet_index(field):
+                return len(self.indexes.bucket(field, value))
+            return self._facet_counter(field).get(value)
+
+    def search_range(self, field: str, low=None, high=None):
+        """
+        Поиск книг со значением поля в диапазоне [low, high]
+
+        Использует SortedIndex с именем field, если он подключён, иначе полный просмотр.
+
+        :param field: Имя упорядоченного индекса или поля книги
+        :type field: str
+        :param low: Нижняя граница включительно или None
+        :param high: Верхняя граница включительно или None
+        :return: Коллекция найденных книг
+        :rtype: BookCollection
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        if self.indexes.has_index(field):
+            index = self.indexes.get_index(field)
+            if isinstance(index, SortedIndex):
+                return BookCollection(index.range(low, high))
+        if field not in BOOK_FIELDS:
+            raise KeyError(f"Неизвестный тип индекса: {field}")
+        result = BookCollection()
+        for book in self.books:
+            value = getattr(book, field)
+            if (low is None or value >= low) and (high is None or value <= high):
+                result.add(book)
+        return result
+
+    def search_page(self, field: str, value, limit: int = 10, offset: int = 0,
+                    sort_by=None, reverse: bool = False):
+        """
+        Постраничный поиск книг по полю
+
+        :param field: Имя индекса или поля книги
+        :type field: str
+        :param value: Значение поля
+        :param limit: Размер страницы
+        :type limit: int
+        :param offset: Смещение первой книги страницы
+        :type offset: int
+        :param sort_by: Поле сортировки ('title', 'author', 'year') или None
+        :type sort_by: str or None
+        :param reverse: Сортировать по убыванию
+        :type reverse: bool
+        :return: Страница результатов
+        :rtype: Page
+        """
+        return paginate(self._candidates(field, value), limit, offset, sort_by, reverse)
+
+    def list_page(self, limit: int = 10, offset: int = 0, sort_by=None, reverse: bool = False):
+        """
+        Постраничный список всех книг библиотеки
+
+        Страница отсортированного списка берётся из поддерживаемого упорядочения
+        за O(n / размер блока + limit), без сортировки всех книг.
+
+        :param limit: Размер страницы
+        :type limit: int
+        :param offset: Смещение первой книги страницы
+        :type offset: int
+        :param sort_by: Поле сортировки ('title', 'author', 'year') или None
+        :type sort_by: str or None
+        :param reverse: Сортировать по убыванию
+        :type reverse: bool
+        :return: Страница результатов
+        :rtype: Page
+        :raises ValueError: Если limit или offset отрицательные или поле сортировки неизвестно
+        """
+        if sort_by is None:
+            return paginate(self.books, limit, offset)
+        if limit < 0 or offset < 0:
+            raise ValueError("limit и offset должны быть неотрицательными")
+        with self._lock:
+            ordering = self._ordering(sort_by)
+            return Page(BookCollection(ordering.page(offset, limit, reverse)), len(ordering),
+                        offset, limit)
+
+    def _ordering(self, sort_by: str) -> BookOrdering:
+        """
+        Упорядочение книг по полю
+
+        Строится при первом обращении и далее обновляется по ленте изменений.
+
+        :param sort_by: Поле сортировки: 'title', 'author' или 'year'
+        :type sort_by: str
+        :return: Упорядочение
+        :rtype: BookOrdering
+        :raises ValueError: Если поле сортировки неизвестно
+        """
+        ordering = self._orderings.get(sort_by)
+        if ordering is None:
+            ordering = BookOrdering(sort_by, self.books)
+            self._orderings[sort_by] = ordering
+            if self.changes is not None:
+                self.changes.subscribe(ordering.apply)
+        return ordering
+
+    def iter_sorted(self, sort_by: str, start=None, reverse: bool = False,
+                    chunk_size: int = 256):
+        """
+        Потоковая итерация по книгам в порядке сортировки, начиная с любого значения поля
+
+        Книги выдаются порциями: блокировка библиотеки берётся только на время
+        получения порции, а следующая порция продолжается после последней выданной
+        книги, поэтому изменения между порциями не сдвигают ещё не выданные книги.
+
+        :param sort_by: Поле сортировки: 'title', 'author' или 'year'
+        :type sort_by: str
+        :param start: Значение поля, с которого начать (при reverse — значения не больше start)
+        :param reverse: По убыванию
+        :type reverse: bool
+        :param chunk_size: Размер порции
+        :type chunk_size: int
+        :return: Генератор книг
+        :rtype: Iterator
+        :raises ValueError: Если поле сортировки неизвестно
+        """
+        after = None
+        while True:
+            with self._lock:
+                chunk = self._ordering(sort_by).chunk(start, after, chunk_size, reverse)
+            if not chunk:
+                return
+            for _, book in chunk:
+                yield book
+            after = chunk[-1][0]
+
+    def top_k(self, field: str, value, k: int, sort_by: str, reverse: bool = False):
+        """
+        Первые k найденных книг в порядке сортировки
+
+        :param field: Имя индекса или поля книги
+        :type field: str
+        :param value: Значение поля
+        :param k: Количество книг
+        :type k: int
+        :param sort_by: Поле сортировки: 'title', 'author' или 'year'
+        :type sort_by: str
+        :param reverse: Сортировать по убыванию
+        :type reverse: bool
+        :return: Коллекция из не более чем k книг
+        :rtype: BookCollection
+        """
+        return BookCollection(top_k(self._candidates(field, value), k, sort_by, reverse))
+
+    def _query_planner(self) -> QueryPlanner:
+        """
+        Планировщик запросов, создаваемый при первом обращении
+
+        :return: Планировщик
+        :rtype: QueryPlanner
+        """
+        if self._planner is None:
+            self._planner = QueryPlanner(self, BOOK_FIELDS)
+        return self._planner
+
+    def analyze(self) -> dict:
+        """
+        Собирает статистику кардинальности индексов и полей для планировщика запросов
+
+        Статистика собирается автоматически при первом запросе и после изменения
+        заметной доли книг; явный вызов нужен после массовой загрузки.
+
+        :return: Словарь {имя поля или индекса: статистика в виде словаря}
+        :rtype: dict
+        """
+        with self._lock:
+            statistics = self._query_planner().analyze()
+        return {name: column.as_dict() for name, column in statistics.items()}
+
+    def query(self, **conditions):
+        """
+        Поиск книг по нескольким условиям с выбором пути доступа по статистике
+
+        Значение условия — искомое значение или кортеж (low, high) для диапазона.
+        Используется индекс с наименьшей оценкой просматриваемых книг, остальные
+        условия проверяются фильтром; без подходящего индекса — полный просмотр.
+
+        :param conditions: Условия {имя индекса или поля книги: значение}
+        :return: Коллекция найденных книг
+        :rtype: BookCollection
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        with self._lock:
+            return self._query_planner().execute(conditions)
+
+    def explain(self, analyze: bool = True, **conditions) -> Explanation:
+        """
+        План запроса query() с оценками и фактическими значениями
+
+        :param analyze: Выполнить запрос и измерить фактическое число просмотренных
+            и найденных книг
+        :type analyze: bool
+        :param conditions: Условия {имя индекса или поля книги: значение}
+        :return: Результат EXPLAIN (as_dict() и format())
+        :rtype: Explanation
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        with self._lock:
+            return self._query_planner().explain(conditions, analyze)
+
     def get_random_book(self):
         """
         Получает случайную книгу из библиотеки
@@ -96,17 +810,152 @@ class Library:
         :return: Случайная книга или None если библиотека пуста
         :rtype: Book or None
         """
-        if len(self.books) == 0:
-            return None
-        books_list = self.books._books
-        return random.choice(books_list)
+        with self._lock:
+            return self._pool.choice()
+
+    def sample(self, k: int, field=None, value=None, weight=None, rng=random):
+        """
+        Случайная выборка k различных книг без возвращения
+
+        Без фильтра и весов выборка берётся из пула за O(k). С фильтром
+        (field, value) выборка делается из корзины индекса, если он подключён,
+        иначе из результатов полного просмотра. С весами используется
+        алгоритм Эфраимидиса-Спиракиса за O(m log k), где m — число кандидатов.
+
+        :param k: Количество книг
+        :type k: int
+        :param field: Имя индекса или поля книги для фильтра (необязательно)
+        :type field: str, optional
+        :param value: Значение фильтра
+        :param weight: Функция веса книги (необязательно)
+        :type weight: Callable, optional
+        :param rng: Генератор случайных чисел
+        :return: Коллекция выбранных книг
+        :rtype: BookCollection
+        :raises ValueError: Если k больше числа кандидатов (без весов) или отрицательно
+        """
+        with self._lock:
+            if field is None:
+                if weight is None:
+                    return BookCollection(self._pool.sample(k, rng))
+                candidates = list(self._pool)
+            else:
+                candidates = list(self._candidates(field, value))
+        if weight is not None:
+            return BookCollection(weighted_sample(candidates, k, weight, rng))
+        return BookCollection(rng.sample(candidates, k))
+
+    def weighted_sampler(self, weight, field=None, value=None):
+        """
+        Взвешенная выборка с возвращением по текущему содержимому библиотеки
+
+        Построение занимает O(n), каждый выбор — O(log n). Выборка не
+        отслеживает последующие изменения библиотеки.
+
+        :param weight: Функция веса книги
+        :type weight: Callable
+        :param field: Имя индекса или поля книги для фильтра (необязательно)
+        :type field: str, optional
+        :param value: Значение фильтра
+        :return: Объект взвешенной выборки
+        :rtype: WeightedSampler
+        """
+        with self._lock:
+            if field is None:
+                candidates = list(self._pool)
+            else:
+                candidates = list(self._candidates(field, value))
+        return WeightedSampler(candidates, weight)
 
     def __str__(self):
         """
         Строковое представление библиотеки
 
-        :return: Строка с информацией о количестве книг
+        :return: Строка с информацией о количестве экземпляров и уникальных книг
         :rtype: str
         """
-        return (f"Общее количество книг: {len(self.books)},"
+        return (f"Общее количество книг: {self.inventory.total_copies},"
                 f" количество уникальных книг: {len(self.indexes)}")
+
+
+class LibrarySnapshot(Library):
+    """Неизменяемый снимок библиотеки, поддерживающий все операции чтения."""
+
+    def __init__(self, books, indexes, version: int = 0, pool=None, inventory=None):
+        """
+        Инициализация снимка из уже согласованных коллекции, индексов и пула
+
+        :param books: Снимок коллекции книг
+        :type books: BookCollection
+        :param indexes: Снимок индексов
+        :type indexes: IndexDict
+        :param version: Версия библиотеки на момент снимка
+        :type version: int
+        :param pool: Снимок пула случайной выборки (по умолчанию строится по books)
+        :type pool: RandomPool, optional
+        :param inventory: Снимок учёта экземпляров (по умолчанию по одному экземпляру на книгу)
+        :type inventory: Inventory, optional
+        """
+        self._pool = pool if pool is not None else RandomPool(books)
+        if inventory is None:
+            inventory = Inventory()
+            for book in books:
+                inventory.add_copies(book.isbn)
+        self.inventory = inventory
+        self._fuzzy = {}
+        self._facets = {}
+        self._orderings = {}
+        self._planner = None
+        self.books = books
+        self.indexes = indexes
+        self.instrumentation = None
+        self.changes = None
+        self._version = version
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        """
+        Версия библиотеки на момент снимка
+
+        :return: Версия
+        :rtype: int
+        """
+        return self._version
+
+    def changes_since(self, version: int) -> list:
+        """
+        Снимок не хранит ленту изменений
+
+        :raises TypeError: Всегда
+        """
+        raise TypeError("Снимок библиотеки не хранит ленту изменений")
+
+    def _read_only(self, *args, **kwargs):
+        """
+        Запрещает изменение снимка
+
+        :raises TypeError: Всегда
+        """
+        raise TypeError("Снимок библиотеки доступен только для чтения")
+
+    add_book = _read_only
+    add_books = _read_only
+    remove_book = _read_only
+    remove_books = _read_only
+    register_index = _read_only
+    unregister_index = _read_only
+    rebuild_indexes = _read_only
+    add_copies = _read_only
+    remove_copies = _read_only
+    checkout = _read_only
+    return_copies = _read_only
+
+    def snapshot(self) -> "LibrarySnapshot":
+        """
+        Снимок неизменяем, поэтому возвращается он сам
+
+        :return: Этот же снимок
+        :rtype: LibrarySnapshot
+        """
+        return self
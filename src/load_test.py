@@ -0,0 +1,194 @@
+"""Модуль с клиентом HTTP/1.1 keep-alive и нагрузочным тестом сервера библиотеки."""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from src.server import DEFAULT_HOST, DEFAULT_PORT
+
+DEFAULT_PATHS = (
+    "/search?field=author&value=%D0%9B%D0%B5%D0%B2%20%D0%A2%D0%BE%D0%BB%D1%81%D1%82%D0%BE%D0%B9",
+    "/search?field=year&value=1869",
+    "/facets?name=genre",
+    "/stats",
+)
+
+
+class HTTPClient:
+    """Клиент, отправляющий запросы по одному постоянному соединению."""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        Инициализация клиента; соединение открывается при первом запросе
+
+        :param host: Адрес сервера
+        :type host: str
+        :param port: Порт сервера
+        :type port: int
+        """
+        self.host = host
+        self.port = port
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """
+        Открывает соединение, если оно ещё не открыто
+
+        :return: Кортеж (поток чтения, поток записи)
+        :rtype: tuple
+        """
+        if self._reader is None or self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        return self._reader, self._writer
+
+    async def close(self) -> None:
+        """Закрывает соединение"""
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._reader = self._writer = None
+
+    async def request(self, method: str, path: str, payload=None):
+        """
+        Отправляет запрос и читает ответ
+
+        :param method: HTTP-метод
+        :type method: str
+        :param path: Путь со строкой запроса
+        :type path: str
+        :param payload: Значение для JSON-тела (необязательно)
+        :return: Кортеж (статус, разобранное JSON-тело)
+        :rtype: tuple
+        :raises ConnectionError: Если сервер закрыл соединение
+        """
+        reader, writer = await self._connect()
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        head = (f"{method} {path} HTTP/1.1\r\n"
+                f"Host: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("Сервер закрыл соединение")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        data = await reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, json.loads(data.decode("utf-8")) if data else None
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Перцентиль отсортированного списка (ближайший ранг)
+
+    :param sorted_values: Отсортированные значения
+    :type sorted_values: list
+    :param fraction: Доля от 0 до 1
+    :type fraction: float
+    :return: Значение перцентиля (0.0 для пустого списка)
+    :rtype: float
+    """
+    if not sorted_values:
+        return 0.0
+    position = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[position]
+
+
+async def run_load_test(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                        requests: int = 1000, concurrency: int = 10,
+                        paths=DEFAULT_PATHS) -> dict:
+    """
+    Нагрузочный тест: concurrency клиентов с постоянными соединениями по очереди запрашивают paths
+
+    :param host: Адрес сервера
+    :type host: str
+    :param port: Порт сервера
+    :type port: int
+    :param requests: Общее количество запросов
+    :type requests: int
+    :param concurrency: Количество одновременных соединений
+    :type concurrency: int
+    :param paths: Пути GET-запросов, перебираемые по кругу
+    :type paths: tuple
+    :return: Словарь с количеством запросов, ошибок, временем, RPS и задержками в мс
+    :rtype: dict
+    """
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        client = HTTPClient(host, port)
+        try:
+            for number in counter:
+                start = time.perf_counter()
+                try:
+                    status, _ = await client.request("GET", paths[number % len(paths)])
+                except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    await client.close()
+                    continue
+                latencies.append(time.perf_counter() - start)
+                if status >= 400:
+                    errors += 1
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "elapsed": elapsed,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.5) * 1000,
+            "p95": _percentile(latencies, 0.95) * 1000,
+            "p99": _percentile(latencies, 0.99) * 1000,
+            "max": (latencies[-1] if latencies else 0.0) * 1000,
+        },
+    }
+
+
+def main(argv=None) -> int:
+    """
+    Точка входа командной строки: нагрузочный тест и вывод результата в JSON
+
+    :param argv: Аргументы командной строки (по умолчанию sys.argv[1:])
+    :type argv: list, optional
+    :return: Код завершения: 0 без ошибок, 1 если были ошибки запросов
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сервера библиотеки")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-n", "--requests", type=int, default=1000,
+                        help="общее количество запросов")
+    parser.add_argument("-c", "--concurrency", type=int, default=10,
+                        help="количество одновременных соединений")
+    args = parser.parse_args(argv)
+    result = asyncio.run(run_load_test(args.host, args.port, args.requests, args.concurrency))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,15 @@
+import argparse
+import sys
+from contextlib import nullcontext
+from src.batch import run_batch
 from src.book import Book
+from src.constants import create_sample_books
 from src.library import Library
-from src.simulation import run_simulation
+from src.memory import measure
+from src.server import DEFAULT_HOST, DEFAULT_PORT, run_server
+from src.pager import DEFAULT_PAGE_SIZE, Pager, format_short_rows
+from src.profiling import DEFAULT_OUTPUT, PROFILE_MODES, Profiler
+from src.simulation import READ_HEAVY_WEIGHTS, run_simulation
 
 
 def menu():
@@ -18,11 +27,11 @@ def menu():
     print("-" * 80)
 
 
-def run_simulation_menu():
+def run_simulation_menu(ask=input):
     print("ЗАПУСК СИМУЛЯЦИИ")
     print("-" * 80)
 
-    steps_str = input("Количество шагов (по умолчанию 20): ").strip()
+    steps_str = ask("Количество шагов (по умолчанию 20): ").strip()
     steps = 20
     if steps_str:
         try:
@@ -31,7 +40,7 @@ def run_simulation_menu():
             print("Задано неверное значение, по умолчанию используется 20")
             steps = 20
 
-    seed_str = input("Seed (Enter для случайного): ").strip()
+    seed_str = ask("Seed (Enter для случайного): ").strip()
     seed = None
     if seed_str:
         try:
@@ -58,14 +67,24 @@ def print_book_details(book):
 
 
 class CLI:
-    def __init__(self):
-        self.library = Library()
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE, library=None, profiler=None):
+        self.library = library if library is not None else Library()
+        self.profiler = profiler
+        self.pager = Pager(page_size, input_func=self.ask)
+        self.results_pager = Pager(page_size, input_func=self.ask, formatter=format_short_rows)
+
+    def ask(self, prompt: str) -> str:
+        # Ожидание ввода не входит во время событий профилировщика.
+        if self.profiler is None:
+            return input(prompt)
+        with self.profiler.waiting():
+            return input(prompt)
 
     def run(self):
         exit_requested = False
         while not exit_requested:
             menu()
-            choice = input("\nВыберите действие: ").strip()
+            choice = self.ask("\nВыберите действие: ").strip()
             print()
             if choice == "0":
                 exit_requested = True
@@ -82,12 +101,13 @@ class CLI:
             "5": self.search_by_author,
             "6": self.search_by_year,
             "7": self.search_by_genre,
-            "8": run_simulation_menu,
+            "8": self.run_simulation_menu,
             "0": self.exit_program
         }
         action = actions.get(choice)
         if action:
-            action()
+            with nullcontext() if self.profiler is None else self.profiler.event(action.__name__):
+                action()
         else:
             print("Неверный выбор (выберите 0-9)")
 
@@ -97,19 +117,19 @@ class CLI:
 
         title = ""
         while not title:
-            title = input("Название: ").strip()
+            title = self.ask("Название: ").strip()
             if not title:
                 print("Название не может быть пустым, попробуйте снова")
 
         author = ""
         while not author:
-            author = input("Автор: ").strip()
+            author = self.ask("Автор: ").strip()
             if not author:
                 print("Автор не может быть пустым, попробуйте снова")
 
         year = None
         while year is None:
-            year_str = input("Год издания: ").strip()
+            year_str = self.ask("Год издания: ").strip()
             if not year_str:
                 print("Год не может быть пустым, попробуйте снова")
                 continue
@@ -123,13 +143,13 @@ class CLI:
 
         genre = ""
         while not genre:
-            genre = input("Жанр: ").strip()
+            genre = self.ask("Жанр: ").strip()
             if not genre:
                 print("Жанр не может быть пустым, попробуйте снова")
 
         isbn = ""
         while not isbn:
-            isbn = input("ISBN: ").strip()
+            isbn = self.ask("ISBN: ").strip()
             if not isbn:
                 print("ISBN не может быть пустым, попробуйте снова")
 
@@ -151,18 +171,12 @@ class CLI:
             return
 
         print(f"Всего книг в библиотеке: {len(self.library.books)}\n")
-        for i, book in enumerate(self.library.books, 1):
-            print(f"{i:3}. {book}")
-            print(f"     ISBN: {book.isbn}, Жанр: {book.genre}")
-
-        print("\n" + "-" * 80)
-        print("Введите номер книги для удаления или '0' для возврата в меню")
+        print("Введите ISBN книги, 'п' для поиска по автору или '0' для возврата в меню")
         print("-" * 80)
 
-        book_found = False
         book = None
-        while not book_found:
-            choice = input("\nВаш выбор: ").strip()
+        while book is None:
+            choice = self.ask("\nВаш выбор: ").strip()
 
             if choice == "0":
                 print("Возврат в главное меню")
@@ -172,24 +186,19 @@ class CLI:
                 print("Выбор не может быть пустым, попробуйте снова")
                 continue
 
-            try:
-                index = int(choice)
-            except ValueError:
-                print("Введите число, попробуйте снова")
-                continue
-
-            if index < 1 or index > len(self.library.books):
-                print(f"Номер должен быть от 1 до {len(self.library.books)}, попробуйте снова")
+            if choice.lower() == "п":
+                book = self._select_book_by_author()
                 continue
 
-            book = self.library.books[index - 1]
-            book_found = True
+            book = self.library.search_by_isbn(choice)
+            if book is None:
+                print(f"Книга с ISBN {choice} не найдена, попробуйте снова")
 
         confirmed = False
         while not confirmed:
             print(f"\nВыбрана книга: {book}")
             print(f"ISBN: {book.isbn}")
-            confirm = input("Удалить эту книгу? (да/нет): ").strip().lower()
+            confirm = self.ask("Удалить эту книгу? (да/нет): ").strip().lower()
 
             if confirm == "да":
                 self.library.remove_book(book)
@@ -202,6 +211,43 @@ class CLI:
             else:
                 print("Неверный ответ, введите 'да' или 'нет'")
 
+    def _select_book_by_author(self):
+        author = self.ask("Введите имя автора: ").strip()
+        if not author:
+            print("Имя автора не может быть пустым")
+            return None
+
+        results = self.library.search_by_author(author)
+        if len(results) == 0:
+            print("Книг не найдено")
+            return None
+
+        self.pager.browse(
+            lambda offset, limit: self.library.search_page("author", author, limit, offset))
+
+        while True:
+            choice = self.ask(f"Номер книги (1-{len(results)}) или '0' для отмены: ").strip()
+            if choice == "0":
+                return None
+            try:
+                index = int(choice)
+            except ValueError:
+                print("Введите число, попробуйте снова")
+                continue
+            if 1 <= index <= len(results):
+                return results[index - 1]
+            print(f"Номер должен быть от 1 до {len(results)}, попробуйте снова")
+
+    def _show_search_results(self, field: str, value) -> bool:
+        page = self.library.search_page(field, value, limit=self.results_pager.page_size)
+        if page.total == 0:
+            return False
+        print(f"\nНайдено книг: {page.total}")
+        print()
+        self.results_pager.browse(
+            lambda offset, limit: self.library.search_page(field, value, limit, offset))
+        return True
+
     def show_all_books(self):
         print("СПИСОК ВСЕХ КНИГ")
         print("-" * 80)
@@ -211,9 +257,15 @@ class CLI:
             return
 
         print(f"Всего книг: {len(self.library.books)}\n")
-        for i, book in enumerate(self.library.books, 1):
-            print(f"{i:3}. {book}")
-            print(f"     ISBN: {book.isbn}, Жанр: {book.genre}")
+        orders = {"": None, "1": "title", "2": "author", "3": "year"}
+        choice = None
+        while choice not in orders:
+            choice = self.ask("Порядок: Enter — по добавлению, 1 — по названию, "
+                           "2 — по автору, 3 — по году: ").strip()
+            if choice not in orders:
+                print("Неверный выбор, попробуйте снова")
+        sort_by = orders[choice]
+        self.pager.browse(lambda offset, limit: self.library.list_page(limit, offset, sort_by))
 
     def search_by_isbn(self):
         print("ПОИСК ПО ISBN")
@@ -225,7 +277,7 @@ class CLI:
         while not found:
             isbn = ""
             while not isbn:
-                isbn = input("Введите ISBN: ").strip()
+                isbn = self.ask("Введите ISBN: ").strip()
 
                 if isbn == "0":
                     print("Возврат в главное меню")
@@ -254,7 +306,7 @@ class CLI:
         while not found:
             author = ""
             while not author:
-                author = input("Введите имя автора: ").strip()
+                author = self.ask("Введите имя автора: ").strip()
 
                 if author == "0":
                     print("Возврат в главное меню")
@@ -263,16 +315,14 @@ class CLI:
                 if not author:
                     print("Имя автора не может быть пустым, попробуйте снова")
 
-            results = self.library.search_by_author(author)
-
-            if len(results) > 0:
-                print(f"\nНайдено книг: {len(results)}")
-                print()
-                for i, book in enumerate(results, 1):
-                    print(f"{i}. {book}")
+            if self._show_search_results("author", author):
                 found = True
             else:
                 print("\nКниг не найдено")
+                suggestions = self.library.fuzzy_search("author", author, limit=5)
+                if suggestions:
+                    print("Возможно, вы имели в виду: "
+                          + ", ".join(name for name, _ in suggestions))
                 print("Попробуйте ещё раз или введите 0, чтобы перейти в главное меню\n")
 
     def search_by_year(self):
@@ -285,7 +335,7 @@ class CLI:
         while not found:
             year = None
             while year is None:
-                year_str = input("Введите год: ").strip()
+                year_str = self.ask("Введите год: ").strip()
 
                 if year_str == "0":
                     print("Возврат в главное меню")
@@ -300,13 +350,7 @@ class CLI:
                 except ValueError:
                     print("Год должен быть числом, попробуйте снова")
 
-            results = self.library.search_by_year(year)
-
-            if len(results) > 0:
-                print(f"\nНайдено книг: {len(results)}")
-                print()
-                for i, book in enumerate(results, 1):
-                    print(f"{i}. {book}")
+            if self._show_search_results("year", year):
                 found = True
             else:
                 print("\nКниг не найдено")
@@ -322,7 +366,7 @@ class CLI:
         while not found:
             genre = ""
             while not genre:
-                genre = input("Введите жанр: ").strip()
+                genre = self.ask("Введите жанр: ").strip()
 
                 if genre == "0":
                     print("Возврат в главное меню")
@@ -331,32 +375,106 @@ class CLI:
                 if not genre:
                     print("Жанр не может быть пустым, попробуйте снова")
 
-            results = self.library.search_by_genre(genre)
-
-            if len(results) > 0:
-                print(f"\nНайдено книг: {len(results)}")
-                print()
-                for i, book in enumerate(results, 1):
-                    print(f"{i}. {book}")
+            if self._show_search_results("genre", genre):
                 found = True
             else:
                 print("\nКниг не найдено")
                 print("Попробуйте ещё раз или введите 0, чтобы перейти в главное меню\n")
 
+    def run_simulation_menu(self):
+        run_simulation_menu(self.ask)
+
     def exit_program(self):
         print("До свидания!")
         print(f"Финальная статистика: {self.library}")
 
 
-def main():
-    cli = CLI()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Библиотека книг")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="выполнить команды из файла ('-' для stdin) и вывести JSON Lines")
+    parser.add_argument("-c", "--command", action="append", default=[],
+                        help="выполнить команду в пакетном режиме (можно повторять)")
+    parser.add_argument("--sample", action="store_true",
+                        help="загрузить начальный набор книг из books_data.json")
+    parser.add_argument("--memory", nargs="?", type=int, const=0, metavar="N",
+                        help="вывести отчёт о памяти библиотеки (с оценкой для N книг)")
+    parser.add_argument("--serve", nargs="?", type=int, const=DEFAULT_PORT, metavar="PORT",
+                        help=f"запустить HTTP-сервер запросов (порт по умолчанию {DEFAULT_PORT})")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help="адрес HTTP-сервера")
+    parser.add_argument("--simulate", nargs="?", type=int, const=20, metavar="STEPS",
+                        help="запустить симуляцию без интерактивного меню")
+    parser.add_argument("--seed", type=int,
+                        help="seed симуляции")
+    parser.add_argument("--catalog-size", type=int, metavar="N",
+                        help="симулировать на синтетическом каталоге из N книг")
+    parser.add_argument("--key-skew", type=float, default=0.0, metavar="S",
+                        help="показатель Zipf для выбора ключей поиска в симуляции")
+    parser.add_argument("--read-heavy", action="store_true",
+                        help="симулировать нагрузку из 95%% чтений")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="профилировать запуск (cProfile или сэмплирование стеков)")
+    parser.add_argument("--profile-output", default=DEFAULT_OUTPUT, metavar="PREFIX",
+                        help="префикс файлов профиля (.pstats/.collapsed и .events.json)")
+    return parser.parse_args(argv)
+
+
+def run_batch_mode(args, library: Library) -> int:
+    exit_code = run_batch(args.command, library)
+    if args.batch == "-":
+        exit_code = max(exit_code, run_batch(sys.stdin, library))
+    elif args.batch:
+        with open(args.batch, "r", encoding="utf-8") as file:
+            exit_code = max(exit_code, run_batch(file, library))
+    return exit_code
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.profile is None:
+        return run_app(args)
+    profiler = Profiler(args.profile)
+    try:
+        with profiler:
+            return run_app(args, profiler)
+    finally:
+        paths = profiler.write(args.profile_output)
+        print(profiler.format(), file=sys.stderr)
+        print(f"Профиль сохранён: {', '.join(paths)}", file=sys.stderr)
+
+
+def run_app(args, profiler=None) -> int:
+    library = Library()
+    if args.sample:
+        for book in create_sample_books():
+            library.add_book(book)
+
+    if args.batch or args.command:
+        return run_batch_mode(args, library)
+
+    if args.memory is not None:
+        print(measure(library).format(args.memory))
+        return 0
+
+    if args.serve is not None:
+        run_server(library, args.host, args.serve)
+        return 0
+
+    if args.simulate is not None:
+        run_simulation(args.simulate, args.seed, READ_HEAVY_WEIGHTS if args.read_heavy else None,
+                       args.catalog_size, args.key_skew, profiler)
+        return 0
+
+    cli = CLI(library=library, profiler=profiler)
     try:
         cli.run()
     except KeyboardInterrupt:
         print("\n\nПрограмма прервана пользователем")
     except Exception as e:
         print(f"\nПроизошла ошибка: {e}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
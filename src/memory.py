@@ -0,0 +1,215 @@
+"""Модуль с учётом памяти, занимаемой библиотекой, по компонентам."""
+
+import sys
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+TEXT_FIELDS = ('title', 'author', 'genre', 'isbn')
+
+_SKIP_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def deep_size(obj, seen=None) -> int:
+    """
+    Полный размер объекта в байтах вместе со всеми достижимыми из него объектами
+
+    Обходятся элементы контейнеров, атрибуты __dict__ и __slots__. Объекты из seen
+    не учитываются повторно, поэтому общий seen для нескольких вызовов позволяет
+    отнести разделяемые объекты к первому компоненту, в котором они встретились.
+    Классы, модули и функции не учитываются.
+
+    :param obj: Объект
+    :param seen: Множество id уже учтённых объектов (дополняется)
+    :type seen: set, optional
+    :return: Размер в байтах
+    :rtype: int
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    queue = deque([obj])
+    while queue:
+        current = queue.popleft()
+        if id(current) in seen or isinstance(current, _SKIP_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            queue.extend(current.keys())
+            queue.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            queue.extend(current)
+        if hasattr(current, '__dict__'):
+            queue.append(vars(current))
+        for slot in getattr(type(current), '__slots__', ()):
+            if hasattr(current, slot):
+                queue.append(getattr(current, slot))
+    return total
+
+
+def string_duplication(books) -> dict:
+    """
+    Дублирование строк в текстовых полях книг
+
+    Для каждого поля считаются значения, различные значения и различные объекты
+    строк; duplicate_bytes — сколько занимают лишние копии одинаковых строк.
+
+    :param books: Итерируемый объект с книгами
+    :type books: iterable
+    :return: Словарь {поле: {values, distinct, objects, duplicate_bytes}}
+    :rtype: dict
+    """
+    values = dict.fromkeys(TEXT_FIELDS, 0)
+    distinct: dict[str, dict[str, int]] = {field: {} for field in TEXT_FIELDS}
+    objects: dict[str, dict[int, str]] = {field: {} for field in TEXT_FIELDS}
+    for book in books:
+        for field in TEXT_FIELDS:
+            value = getattr(book, field)
+            values[field] += 1
+            distinct[field].setdefault(value, id(value))
+            objects[field].setdefault(id(value), value)
+    result = {}
+    for field in TEXT_FIELDS:
+        kept = set(distinct[field].values())
+        duplicate_bytes = sum(sys.getsizeof(value) for object_id, value in objects[field].items()
+                              if object_id not in kept)
+        result[field] = {
+            "values": values[field],
+            "distinct": len(distinct[field]),
+            "objects": len(objects[field]),
+            "duplicate_bytes": duplicate_bytes,
+        }
+    return result
+
+
+class MemoryReport:
+    """Отчёт о памяти библиотеки: размеры компонентов и дублирование строк."""
+
+    def __init__(self, books: int, components: dict, strings: dict):
+        """
+        Инициализация отчёта
+
+        :param books: Количество уникальных книг
+        :type books: int
+        :param components: Словарь {компонент: байты}
+        :type components: dict
+        :param strings: Статистика дублирования строк
+        :type strings: dict
+        """
+        self.books = books
+        self.components = components
+        self.strings = strings
+
+    @property
+    def total(self) -> int:
+        """
+        Суммарный размер всех компонентов
+
+        :return: Размер в байтах
+        :rtype: int
+        """
+        return sum(self.components.values())
+
+    @property
+    def bytes_per_book(self) -> float:
+        """
+        Средний размер в расчёте на одну книгу
+
+        :return: Байты на книгу (0.0 для пустой библиотеки)
+        :rtype: float
+        """
+        return self.total / self.books if self.books else 0.0
+
+    def extrapolate(self, target_books: int) -> dict:
+        """
+        Линейная оценка размеров компонентов для каталога другого размера
+
+        :param target_books: Целевое количество книг
+        :type target_books: int
+        :return: Словарь {компонент: байты} с ключом 'total'
+        :rtype: dict
+        :raises ValueError: Если библиотека пуста
+        """
+        if not self.books:
+            raise ValueError("Нельзя экстраполировать по пустой библиотеке")
+        scale = target_books / self.books
+        estimate = {name: round(size * scale) for name, size in self.components.items()}
+        estimate["total"] = sum(estimate.values())
+        return estimate
+
+    def as_dict(self) -> dict:
+        """
+        Представление отчёта в виде словаря
+
+        :return: Словарь с количеством книг, компонентами, итогом и строками
+        :rtype: dict
+        """
+        return {
+            "books": self.books,
+            "components": dict(self.components),
+            "total": self.total,
+            "bytes_per_book": self.bytes_per_book,
+            "strings": self.strings,
+        }
+
+    def format(self, target_books=None) -> str:
+        """
+        Текстовая таблица отчёта
+
+        :param target_books: Количество книг для экстраполяции (необязательно)
+        :type target_books: int, optional
+        :return: Многострочный текст
+        :rtype: str
+        """
+        estimate = self.extrapolate(target_books) if target_books and self.books else None
+        header = f"{'Компонент':<24}{'Байт':>14}{'Байт/книга':>14}"
+        if estimate is not None:
+            header += f"{f'На {target_books} книг':>22}"
+        lines = [header, "-" * len(header)]
+        for name, size in list(self.components.items()) + [("Итого", self.total)]:
+            per_book = size / self.books if self.books else 0.0
+            line = f"{name:<24}{size:>14}{per_book:>14.1f}"
+            if estimate is not None:
+                line += f"{estimate.get(name, estimate['total']):>22}"
+            lines.append(line)
+        lines.append("")
+        lines.append("Дублирование строк:")
+        for field, data in self.strings.items():
+            lines.append(f"  {field}: значений {data['values']}, различных {data['distinct']},"
+                         f" объектов {data['objects']}, лишних байт {data['duplicate_bytes']}")
+        return "\n".join(lines)
+
+
+def measure(library) -> MemoryReport:
+    """
+    Измеряет память библиотеки по компонентам
+
+    Сначала учитываются сами книги со строками полей, затем структуры, которые
+    на них ссылаются, поэтому размер индексов и коллекции — их собственные накладные
+    расходы без учёта книг.
+
+    :param library: Библиотека
+    :type library: Library
+    :return: Отчёт о памяти
+    :rtype: MemoryReport
+    """
+    with library._lock:
+        seen: set[int] = set()
+        components = {"books": sum(deep_size(book, seen) for book in library.books)}
+        components["collection"] = deep_size(library.books, seen)
+        for name in library.indexes.index_names():
+            components[f"index:{name}"] = deep_size(library.indexes.get_index(name), seen)
+        components["random_pool"] = deep_size(library._pool, seen)
+        components["inventory"] = deep_size(library.inventory, seen)
+        for name, index in library._fuzzy.items():
+            components[f"fuzzy:{name}"] = deep_size(index, seen)
+        for name, counter in library._facets.items():
+            components[f"facet:{name}"] = deep_size(counter, seen)
+        for name, ordering in library._orderings.items():
+            components[f"ordering:{name}"] = deep_size(ordering, seen)
+        if library._planner is not None:
+            components["planner_statistics"] = deep_size(library._planner.statistics, seen)
+        if library.changes is not None:
+            components["change_feed"] = deep_size(library.changes, seen)
+        return MemoryReport(len(library.indexes), components,
+                            string_duplication(library.books))
@@ -0,0 +1,370 @@
+"""Модуль с поддерживаемыми упорядочениями книг для сортированного вывода без пересортировки."""
+
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from src.book import Book
+from src.pagination import SORT_KEYS
+
+DEFAULT_LOAD = 512
+
+
+class _Greatest:
+    """Значение, большее любого другого: верхняя граница для поиска по префиксу кортежа."""
+
+    def __lt__(self, other) -> bool:
+        return False
+
+    def __gt__(self, other) -> bool:
+        return True
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Greatest)
+
+    __hash__ = object.__hash__
+
+
+GREATEST = _Greatest()
+
+
+class SortedList:
+    """Упорядоченный список из блоков ограниченного размера (в духе sortedcontainers).
+
+    Вставка и удаление сдвигают элементы только внутри одного блока, поиск
+    позиции — двоичный поиск по максимумам блоков и внутри блока.
+    """
+
+    def __init__(self, values=None, load: int = DEFAULT_LOAD):
+        """
+        Инициализация списка
+
+        :param values: Итерируемый объект со значениями (необязательно)
+        :type values: iterable, optional
+        :param load: Целевой размер блока; блок делится пополам при превышении 2 * load
+        :type load: int
+        """
+        self._load = load
+        self._lists = []
+        self._maxes = []
+        self._len = 0
+        if values is not None:
+            ordered = sorted(values)
+            self._lists = [ordered[i:i + load] for i in range(0, len(ordered), load)]
+            self._maxes = [block[-1] for block in self._lists]
+            self._len = len(ordered)
+
+    def add(self, value) -> None:
+        """
+        Вставляет значение с сохранением порядка
+
+        :param value: Значение
+        """
+        if not self._maxes:
+            self._lists.append([value])
+            self._maxes.append(value)
+        else:
+            position = bisect_left(self._maxes, value)
+            if position == len(self._maxes):
+                position -= 1
+                self._lists[position].append(value)
+                self._maxes[position] = value
+            else:
+                insort(self._lists[position], value)
+            self._split(position)
+        self._len += 1
+
+    def _split(self, position: int) -> None:
+        """
+        Делит слишком большой блок пополам
+
+        :param position: Номер блока
+        :type position: int
+        """
+        block = self._lists[position]
+        if len(block) <= 2 * self._load:
+            return
+        half = len(block) // 2
+        self._lists[position:position + 1] = [block[:half], block[half:]]
+        self._maxes[position:position + 1] = [block[half - 1], block[-1]]
+
+    def remove(self, value) -> None:
+        """
+        Удаляет значение
+
+        :param value: Значение
+        :raises ValueError: Если значения нет в списке
+        """
+        position = bisect_left(self._maxes, value)
+        if position < len(self._maxes):
+            block = self._lists[position]
+            index = bisect_left(block, value)
+            if index < len(block) and block[index] == value:
+                del block[index]
+                self._len -= 1
+                if not block:
+                    del self._lists[position]
+                    del self._maxes[position]
+                elif index == len(block):
+                    self._maxes[position] = block[-1]
+                return
+        raise ValueError(f"Значение {value!r} отсутствует в списке")
+
+    def irange(self, start=None, reverse: bool = False, inclusive: bool = True):
+        """
+        Потоковая итерация в порядке возрастания (или убывания) начиная с позиции start
+
+        :param start: Начальное значение (None — с начала или с конца при reverse)
+        :param reverse: Итерировать по убыванию
+        :type reverse: bool
+        :param inclusive: Включать ли значения, равные start
+        :type inclusive: bool
+        :return: Итератор по значениям
+        :rtype: Iterator
+        """
+        if reverse:
+            return self._iter_backward(start, inclusive)
+        return self._iter_forward(start, inclusive)
+
+    def _iter_forward(self, start, inclusive: bool):
+        """
+        Итерация по возрастанию от первого значения >= start (> start при inclusive=False)
+
+        :param start: Начальное значение или None
+        :param inclusive: Включать ли значения, равные start
+        :type inclusive: bool
+        :return: Генератор значений
+        """
+        find = bisect_left if inclusive else bisect_right
+        if start is None:
+            position, index = 0, 0
+        else:
+            position = find(self._maxes, start)
+            if position == len(self._maxes):
+                return
+            index = find(self._lists[position], start)
+        for block in self._lists[position:position + 1]:
+            yield from islice(block, index, None)
+        for block in self._lists[position + 1:]:
+            yield from block
+
+    def _iter_backward(self, start, inclusive: bool):
+        """
+        Итерация по убыванию от последнего значения <= start (< start при inclusive=False)
+
+        :param start: Начальное значение или None
+        :param inclusive: Включать ли значения, равные start
+        :type inclusive: bool
+        :return: Генератор значений
+        """
+        if not self._lists:
+            return
+        if start is None:
+            position, index = len(self._lists) - 1, len(self._lists[-1])
+        else:
+            find = bisect_right if inclusive else bisect_left
+            position = min(bisect_left(self._maxes, start), len(self._lists) - 1)
+            index = find(self._lists[position], start)
+        for i in range(position, -1, -1):
+            block = self._lists[i]
+            stop = index if i == position else len(block)
+            for j in range(stop - 1, -1, -1):
+                yield block[j]
+
+    def islice(self, start: int, stop: int, reverse: bool = False) -> list:
+        """
+        Значения с позициями [start, stop) без обхода предшествующих блоков поэлементно
+
+        :param start: Начальная позиция
+        :type start: int
+        :param stop: Конечная позиция (не включая)
+        :type stop: int
+        :param reverse: Считать позиции от конца (по убыванию)
+        :type reverse: bool
+        :return: Список значений
+        :rtype: list
+        """
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+        if reverse:
+            values = self.islice(self._len - stop, self._len - start)
+            values.reverse()
+            return values
+        result = []
+        offset = 0
+        for block in self._lists:
+            if offset + len(block) <= start:
+                offset += len(block)
+                continue
+            result.extend(block[max(0, start - offset):stop - offset])
+            offset += len(block)
+            if offset >= stop:
+                break
+        return result
+
+    def __len__(self) -> int:
+        """
+        Количество значений
+
+        :return: Количество значений
+        :rtype: int
+        """
+        return self._len
+
+    def __iter__(self):
+        """
+        Итерация по возрастанию
+
+        :return: Итератор по значениям
+        :rtype: Iterator
+        """
+        return self._iter_forward(None, True)
+
+    def __contains__(self, value) -> bool:
+        """
+        Проверяет наличие значения за O(log n)
+
+        :param value: Значение
+        :return: True если значение есть в списке
+        :rtype: bool
+        """
+        position = bisect_left(self._maxes, value)
+        if position == len(self._maxes):
+            return False
+        block = self._lists[position]
+        index = bisect_left(block, value)
+        return index < len(block) and block[index] == value
+
+
+class BookOrdering:
+    """Книги, упорядоченные по полю сортировки; при равенстве — в порядке добавления."""
+
+    def __init__(self, sort_by: str, books=None, load: int = DEFAULT_LOAD):
+        """
+        Инициализация упорядочения
+
+        :param sort_by: Поле сортировки: 'title', 'author' или 'year'
+        :type sort_by: str
+        :param books: Итерируемый объект с книгами (необязательно)
+        :type books: iterable, optional
+        :param load: Размер блока упорядоченного списка
+        :type load: int
+        :raises ValueError: Если поле сортировки неизвестно
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Неизвестное поле сортировки: {sort_by}")
+        self.sort_by = sort_by
+        self._key = SORT_KEYS[sort_by]
+        self._entries: dict[str, tuple] = {}
+        self._books: dict[str, Book] = {}
+        self._sequence = 0
+        entries = []
+        for book in books or ():
+            if book.isbn not in self._entries:
+                entries.append(self._register(book))
+        self._list = SortedList(entries, load)
+
+    def _register(self, book) -> tuple:
+        """
+        Создаёт элемент упорядоченного списка для книги
+
+        :param book: Книга
+        :type book: Book
+        :return: Кортеж (ключ сортировки, порядковый номер добавления, ISBN)
+        :rtype: tuple
+        """
+        self._sequence += 1
+        entry = (self._key(book), self._sequence, book.isbn)
+        self._entries[book.isbn] = entry
+        self._books[book.isbn] = book
+        return entry
+
+    def add(self, book) -> None:
+        """
+        Добавляет книгу, если книги с таким ISBN ещё нет
+
+        :param book: Книга
+        :type book: Book
+        """
+        if book.isbn not in self._entries:
+            self._list.add(self._register(book))
+
+    def remove(self, book) -> None:
+        """
+        Удаляет книгу по ISBN
+
+        :param book: Книга
+        :type book: Book
+        """
+        entry = self._entries.pop(book.isbn, None)
+        if entry is not None:
+            del self._books[book.isbn]
+            self._list.remove(entry)
+
+    def apply(self, change) -> None:
+        """
+        Применяет изменение из ленты изменений библиотеки
+
+        :param change: Изменение
+        :type change: Change
+        """
+        if change.kind == 'add':
+            self.add(change.book)
+        else:
+            self.remove(change.book)
+
+    def chunk(self, start=None, after=None, count: int = 256, reverse: bool = False) -> list:
+        """
+        Следующая порция книг в порядке сортировки
+
+        :param start: Значение поля, с которого начинать (при after=None)
+        :param after: Элемент, после которого продолжать (курсор предыдущей порции)
+        :type after: tuple, optional
+        :param count: Размер порции
+        :type count: int
+        :param reverse: По убыванию
+        :type reverse: bool
+        :return: Список пар (элемент-курсор, книга)
+        :rtype: list
+        """
+        if after is not None:
+            entries = self._list.irange(after, reverse, inclusive=False)
+        elif start is not None:
+            bound = (start, GREATEST) if reverse else (start,)
+            entries = self._list.irange(bound, reverse)
+        else:
+            entries = self._list.irange(None, reverse)
+        return [(entry, self._books[entry[2]]) for entry in islice(entries, count)]
+
+    def page(self, offset: int, limit: int, reverse: bool = False) -> list:
+        """
+        Книги с позициями [offset, offset + limit) в порядке сортировки
+
+        :param offset: Смещение
+        :type offset: int
+        :param limit: Количество книг
+        :type limit: int
+        :param reverse: По убыванию
+        :type reverse: bool
+        :return: Список книг
+        :rtype: list
+        """
+        return [self._books[entry[2]]
+                for entry in self._list.islice(offset, offset + limit, reverse)]
+
+    def __iter__(self):
+        """
+        Итерация по книгам в порядке сортировки
+
+        :return: Итератор по книгам
+        :rtype: Iterator
+        """
+        return (self._books[entry[2]] for entry in self._list)
+
+    def __len__(self) -> int:
+        """
+        Количество книг
+
+        :return: Количество книг
+        :rtype: int
+        """
+        return len(self._list)
@@ -0,0 +1,143 @@
+"""Модуль с буферизованным постраничным выводом для CLI."""
+
+import sys
+
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def format_book_rows(books, start: int = 1) -> list:
+    """
+    Форматирует книги в строки списка с ISBN и жанром
+
+    :param books: Итерируемый объект с книгами
+    :type books: iterable
+    :param start: Номер первой книги
+    :type start: int
+    :return: Список строк (по две на книгу)
+    :rtype: list
+    """
+    rows = []
+    for i, book in enumerate(books, start):
+        rows.append(f"{i:3}. {book}\n")
+        rows.append(f"     ISBN: {book.isbn}, Жанр: {book.genre}\n")
+    return rows
+
+
+def format_short_rows(books, start: int = 1) -> list:
+    """
+    Форматирует книги в краткие строки результатов поиска
+
+    :param books: Итерируемый объект с книгами
+    :type books: iterable
+    :param start: Номер первой книги
+    :type start: int
+    :return: Список строк (по одной на книгу)
+    :rtype: list
+    """
+    return [f"{i}. {book}\n" for i, book in enumerate(books, start)]
+
+
+def write_buffered(lines, output=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """
+    Выводит строки крупными блоками вместо отдельного print на каждую строку
+
+    :param lines: Итерируемый объект со строками (с переводом строки)
+    :type lines: iterable
+    :param output: Поток вывода (по умолчанию sys.stdout)
+    :type output: TextIO, optional
+    :param chunk_size: Количество строк в одном блоке записи
+    :type chunk_size: int
+    """
+    output = output if output is not None else sys.stdout
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            output.write("".join(buffer))
+            buffer.clear()
+    if buffer:
+        output.write("".join(buffer))
+    output.flush()
+
+
+class Pager:
+    """Постраничный просмотр результатов с навигацией вперёд и назад."""
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE, output=None, input_func=input,
+                 formatter=format_book_rows):
+        """
+        Инициализация пейджера
+
+        :param page_size: Количество книг на экране
+        :type page_size: int
+        :param output: Поток вывода (по умолчанию sys.stdout)
+        :type output: TextIO, optional
+        :param input_func: Функция чтения команд пользователя
+        :type input_func: Callable
+        :param formatter: Функция форматирования книг в строки
+        :type formatter: Callable
+        :raises ValueError: Если page_size не положителен
+        """
+        if page_size <= 0:
+            raise ValueError("Размер страницы должен быть положительным")
+        self.page_size = page_size
+        self.output = output
+        self.input_func = input_func
+        self.formatter = formatter
+
+    def browse(self, fetch_page) -> None:
+        """
+        Показывает страницы, пока пользователь не выйдет или страницы не закончатся
+
+        :param fetch_page: Функция (offset, limit) -> Page
+        :type fetch_page: Callable
+        """
+        offset = 0
+        while True:
+            page = fetch_page(offset, self.page_size)
+            self.show_page(page)
+            if page.total <= self.page_size:
+                return
+            command = self._ask_command(page)
+            if command == "0":
+                return
+            if command == "n" and page.has_next:
+                offset = page.next_offset
+            elif command == "p" and offset > 0:
+                offset = max(0, offset - self.page_size)
+
+    def show_page(self, page) -> None:
+        """
+        Выводит одну страницу одним блоком
+
+        :param page: Страница результатов
+        :type page: Page
+        """
+        lines = self.formatter(page.books, page.offset + 1)
+        if page.total > self.page_size:
+            pages = (page.total + self.page_size - 1) // self.page_size
+            current = page.offset // self.page_size + 1
+            lines.append(f"\nСтраница {current} из {pages}\n")
+        write_buffered(lines, self.output)
+
+    def _ask_command(self, page) -> str:
+        """
+        Запрашивает команду навигации
+
+        :param page: Текущая страница
+        :type page: Page
+        :return: 'n', 'p' или '0'
+        :rtype: str
+        """
+        hints = []
+        if page.has_next:
+            hints.append("n - следующая")
+        if page.offset > 0:
+            hints.append("p - предыдущая")
+        hints.append("0 - выход")
+        while True:
+            command = self.input_func(f"[{', '.join(hints)}]: ").strip().lower()
+            if command in ("n", "p", "0"):
+                return command
+            write_buffered(["Неверная команда, попробуйте снова\n"], self.output)
@@ -0,0 +1,149 @@
+"""Модуль с постраничной выборкой и выборкой top-K результатов поиска."""
+
+import heapq
+from itertools import islice
+from src.book_collections import BookCollection
+
+SORT_KEYS = {
+    'title': lambda book: book.title,
+    'author': lambda book: book.author,
+    'year': lambda book: book.year,
+}
+
+
+class Page:
+    """Страница результатов поиска."""
+
+    def __init__(self, books, total: int, offset: int, limit: int):
+        """
+        Инициализация страницы
+
+        :param books: Книги на странице
+        :type books: BookCollection
+        :param total: Общее количество найденных книг
+        :type total: int
+        :param offset: Смещение первой книги страницы
+        :type offset: int
+        :param limit: Максимальный размер страницы
+        :type limit: int
+        """
+        self.books = books
+        self.total = total
+        self.offset = offset
+        self.limit = limit
+
+    @property
+    def next_offset(self):
+        """
+        Смещение следующей страницы (курсор)
+
+        :return: Смещение или None, если страница последняя
+        :rtype: int or None
+        """
+        following = self.offset + len(self.books)
+        return following if following < self.total else None
+
+    @property
+    def has_next(self) -> bool:
+        """
+        Есть ли следующая страница
+
+        :return: True если за страницей есть ещё книги
+        :rtype: bool
+        """
+        return self.next_offset is not None
+
+    def __len__(self) -> int:
+        """
+        Количество книг на странице
+
+        :return: Количество книг
+        :rtype: int
+        """
+        return len(self.books)
+
+    def __iter__(self):
+        """
+        Итерация по книгам страницы
+
+        :return: Итератор по книгам
+        :rtype: Iterator
+        """
+        return iter(self.books)
+
+    def __repr__(self) -> str:
+        """
+        Представление страницы для отладки
+
+        :return: Строка с параметрами страницы
+        :rtype: str
+        """
+        return f"Page(offset={self.offset}, size={len(self.books)}, total={self.total})"
+
+
+def _sort_key(sort_by: str):
+    """
+    Возвращает функцию-ключ сортировки по имени поля
+
+    :param sort_by: Поле сортировки: 'title', 'author' или 'year'
+    :type sort_by: str
+    :return: Функция-ключ
+    :rtype: Callable
+    :raises ValueError: Если поле сортировки неизвестно
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Неизвестное поле сортировки: {sort_by}")
+    return SORT_KEYS[sort_by]
+
+
+def top_k(books, k: int, sort_by: str, reverse: bool = False) -> list:
+    """
+    Первые k книг в порядке сортировки без полной сортировки (куча, O(n log k))
+
+    :param books: Итерируемый объект с книгами
+    :type books: iterable
+    :param k: Количество книг
+    :type k: int
+    :param sort_by: Поле сортировки: 'title', 'author' или 'year'
+    :type sort_by: str
+    :param reverse: Сортировать по убыванию
+    :type reverse: bool
+    :return: Список из не более чем k книг
+    :rtype: list
+    """
+    if k <= 0:
+        return []
+    key = _sort_key(sort_by)
+    if reverse:
+        return heapq.nlargest(k, books, key=key)
+    return heapq.nsmallest(k, books, key=key)
+
+
+def paginate(books, limit: int, offset: int = 0, sort_by=None, reverse: bool = False) -> Page:
+    """
+    Возвращает страницу результатов
+
+    Без сортировки страница вырезается за O(offset + limit), с сортировкой
+    используется куча размера offset + limit вместо сортировки всех книг.
+
+    :param books: Последовательность книг (должна поддерживать len)
+    :type books: list or BookCollection
+    :param limit: Размер страницы
+    :type limit: int
+    :param offset: Смещение первой книги
+    :type offset: int
+    :param sort_by: Поле сортировки или None для исходного порядка
+    :type sort_by: str or None
+    :param reverse: Сортировать по убыванию
+    :type reverse: bool
+    :return: Страница результатов
+    :rtype: Page
+    :raises ValueError: Если limit или offset отрицательные
+    """
+    if limit < 0 or offset < 0:
+        raise ValueError("limit и offset должны быть неотрицательными")
+    if sort_by is None:
+        selected = list(islice(books, offset, offset + limit))
+    else:
+        selected = top_k(books, offset + limit, sort_by, reverse)[offset:]
+    return Page(BookCollection(selected), len(books), offset, limit)
@@ -0,0 +1,302 @@
+"""Модуль с необязательным профилированием симуляции и CLI: cProfile и сэмплирование стеков."""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_MODES = ("cprofile", "sampling")
+DEFAULT_INTERVAL = 0.005
+DEFAULT_OUTPUT = "profile"
+
+
+def _frame_name(frame) -> str:
+    """
+    Имя кадра стека для collapsed-формата: файл и квалифицированное имя функции
+
+    :param frame: Кадр стека
+    :type frame: frame
+    :return: Строка вида 'library.py:Library.add_book'
+    :rtype: str
+    """
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+class EventTimer:
+    """Количество, суммарное и максимальное время выполнения одного типа событий."""
+
+    def __init__(self):
+        """Инициализация пустой статистики"""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, elapsed: float) -> None:
+        """
+        Учитывает одно выполнение события
+
+        :param elapsed: Время выполнения в секундах
+        :type elapsed: float
+        """
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+
+    def as_dict(self) -> dict:
+        """
+        Представление статистики в виде словаря
+
+        :return: Словарь с количеством, суммой, средним и максимумом в секундах
+        :rtype: dict
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+class Profiler:
+    """Профилировщик с режимами cProfile и периодического сэмплирования стеков.
+
+    Код можно размечать событиями через event(): время каждого события
+    учитывается отдельно, а в режиме сэмплирования имя события становится
+    корнем стека в collapsed-выводе. Ожидание ввода пользователя размечается
+    через waiting(): оно вычитается из времени событий и не попадает в снимки
+    стека, но входит в общее время elapsed и в профиль cProfile (builtins.input).
+    """
+
+    def __init__(self, mode: str = "cprofile", interval: float = DEFAULT_INTERVAL):
+        """
+        Инициализация профилировщика
+
+        :param mode: 'cprofile' — детерминированный профиль, 'sampling' — снимки стека
+        :type mode: str
+        :param interval: Период сэмплирования в секундах
+        :type interval: float
+        :raises ValueError: Если режим неизвестен
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Неизвестный режим профилирования: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.events: dict[str, EventTimer] = {}
+        self.samples: Counter[str] = Counter()
+        self.elapsed = 0.0
+        self.waited = 0.0
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._thread: threading.Thread | None = None
+        self._target: int | None = None
+        self._stopping = threading.Event()
+        self._current_event: str | None = None
+        self._started: float | None = None
+        self._waiting = False
+
+    @property
+    def running(self) -> bool:
+        """
+        Идёт ли сейчас профилирование
+
+        :return: True между start() и stop()
+        :rtype: bool
+        """
+        return self._started is not None
+
+    def start(self) -> None:
+        """
+        Начинает профилирование текущего потока
+
+        :raises RuntimeError: Если профилирование уже идёт
+        """
+        if self.running:
+            raise RuntimeError("Профилирование уже запущено")
+        self._started = time.perf_counter()
+        if self._profile is not None:
+            self._profile.enable()
+        else:
+            self._target = threading.get_ident()
+            self._stopping.clear()
+            thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+            self._thread = thread
+            thread.start()
+
+    def stop(self) -> None:
+        """Завершает профилирование; повторный вызов ничего не делает"""
+        started = self._started
+        if started is None:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+        elif self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+        self.elapsed += time.perf_counter() - started
+        self._started = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stop()
+
+    def _sample_loop(self) -> None:
+        """Снимает стек профилируемого потока каждые interval секунд"""
+        while not self._stopping.wait(self.interval):
+            if self._waiting or self._target is None:
+                continue
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.sample(frame)
+
+    def sample(self, frame) -> None:
+        """
+        Учитывает один снимок стека
+
+        :param frame: Верхний кадр стека
+        :type frame: frame
+        """
+        names = []
+        while frame is not None:
+            names.append(_frame_name(frame))
+            frame = frame.f_back
+        if self._current_event is not None:
+            names.append(f"event:{self._current_event}")
+        names.reverse()
+        self.samples[";".join(names)] += 1
+
+    @contextmanager
+    def event(self, name: str):
+        """
+        Размечает выполнение события
+
+        :param name: Имя события, например '_event_add_book'
+        :type name: str
+        """
+        previous = self._current_event
+        self._current_event = name
+        waited = self.waited
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started - (self.waited - waited)
+            self.events.setdefault(name, EventTimer()).observe(elapsed)
+            self._current_event = previous
+
+    @contextmanager
+    def waiting(self):
+        """
+        Размечает ожидание ввода пользователя: оно не входит во время событий
+        и пропускается при сэмплировании
+        """
+        if self._waiting:
+            yield
+            return
+        self._waiting = True
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.waited += time.perf_counter() - started
+            self._waiting = False
+
+    def stats(self):
+        """
+        Статистика cProfile
+
+        :return: Объект pstats.Stats или None в режиме сэмплирования
+        :rtype: pstats.Stats or None
+        """
+        if self._profile is None:
+            return None
+        return pstats.Stats(self._profile, stream=io.StringIO())
+
+    def collapsed(self) -> str:
+        """
+        Снимки стека в collapsed-формате ('кадр;кадр;кадр количество'), пригодном
+        для flamegraph.pl и speedscope
+
+        :return: Многострочный текст
+        :rtype: str
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def write(self, prefix: str = DEFAULT_OUTPUT) -> list:
+        """
+        Сохраняет результаты: <prefix>.pstats (cProfile) или <prefix>.collapsed
+        (сэмплирование) и <prefix>.events.json со временем по событиям
+
+        :param prefix: Путь к файлам без расширения
+        :type prefix: str
+        :return: Список записанных путей
+        :rtype: list
+        """
+        self.stop()
+        paths = []
+        if self._profile is not None:
+            paths.append(f"{prefix}.pstats")
+            self._profile.dump_stats(paths[-1])
+        else:
+            paths.append(f"{prefix}.collapsed")
+            with open(paths[-1], "w", encoding="utf-8") as file:
+                file.write(self.collapsed())
+        paths.append(f"{prefix}.events.json")
+        with open(paths[-1], "w", encoding="utf-8") as file:
+            json.dump(self.as_dict(), file, ensure_ascii=False, indent=2)
+        return paths
+
+    def as_dict(self) -> dict:
+        """
+        Сводка профилирования в виде словаря
+
+        :return: Словарь с режимом, общим временем, временем ожидания ввода,
+            количеством снимков и событиями
+        :rtype: dict
+        """
+        return {
+            "mode": self.mode,
+            "elapsed": self.elapsed,
+            "waited": self.waited,
+            "samples": sum(self.samples.values()),
+            "events": {name: timer.as_dict() for name, timer in sorted(self.events.items())},
+        }
+
+    def format(self, top: int = 15) -> str:
+        """
+        Текстовая сводка: время по событиям и самые дорогие функции или стеки
+
+        :param top: Сколько функций или стеков вывести
+        :type top: int
+        :return: Многострочный текст
+        :rtype: str
+        """
+        lines = [f"Профилирование ({self.mode}): {self.elapsed:.3f} с"
+                 + (f", из них ожидание ввода {self.waited:.3f} с" if self.waited else "")]
+        if self.events:
+            lines.append(f"{'Событие':<32}{'раз':>8}{'всего, мс':>14}{'среднее, мс':>14}"
+                         f"{'макс, мс':>12}")
+            for name, timer in sorted(self.events.items(), key=lambda item: -item[1].total):
+                lines.append(f"{name:<32}{timer.count:>8}{timer.total * 1000:>14.3f}"
+                             f"{timer.total / timer.count * 1000:>14.3f}{timer.max * 1000:>12.3f}")
+        stats = self.stats()
+        if stats is not None:
+            stats.sort_stats("cumulative").print_stats(top)
+            lines.append(stats.stream.getvalue().strip())
+        else:
+            leaves: Counter[str] = Counter()
+            for stack, count in self.samples.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            lines.append(f"Снимков стека: {sum(self.samples.values())}")
+            for name, count in leaves.most_common(top):
+                lines.append(f"{count:>8}  {name}")
+        return "\n".join(lines)
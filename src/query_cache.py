@@ -0,0 +1,383 @@
+"""Модуль с двухуровневым кэшем результатов запросов: LRU в памяти и SQLite на диске."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from src.book import Book
+from src.book_collections import BookCollection
+from src.changefeed import ChangeFeedOverflow
+
+DEFAULT_MEMORY_SIZE = 256
+DEFAULT_DISK_SIZE = 10000
+
+# Методы Library, которые только читают данные и потому допускают кэширование.
+CACHEABLE = ("search", "query", "search_range", "top_k", "fuzzy_search", "facet", "facets",
+             "count")
+
+_SCHEMA = """CREATE TABLE IF NOT EXISTS results (
+    query TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    value TEXT NOT NULL
+)"""
+_SELECT = "SELECT state, value FROM results WHERE query = ?"
+_UPSERT = "INSERT OR REPLACE INTO results (query, state, value) VALUES (?, ?, ?)"
+_DELETE_STALE = "DELETE FROM results WHERE state != ?"
+# INSERT OR REPLACE выдаёт записи новый rowid, поэтому самые старые записи — с меньшими rowid.
+_PRUNE = "DELETE FROM results WHERE rowid <= (SELECT MAX(rowid) FROM results) - ?"
+_COUNT = "SELECT COUNT(*) FROM results"
+_CONTENT_MODULUS = 1 << 64
+
+
+def content_hash(book) -> int:
+    """
+    Стабильный между запусками 64-битный хеш всех полей книги
+
+    :param book: Книга
+    :type book: Book
+    :return: Хеш пар (поле, значение) из to_dict()
+    :rtype: int
+    """
+    row = json.dumps(list(book.to_dict().items()), ensure_ascii=False).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(row, digest_size=8).digest(), "little")
+
+
+def encode(value):
+    """
+    Представляет результат запроса в виде, пригодном для JSON
+
+    Книги заменяются их ISBN, словари — списками пар (ключи фасетов могут быть
+    числами), кортежи помечаются, чтобы восстановиться без потерь.
+
+    :param value: Результат метода библиотеки
+    :return: Значение из списков, словарей, строк и чисел
+    :raises TypeError: Если тип значения не поддерживается
+    """
+    if isinstance(value, Book):
+        return {"$book": value.isbn}
+    if isinstance(value, BookCollection):
+        return {"$books": [book.isbn for book in value]}
+    if isinstance(value, dict):
+        return {"$dict": [[encode(key), encode(item)] for key, item in value.items()]}
+    if isinstance(value, tuple):
+        return {"$tuple": [encode(item) for item in value]}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError(f"Результат типа {type(value).__name__} нельзя кэшировать")
+
+
+def decode(value, library):
+    """
+    Восстанавливает результат запроса, закодированный encode()
+
+    :param value: Закодированное значение
+    :param library: Библиотека, по которой книги находятся по ISBN
+    :type library: Library
+    :return: Исходный результат
+    """
+    if isinstance(value, list):
+        return [decode(item, library) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "$book" in value:
+        return library.search_by_isbn(value["$book"])
+    if "$books" in value:
+        return BookCollection([library.search_by_isbn(isbn) for isbn in value["$books"]])
+    if "$tuple" in value:
+        return tuple(decode(item, library) for item in value["$tuple"])
+    return {decode(key, library): decode(item, library) for key, item in value["$dict"]}
+
+
+class LRUCache:
+    """Кэш в памяти с вытеснением давно не использованных записей."""
+
+    def __init__(self, maxsize: int = DEFAULT_MEMORY_SIZE):
+        """
+        Инициализация кэша
+
+        :param maxsize: Максимальное количество записей
+        :type maxsize: int
+        :raises ValueError: Если maxsize меньше 1
+        """
+        if maxsize < 1:
+            raise ValueError(f"Размер кэша должен быть положительным: {maxsize}")
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, object] = OrderedDict()
+
+    def get(self, key, default=None):
+        """
+        Значение по ключу; найденная запись становится самой свежей
+
+        :param key: Ключ
+        :param default: Значение при отсутствии ключа
+        :return: Значение или default
+        """
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value) -> None:
+        """
+        Сохраняет значение, вытесняя самую старую запись при переполнении
+
+        :param key: Ключ
+        :param value: Значение
+        """
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Удаляет все записи"""
+        self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """Хранилище результатов в файле SQLite; каждая запись помечена состоянием библиотеки."""
+
+    def __init__(self, path: str, maxsize: int = DEFAULT_DISK_SIZE):
+        """
+        Инициализация хранилища; таблица создаётся при необходимости
+
+        :param path: Путь к файлу базы данных или ':memory:'
+        :type path: str
+        :param maxsize: Максимальное количество записей
+        :type maxsize: int
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode = WAL")
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+        self._lock = threading.Lock()
+        self._state: str | None = None
+
+    def get(self, query: str, state: str):
+        """
+        Закодированный результат запроса для данного состояния библиотеки
+
+        :param query: Ключ запроса
+        :type query: str
+        :param state: Состояние библиотеки
+        :type state: str
+        :return: Закодированное значение или None, если записи нет или она устарела
+        """
+        with self._lock:
+            row = self._connection.execute(_SELECT, (query,)).fetchone()
+        if row is None or row[0] != state:
+            return None
+        return json.loads(row[1])
+
+    def put(self, query: str, state: str, value) -> None:
+        """
+        Сохраняет результат; при смене состояния библиотеки устаревшие записи удаляются
+
+        :param query: Ключ запроса
+        :type query: str
+        :param state: Состояние библиотеки
+        :type state: str
+        :param value: Закодированное значение
+        """
+        with self._lock, self._connection:
+            if state != self._state:
+                self._connection.execute(_DELETE_STALE, (state,))
+                self._state = state
+            self._connection.execute(_UPSERT, (query, state, json.dumps(value,
+                                                                        ensure_ascii=False)))
+            self._connection.execute(_PRUNE, (self.maxsize,))
+
+    def clear(self) -> None:
+        """Удаляет все записи"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        """Закрывает соединение с базой"""
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(_COUNT).fetchone()[0]
+
+
+class QueryCache:
+    """Двухуровневый кэш результатов запросов к библиотеке.
+
+    Сначала проверяется LRU в памяти, затем файл SQLite, и только потом
+    запрос выполняется. Ключ записи — имя метода с аргументами и состояние
+    библиотеки (версия изменений и хеш содержимого всех книг), поэтому любое
+    изменение каталога делает старые результаты недоступными, а после
+    перезапуска с тем же каталогом результаты берутся с диска.
+    """
+
+    def __init__(self, library, path=None, memory_size: int = DEFAULT_MEMORY_SIZE,
+                 disk_size: int = DEFAULT_DISK_SIZE):
+        """
+        Инициализация кэша
+
+        :param library: Библиотека
+        :type library: Library
+        :param path: Путь к файлу кэша на диске (None — только кэш в памяти)
+        :type path: str, optional
+        :param memory_size: Количество записей в памяти
+        :type memory_size: int
+        :param disk_size: Количество записей на диске
+        :type disk_size: int
+        """
+        self.library = library
+        self.memory = LRUCache(memory_size)
+        self.disk = DiskCache(path, disk_size) if path is not None else None
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self._state: str | None = None
+        self._content = 0
+        self._content_version: int | None = None
+        self._lock = threading.Lock()
+
+    def _content_hash(self) -> int:
+        """
+        Сумма content_hash всех книг библиотеки по модулю 2**64 (не зависит от порядка)
+
+        Считается полным проходом при первом вызове и после переполнения ленты
+        изменений, иначе обновляется по changes_since. Вызывается под блокировкой
+        библиотеки.
+
+        :return: Хеш содержимого
+        :rtype: int
+        """
+        version = self.library.version
+        if version == self._content_version:
+            return self._content
+        changes = None
+        if self._content_version is not None:
+            try:
+                changes = self.library.changes_since(self._content_version)
+            except ChangeFeedOverflow:
+                pass
+        if changes is None:
+            content = sum(content_hash(book) for book in self.library.books)
+        else:
+            content = self._content
+            for change in changes:
+                sign = 1 if change.kind == 'add' else -1
+                content += sign * content_hash(change.book)
+        self._content = content % _CONTENT_MODULUS
+        self._content_version = version
+        return self._content
+
+    def state(self) -> str:
+        """
+        Состояние библиотеки, которым помечаются записи кэша
+
+        Версия изменений сбрасывается при перезапуске, поэтому к ней добавляются
+        количество книг и хеш содержимого всех полей книг: исправленная запись
+        с прежним ISBN тоже меняет состояние.
+
+        :return: Строка состояния
+        :rtype: str
+        """
+        with self.library._lock:
+            content = self._content_hash()
+            return f"{self.library.version}:{len(self.library.books)}:{content:016x}"
+
+    @staticmethod
+    def key(method: str, args: tuple, kwargs: dict) -> str:
+        """
+        Ключ запроса
+
+        :param method: Имя метода библиотеки
+        :type method: str
+        :param args: Позиционные аргументы
+        :type args: tuple
+        :param kwargs: Именованные аргументы
+        :type kwargs: dict
+        :return: Строка JSON
+        :rtype: str
+        """
+        return json.dumps([method, encode(list(args)), encode(dict(sorted(kwargs.items())))],
+                          ensure_ascii=False)
+
+    def call(self, method: str, *args, **kwargs):
+        """
+        Результат метода библиотеки из кэша или с выполнением запроса
+
+        :param method: Имя метода из CACHEABLE
+        :type method: str
+        :return: Результат метода
+        :raises ValueError: Если метод изменяет библиотеку или не поддерживается
+        """
+        if method not in CACHEABLE:
+            raise ValueError(f"Метод '{method}' нельзя кэшировать")
+        query = self.key(method, args, kwargs)
+        with self.library._lock:
+            state = self.state()
+            with self._lock:
+                if state != self._state:
+                    self.memory.clear()
+                    self._state = state
+                encoded = self.memory.get(query)
+                if encoded is not None:
+                    self.hits["memory"] += 1
+                    return decode(encoded, self.library)
+            encoded = self.disk.get(query, state) if self.disk is not None else None
+            if encoded is not None:
+                source = "disk"
+            else:
+                encoded = encode(getattr(self.library, method)(*args, **kwargs))
+                source = None
+                if self.disk is not None:
+                    self.disk.put(query, state, encoded)
+            with self._lock:
+                if source is None:
+                    self.misses += 1
+                else:
+                    self.hits[source] += 1
+                if state == self._state:
+                    self.memory.put(query, encoded)
+            return decode(encoded, self.library)
+
+    def clear(self) -> None:
+        """Очищает оба уровня кэша"""
+        with self._lock:
+            self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self) -> None:
+        """Закрывает файл кэша"""
+        if self.disk is not None:
+            self.disk.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def as_dict(self) -> dict:
+        """
+        Статистика кэша
+
+        :return: Словарь с попаданиями по уровням, промахами и размерами уровней
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "memory": len(self.memory),
+                "disk": len(self.disk) if self.disk is not None else 0,
+            }
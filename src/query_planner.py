@@ -0,0 +1,474 @@
+"""Модуль с планировщиком запросов: статистика индексов, выбор пути доступа и EXPLAIN."""
+
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from src.book_collections import BookCollection
+from src.facets import rank
+from src.indexes import SortedIndex, TextIndex
+
+MOST_COMMON_VALUES = 10
+DEFAULT_RANGE_SELECTIVITY = 1 / 3
+DEFAULT_STALE_RATIO = 0.1
+
+
+class Condition:
+    """Условие запроса: равенство значению или диапазон [low, high] по полю или индексу."""
+
+    def __init__(self, field: str, value):
+        """
+        Инициализация условия
+
+        :param field: Имя поля книги или подключённого индекса
+        :type field: str
+        :param value: Значение для равенства или кортеж (low, high) для диапазона;
+            граница None означает отсутствие ограничения
+        """
+        self.field = field
+        self.value = value
+        self.is_range = isinstance(value, tuple)
+        if self.is_range and len(value) != 2:
+            raise ValueError(f"Диапазон для '{field}' должен быть кортежем (low, high)")
+
+    def matches(self, key) -> bool:
+        """
+        Проверяет ключ книги
+
+        :param key: Значение поля (ключа индекса) книги
+        :return: True если условие выполнено
+        :rtype: bool
+        """
+        if not self.is_range:
+            return key == self.value
+        low, high = self.value
+        try:
+            return (low is None or key >= low) and (high is None or key <= high)
+        except TypeError:
+            return False
+
+    def __str__(self) -> str:
+        """
+        Условие в виде текста для EXPLAIN
+
+        :return: Строка вида "author = 'Лев Толстой'" или "year BETWEEN 1860 AND 1880"
+        :rtype: str
+        """
+        if not self.is_range:
+            return f"{self.field} = {self.value!r}"
+        low, high = self.value
+        if high is None:
+            return f"{self.field} >= {low!r}"
+        if low is None:
+            return f"{self.field} <= {high!r}"
+        return f"{self.field} BETWEEN {low!r} AND {high!r}"
+
+
+class ColumnStatistics:
+    """Статистика кардинальности поля или индекса на момент ANALYZE."""
+
+    def __init__(self, name: str, rows: int, counts: dict, indexed: bool, unique: bool = False):
+        """
+        Инициализация статистики
+
+        :param name: Имя поля или индекса
+        :type name: str
+        :param rows: Количество пар (ключ, книга)
+        :type rows: int
+        :param counts: Размеры корзин {значение: количество книг}
+        :type counts: dict
+        :param indexed: Есть ли индекс
+        :type indexed: bool
+        :param unique: Уникален ли индекс
+        :type unique: bool
+        """
+        self.name = name
+        self.rows = rows
+        self.distinct = len(counts)
+        self.most_common = rank(counts, MOST_COMMON_VALUES)
+        self.indexed = indexed
+        self.unique = unique
+
+    def estimate(self, value) -> float:
+        """
+        Оценка количества книг со значением: частота из списка самых частых
+        значений, иначе равномерная доля остальных строк
+
+        :param value: Значение
+        :return: Оценка количества книг
+        :rtype: float
+        """
+        if self.unique:
+            return 1.0 if self.rows else 0.0
+        try:
+            if value in self.most_common:
+                return float(self.most_common[value])
+        except TypeError:
+            return 0.0
+        rest = self.distinct - len(self.most_common)
+        if rest <= 0:
+            return 0.0
+        return max(0.0, (self.rows - sum(self.most_common.values())) / rest)
+
+    def as_dict(self) -> dict:
+        """
+        Представление статистики в виде словаря
+
+        :return: Словарь с количеством строк, различных значений и самыми частыми значениями
+        :rtype: dict
+        """
+        return {
+            "rows": self.rows,
+            "distinct": self.distinct,
+            "indexed": self.indexed,
+            "most_common": [{"value": value, "count": count}
+                            for value, count in self.most_common.items()],
+        }
+
+
+class AccessPath:
+    """Способ получения книг-кандидатов: просмотр индекса или полный просмотр каталога."""
+
+    def __init__(self, condition, index=None, estimated_rows: float = 0.0):
+        """
+        Инициализация пути доступа
+
+        :param condition: Условие, проверяемое индексом (None для полного просмотра)
+        :type condition: Condition or None
+        :param index: Индекс (None для полного просмотра)
+        :type index: BaseIndex or None
+        :param estimated_rows: Оценка количества просматриваемых книг
+        :type estimated_rows: float
+        """
+        self.condition = condition
+        self.index = index
+        self.estimated_rows = estimated_rows
+
+    @property
+    def kind(self) -> str:
+        """
+        Тип пути доступа
+
+        :return: 'Index Scan', 'Index Range Scan' или 'Seq Scan'
+        :rtype: str
+        """
+        if self.index is None:
+            return "Seq Scan"
+        return "Index Range Scan" if self.condition.is_range else "Index Scan"
+
+    def rows(self, library) -> list:
+        """
+        Книги-кандидаты
+
+        :param library: Библиотека
+        :type library: Library
+        :return: Список книг
+        :rtype: list
+        """
+        if self.index is None:
+            return list(library.indexes)
+        if self.condition.is_range:
+            return self.index.range(*self.condition.value)
+        return self.index.lookup(self.condition.value)
+
+    def __str__(self) -> str:
+        """
+        Путь доступа в виде текста для EXPLAIN
+
+        :return: Строка вида "Index Scan using author (author = 'Лев Толстой')"
+        :rtype: str
+        """
+        if self.index is None:
+            return "Seq Scan on books"
+        return f"{self.kind} using {self.condition.field} ({self.condition})"
+
+
+class QueryPlan:
+    """План запроса: путь доступа и условия, проверяемые фильтром."""
+
+    def __init__(self, conditions: list, access: AccessPath, filters: list, predicates: dict,
+                 estimated_rows: float):
+        """
+        Инициализация плана
+
+        :param conditions: Все условия запроса
+        :type conditions: list
+        :param access: Выбранный путь доступа
+        :type access: AccessPath
+        :param filters: Условия, проверяемые для каждой книги-кандидата
+        :type filters: list
+        :param predicates: Проверки книги для условий {поле: функция книга -> bool}
+        :type predicates: dict
+        :param estimated_rows: Оценка размера результата
+        :type estimated_rows: float
+        """
+        self.conditions = conditions
+        self.access = access
+        self.filters = filters
+        self.predicates = predicates
+        self.estimated_rows = estimated_rows
+
+    def execute(self, library) -> tuple:
+        """
+        Выполняет план
+
+        :param library: Библиотека
+        :type library: Library
+        :return: Кортеж (найденные книги, количество просмотренных книг)
+        :rtype: tuple
+        """
+        candidates = self.access.rows(library)
+        result = [book for book in candidates
+                  if all(self.predicates[condition.field](book) for condition in self.filters)]
+        return BookCollection(result), len(candidates)
+
+
+class Explanation:
+    """Результат EXPLAIN: план, оценки и (при analyze) фактические значения."""
+
+    def __init__(self, plan: QueryPlan, actual_examined=None, actual_rows=None, elapsed=None):
+        """
+        Инициализация результата
+
+        :param plan: План запроса
+        :type plan: QueryPlan
+        :param actual_examined: Фактически просмотрено книг (None без выполнения)
+        :type actual_examined: int or None
+        :param actual_rows: Фактический размер результата (None без выполнения)
+        :type actual_rows: int or None
+        :param elapsed: Время выполнения в секундах (None без выполнения)
+        :type elapsed: float or None
+        """
+        self.plan = plan
+        self.actual_examined = actual_examined
+        self.actual_rows = actual_rows
+        self.elapsed = elapsed
+
+    def as_dict(self) -> dict:
+        """
+        Представление в виде словаря
+
+        :return: Словарь с путём доступа, фильтром, оценками и фактическими значениями
+        :rtype: dict
+        """
+        result = {
+            "access": self.plan.access.kind,
+            "index": self.plan.access.condition.field if self.plan.access.index else None,
+            "plan": str(self.plan.access),
+            "filter": [str(condition) for condition in self.plan.filters],
+            "estimated": {"examined": round(self.plan.access.estimated_rows),
+                          "rows": round(self.plan.estimated_rows)},
+        }
+        if self.actual_examined is not None:
+            result["actual"] = {"examined": self.actual_examined, "rows": self.actual_rows,
+                                "time_ms": self.elapsed * 1000}
+        return result
+
+    def format(self) -> str:
+        """
+        Текстовое представление в стиле EXPLAIN ANALYZE
+
+        :return: Многострочный текст
+        :rtype: str
+        """
+        data = self.as_dict()
+        line = (f"{data['plan']}  (оценка: просмотр={data['estimated']['examined']} "
+                f"строк={data['estimated']['rows']})")
+        if "actual" in data:
+            actual = data["actual"]
+            line += (f"  (факт: просмотр={actual['examined']} строк={actual['rows']} "
+                     f"время={actual['time_ms']:.3f} мс)")
+        lines = [line]
+        if data["filter"]:
+            lines.append(f"  Filter: {' AND '.join(data['filter'])}")
+        return "\n".join(lines)
+
+
+class QueryPlanner:
+    """Планировщик запросов к библиотеке на основе статистики кардинальности."""
+
+    def __init__(self, library, fields: tuple = (), stale_ratio: float = DEFAULT_STALE_RATIO):
+        """
+        Инициализация планировщика; статистика собирается при первом запросе
+
+        :param library: Библиотека
+        :type library: Library
+        :param fields: Поля книги, по которым возможен полный просмотр без индекса
+        :type fields: tuple
+        :param stale_ratio: Доля изменённых книг, после которой статистика собирается заново
+        :type stale_ratio: float
+        """
+        self.library = library
+        self.fields = fields
+        self.stale_ratio = stale_ratio
+        self.statistics: dict[str, ColumnStatistics] = {}
+        self._analyzed_version = None
+        self._analyzed_rows = 0
+
+    def analyze(self) -> dict:
+        """
+        Собирает статистику по всем индексам и полям книг (аналог ANALYZE)
+
+        :return: Словарь {имя: ColumnStatistics}
+        :rtype: dict
+        """
+        library = self.library
+        with library._lock:
+            statistics = {}
+            for name in library.indexes.index_names():
+                index = library.indexes.get_index(name)
+                sizes = index.bucket_sizes()
+                statistics[name] = ColumnStatistics(name, sum(sizes.values()), sizes, True,
+                                                    index.unique)
+            books = list(library.indexes)
+            for field in self.fields:
+                if field not in statistics:
+                    counts = Counter(getattr(book, field) for book in books)
+                    statistics[field] = ColumnStatistics(field, len(books), counts, False)
+            self.statistics = statistics
+            self._analyzed_version = library.version
+            self._analyzed_rows = len(books)
+        return statistics
+
+    def _ensure_statistics(self) -> None:
+        """Собирает статистику, если её нет или она устарела"""
+        if self._analyzed_version is None:
+            self.analyze()
+            return
+        changed = self.library.version - self._analyzed_version
+        if changed > self.stale_ratio * max(self._analyzed_rows, 1):
+            self.analyze()
+        elif set(self.library.indexes.index_names()) - set(self.statistics):
+            self.analyze()
+
+    def _predicate(self, condition: Condition):
+        """
+        Функция проверки книги на соответствие условию по полю или индексу
+
+        Для текстового индекса книга подходит, если её текст содержит все слова запроса.
+
+        :param condition: Условие
+        :type condition: Condition
+        :return: Функция книга -> bool
+        :rtype: Callable
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        field = condition.field
+        if self.library.indexes.has_index(field):
+            index = self.library.indexes.get_index(field)
+            if isinstance(index, TextIndex) and not condition.is_range:
+                tokens = index.tokenize(condition.value)
+                return lambda book: bool(tokens) and tokens <= index.tokenize(index.key(book))
+            return lambda book: condition.matches(index.key(book))
+        if field not in self.fields:
+            raise KeyError(f"Неизвестный тип индекса: {field}")
+        return lambda book: condition.matches(getattr(book, field))
+
+    def _estimate(self, condition: Condition) -> float:
+        """
+        Оценка количества книг, удовлетворяющих условию
+
+        :param condition: Условие
+        :type condition: Condition
+        :return: Оценка количества книг
+        :rtype: float
+        """
+        statistics = self.statistics[condition.field]
+        if not condition.is_range:
+            if self.library.indexes.has_index(condition.field):
+                index = self.library.indexes.get_index(condition.field)
+                if isinstance(index, TextIndex):
+                    tokens = index.tokenize(condition.value)
+                    if not tokens:
+                        return 0.0
+                    return min(statistics.estimate(token) for token in tokens)
+            return statistics.estimate(condition.value)
+        index = self.library.indexes.get_index(condition.field) \
+            if self.library.indexes.has_index(condition.field) else None
+        if isinstance(index, SortedIndex) and statistics.distinct:
+            keys = index.keys()
+            low, high = condition.value
+            try:
+                start = 0 if low is None else bisect_left(keys, low)
+                stop = len(keys) if high is None else bisect_right(keys, high)
+            except TypeError:
+                return 0.0
+            return max(0, stop - start) * statistics.rows / statistics.distinct
+        return statistics.rows * DEFAULT_RANGE_SELECTIVITY
+
+    def _access_paths(self, conditions: list) -> list:
+        """
+        Возможные пути доступа: полный просмотр и просмотр каждого подходящего индекса
+
+        :param conditions: Условия запроса
+        :type conditions: list
+        :return: Список путей доступа
+        :rtype: list
+        """
+        total = len(self.library.indexes)
+        paths = [AccessPath(None, None, float(total))]
+        for condition in conditions:
+            if not self.library.indexes.has_index(condition.field):
+                continue
+            index = self.library.indexes.get_index(condition.field)
+            if condition.is_range and not isinstance(index, SortedIndex):
+                continue
+            paths.append(AccessPath(condition, index, self._estimate(condition)))
+        return paths
+
+    def plan(self, conditions: dict) -> QueryPlan:
+        """
+        Строит план: путь доступа с наименьшей оценкой просматриваемых книг
+        (при равенстве — индекс), остальные условия проверяются фильтром
+
+        :param conditions: Условия {поле или индекс: значение или (low, high)}
+        :type conditions: dict
+        :return: План запроса
+        :rtype: QueryPlan
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        self._ensure_statistics()
+        parsed = [Condition(field, value) for field, value in conditions.items()]
+        predicates = {condition.field: self._predicate(condition) for condition in parsed}
+        paths = self._access_paths(parsed)
+        access = min(paths, key=lambda path: (path.estimated_rows, path.index is None))
+        filters = [condition for condition in parsed if condition is not access.condition]
+        total = max(len(self.library.indexes), 1)
+        estimated = float(len(self.library.indexes))
+        for condition in parsed:
+            estimated *= min(1.0, self._estimate(condition) / total)
+        return QueryPlan(parsed, access, filters, predicates, estimated)
+
+    def execute(self, conditions: dict) -> BookCollection:
+        """
+        Выполняет запрос по выбранному плану
+
+        :param conditions: Условия {поле или индекс: значение или (low, high)}
+        :type conditions: dict
+        :return: Коллекция найденных книг
+        :rtype: BookCollection
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        with self.library._lock:
+            result, _ = self.plan(conditions).execute(self.library)
+        return result
+
+    def explain(self, conditions: dict, analyze: bool = True) -> Explanation:
+        """
+        План запроса с оценками и, при analyze, фактическими значениями
+
+        :param conditions: Условия {поле или индекс: значение или (low, high)}
+        :type conditions: dict
+        :param analyze: Выполнить запрос и измерить фактические значения
+        :type analyze: bool
+        :return: Результат EXPLAIN
+        :rtype: Explanation
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        with self.library._lock:
+            plan = self.plan(conditions)
+            if not analyze:
+                return Explanation(plan)
+            started = time.perf_counter()
+            result, examined = plan.execute(self.library)
+            elapsed = time.perf_counter() - started
+        return Explanation(plan, examined, len(result), elapsed)
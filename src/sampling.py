@@ -0,0 +1,207 @@
+"""Модуль со случайной выборкой книг: равномерной, с фильтром и взвешенной."""
+
+import heapq
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class RandomPool:
+    """Массив книг с удалением перестановкой последнего элемента: все операции за O(1)."""
+
+    def __init__(self, books=None):
+        """
+        Инициализация пула
+
+        Книги с одинаковым ISBN хранятся в пуле один раз.
+
+        :param books: Итерируемый объект с книгами (необязательно)
+        :type books: iterable, optional
+        """
+        self._items = []
+        self._positions = {}
+        self._shared = False
+        if books is not None:
+            for book in books:
+                self.add(book)
+
+    def snapshot(self) -> "RandomPool":
+        """
+        Снимок пула за O(1) с копированием при записи
+
+        :return: Пул с тем же содержимым
+        :rtype: RandomPool
+        """
+        snapshot = RandomPool.__new__(RandomPool)
+        snapshot._items = self._items
+        snapshot._positions = self._positions
+        snapshot._shared = True
+        self._shared = True
+        return snapshot
+
+    def _own(self) -> None:
+        """Копирует разделяемые со снимком структуры перед изменением"""
+        if self._shared:
+            self._items = list(self._items)
+            self._positions = dict(self._positions)
+            self._shared = False
+
+    def add(self, book) -> None:
+        """
+        Добавляет книгу в пул, если книги с таким ISBN ещё нет
+
+        :param book: Книга
+        :type book: Book
+        """
+        if book.isbn in self._positions:
+            return
+        self._own()
+        self._positions[book.isbn] = len(self._items)
+        self._items.append(book)
+
+    def remove(self, book) -> None:
+        """
+        Удаляет книгу, перемещая последний элемент на её место
+
+        :param book: Книга
+        :type book: Book
+        """
+        position = self._positions.get(book.isbn)
+        if position is None:
+            return
+        self._own()
+        del self._positions[book.isbn]
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last.isbn] = position
+
+    def choice(self, rng=random):
+        """
+        Равновероятный выбор книги
+
+        :param rng: Генератор случайных чисел (модуль random или random.Random)
+        :return: Книга или None если пул пуст
+        :rtype: Book or None
+        """
+        if not self._items:
+            return None
+        return rng.choice(self._items)
+
+    def sample(self, k: int, rng=random) -> list:
+        """
+        k различных книг без возвращения
+
+        :param k: Количество книг
+        :type k: int
+        :param rng: Генератор случайных чисел
+        :return: Список книг
+        :rtype: list
+        :raises ValueError: Если k больше размера пула или отрицательно
+        """
+        return rng.sample(self._items, k)
+
+    def __len__(self) -> int:
+        """
+        Количество книг в пуле
+
+        :return: Количество книг
+        :rtype: int
+        """
+        return len(self._items)
+
+    def __iter__(self):
+        """
+        Итерация по книгам пула (порядок не определён)
+
+        :return: Итератор по книгам
+        :rtype: Iterator
+        """
+        return iter(self._items)
+
+    def __contains__(self, book) -> bool:
+        """
+        Проверяет наличие книги в пуле по ISBN
+
+        :param book: Книга
+        :type book: Book
+        :return: True если книга в пуле
+        :rtype: bool
+        """
+        return book.isbn in self._positions
+
+
+class WeightedSampler:
+    """Взвешенная выборка с возвращением: O(n) на построение, O(log n) на выбор."""
+
+    def __init__(self, books, weight):
+        """
+        Инициализация выборки
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        :param weight: Функция веса книги (неотрицательное число)
+        :type weight: Callable
+        :raises ValueError: Если есть отрицательный вес или сумма весов равна нулю
+        """
+        self._books = list(books)
+        weights = [weight(book) for book in self._books]
+        if any(value < 0 for value in weights):
+            raise ValueError("Веса не могут быть отрицательными")
+        self._cumulative = list(accumulate(weights))
+        if not self._cumulative or self._cumulative[-1] <= 0:
+            raise ValueError("Сумма весов должна быть положительной")
+
+    def draw(self, rng=random):
+        """
+        Выбирает одну книгу с вероятностью, пропорциональной весу
+
+        :param rng: Генератор случайных чисел
+        :return: Книга
+        :rtype: Book
+        """
+        target = rng.random() * self._cumulative[-1]
+        position = bisect_right(self._cumulative, target)
+        return self._books[min(position, len(self._books) - 1)]
+
+    def draws(self, k: int, rng=random) -> list:
+        """
+        k независимых выборов с возвращением
+
+        :param k: Количество выборов
+        :type k: int
+        :param rng: Генератор случайных чисел
+        :return: Список книг
+        :rtype: list
+        """
+        return [self.draw(rng) for _ in range(k)]
+
+
+def weighted_sample(books, k: int, weight, rng=random) -> list:
+    """
+    k различных книг без возвращения с вероятностями, пропорциональными весам
+
+    Используется алгоритм Эфраимидиса-Спиракиса: каждой книге назначается
+    ключ u^(1/w), выбираются k наибольших ключей (O(n log k)).
+
+    :param books: Итерируемый объект с книгами
+    :type books: iterable
+    :param k: Количество книг
+    :type k: int
+    :param weight: Функция веса книги (неотрицательное число)
+    :type weight: Callable
+    :param rng: Генератор случайных чисел
+    :return: Список книг (книги с нулевым весом не выбираются)
+    :rtype: list
+    :raises ValueError: Если k отрицательно или есть отрицательный вес
+    """
+    if k < 0:
+        raise ValueError("Размер выборки не может быть отрицательным")
+    keyed = []
+    for book in books:
+        value = weight(book)
+        if value < 0:
+            raise ValueError("Веса не могут быть отрицательными")
+        if value > 0:
+            keyed.append((rng.random() ** (1.0 / value), book))
+    return [book for _, book in heapq.nlargest(k, keyed, key=lambda item: item[0])]
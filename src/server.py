@@ -0,0 +1,480 @@
+"""Модуль с HTTP/JSON сервером запросов к библиотеке на asyncio."""
+
+import asyncio
+import json
+import shlex
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+from src.batch import READ_COMMANDS, SEARCH_FIELDS, execute_command
+from src.bulk_io import BulkImportError, parse_book
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BODY_SIZE = 1 << 20
+MAX_HEADER_LINES = 100
+KEEP_ALIVE_TIMEOUT = 15.0
+DEFAULT_WORKERS = 4
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Ошибка обработки запроса с HTTP-статусом."""
+
+    def __init__(self, status: int, message: str):
+        """
+        Инициализация ошибки
+
+        :param status: HTTP-статус ответа
+        :type status: int
+        :param message: Сообщение для клиента
+        :type message: str
+        """
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    """Разобранный HTTP-запрос."""
+
+    def __init__(self, method: str, target: str, version: str, headers: dict, body: bytes):
+        """
+        Инициализация запроса
+
+        :param method: Метод (GET, POST, DELETE)
+        :type method: str
+        :param target: Цель запроса (путь и строка запроса)
+        :type target: str
+        :param version: Версия протокола ('HTTP/1.1' или 'HTTP/1.0')
+        :type version: str
+        :param headers: Заголовки с именами в нижнем регистре
+        :type headers: dict
+        :param body: Тело запроса
+        :type body: bytes
+        """
+        parts = urlsplit(target)
+        self.method = method
+        self.path = unquote(parts.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        """
+        Оставлять ли соединение открытым после ответа
+
+        :return: True для HTTP/1.1 без 'Connection: close' и для HTTP/1.0 с 'keep-alive'
+        :rtype: bool
+        """
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self):
+        """
+        Тело запроса в формате JSON
+
+        :return: Разобранное значение
+        :raises HTTPError: Если тело не является корректным JSON
+        """
+        try:
+            return json.loads(self.body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(400, f"Некорректный JSON: {e}")
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """
+    Читает один запрос из потока
+
+    :param reader: Поток чтения соединения
+    :type reader: asyncio.StreamReader
+    :return: Запрос или None, если клиент закрыл соединение
+    :rtype: Request or None
+    :raises HTTPError: Если запрос некорректен
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Некорректная строка запроса")
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(400, "Слишком много заголовков")
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(411, "Требуется заголовок Content-Length")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "Некорректный Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Некорректный Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413, f"Тело запроса больше {MAX_BODY_SIZE} байт")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, version, headers, body)
+
+
+def encode_response(status: int, payload, keep_alive: bool = True) -> bytes:
+    """
+    Кодирует JSON-ответ
+
+    :param status: HTTP-статус
+    :type status: int
+    :param payload: Значение, сериализуемое в JSON
+    :param keep_alive: Оставить соединение открытым
+    :type keep_alive: bool
+    :return: Байты ответа вместе с заголовками
+    :rtype: bytes
+    """
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+def _int_param(request: Request, name: str, default):
+    """
+    Целочисленный параметр строки запроса
+
+    :param request: Запрос
+    :type request: Request
+    :param name: Имя параметра
+    :type name: str
+    :param default: Значение по умолчанию
+    :return: Значение параметра
+    :raises HTTPError: Если значение не является целым числом
+    """
+    value = request.query.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPError(400, f"Параметр {name} должен быть числом: {value!r}")
+
+
+class LibraryServer:
+    """HTTP/1.1 сервер с keep-alive: поиск, добавление, удаление, фасеты и пакетные запросы."""
+
+    def __init__(self, library, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 keep_alive_timeout: float = KEEP_ALIVE_TIMEOUT, workers: int = DEFAULT_WORKERS):
+        """
+        Инициализация сервера
+
+        :param library: Библиотека
+        :type library: Library
+        :param host: Адрес для прослушивания
+        :type host: str
+        :param port: Порт (0 — выбрать свободный)
+        :type port: int
+        :param keep_alive_timeout: Сколько секунд ждать следующего запроса в соединении
+        :type keep_alive_timeout: float
+        :param workers: Количество потоков, выполняющих обработчики запросов
+        :type workers: int
+        """
+        self.library = library
+        self.host = host
+        self.port = port
+        self.keep_alive_timeout = keep_alive_timeout
+        self.workers = workers
+        self._server: asyncio.Server | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self.routes = {
+            ("GET", "/search"): self._search,
+            ("GET", "/facets"): self._facets,
+            ("GET", "/stats"): self._stats,
+            ("POST", "/books"): self._add,
+            ("POST", "/batch"): self._batch,
+        }
+
+    async def _listen(self) -> asyncio.Server:
+        """
+        Создаёт пул потоков обработчиков и открывает сокет
+
+        :return: Запущенный сервер asyncio
+        :rtype: asyncio.Server
+        """
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="library-server")
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._server = server
+        return server
+
+    async def start(self) -> None:
+        """Начинает прослушивание; при port=0 фактический порт записывается в self.port"""
+        await self._listen()
+
+    async def serve_forever(self) -> None:
+        """Запускает сервер и обслуживает соединения до отмены"""
+        server = self._server if self._server is not None else await self._listen()
+        async with server:
+            await server.serve_forever()
+
+    async def close(self) -> None:
+        """Останавливает приём соединений и пул потоков обработчиков"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        """
+        Обслуживает соединение: запросы обрабатываются по очереди, пока клиент его не закроет
+
+        :param reader: Поток чтения
+        :type reader: asyncio.StreamReader
+        :param writer: Поток записи
+        :type writer: asyncio.StreamWriter
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader),
+                                                     self.keep_alive_timeout)
+                except HTTPError as e:
+                    writer.write(encode_response(e.status, {"error": str(e)}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                status, payload = await loop.run_in_executor(self._executor, self.dispatch,
+                                                             request)
+                writer.write(encode_response(status, payload, request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, request: Request):
+        """
+        Выполняет запрос и возвращает статус и тело ответа
+
+        Вызывается в пуле из workers потоков, чтобы медленные запросы (фасеты,
+        пакеты команд) не останавливали цикл событий; одновременный доступ
+        к библиотеке защищён её блокировкой.
+
+        :param request: Запрос
+        :type request: Request
+        :return: Кортеж (статус, значение для JSON)
+        :rtype: tuple
+        """
+        try:
+            if request.path.startswith("/books/"):
+                isbn = request.path[len("/books/"):]
+                if request.method == "GET":
+                    return self._get(isbn)
+                if request.method == "DELETE":
+                    return self._remove(isbn)
+                raise HTTPError(405, f"Метод {request.method} не поддерживается")
+            handler = self.routes.get((request.method, request.path))
+            if handler is None:
+                if any(path == request.path for _, path in self.routes):
+                    raise HTTPError(405, f"Метод {request.method} не поддерживается")
+                raise HTTPError(404, f"Неизвестный путь: {request.path}")
+            return handler(request)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"Внутренняя ошибка: {e}"}
+
+    def _get(self, isbn: str):
+        """
+        GET /books/<isbn>: книга по ISBN
+
+        :param isbn: ISBN
+        :type isbn: str
+        :return: Кортеж (статус, ответ)
+        :rtype: tuple
+        """
+        book = self.library.search_by_isbn(isbn)
+        if book is None:
+            raise HTTPError(404, f"Книга с ISBN '{isbn}' не найдена")
+        return 200, book.to_dict()
+
+    def _remove(self, isbn: str):
+        """
+        DELETE /books/<isbn>: удаление книги
+
+        :param isbn: ISBN
+        :type isbn: str
+        :return: Кортеж (статус, ответ)
+        :rtype: tuple
+        """
+        book = self.library.search_by_isbn(isbn)
+        if book is None:
+            raise HTTPError(404, f"Книга с ISBN '{isbn}' не найдена")
+        self.library.remove_book(book)
+        return 200, book.to_dict()
+
+    def _add(self, request: Request):
+        """
+        POST /books: добавление книги из JSON-объекта с полями книги
+
+        Запись проверяется так же, как при импорте каталога (ISBN и год).
+
+        :param request: Запрос
+        :type request: Request
+        :return: Кортеж (статус, ответ)
+        :rtype: tuple
+        """
+        data = request.json()
+        if not isinstance(data, dict) or not all(isinstance(v, (str, int)) for v in data.values()):
+            raise HTTPError(400, "Тело запроса должно быть объектом с полями книги")
+        try:
+            book = parse_book({key: str(value) for key, value in data.items()})
+        except BulkImportError as e:
+            raise HTTPError(400, f"Некорректная книга: {e}")
+        try:
+            self.library.add_book(book)
+        except ValueError as e:
+            raise HTTPError(409, str(e))
+        return 201, book.to_dict()
+
+    def _search(self, request: Request):
+        """
+        GET /search?field=&value=&limit=&offset=&sort_by=&reverse=: постраничный поиск
+
+        :param request: Запрос
+        :type request: Request
+        :return: Кортеж (статус, ответ)
+        :rtype: tuple
+        """
+        field = request.query.get("field")
+        value = request.query.get("value")
+        if field not in SEARCH_FIELDS or value is None:
+            raise HTTPError(400, f"Нужны параметры field ({', '.join(SEARCH_FIELDS)}) и value")
+        if field == "year":
+            value = _int_param(request, "value", None)
+        limit = _int_param(request, "limit", 10)
+        offset = _int_param(request, "offset", 0)
+        reverse = request.query.get("reverse", "") in ("1", "true")
+        try:
+            page = self.library.search_page(field, value, limit, offset,
+                                            request.query.get("sort_by"), reverse)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return 200, {
+            "total": page.total,
+            "next_offset": page.next_offset,
+            "books": [book.to_dict() for book in page],
+        }
+
+    def _facets(self, request: Request):
+        """
+        GET /facets?name=genre,decade&top=: количество книг по значениям фасетов
+
+        :param request: Запрос
+        :type request: Request
+        :return: Кортеж (статус, ответ)
+        :rtype: tuple
+        """
+        names = request.query.get("name", "genre,author,decade").split(",")
+        top = _int_param(request, "top", None)
+        try:
+            facets = self.library.facets(names, top)
+        except KeyError as e:
+            raise HTTPError(400, f"Неизвестный фасет: {e.args[0]}")
+        return 200, {
+            name: [{"value": value, "count": count} for value, count in counts.items()]
+            for name, counts in facets.items()
+        }
+
+    def _stats(self, request: Request):
+        """
+        GET /stats: размер библиотеки и её версия
+
+        :param request: Запрос
+        :type request: Request
+        :return: Кортеж (статус, ответ)
+        :rtype: tuple
+        """
+        return 200, {
+            "books": len(self.library.indexes),
+            "copies": self.library.inventory.total_copies,
+            "version": self.library.version,
+        }
+
+    def _batch(self, request: Request):
+        """
+        POST /batch: несколько команд пакетного режима за один запрос
+
+        Тело — JSON-массив строк команд (см. batch.execute_command); ответ — массив
+        результатов в том же порядке. По HTTP доступны только команды чтения
+        (batch.READ_COMMANDS): export и import работают с файлами сервера, а изменения
+        каталога выполняются через /books. Если в пакете есть другая команда,
+        ни одна команда не выполняется.
+
+        :param request: Запрос
+        :type request: Request
+        :return: Кортеж (статус, ответ)
+        :rtype: tuple
+        :raises HTTPError: 403, если в пакете есть команда не из READ_COMMANDS
+        """
+        commands = request.json()
+        if not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+            raise HTTPError(400, "Тело запроса должно быть массивом строк команд")
+        for command in commands:
+            try:
+                name = next(iter(shlex.split(command)), None)
+            except ValueError:
+                continue
+            if name is not None and name not in READ_COMMANDS:
+                raise HTTPError(403, f"Команда {name} недоступна по HTTP")
+        return 200, [execute_command(self.library, command) for command in commands]
+
+
+def run_server(library, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    """
+    Запускает сервер и блокирует поток до Ctrl+C
+
+    :param library: Библиотека
+    :type library: Library
+    :param host: Адрес для прослушивания
+    :type host: str
+    :param port: Порт
+    :type port: int
+    """
+    server = LibraryServer(library, host, port)
+
+    async def serve():
+        await server.start()
+        print(f"Сервер библиотеки слушает http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nСервер остановлен")
@@ -0,0 +1,707 @@
+"""Модуль с неизменяемым каталогом в разделяемой памяти для чтения из нескольких процессов."""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from multiprocessing import resource_tracker, shared_memory
+from src.book import Book
+from src.book_collections import BookCollection
+from src.facets import rank
+from src.library import BOOK_FIELDS
+
+SHARED_MAGIC = b"LBS1"
+INDEX_FIELDS = ('isbn', 'author', 'year', 'genre')
+STRING_FIELDS = ('title', 'author', 'genre', 'isbn')
+
+# Заголовок: сигнатура, количество книг, строк, байт строковых данных и количество
+# ключей каждого индекса. Массивы чисел хранятся в порядке байтов машины: разметка
+# предназначена для процессов одного хоста.
+_HEADER = struct.Struct("<4sIII" + "I" * len(INDEX_FIELDS))
+_RECORD_FIELDS = len(BOOK_FIELDS)
+_ALIGN = 8
+
+_created: set[str] = set()
+
+
+def _aligned(offset: int) -> int:
+    """
+    Выравнивает смещение до границы _ALIGN байт
+
+    :param offset: Смещение
+    :type offset: int
+    :return: Выровненное смещение
+    :rtype: int
+    """
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _sections(books: int, strings: int, data: int, key_counts) -> tuple:
+    """
+    Смещения разделов разметки
+
+    :param books: Количество книг
+    :type books: int
+    :param strings: Количество строк
+    :type strings: int
+    :param data: Размер строковых данных в байтах
+    :type data: int
+    :param key_counts: Количество ключей каждого индекса в порядке INDEX_FIELDS
+    :type key_counts: Sequence
+    :return: Кортеж (словарь {раздел: (смещение, размер)}, общий размер)
+    :rtype: tuple
+    """
+    sizes = [("offsets", 4 * (strings + 1)), ("data", data),
+             ("records", 4 * _RECORD_FIELDS * books)]
+    for field, keys in zip(INDEX_FIELDS, key_counts):
+        sizes += [(f"{field}.keys", 4 * keys), (f"{field}.starts", 4 * (keys + 1)),
+                  (f"{field}.postings", 4 * books)]
+    sections = {}
+    offset = _aligned(_HEADER.size)
+    for name, size in sizes:
+        sections[name] = (offset, size)
+        offset = _aligned(offset + size)
+    return sections, offset
+
+
+def build_layout(books) -> bytearray:
+    """
+    Сериализует книги в неизменяемую разметку: таблица строк, записи книг
+    и для каждого поля INDEX_FIELDS отсортированные ключи со списками позиций
+
+    Книги с повторяющимся ISBN пропускаются (остаётся первая).
+
+    :param books: Итерируемый объект с книгами или Library
+    :type books: iterable or Library
+    :return: Буфер с разметкой
+    :rtype: bytearray
+    :raises TypeError: Если год книги не целое число
+    """
+    books = getattr(books, "indexes", books)
+    unique: dict[str, Book] = {}
+    for book in books:
+        unique.setdefault(book.isbn, book)
+    books = list(unique.values())
+
+    string_ids: dict[str, int] = {}
+    encoded: list[bytes] = []
+    records = []
+    for book in books:
+        if not isinstance(book.year, int):
+            raise TypeError(f"Год книги должен быть целым числом: {book.year!r}")
+        record = []
+        for field in BOOK_FIELDS:
+            value = getattr(book, field)
+            if field in STRING_FIELDS:
+                value = string_ids.setdefault(value, len(string_ids))
+                if value == len(encoded):
+                    encoded.append(getattr(book, field).encode("utf-8"))
+            record.append(value)
+        records.extend(record)
+
+    indexes = []
+    for field in INDEX_FIELDS:
+        values = records[BOOK_FIELDS.index(field)::_RECORD_FIELDS]
+        # Строки сортируются по байтам UTF-8, как их сравнивает поиск по разметке.
+        sort_keys = [encoded[value] for value in values] if field in STRING_FIELDS else values
+        postings = sorted(range(len(books)), key=sort_keys.__getitem__)
+        keys, starts = [], []
+        previous = object()
+        for order, position in enumerate(postings):
+            key = sort_keys[position]
+            if key != previous:
+                keys.append(values[position])
+                starts.append(order)
+                previous = key
+        starts.append(len(postings))
+        indexes.append((keys, starts, postings))
+
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    sections, size = _sections(len(books), len(encoded), offsets[-1],
+                               [len(keys) for keys, _, _ in indexes])
+    buffer = bytearray(size)
+    _HEADER.pack_into(buffer, 0, SHARED_MAGIC, len(books), len(encoded), offsets[-1],
+                      *(len(keys) for keys, _, _ in indexes))
+
+    def put(name: str, fmt: str, values) -> None:
+        offset, length = sections[name]
+        buffer[offset:offset + length] = array(fmt, values).tobytes()
+
+    put("offsets", "I", offsets)
+    offset, length = sections["data"]
+    buffer[offset:offset + length] = b"".join(encoded)
+    put("records", "i", records)
+    for field, (keys, starts, postings) in zip(INDEX_FIELDS, indexes):
+        put(f"{field}.keys", "i", keys)
+        put(f"{field}.starts", "I", starts)
+        put(f"{field}.postings", "I", postings)
+    return buffer
+
+
+class BookView(Book):
+    """Книга, поля которой декодируются из разделяемого буфера при обращении."""
+
+    __slots__ = ("_catalog", "_position")
+
+    def __init__(self, catalog: "SharedCatalog", position: int):
+        """
+        Инициализация представления без чтения полей
+
+        :param catalog: Каталог, которому принадлежит книга
+        :type catalog: SharedCatalog
+        :param position: Номер записи книги
+        :type position: int
+        """
+        self._catalog = catalog
+        self._position = position
+
+    @property
+    def title(self) -> str:
+        """
+        Название книги
+
+        :return: Значение, декодированное из буфера
+        :rtype: str
+        """
+        return self._catalog.field(self._position, 'title')
+
+    @property
+    def author(self) -> str:
+        """
+        Автор книги
+
+        :return: Значение, декодированное из буфера
+        :rtype: str
+        """
+        return self._catalog.field(self._position, 'author')
+
+    @property
+    def year(self) -> int:
+        """
+        Год издания
+
+        :return: Значение, декодированное из буфера
+        :rtype: int
+        """
+        return self._catalog.field(self._position, 'year')
+
+    @property
+    def genre(self) -> str:
+        """
+        Жанр книги
+
+        :return: Значение, декодированное из буфера
+        :rtype: str
+        """
+        return self._catalog.field(self._position, 'genre')
+
+    @property
+    def isbn(self) -> str:
+        """
+        ISBN книги
+
+        :return: Значение, декодированное из буфера
+        :rtype: str
+        """
+        return self._catalog.field(self._position, 'isbn')
+
+    def materialize(self) -> Book:
+        """
+        Обычная книга с теми же полями, не зависящая от буфера
+
+        :return: Книга
+        :rtype: Book
+        """
+        return Book(self.title, self.author, self.year, self.genre, self.isbn)
+
+
+class SharedCatalog:
+    """Каталог поверх буфера разметки: хранилище книг и индексы без копирования данных."""
+
+    def __init__(self, buffer):
+        """
+        Инициализация каталога: разбирается только заголовок, массивы
+        отображаются на буфер через memoryview
+
+        :param buffer: Буфер с разметкой build_layout (bytes, mmap, SharedMemory.buf)
+        :raises ValueError: Если буфер не содержит разметку
+        """
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("Буфер не содержит разметку каталога")
+        magic, books, strings, data, *key_counts = _HEADER.unpack_from(view, 0)
+        if magic != SHARED_MAGIC:
+            raise ValueError("Буфер не содержит разметку каталога")
+        self._views = [view]
+        sections, _ = _sections(books, strings, data, key_counts)
+        self._length = books
+        self._offsets = self._section(sections, "offsets", "I")
+        self._data = self._section(sections, "data", "B")
+        self._records = self._section(sections, "records", "i")
+        self._indexes = {
+            field: (self._section(sections, f"{field}.keys", "i"),
+                    self._section(sections, f"{field}.starts", "I"),
+                    self._section(sections, f"{field}.postings", "I"))
+            for field in INDEX_FIELDS
+        }
+
+    def _section(self, sections: dict, name: str, fmt: str) -> memoryview:
+        """
+        Отображение раздела разметки
+
+        :param sections: Смещения разделов
+        :type sections: dict
+        :param name: Имя раздела
+        :type name: str
+        :param fmt: Формат элементов ('I', 'i' или 'B')
+        :type fmt: str
+        :return: memoryview раздела
+        :rtype: memoryview
+        """
+        offset, size = sections[name]
+        view = self._views[0][offset:offset + size].cast(fmt)
+        self._views.append(view)
+        return view
+
+    def release(self) -> None:
+        """Освобождает все memoryview буфера; после этого каталог использовать нельзя"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+
+    def string(self, string_id: int) -> str:
+        """
+        Декодирует строку из таблицы строк
+
+        :param string_id: Номер строки
+        :type string_id: int
+        :return: Строка
+        :rtype: str
+        """
+        return str(self._data[self._offsets[string_id]:self._offsets[string_id + 1]], "utf-8")
+
+    def _string_bytes(self, string_id: int) -> bytes:
+        """
+        Байты строки для сравнения при двоичном поиске
+
+        :param string_id: Номер строки
+        :type string_id: int
+        :return: Байты UTF-8
+        :rtype: bytes
+        """
+        return self._data[self._offsets[string_id]:self._offsets[string_id + 1]].tobytes()
+
+    def field(self, position: int, field: str):
+        """
+        Значение поля книги
+
+        :param position: Номер записи книги
+        :type position: int
+        :param field: Имя поля
+        :type field: str
+        :return: Значение поля
+        """
+        value = self._records[position * _RECORD_FIELDS + BOOK_FIELDS.index(field)]
+        return self.string(value) if field in STRING_FIELDS else value
+
+    def span(self, field: str, value) -> tuple:
+        """
+        Границы списка позиций значения поля в разделе postings индекса
+
+        :param field: Имя индекса
+        :type field: str
+        :param value: Значение
+        :return: Кортеж (начало, конец); для отсутствующего значения пустой
+        :rtype: tuple
+        :raises KeyError: Если индекса с таким именем нет
+        """
+        if field not in self._indexes:
+            raise KeyError(f"Неизвестный тип индекса: {field}")
+        keys, starts, _ = self._indexes[field]
+        if field in STRING_FIELDS:
+            if not isinstance(value, str):
+                return 0, 0
+            target = value.encode("utf-8")
+            position = bisect_left(keys, target, key=self._string_bytes)
+            found = position < len(keys) and self._string_bytes(keys[position]) == target
+        else:
+            if not isinstance(value, int):
+                return 0, 0
+            position = bisect_left(keys, value)
+            found = position < len(keys) and keys[position] == value
+        if not found:
+            return 0, 0
+        return starts[position], starts[position + 1]
+
+    def positions(self, field: str, value) -> list:
+        """
+        Номера записей книг с данным значением поля в порядке добавления
+
+        :param field: Имя индекса
+        :type field: str
+        :param value: Значение
+        :return: Список позиций (пустой, если значения нет)
+        :rtype: list
+        :raises KeyError: Если индекса с таким именем нет
+        """
+        start, stop = self.span(field, value)
+        return self._indexes[field][2][start:stop].tolist()
+
+    def keys(self, field: str) -> list:
+        """
+        Значения поля, встречающиеся в каталоге, в порядке сортировки
+
+        :param field: Имя индекса
+        :type field: str
+        :return: Список значений
+        :rtype: list
+        :raises KeyError: Если индекса с таким именем нет
+        """
+        if field not in self._indexes:
+            raise KeyError(f"Неизвестный тип индекса: {field}")
+        keys = self._indexes[field][0]
+        if field in STRING_FIELDS:
+            return [self.string(key) for key in keys]
+        return list(keys)
+
+    def bucket_sizes(self, field: str) -> dict:
+        """
+        Размеры корзин индекса
+
+        :param field: Имя индекса
+        :type field: str
+        :return: Словарь {значение: количество книг}
+        :rtype: dict
+        :raises KeyError: Если индекса с таким именем нет
+        """
+        keys = self.keys(field)
+        starts = self._indexes[field][1]
+        return {key: starts[position + 1] - starts[position]
+                for position, key in enumerate(keys)}
+
+    def __getitem__(self, key):
+        """
+        Доступ в стиле IndexDict: catalog['isbn', значение] или catalog[поле, значение]
+
+        :param key: Кортеж (имя индекса, значение)
+        :type key: tuple
+        :return: Книга или None для ISBN, коллекция для остальных индексов
+        :rtype: BookView or BookCollection
+        :raises TypeError: Если ключ не является кортежем из двух элементов
+        :raises KeyError: Если тип индекса неизвестен
+        """
+        if isinstance(key, tuple) and len(key) == 2:
+            field, value = key
+            positions = self.positions(field, value)
+            if field == 'isbn':
+                return BookView(self, positions[0]) if positions else None
+            return BookCollection([BookView(self, position) for position in positions])
+        raise TypeError("Ключ должен быть кортежем (тип, значение)")
+
+    def __iter__(self):
+        """
+        Итерация по книгам в порядке добавления
+
+        :return: Итератор по представлениям книг
+        :rtype: Iterator
+        """
+        return (BookView(self, position) for position in range(self._length))
+
+    def __len__(self) -> int:
+        """
+        Количество книг
+
+        :return: Количество книг
+        :rtype: int
+        """
+        return self._length
+
+    def __contains__(self, item) -> bool:
+        """
+        Проверяет наличие книги по ISBN
+
+        :param item: Книга (Book) или ISBN (str)
+        :type item: Book or str
+        :return: True если книга есть в каталоге
+        :rtype: bool
+        """
+        if isinstance(item, Book):
+            item = item.isbn
+        if not isinstance(item, str):
+            return False
+        start, stop = self.span('isbn', item)
+        return stop > start
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Подключается к существующему сегменту разделяемой памяти, не передавая его
+    трекеру ресурсов: иначе сегмент удалился бы при завершении читателя
+
+    :param name: Имя сегмента
+    :type name: str
+    :return: Сегмент
+    :rtype: shared_memory.SharedMemory
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    segment = shared_memory.SharedMemory(name=name)
+    if name not in _created and os.name == "posix":
+        # Трекер регистрирует сегмент под POSIX-именем с ведущей косой чертой.
+        resource_tracker.unregister(f"/{segment.name}", "shared_memory")
+    return segment
+
+
+def _segment_buffer(segment: shared_memory.SharedMemory) -> memoryview:
+    """
+    Буфер сегмента разделяемой памяти
+
+    :param segment: Открытый сегмент
+    :type segment: shared_memory.SharedMemory
+    :return: Буфер сегмента
+    :rtype: memoryview
+    :raises ValueError: Если сегмент уже закрыт
+    """
+    buffer = segment.buf
+    if buffer is None:
+        raise ValueError(f"Сегмент разделяемой памяти {segment.name} закрыт")
+    return buffer
+
+
+class SharedLibrary:
+    """Библиотека только для чтения поверх разметки в разделяемой памяти или mmap-файле.
+
+    Разметка строится один раз (create или save), после чего любое
+    количество процессов подключается к ней (attach или open) и выполняет
+    запросы без копирования каталога.
+    """
+
+    def __init__(self, buffer, segment=None, mapping=None, owner: bool = False):
+        """
+        Инициализация поверх готового буфера; обычно используются create, attach, open
+
+        :param buffer: Буфер с разметкой
+        :param segment: Сегмент разделяемой памяти, которому принадлежит буфер
+        :type segment: shared_memory.SharedMemory, optional
+        :param mapping: Отображение файла, которому принадлежит буфер
+        :type mapping: mmap.mmap, optional
+        :param owner: Удалять ли сегмент при unlink()
+        :type owner: bool
+        """
+        self.books = SharedCatalog(buffer)
+        self.indexes = self.books
+        self._segment = segment
+        self._mapping = mapping
+        self._owner = owner
+
+    @classmethod
+    def create(cls, books, name: str | None = None) -> "SharedLibrary":
+        """
+        Строит разметку и размещает её в новом сегменте разделяемой памяти
+
+        :param books: Library или итерируемый объект с книгами
+        :type books: Library or iterable
+        :param name: Имя сегмента (по умолчанию генерируется)
+        :type name: str or None
+        :return: Библиотека-владелец сегмента
+        :rtype: SharedLibrary
+        """
+        layout = build_layout(books)
+        segment = shared_memory.SharedMemory(name=name, create=True, size=max(1, len(layout)))
+        _created.add(segment.name)
+        buffer = _segment_buffer(segment)
+        buffer[:len(layout)] = layout
+        return cls(buffer, segment=segment, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedLibrary":
+        """
+        Подключается к сегменту, созданному create в другом процессе
+
+        :param name: Имя сегмента (SharedLibrary.name у владельца)
+        :type name: str
+        :return: Библиотека
+        :rtype: SharedLibrary
+        :raises FileNotFoundError: Если сегмента нет
+        """
+        segment = _attach_shared_memory(name)
+        return cls(_segment_buffer(segment), segment=segment)
+
+    @staticmethod
+    def save(books, path) -> int:
+        """
+        Записывает разметку в файл для последующего open
+
+        :param books: Library или итерируемый объект с книгами
+        :type books: Library or iterable
+        :param path: Путь к файлу
+        :type path: str or PathLike
+        :return: Размер файла в байтах
+        :rtype: int
+        """
+        layout = build_layout(books)
+        with open(path, "wb") as file:
+            file.write(layout)
+        return len(layout)
+
+    @classmethod
+    def open(cls, path) -> "SharedLibrary":
+        """
+        Отображает файл разметки в память только для чтения; страницы файла
+        разделяются всеми процессами через кэш страниц ОС
+
+        :param path: Путь к файлу
+        :type path: str or PathLike
+        :return: Библиотека
+        :rtype: SharedLibrary
+        """
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapping, mapping=mapping)
+
+    @property
+    def name(self) -> str | None:
+        """
+        Имя сегмента разделяемой памяти для attach
+
+        :return: Имя или None для mmap-файла
+        :rtype: str or None
+        """
+        return self._segment.name if self._segment is not None else None
+
+    def close(self) -> None:
+        """Отключается от буфера; представления книг после этого читать нельзя"""
+        self.books.release()
+        if self._segment is not None:
+            self._segment.close()
+        if self._mapping is not None:
+            self._mapping.close()
+
+    def unlink(self) -> None:
+        """Удаляет сегмент разделяемой памяти (только у владельца)"""
+        if self._owner and self._segment is not None:
+            self._segment.unlink()
+            _created.discard(self._segment.name)
+            self._owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        self.unlink()
+
+    def search_by_isbn(self, isbn: str):
+        """
+        Поиск книги по ISBN
+
+        :param isbn: ISBN для поиска
+        :type isbn: str
+        :return: Найденная книга или None
+        :rtype: BookView or None
+        """
+        return self.books['isbn', isbn]
+
+    def search_by_author(self, author: str) -> BookCollection:
+        """
+        Поиск всех книг автора
+
+        :param author: Имя автора
+        :type author: str
+        :return: Коллекция книг
+        :rtype: BookCollection
+        """
+        return self.books['author', author]
+
+    def search_by_year(self, year: int) -> BookCollection:
+        """
+        Поиск всех книг года издания
+
+        :param year: Год издания
+        :type year: int
+        :return: Коллекция книг
+        :rtype: BookCollection
+        """
+        return self.books['year', year]
+
+    def search_by_genre(self, genre: str) -> BookCollection:
+        """
+        Поиск всех книг жанра по индексу, без полного просмотра
+
+        :param genre: Жанр
+        :type genre: str
+        :return: Коллекция книг
+        :rtype: BookCollection
+        """
+        return self.books['genre', genre]
+
+    def search(self, field: str, value) -> BookCollection:
+        """
+        Поиск по индексу или, для поля без индекса (title), полным просмотром
+
+        :param field: Имя поля книги
+        :type field: str
+        :param value: Значение
+        :return: Коллекция найденных книг
+        :rtype: BookCollection
+        :raises KeyError: Если поле неизвестно
+        """
+        if field in INDEX_FIELDS:
+            return BookCollection([BookView(self.books, position)
+                                   for position in self.books.positions(field, value)])
+        if field not in BOOK_FIELDS:
+            raise KeyError(f"Неизвестный тип индекса: {field}")
+        return BookCollection([book for book in self.books if getattr(book, field) == value])
+
+    def count(self, field=None, value=None) -> int:
+        """
+        Количество книг, всего или с данным значением поля, без декодирования книг
+
+        :param field: Имя индекса (необязательно)
+        :type field: str or None
+        :param value: Значение
+        :return: Количество книг
+        :rtype: int
+        :raises KeyError: Если индекса с таким именем нет
+        """
+        if field is None:
+            return len(self.books)
+        start, stop = self.books.span(field, value)
+        return stop - start
+
+    def facet(self, name: str, top=None) -> dict:
+        """
+        Распределение книг по значениям поля
+
+        :param name: Имя индекса
+        :type name: str
+        :param top: Сколько самых частых значений вернуть (None — все)
+        :type top: int or None
+        :return: Словарь {значение: количество} по убыванию количества
+        :rtype: dict
+        :raises KeyError: Если индекса с таким именем нет
+        """
+        return rank(self.books.bucket_sizes(name), top)
+
+    def __len__(self) -> int:
+        """
+        Количество книг
+
+        :return: Количество книг
+        :rtype: int
+        """
+        return len(self.books)
+
+    def __str__(self) -> str:
+        """
+        Строковое представление библиотеки
+
+        :return: Строка с количеством книг и источником разметки
+        :rtype: str
+        """
+        source = f"сегмент {self.name}" if self._segment is not None else "файл"
+        return f"Библиотека только для чтения ({source}): {len(self.books)} книг"
@@ -1,66 +1,121 @@
 """Модуль с функцией симуляции работы библиотеки."""
 
 import random
+from collections import Counter
+from contextlib import nullcontext
 from src.library import Library
 from src.constants import create_sample_books, GENRES, AUTHORS, YEARS, FAKE_ISBNS
-
-
-def run_simulation(steps: int = 20, seed: int | None = None) -> None:
+from src.generator import ZipfChoice, generate_books
+
+EVENTS = (
+    "add_book",
+    "remove_book",
+    "search_by_author",
+    "search_by_genre",
+    "search_by_year",
+    "search_nonexistent",
+)
+
+READ_HEAVY_WEIGHTS = {
+    "add_book": 3,
+    "remove_book": 2,
+    "search_by_author": 40,
+    "search_by_genre": 25,
+    "search_by_year": 25,
+    "search_nonexistent": 5,
+}
+
+MAX_PRINTED_RESULTS = 10
+
+
+def run_simulation(steps: int = 20, seed: int | None = None, event_weights: dict | None = None,
+                   catalog_size: int | None = None, key_skew: float = 0.0,
+                   profiler=None) -> None:
     """
     Выполняет псевдослучайную симуляцию работы библиотеки
 
+    Без event_weights события выбираются равномерно, без catalog_size
+    используются книги из books_data.json.
+
     :param steps: Количество шагов симуляции
     :type steps: int
     :param seed: Seed для генератора случайных чисел
     :type seed: int or None
+    :param event_weights: Веса событий, например READ_HEAVY_WEIGHTS (отсутствующие — 0)
+    :type event_weights: dict or None
+    :param catalog_size: Размер синтетического каталога (см. src.generator)
+    :type catalog_size: int or None
+    :param key_skew: Показатель Zipf для выбора автора, жанра и года в поиске (0 — равномерно)
+    :type key_skew: float
+    :param profiler: Профилировщик (см. src.profiling); если он не запущен, профилируется
+        вся симуляция, а каждое событие размечается именем обработчика
+    :type profiler: Profiler or None
+    :raises ValueError: Если в event_weights есть неизвестное событие или все веса нулевые
     """
+    if event_weights is not None:
+        unknown = set(event_weights) - set(EVENTS)
+        if unknown:
+            raise ValueError(f"Неизвестные события: {', '.join(sorted(unknown))}")
+        weights = [event_weights.get(event, 0) for event in EVENTS]
+        if sum(weights) <= 0:
+            raise ValueError("Сумма весов событий должна быть положительной")
+    if profiler is not None and not profiler.running:
+        with profiler:
+            return run_simulation(steps, seed, event_weights, catalog_size, key_skew, profiler)
     if seed is not None:
         random.seed(seed)
+    choose = random.choice if key_skew == 0 else ZipfChoice(key_skew)
 
     print("ПСЕВДОСЛУЧАЙНАЯ СИМУЛЯЦИЯ")
     print(f"Параметры: steps={steps}, seed={seed}")
+    if event_weights is not None or catalog_size is not None or key_skew:
+        print(f"Веса событий: {event_weights or 'равные'}, размер каталога: {catalog_size}, "
+              f"skew ключей: {key_skew}")
     print()
 
     library = Library()
-    available_books = create_sample_books()
 
     print("Инициализация библиотеки")
-    for book in available_books[:10]:
-        library.add_book(book)
-        print(f"Добавлена книга: {book}")
+    if catalog_size is None:
+        available_books = create_sample_books()
+        for book in available_books[:10]:
+            library.add_book(book)
+            print(f"Добавлена книга: {book}")
+    else:
+        catalog = list(generate_books(catalog_size + steps, seed))
+        library.add_books(catalog[:catalog_size])
+        available_books = catalog[catalog_size:]
+        print(f"Сгенерировано и загружено книг: {catalog_size}")
     print(f"\nНачальное состояние: {library}")
     print()
 
-    events = [
-        "add_book",
-        "remove_book",
-        "search_by_author",
-        "search_by_genre",
-        "search_by_year",
-        "search_nonexistent",
-    ]
-
+    counts: Counter[str] = Counter()
     for step in range(1, steps + 1):
         print(f"Шаг {step}")
 
-        event = random.choice(events)
+        if event_weights is None:
+            event = random.choice(EVENTS)
+        else:
+            event = random.choices(EVENTS, weights)[0]
+        counts[event] += 1
 
         try:
-            match event:
-                case "add_book":
-                    _event_add_book(library, available_books)
-                case "remove_book":
-                    _event_remove_book(library)
-                case "search_by_author":
-                    _event_search_by_author(library)
-                case "search_by_genre":
-                    _event_search_by_genre(library)
-                case "search_by_year":
-                    _event_search_by_year(library)
-                case "search_nonexistent":
-                    _event_search_nonexistent(library)
-                case _:
-                    print(f"Неизвестное событие: {event}")
+            with nullcontext() if profiler is None else profiler.event(f"_event_{event}"):
+                match event:
+                    case "add_book":
+                        _event_add_book(library, available_books)
+                    case "remove_book":
+                        _event_remove_book(library)
+                    case "search_by_author":
+                        _event_search_by_author(library, choose)
+                    case "search_by_genre":
+                        _event_search_by_genre(library, choose)
+                    case "search_by_year":
+                        _event_search_by_year(library, choose)
+                    case "search_nonexistent":
+                        _event_search_nonexistent(library)
+                    case _:
+                        print(f"Неизвестное событие: {event}")
 
         except Exception as e:
             print(f"Ошибка: {e}")
@@ -69,9 +124,24 @@ def run_simulation(steps: int = 20, seed: int | None = None) -> None:
     print("ФИНАЛЬНОЕ СОСТОЯНИЕ")
     print(f"Всего книг: {len(library.books)}")
     print(f"Уникальных книг в индексе: {len(library.indexes)}")
+    print("События: " + ", ".join(f"{event}={counts[event]}" for event in EVENTS))
     print()
 
 
+def _print_results(results) -> None:
+    """
+    Выводит первые MAX_PRINTED_RESULTS найденных книг
+
+    :param results: Найденные книги
+    :type results: BookCollection
+    """
+    for number, book in enumerate(results):
+        if number == MAX_PRINTED_RESULTS:
+            print(f"     ... и ещё {len(results) - MAX_PRINTED_RESULTS}")
+            break
+        print(f"     - {book}")
+
+
 def _event_add_book(library: Library, available_books: list):
     """
     Событие симуляции: добавление новой книги в библиотеку
@@ -119,58 +189,58 @@ def _event_remove_book(library: Library):
         print(f"Текущее количество книг: {len(library.books)}")
 
 
-def _event_search_by_author(library: Library):
+def _event_search_by_author(library: Library, choose=random.choice):
     """
     Событие симуляции: поиск книг по случайному автору
 
     :param library: Объект библиотеки
     :type library: Library
+    :param choose: Функция выбора значения из словаря (random.choice или ZipfChoice)
+    :type choose: Callable
     """
-    author = random.choice(AUTHORS)
+    author = choose(AUTHORS)
     print(f"Событие: Поиск по автору '{author}'")
 
     results = library.search_by_author(author)
     print(f"Найдено книг: {len(results)}")
 
-    if len(results) > 0:
-        for book in results:
-            print(f"     - {book}")
+    _print_results(results)
 
 
-def _event_search_by_genre(library: Library):
+def _event_search_by_genre(library: Library, choose=random.choice):
     """
     Событие симуляции: поиск книг по случайному жанру
 
     :param library: Объект библиотеки
     :type library: Library
+    :param choose: Функция выбора значения из словаря (random.choice или ZipfChoice)
+    :type choose: Callable
     """
-    genre = random.choice(GENRES)
+    genre = choose(GENRES)
     print(f"Событие: Поиск по жанру '{genre}'")
 
     results = library.search_by_genre(genre)
     print(f"Найдено книг: {len(results)}")
 
-    if len(results) > 0:
-        for book in results:
-            print(f"     - {book}")
+    _print_results(results)
 
 
-def _event_search_by_year(library: Library):
+def _event_search_by_year(library: Library, choose=random.choice):
     """
     Событие симуляции: поиск книг по случайному году издания
 
     :param library: Объект библиотеки
     :type library: Library
+    :param choose: Функция выбора значения из словаря (random.choice или ZipfChoice)
+    :type choose: Callable
     """
-    year = random.choice(YEARS)
+    year = choose(YEARS)
     print(f"Событие: Поиск по году {year}")
 
     results = library.search_by_year(year)
     print(f"Найдено книг: {len(results)}")
 
-    if len(results) > 0:
-        for book in results:
-            print(f"     - {book}")
+    _print_results(results)
 
 
 def _event_search_nonexistent(library: Library):
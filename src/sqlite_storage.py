@@ -0,0 +1,1666 @@
+"""Модуль с хранением каталога библиотеки в SQLite (стандартный модуль sqlite3)."""
+
+import os
+import queue
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from src.book import Book
+from src.book_collections import BookCollection
+from src.changefeed import DEFAULT_CAPACITY, Change, ChangeFeedOverflow
+from src.fuzzy import FuzzyIndex
+from src.indexes import BaseIndex, SortedIndex, TextIndex
+from src.instrumentation import Instrumentation, instrumented
+from src.inventory import InventoryError
+from src.library import BOOK_FIELDS
+from src.pagination import SORT_KEYS, Page
+from src.query_planner import Condition
+from src.sampling import WeightedSampler, weighted_sample
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 30.0
+FETCH_SIZE = 500
+
+_COLUMNS = "title, author, year, genre, isbn"
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS books (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        author TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        genre TEXT NOT NULL,
+        isbn TEXT NOT NULL UNIQUE,
+        copies INTEGER NOT NULL DEFAULT 1,
+        checked_out INTEGER NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS books_author ON books (author)",
+    "CREATE INDEX IF NOT EXISTS books_year ON books (year)",
+    "CREATE INDEX IF NOT EXISTS books_genre ON books (genre)",
+    "CREATE INDEX IF NOT EXISTS books_title ON books (title)",
+    # Лента изменений пишется триггерами в той же транзакции, что и сами изменения,
+    # поэтому версии не теряются при откате и сохраняются между запусками.
+    """CREATE TABLE IF NOT EXISTS changes (
+        version INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        title TEXT NOT NULL,
+        author TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        genre TEXT NOT NULL,
+        isbn TEXT NOT NULL
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_added AFTER INSERT ON books BEGIN
+        INSERT INTO changes (kind, {_COLUMNS})
+        VALUES ('add', NEW.title, NEW.author, NEW.year, NEW.genre, NEW.isbn);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS books_removed AFTER DELETE ON books BEGIN
+        INSERT INTO changes (kind, {_COLUMNS})
+        VALUES ('remove', OLD.title, OLD.author, OLD.year, OLD.genre, OLD.isbn);
+    END""",
+)
+
+# Столбцы учёта экземпляров, которых нет в базах, созданных до их появления.
+_INVENTORY_COLUMNS = {
+    "copies": "INTEGER NOT NULL DEFAULT 1",
+    "checked_out": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# Выражения фасетов, которые не совпадают с полем книги (как facets.FACET_KEYS).
+_FACET_EXPRESSIONS = {
+    "decade": "year / 10 * 10",
+}
+
+# Тексты запросов постоянны, поэтому sqlite3 компилирует каждый один раз
+# и берёт подготовленное выражение из кэша соединения.
+_INSERT = f"INSERT INTO books ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+_INSERT_COPIES = f"INSERT INTO books ({_COLUMNS}, copies) VALUES (?, ?, ?, ?, ?, ?)"
+_INSERT_OR_IGNORE = f"INSERT OR IGNORE INTO books ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+_DELETE = "DELETE FROM books WHERE isbn = ?"
+_SELECT_AFTER = f"SELECT {_COLUMNS}, id FROM books WHERE id > ? ORDER BY id LIMIT ?"
+_COUNT = "SELECT COUNT(*) FROM books"
+_EXISTS = "SELECT 1 FROM books WHERE isbn = ?"
+_RANDOM = f"SELECT {_COLUMNS} FROM books WHERE id >= ? ORDER BY id LIMIT 1"
+_ID_RANGE = "SELECT MIN(id), MAX(id) FROM books"
+_INVENTORY = "SELECT copies, checked_out FROM books WHERE isbn = ?"
+_INVENTORY_TOTALS = "SELECT COALESCE(SUM(copies), 0), COALESCE(SUM(checked_out), 0) FROM books"
+_ADD_COPIES = "UPDATE books SET copies = copies + ? WHERE isbn = ?"
+_REMOVE_COPIES = "UPDATE books SET copies = copies - ? WHERE isbn = ? AND copies - checked_out >= ?"
+_CHECKOUT = ("UPDATE books SET checked_out = checked_out + ? "
+             "WHERE isbn = ? AND copies - checked_out >= ?")
+_RETURN = "UPDATE books SET checked_out = checked_out - ? WHERE isbn = ? AND checked_out >= ?"
+_VERSION = "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+_OLDEST_CHANGE = "SELECT MIN(version) FROM changes"
+_CHANGES_SINCE = (f"SELECT version, kind, {_COLUMNS} FROM changes "
+                  "WHERE version > ? ORDER BY version")
+_PRUNE_CHANGES = "DELETE FROM changes WHERE version <= (SELECT MAX(version) FROM changes) - ?"
+_SELECT_ALL = f"SELECT {_COLUMNS} FROM books ORDER BY id"
+_SELECT_BY_ID = f"SELECT {_COLUMNS} FROM books WHERE id = ?"
+
+# Индекс в строке EXPLAIN QUERY PLAN: "SEARCH books USING INDEX books_author (author=?)".
+_PLAN_INDEX = re.compile(r"USING (?:COVERING )?INDEX \w+ \((\w+)")
+
+
+def _row(book: Book) -> tuple:
+    """
+    Строка таблицы для книги
+
+    :param book: Книга
+    :type book: Book
+    :return: Кортеж значений в порядке столбцов
+    :rtype: tuple
+    """
+    return book.title, book.author, book.year, book.genre, book.isbn
+
+
+def _book(row) -> Book:
+    """
+    Книга из строки таблицы
+
+    :param row: Кортеж (title, author, year, genre, isbn)
+    :type row: tuple
+    :return: Книга
+    :rtype: Book
+    """
+    return Book(*row)
+
+
+def _column(field: str) -> str:
+    """
+    Проверяет имя поля книги перед подстановкой в текст запроса
+
+    :param field: Имя поля
+    :type field: str
+    :return: Имя столбца
+    :rtype: str
+    :raises KeyError: Если поле неизвестно
+    """
+    if field not in BOOK_FIELDS:
+        raise KeyError(f"Неизвестный тип индекса: {field}")
+    return field
+
+
+def _order_by(sort_by, reverse: bool) -> str:
+    """
+    Выражение ORDER BY для сортировки по полю; при равенстве — по порядку добавления
+    (при убывании — в обратном порядке, как в orderings.BookOrdering)
+
+    :param sort_by: Поле сортировки ('title', 'author', 'year') или None
+    :type sort_by: str or None
+    :param reverse: Сортировать по убыванию
+    :type reverse: bool
+    :return: Текст выражения
+    :rtype: str
+    :raises ValueError: Если поле сортировки неизвестно
+    """
+    if sort_by is None:
+        return "ORDER BY id"
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Неизвестное поле сортировки: {sort_by}")
+    direction = "DESC" if reverse else "ASC"
+    return f"ORDER BY {sort_by} {direction}, id {direction}"
+
+
+def _range_clauses(column: str, low, high) -> tuple:
+    """
+    Условия WHERE для диапазона [low, high] по столбцу
+
+    :param column: Проверенное имя столбца
+    :type column: str
+    :param low: Нижняя граница включительно или None
+    :param high: Верхняя граница включительно или None
+    :return: Кортеж (список условий, список параметров)
+    :rtype: tuple
+    """
+    clauses, parameters = [], []
+    if low is not None:
+        clauses.append(f"{column} >= ?")
+        parameters.append(low)
+    if high is not None:
+        clauses.append(f"{column} <= ?")
+        parameters.append(high)
+    return clauses, parameters
+
+
+def _where(conditions: list) -> tuple:
+    """
+    Условие WHERE для условий query по полям книги
+
+    :param conditions: Условия (Condition) по полям книги
+    :type conditions: list
+    :return: Кортеж (текст WHERE с завершающим пробелом или пустая строка, параметры)
+    :rtype: tuple
+    :raises KeyError: Если поле неизвестно
+    """
+    clauses, parameters = [], []
+    for condition in conditions:
+        column = _column(condition.field)
+        if condition.is_range:
+            more, values = _range_clauses(column, *condition.value)
+        else:
+            more, values = [f"{column} = ?"], [condition.value]
+        clauses += more
+        parameters += values
+    return (f"WHERE {' AND '.join(clauses)} " if clauses else ""), tuple(parameters)
+
+
+def _matcher(condition: Condition, index=None):
+    """
+    Функция проверки книги на соответствие условию по полю или подключённому индексу
+
+    Для текстового индекса книга подходит, если её текст содержит все слова запроса
+    (как в query_planner.QueryPlanner).
+
+    :param condition: Условие
+    :type condition: Condition
+    :param index: Подключённый индекс (None — условие по полю книги)
+    :type index: BaseIndex, optional
+    :return: Функция книга -> bool
+    :rtype: Callable
+    """
+    if index is None:
+        def matches(book) -> bool:
+            return condition.matches(getattr(book, condition.field))
+    elif isinstance(index, TextIndex) and not condition.is_range:
+        tokens = index.tokenize(condition.value)
+
+        def matches(book) -> bool:
+            return bool(tokens) and tokens <= index.tokenize(index.key(book))
+    else:
+        def matches(book) -> bool:
+            return condition.matches(index.key(book))
+    return matches
+
+
+class SQLiteExplanation:
+    """Результат explain для SQLite: путь доступа из EXPLAIN QUERY PLAN и фактические значения.
+
+    Словарь совместим с query_planner.Explanation, но без оценок: SQLite не
+    сообщает ожидаемое количество строк.
+    """
+
+    def __init__(self, access: str, index, plan: str, filters: list, actual_examined=None,
+                 actual_rows=None, elapsed=None):
+        """
+        Инициализация результата
+
+        :param access: 'Index Scan', 'Index Range Scan' или 'Seq Scan'
+        :type access: str
+        :param index: Имя поля или подключённого индекса пути доступа (None для Seq Scan)
+        :type index: str or None
+        :param plan: Текст плана
+        :type plan: str
+        :param filters: Условия, проверяемые после выбора пути доступа
+        :type filters: list
+        :param actual_examined: Фактически просмотрено книг (None без выполнения)
+        :type actual_examined: int or None
+        :param actual_rows: Фактический размер результата (None без выполнения)
+        :type actual_rows: int or None
+        :param elapsed: Время выполнения в секундах (None без выполнения)
+        :type elapsed: float or None
+        """
+        self.access = access
+        self.index = index
+        self.plan = plan
+        self.filters = filters
+        self.actual_examined = actual_examined
+        self.actual_rows = actual_rows
+        self.elapsed = elapsed
+
+    def as_dict(self) -> dict:
+        """
+        Представление в виде словаря
+
+        :return: Словарь с путём доступа, фильтром и фактическими значениями
+        :rtype: dict
+        """
+        result = {
+            "access": self.access,
+            "index": self.index,
+            "plan": self.plan,
+            "filter": [str(condition) for condition in self.filters],
+        }
+        if self.actual_examined is not None:
+            result["actual"] = {"examined": self.actual_examined, "rows": self.actual_rows,
+                                "time_ms": self.elapsed * 1000}
+        return result
+
+    def format(self) -> str:
+        """
+        Текстовое представление в стиле EXPLAIN ANALYZE
+
+        :return: Многострочный текст
+        :rtype: str
+        """
+        data = self.as_dict()
+        line = data["plan"]
+        if "actual" in data:
+            actual = data["actual"]
+            line += (f"  (факт: просмотр={actual['examined']} строк={actual['rows']} "
+                     f"время={actual['time_ms']:.3f} мс)")
+        lines = [line]
+        if data["filter"]:
+            lines.append(f"  Filter: {' AND '.join(data['filter'])}")
+        return "\n".join(lines)
+
+
+class ConnectionPool:
+    """Пул соединений SQLite для параллельных читателей."""
+
+    def __init__(self, database: str, size: int = DEFAULT_POOL_SIZE, uri: bool = False,
+                 setup=None, timeout: float | None = DEFAULT_TIMEOUT):
+        """
+        Инициализация пула; соединения создаются по мере надобности
+
+        :param database: Путь к базе данных или URI
+        :type database: str
+        :param size: Максимальное количество соединений
+        :type size: int
+        :param uri: Интерпретировать database как URI
+        :type uri: bool
+        :param setup: Функция настройки нового соединения (необязательно)
+        :type setup: Callable, optional
+        :param timeout: Сколько секунд ждать свободного соединения (None — без ограничения)
+        :type timeout: float, optional
+        """
+        self._database = database
+        self._uri = uri
+        self._setup = setup
+        self._size = size
+        self._timeout = timeout
+        self._created = 0
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._all: list[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Создаёт новое соединение
+
+        :return: Соединение
+        :rtype: sqlite3.Connection
+        """
+        connection = sqlite3.connect(self._database, uri=self._uri, check_same_thread=False)
+        if self._setup is not None:
+            self._setup(connection)
+        return connection
+
+    @contextmanager
+    def connection(self):
+        """
+        Берёт соединение из пула на время блока with
+
+        Если все соединения заняты и пул заполнен, ожидает освобождения не дольше timeout.
+
+        :return: Менеджер контекста, выдающий соединение
+        :raises TimeoutError: Если соединение не освободилось за timeout секунд
+        """
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self._size
+                if create:
+                    self._created += 1
+            if create:
+                connection = self._connect()
+                with self._lock:
+                    self._all.append(connection)
+            else:
+                try:
+                    connection = self._idle.get(timeout=self._timeout)
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"Нет свободного соединения в пуле за {self._timeout} с"
+                    ) from None
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        """Закрывает все созданные соединения"""
+        with self._lock:
+            for connection in self._all:
+                connection.close()
+            self._all.clear()
+            self._created = 0
+            self._idle = queue.LifoQueue()
+
+
+class SQLiteCatalog:
+    """Представление таблицы книг вместо BookCollection и IndexDict.
+
+    Поддерживает len, in, потоковую итерацию и поиск вида catalog[поле, значение].
+    """
+
+    def __init__(self, library: "SQLiteLibrary"):
+        """
+        Инициализация представления
+
+        :param library: Библиотека, хранящая книги в SQLite
+        :type library: SQLiteLibrary
+        """
+        self._library = library
+
+    def __iter__(self):
+        """
+        Потоковая итерация по книгам в порядке добавления порциями по FETCH_SIZE
+
+        Соединение берётся из пула только на время запроса очередной порции
+        (условие по id после последней выданной книги), поэтому незавершённые
+        итераторы не удерживают соединения.
+
+        :return: Итератор по книгам
+        :rtype: Iterator
+        """
+        after = 0
+        while True:
+            with self._library._reader() as connection:
+                rows = connection.execute(_SELECT_AFTER, (after, FETCH_SIZE)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _book(row[:5])
+            after = rows[-1][5]
+
+    def __len__(self) -> int:
+        """
+        Количество книг
+
+        :return: Количество книг
+        :rtype: int
+        """
+        return self._library.count()
+
+    def __contains__(self, item) -> bool:
+        """
+        Проверяет наличие книги по ISBN
+
+        :param item: Книга (Book) или ISBN (str)
+        :type item: Book or str
+        :return: True если книга найдена
+        :rtype: bool
+        """
+        isbn = item.isbn if isinstance(item, Book) else item
+        if not isinstance(isbn, str):
+            return False
+        return self._library._fetch_one(_EXISTS, (isbn,)) is not None
+
+    def __getitem__(self, key):
+        """
+        Поиск в стиле IndexDict: catalog['isbn', значение], catalog['author', значение]
+        или catalog[имя подключённого индекса, значение]
+
+        :param key: Кортеж (поле или индекс, значение)
+        :type key: tuple
+        :return: Книга или None для ISBN и уникальных индексов, коллекция для остальных
+        :rtype: Book or BookCollection
+        :raises TypeError: Если ключ не является кортежем из двух элементов
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        if not isinstance(key, tuple) or len(key) != 2:
+            raise TypeError("Ключ должен быть кортежем (тип, значение)")
+        field, value = key
+        if field == 'isbn':
+            return self._library.search_by_isbn(value)
+        if self._library._is_unique_index(field):
+            found = self._library.search(field, value)
+            return found[0] if len(found) else None
+        return self._library.search(field, value)
+
+
+class SQLiteInventory:
+    """Представление учёта экземпляров вместо Inventory: счётчики хранятся в таблице книг."""
+
+    def __init__(self, library: "SQLiteLibrary"):
+        """
+        Инициализация представления
+
+        :param library: Библиотека, хранящая книги в SQLite
+        :type library: SQLiteLibrary
+        """
+        self._library = library
+
+    def _counts(self, isbn: str) -> tuple:
+        """
+        Количество экземпляров и выданных экземпляров книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: Кортеж (экземпляров, выдано); (0, 0) если книги нет
+        :rtype: tuple
+        """
+        row = self._library._fetch_one(_INVENTORY, (isbn,))
+        return row if row is not None else (0, 0)
+
+    def copies(self, isbn: str) -> int:
+        """
+        Общее количество экземпляров книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: Количество экземпляров
+        :rtype: int
+        """
+        return self._counts(isbn)[0]
+
+    def checked_out(self, isbn: str) -> int:
+        """
+        Количество выданных экземпляров книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: Количество выданных экземпляров
+        :rtype: int
+        """
+        return self._counts(isbn)[1]
+
+    def available(self, isbn: str) -> int:
+        """
+        Количество свободных экземпляров книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: Количество свободных экземпляров
+        :rtype: int
+        """
+        copies, checked_out = self._counts(isbn)
+        return copies - checked_out
+
+    @property
+    def total_copies(self) -> int:
+        """
+        Общее количество экземпляров всех книг
+
+        :return: Количество экземпляров
+        :rtype: int
+        """
+        return self._library._fetch_one(_INVENTORY_TOTALS)[0]
+
+    @property
+    def total_checked_out(self) -> int:
+        """
+        Общее количество выданных экземпляров
+
+        :return: Количество выданных экземпляров
+        :rtype: int
+        """
+        return self._library._fetch_one(_INVENTORY_TOTALS)[1]
+
+    def __len__(self) -> int:
+        """
+        Количество ISBN, по которым есть экземпляры
+
+        :return: Количество ISBN
+        :rtype: int
+        """
+        return self._library._fetch_one("SELECT COUNT(*) FROM books WHERE copies > 0")[0]
+
+    def __contains__(self, isbn: str) -> bool:
+        """
+        Проверяет, учитываются ли экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :return: True если книга есть в учёте
+        :rtype: bool
+        """
+        return self.copies(isbn) > 0
+
+
+class SQLiteLibrary:
+    """Библиотека с каталогом в SQLite: интерфейс поиска Library при ограниченной памяти."""
+
+    def __init__(self, path: str = ":memory:", pool_size: int = DEFAULT_POOL_SIZE,
+                 capacity: int = DEFAULT_CAPACITY):
+        """
+        Инициализация библиотеки; схема и индексы создаются при необходимости
+
+        База открывается в режиме журнала WAL: читатели из пула видят только
+        зафиксированные транзакции и не ждут писателя. База ':memory:' размещается
+        во временном файле, который удаляется при закрытии, чтобы её видели все
+        соединения пула.
+
+        :param path: Путь к файлу базы данных или ':memory:'
+        :type path: str
+        :param pool_size: Количество соединений для читателей
+        :type pool_size: int
+        :param capacity: Сколько последних изменений хранить для changes_since
+        :type capacity: int
+        """
+        self.path = path
+        self.capacity = capacity
+        self._directory = None
+        if path == ":memory:":
+            self._directory = tempfile.TemporaryDirectory(prefix="library-")
+            database = os.path.join(self._directory.name, "library.db")
+        else:
+            database = path
+        self._writer = sqlite3.connect(database, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        if self._directory is not None:
+            self._writer.execute("PRAGMA synchronous = OFF")
+        with self._writer:
+            for statement in _SCHEMA:
+                self._writer.execute(statement)
+            self._upgrade()
+        self._database = database
+        self._readers = ConnectionPool(database, pool_size)
+        self._write_lock = threading.Lock()
+        self.books = SQLiteCatalog(self)
+        self.indexes = self.books
+        self.inventory = SQLiteInventory(self)
+        self.instrumentation: Instrumentation | None = None
+        # Подключённые индексы и производные структуры в памяти: {ключ: (структура, версия)}.
+        self._registered: dict[str, BaseIndex] = {}
+        self._derived: dict[tuple, tuple] = {}
+        self._lock = threading.RLock()
+
+    def _upgrade(self) -> None:
+        """Добавляет столбцы учёта экземпляров в таблицу книг, созданную без них"""
+        columns = {row[1] for row in self._writer.execute("PRAGMA table_info(books)")}
+        for column, definition in _INVENTORY_COLUMNS.items():
+            if column not in columns:
+                self._writer.execute(f"ALTER TABLE books ADD COLUMN {column} {definition}")
+
+    def close(self) -> None:
+        """Закрывает все соединения с базой; временная база ':memory:' удаляется"""
+        self._readers.close()
+        self._writer.close()
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+
+    def __enter__(self) -> "SQLiteLibrary":
+        """
+        Вход в контекст
+
+        :return: Эта библиотека
+        :rtype: SQLiteLibrary
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Выход из контекста с закрытием соединений"""
+        self.close()
+
+    @contextmanager
+    def _reader(self):
+        """
+        Соединение для чтения на время блока with
+
+        :return: Менеджер контекста, выдающий соединение из пула
+        """
+        with self._readers.connection() as connection:
+            yield connection
+
+    @contextmanager
+    def _consistent_reader(self):
+        """
+        Соединение, все запросы через которое в блоке with читают один снимок базы
+
+        :return: Менеджер контекста, выдающий соединение внутри читающей транзакции
+        """
+        with self._reader() as connection:
+            if connection.in_transaction:
+                yield connection
+                return
+            connection.execute("BEGIN")
+            try:
+                yield connection
+            finally:
+                connection.rollback()
+
+    @property
+    def version(self) -> int:
+        """
+        Версия библиотеки: количество изменений с момента создания базы
+
+        :return: Версия
+        :rtype: int
+        """
+        row = self._fetch_one(_VERSION)
+        return row[0] if row is not None else 0
+
+    def changes_since(self, version: int) -> list:
+        """
+        Изменения библиотеки после указанной версии
+
+        :param version: Последняя версия, известная потребителю
+        :type version: int
+        :return: Список изменений (Change) в порядке версий
+        :rtype: list
+        :raises ValueError: Если version больше текущей версии или отрицательна
+        :raises ChangeFeedOverflow: Если изменения уже удалены из ленты
+        """
+        with self._consistent_reader() as connection:
+            row = connection.execute(_VERSION).fetchone()
+            current = row[0] if row is not None else 0
+            if version < 0 or version > current:
+                raise ValueError(f"Некорректная версия: {version} (текущая {current})")
+            oldest = connection.execute(_OLDEST_CHANGE).fetchone()[0]
+            if version < current and (oldest is None or oldest > version + 1):
+                first = oldest if oldest is not None else current + 1
+                raise ChangeFeedOverflow(
+                    f"Изменения после версии {version} удалены из ленты, "
+                    f"доступны версии начиная с {first}"
+                )
+            rows = connection.execute(_CHANGES_SINCE, (version,)).fetchall()
+        return [Change(row[0], row[1], _book(row[2:])) for row in rows]
+
+    def enable_instrumentation(self, instrumentation=None):
+        """
+        Включает сбор статистики по операциям поиска
+
+        :param instrumentation: Готовый сборщик или None для создания нового
+        :type instrumentation: Instrumentation, optional
+        :return: Подключённый сборщик статистики
+        :rtype: Instrumentation
+        """
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
+        return instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """Отключает сбор статистики"""
+        self.instrumentation = None
+
+    def _fetch_one(self, sql: str, parameters=()):
+        """
+        Первая строка результата запроса через соединение из пула
+
+        :param sql: Текст запроса
+        :type sql: str
+        :param parameters: Параметры запроса
+        :return: Строка или None
+        :rtype: tuple or None
+        """
+        with self._reader() as connection:
+            return connection.execute(sql, parameters).fetchone()
+
+    def _fetch_books(self, sql: str, parameters=()) -> BookCollection:
+        """
+        Книги из результата запроса через соединение из пула
+
+        :param sql: Текст запроса
+        :type sql: str
+        :param parameters: Параметры запроса
+        :return: Коллекция книг
+        :rtype: BookCollection
+        """
+        with self._reader() as connection:
+            return BookCollection(_book(row) for row in connection.execute(sql, parameters))
+
+    def add_book(self, book: Book, copies: int = 1):
+        """
+        Добавляет книгу
+
+        :param book: Книга для добавления
+        :type book: Book
+        :param copies: Количество экземпляров книги
+        :type copies: int
+        :raises ValueError: Если книга с таким ISBN уже существует или copies не положительно
+        """
+        self._check_count(copies)
+        with self._write_lock:
+            try:
+                with self._writer:
+                    self._writer.execute(_INSERT_COPIES, _row(book) + (copies,))
+                    self._prune_changes()
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Книга с ISBN '{book.isbn}' уже существует в библиотеке")
+
+    def add_books(self, books, skip_duplicates: bool = False) -> int:
+        """
+        Добавляет несколько книг одной транзакцией через executemany
+
+        Книги читаются потоково, поэтому загрузка не требует держать весь каталог в памяти.
+        Без skip_duplicates вставка атомарна: при первом дубликате ISBN транзакция откатывается.
+
+        :param books: Итерируемый объект с книгами
+        :type books: iterable
+        :param skip_duplicates: Пропускать книги с уже существующим ISBN вместо ошибки
+        :type skip_duplicates: bool
+        :return: Количество добавленных книг
+        :rtype: int
+        :raises ValueError: Если найден дубликат ISBN и skip_duplicates равен False
+        """
+        sql = _INSERT_OR_IGNORE if skip_duplicates else _INSERT
+        with self._write_lock:
+            try:
+                with self._writer:
+                    cursor = self._writer.executemany(sql, (_row(book) for book in books))
+                    added = max(cursor.rowcount, 0)
+                    self._prune_changes()
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Дубликат ISBN в пакете, ни одна книга не добавлена: {e}")
+            return added
+
+    def remove_book(self, book: Book):
+        """
+        Удаляет книгу по ISBN вместе с учётом её экземпляров
+
+        :param book: Книга для удаления
+        :type book: Book
+        """
+        with self._write_lock:
+            with self._writer:
+                self._writer.execute(_DELETE, (book.isbn,))
+                self._prune_changes()
+
+    def remove_books(self, books) -> int:
+        """
+        Удаляет много книг одной транзакцией через executemany
+
+        :param books: Итерируемый объект с книгами или ISBN либо предикат,
+            вызываемый для каждой книги каталога
+        :type books: iterable or Callable
+        :return: Количество удалённых книг
+        :rtype: int
+        """
+        with self._write_lock:
+            if callable(books):
+                isbns = [book.isbn for book in self.books if books(book)]
+            else:
+                isbns = [item.isbn if isinstance(item, Book) else item for item in books]
+            with self._writer:
+                cursor = self._writer.executemany(_DELETE, ((isbn,) for isbn in isbns))
+                removed = max(cursor.rowcount, 0)
+                self._prune_changes()
+            return removed
+
+    def snapshot(self) -> "SQLiteSnapshot":
+        """
+        Неизменяемый снимок библиотеки на текущий момент
+
+        Снимок держит читающую транзакцию WAL на отдельном соединении, поэтому
+        создаётся за O(1), не блокирует писателей и не видит последующих изменений.
+        Подключённые индексы снимок строит заново при первом обращении. Снимок
+        нужно закрыть (close или with), иначе WAL не сможет сократиться.
+
+        :return: Снимок библиотеки
+        :rtype: SQLiteSnapshot
+        """
+        with self._lock:
+            return SQLiteSnapshot(self)
+
+    def _prune_changes(self) -> None:
+        """Оставляет в ленте изменений не больше capacity последних записей"""
+        self._writer.execute(_PRUNE_CHANGES, (self.capacity,))
+
+    @staticmethod
+    def _check_count(count: int) -> None:
+        """
+        Проверяет количество экземпляров в операции
+
+        :param count: Количество
+        :type count: int
+        :raises InventoryError: Если количество не положительно
+        """
+        if count <= 0:
+            raise InventoryError(f"Количество экземпляров должно быть положительным: {count}")
+
+    def _update_inventory(self, sql: str, isbn: str, count: int, parameters: tuple) -> tuple:
+        """
+        Изменяет счётчики экземпляров книги одним условным UPDATE
+
+        :param sql: Текст запроса UPDATE
+        :type sql: str
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество экземпляров в операции
+        :type count: int
+        :param parameters: Параметры запроса
+        :type parameters: tuple
+        :return: Кортеж (экземпляров, выдано) до изменения и признак, что условие выполнено
+        :rtype: tuple
+        :raises InventoryError: Если count не положительно или книги нет в каталоге
+        """
+        self._check_count(count)
+        with self._write_lock:
+            with self._writer:
+                before = self._writer.execute(_INVENTORY, (isbn,)).fetchone()
+                if before is None:
+                    raise InventoryError(f"Книга с ISBN '{isbn}' не найдена в библиотеке")
+                updated = self._writer.execute(sql, parameters).rowcount > 0
+        return before, updated
+
+    def add_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Добавляет экземпляры книги из каталога
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество новых экземпляров
+        :type count: int
+        :return: Общее количество экземпляров книги
+        :rtype: int
+        :raises InventoryError: Если книги нет в каталоге или count не положительно
+        """
+        (copies, _), _ = self._update_inventory(_ADD_COPIES, isbn, count, (count, isbn))
+        return copies + count
+
+    def remove_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Списывает свободные экземпляры книги; книга остаётся в каталоге
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество списываемых экземпляров
+        :type count: int
+        :return: Оставшееся количество экземпляров книги
+        :rtype: int
+        :raises InventoryError: Если книги нет в каталоге или свободных экземпляров меньше count
+        """
+        (copies, checked_out), updated = self._update_inventory(_REMOVE_COPIES, isbn, count,
+                                                                (count, isbn, count))
+        if not updated:
+            raise InventoryError(
+                f"Нельзя списать {count} экз. книги '{isbn}': свободно {copies - checked_out}"
+            )
+        return copies - count
+
+    def checkout(self, isbn: str, count: int = 1) -> int:
+        """
+        Выдаёт экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество выдаваемых экземпляров
+        :type count: int
+        :return: Количество оставшихся свободных экземпляров
+        :rtype: int
+        :raises InventoryError: Если книги нет в каталоге или свободных экземпляров меньше count
+        """
+        (copies, checked_out), updated = self._update_inventory(_CHECKOUT, isbn, count,
+                                                                (count, isbn, count))
+        if not updated:
+            raise InventoryError(
+                f"Нет свободных экземпляров книги '{isbn}' (свободно {copies - checked_out})"
+            )
+        return copies - checked_out - count
+
+    def return_copies(self, isbn: str, count: int = 1) -> int:
+        """
+        Принимает возвращённые экземпляры книги
+
+        :param isbn: ISBN книги
+        :type isbn: str
+        :param count: Количество возвращаемых экземпляров
+        :type count: int
+        :return: Количество свободных экземпляров после возврата
+        :rtype: int
+        :raises InventoryError: Если книги нет в каталоге или выданных экземпляров меньше count
+        """
+        (copies, checked_out), updated = self._update_inventory(_RETURN, isbn, count,
+                                                                (count, isbn, count))
+        if not updated:
+            raise InventoryError(f"Книга '{isbn}' выдана в количестве {checked_out} экз.")
+        return copies - checked_out + count
+
+    def register_index(self, name: str, index) -> None:
+        """
+        Подключает вторичный индекс в памяти; он строится по текущим книгам и далее
+        догоняет базу по ленте изменений при каждом обращении
+
+        :param name: Имя индекса, используемое в запросах
+        :type name: str
+        :param index: Пустой индекс (HashIndex, MultiValueIndex, SortedIndex, TextIndex)
+        :type index: BaseIndex
+        :raises ValueError: Если индекс с таким именем уже подключён или это поле книги
+        """
+        with self._lock:
+            if name in self._registered or name in BOOK_FIELDS:
+                raise ValueError(f"Индекс '{name}' уже подключён")
+            self._registered[name] = index
+            self._derived[("index", name)] = (index, self._build(index))
+
+    def unregister_index(self, name: str) -> None:
+        """
+        Отключает вторичный индекс
+
+        :param name: Имя индекса
+        :type name: str
+        :raises ValueError: Если индекс не подключён
+        """
+        with self._lock:
+            if name not in self._registered:
+                raise ValueError(f"Индекс '{name}' не подключён")
+            del self._registered[name]
+            del self._derived[("index", name)]
+
+    def _build(self, structure) -> int:
+        """
+        Заполняет структуру в памяти всеми книгами одного снимка базы
+
+        :param structure: Пустая структура с методом add
+        :return: Версия, по которой структура построена
+        :rtype: int
+        """
+        with self._consistent_reader() as connection:
+            row = connection.execute(_VERSION).fetchone()
+            for book_row in connection.execute(_SELECT_ALL):
+                structure.add(_book(book_row))
+        return row[0] if row is not None else 0
+
+    def _synced(self, key: tuple, create):
+        """
+        Производная структура в памяти, согласованная с базой; вызывается под self._lock
+
+        Структура строится при первом обращении и далее догоняет базу по ленте
+        изменений, в том числе по изменениям других процессов; при переполнении
+        ленты строится заново.
+
+        :param key: Ключ структуры
+        :type key: tuple
+        :param create: Функция, создающая пустую структуру с методами add и remove
+        :type create: Callable
+        :return: Структура
+        """
+        entry = self._derived.get(key)
+        if entry is not None:
+            structure, version = entry
+            if version == self.version:
+                return structure
+            try:
+                changes = self.changes_since(version)
+            except ChangeFeedOverflow:
+                pass
+            else:
+                for change in changes:
+                    if change.kind == 'add':
+                        structure.add(change.book)
+                    else:
+                        structure.remove(change.book)
+                if changes:
+                    self._derived[key] = (structure, changes[-1].version)
+                return structure
+        structure = create()
+        self._derived[key] = (structure, self._build(structure))
+        return structure
+
+    def _index(self, name: str):
+        """
+        Подключённый индекс, согласованный с базой; вызывается под self._lock
+
+        :param name: Имя индекса
+        :type name: str
+        :return: Индекс
+        :rtype: BaseIndex
+        """
+        return self._synced(("index", name), self._registered[name].empty)
+
+    def _is_unique_index(self, name: str) -> bool:
+        """
+        Проверяет, подключён ли под именем уникальный индекс
+
+        :param name: Имя индекса или поля
+        :type name: str
+        :return: True для уникального подключённого индекса
+        :rtype: bool
+        """
+        index = self._registered.get(name)
+        return index is not None and index.unique
+
+    @instrumented("search_by_isbn")
+    def search_by_isbn(self, isbn: str):
+        """
+        Поиск книги по ISBN (уникальный индекс)
+
+        :param isbn: ISBN для поиска
+        :type isbn: str
+        :return: Найденная книга или None
+        :rtype: Book or None
+        """
+        row = self._fetch_one(f"SELECT {_COLUMNS} FROM books WHERE isbn = ?", (isbn,))
+        return _book(row) if row is not None else None
+
+    @instrumented("search_by_author")
+    def search_by_author(self, author: str):
+        """
+        Поиск всех книг автора (индекс books_author)
+
+        :param author: Имя автора
+        :type author: str
+        :return: Коллекция книг автора
+        :rtype: BookCollection
+        """
+        return self.search('author', author)
+
+    @instrumented("search_by_year")
+    def search_by_year(self, year: int):
+        """
+        Поиск всех книг года издания (индекс books_year)
+
+        :param year: Год издания
+        :type year: int
+        :return: Коллекция книг данного года
+        :rtype: BookCollection
+        """
+        return self.search('year', year)
+
+    @instrumented("search_by_genre")
+    def search_by_genre(self, genre: str):
+        """
+        Поиск всех книг жанра (индекс books_genre)
+
+        :param genre: Жанр
+        :type genre: str
+        :return: Коллекция книг жанра
+        :rtype: BookCollection
+        """
+        return self.search('genre', genre)
+
+    def search(self, field: str, value):
+        """
+        Поиск книг по полю (индекс SQLite) или подключённому индексу
+
+        :param field: Имя поля книги или подключённого индекса
+        :type field: str
+        :param value: Значение (для текстового индекса — слова запроса)
+        :return: Коллекция найденных книг
+        :rtype: BookCollection
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        if field in self._registered:
+            with self._lock:
+                return BookCollection(self._index(field).lookup(value))
+        column = _column(field)
+        return self._fetch_books(f"SELECT {_COLUMNS} FROM books WHERE {column} = ? ORDER BY id",
+                                 (value,))
+
+    def search_range(self, field: str, low=None, high=None):
+        """
+        Поиск книг со значением поля в диапазоне [low, high]
+
+        :param field: Имя поля книги
+        :type field: str
+        :param low: Нижняя граница включительно или None
+        :param high: Верхняя граница включительно или None
+        :return: Коллекция найденных книг
+        :rtype: BookCollection
+        :raises KeyError: Если поле неизвестно
+        """
+        column = _column(field)
+        conditions, parameters = _range_clauses(column, low, high)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return self._fetch_books(f"SELECT {_COLUMNS} FROM books {where}ORDER BY {column}, id",
+                                 parameters)
+
+    def fuzzy_search(self, field: str, query: str, max_distance: int = 2, limit: int = 10) -> list:
+        """
+        Нечёткий поиск значений поля с учётом опечаток
+
+        Нечёткий индекс поля (значения и их триграммы, без книг) строится в памяти
+        при первом обращении и далее догоняет базу по ленте изменений.
+
+        :param field: Текстовое поле книги: 'author', 'title' или 'genre'
+        :type field: str
+        :param query: Запрос
+        :type query: str
+        :param max_distance: Максимальное расстояние Левенштейна
+        :type max_distance: int
+        :param limit: Максимальное количество результатов
+        :type limit: int
+        :return: Список пар (значение, расстояние), лучшие совпадения первыми
+        :rtype: list
+        :raises KeyError: Если поле не является текстовым полем книги
+        """
+        if field not in ('author', 'title', 'genre'):
+            raise KeyError(f"Нечёткий поиск по полю '{field}' не поддерживается")
+        with self._lock:
+            index = self._synced(("fuzzy", field), partial(FuzzyIndex, field))
+            return index.search(query, max_distance, limit)
+
+    def search_by_author_fuzzy(self, author: str, max_distance: int = 2):
+        """
+        Поиск книг авторов, имя которых похоже на запрос
+
+        :param author: Имя автора, возможно с опечатками
+        :type author: str
+        :param max_distance: Максимальное расстояние Левенштейна
+        :type max_distance: int
+        :return: Коллекция книг найденных авторов, лучшие совпадения первыми
+        :rtype: BookCollection
+        """
+        result = BookCollection()
+        for name, _ in self.fuzzy_search('author', author, max_distance):
+            result.extend(self.search('author', name))
+        return result
+
+    def _page(self, where: str, parameters: tuple, limit: int, offset: int,
+              sort_by, reverse: bool) -> Page:
+        """
+        Страница результатов с подсчётом общего количества
+
+        :param where: Условие WHERE (пустая строка — все книги)
+        :type where: str
+        :param parameters: Параметры условия
+        :type parameters: tuple
+        :param limit: Размер страницы
+        :type limit: int
+        :param offset: Смещение первой книги
+        :type offset: int
+        :param sort_by: Поле сортировки или None
+        :type sort_by: str or None
+        :param reverse: Сортировать по убыванию
+        :type reverse: bool
+        :return: Страница результатов
+        :rtype: Page
+        :raises ValueError: Если limit или offset отрицательные или поле сортировки неизвестно
+        """
+        if limit < 0 or offset < 0:
+            raise ValueError("limit и offset должны быть неотрицательными")
+        order = _order_by(sort_by, reverse)
+        with self._consistent_reader() as connection:
+            total = connection.execute(f"SELECT COUNT(*) FROM books {where}",
+                                       parameters).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT {_COLUMNS} FROM books {where} {order} LIMIT ? OFFSET ?",
+                parameters + (limit, offset),
+            )
+            books = BookCollection(_book(row) for row in rows)
+        return Page(books, total, offset, limit)
+
+    def search_page(self, field: str, value, limit: int = 10, offset: int = 0,
+                    sort_by=None, reverse: bool = False) -> Page:
+        """
+        Постраничный поиск книг по полю: LIMIT/OFFSET и сортировка выполняются в SQLite
+
+        :param field: Имя поля книги
+        :type field: str
+        :param value: Значение поля
+        :param limit: Размер страницы
+        :type limit: int
+        :param offset: Смещение первой книги страницы
+        :type offset: int
+        :param sort_by: Поле сортировки ('title', 'author', 'year') или None
+        :type sort_by: str or None
+        :param reverse: Сортировать по убыванию
+        :type reverse: bool
+        :return: Страница результатов
+        :rtype: Page
+        """
+        column = _column(field)
+        return self._page(f"WHERE {column} = ?", (value,), limit, offset, sort_by, reverse)
+
+    def list_page(self, limit: int = 10, offset: int = 0, sort_by=None,
+                  reverse: bool = False) -> Page:
+        """
+        Постраничный список всех книг
+
+        :param limit: Размер страницы
+        :type limit: int
+        :param offset: Смещение первой книги страницы
+        :type offset: int
+        :param sort_by: Поле сортировки ('title', 'author', 'year') или None
+        :type sort_by: str or None
+        :param reverse: Сортировать по убыванию
+        :type reverse: bool
+        :return: Страница результатов
+        :rtype: Page
+        """
+        return self._page("", (), limit, offset, sort_by, reverse)
+
+    def iter_sorted(self, sort_by: str, start=None, reverse: bool = False,
+                    chunk_size: int = FETCH_SIZE):
+        """
+        Потоковая итерация в порядке сортировки по индексу: каждая порция — запрос
+        с условием «после последней выданной книги», без OFFSET
+
+        :param sort_by: Поле сортировки: 'title', 'author' или 'year'
+        :type sort_by: str
+        :param start: Значение поля, с которого начать (при reverse — значения не больше start)
+        :param reverse: По убыванию
+        :type reverse: bool
+        :param chunk_size: Размер порции
+        :type chunk_size: int
+        :return: Генератор книг
+        :rtype: Iterator
+        :raises ValueError: Если поле сортировки неизвестно
+        """
+        order = _order_by(sort_by, reverse)
+        compare = "<" if reverse else ">"
+        after = None
+        parameters: tuple
+        while True:
+            if after is not None:
+                where, parameters = f"WHERE ({sort_by}, id) {compare} (?, ?)", after
+            elif start is not None:
+                where, parameters = f"WHERE {sort_by} {compare}= ?", (start,)
+            else:
+                where, parameters = "", ()
+            with self._reader() as connection:
+                rows = connection.execute(
+                    f"SELECT {_COLUMNS}, {sort_by}, id FROM books {where} {order} LIMIT ?",
+                    parameters + (chunk_size,),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _book(row[:5])
+            after = rows[-1][5:]
+
+    def top_k(self, field: str, value, k: int, sort_by: str, reverse: bool = False):
+        """
+        Первые k найденных книг в порядке сортировки
+
+        :param field: Имя поля книги
+        :type field: str
+        :param value: Значение поля
+        :param k: Количество книг
+        :type k: int
+        :param sort_by: Поле сортировки: 'title', 'author' или 'year'
+        :type sort_by: str
+        :param reverse: Сортировать по убыванию
+        :type reverse: bool
+        :return: Коллекция из не более чем k книг
+        :rtype: BookCollection
+        """
+        return self.search_page(field, value, max(k, 0), 0, sort_by, reverse).books
+
+    def get_random_book(self, rng=random):
+        """
+        Случайная книга за O(log n) по индексу первичного ключа
+
+        Выбирается случайный id в диапазоне [MIN(id), MAX(id)] и первая книга с id не меньше
+        него; после удалений книги, следующие за пропусками, выбираются чаще.
+
+        :param rng: Генератор случайных чисел
+        :return: Случайная книга или None если библиотека пуста
+        :rtype: Book or None
+        """
+        low, high = self._fetch_one(_ID_RANGE)
+        if low is None:
+            return None
+        row = self._fetch_one(_RANDOM, (rng.randint(low, high),))
+        return _book(row) if row is not None else None
+
+    def sample(self, k: int, field=None, value=None, weight=None, rng=random):
+        """
+        Случайная выборка k различных книг без возвращения
+
+        Без весов из базы читаются id кандидатов и затем только выбранные книги.
+        С весами кандидаты просматриваются потоково (алгоритм Эфраимидиса-Спиракиса).
+
+        :param k: Количество книг
+        :type k: int
+        :param field: Имя поля книги или подключённого индекса для фильтра (необязательно)
+        :type field: str, optional
+        :param value: Значение фильтра
+        :param weight: Функция веса книги (необязательно)
+        :type weight: Callable, optional
+        :param rng: Генератор случайных чисел
+        :return: Коллекция выбранных книг
+        :rtype: BookCollection
+        :raises ValueError: Если k больше числа кандидатов (без весов) или отрицательно
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        if weight is not None:
+            candidates = self.books if field is None else self.search(field, value)
+            return BookCollection(weighted_sample(candidates, k, weight, rng))
+        if field in self._registered:
+            return BookCollection(rng.sample(list(self.search(field, value)), k))
+        where, parameters = _where([] if field is None else [Condition(field, value)])
+        with self._consistent_reader() as connection:
+            ids = [row[0] for row in connection.execute(f"SELECT id FROM books {where}",
+                                                        parameters)]
+            chosen = rng.sample(ids, k)
+            return BookCollection(
+                _book(connection.execute(_SELECT_BY_ID, (book_id,)).fetchone())
+                for book_id in chosen
+            )
+
+    def weighted_sampler(self, weight, field=None, value=None):
+        """
+        Взвешенная выборка с возвращением по текущему содержимому библиотеки
+
+        :param weight: Функция веса книги
+        :type weight: Callable
+        :param field: Имя поля книги или подключённого индекса для фильтра (необязательно)
+        :type field: str, optional
+        :param value: Значение фильтра
+        :return: Объект взвешенной выборки
+        :rtype: WeightedSampler
+        """
+        candidates = self.books if field is None else self.search(field, value)
+        return WeightedSampler(list(candidates), weight)
+
+    def count(self, field=None, value=None) -> int:
+        """
+        Количество книг без загрузки их в память
+
+        :param field: Имя поля (None — все книги)
+        :type field: str, optional
+        :param value: Значение поля
+        :return: Количество книг
+        :rtype: int
+        :raises KeyError: Если поле неизвестно
+        """
+        if field is None:
+            return self._fetch_one(_COUNT)[0]
+        if field in self._registered:
+            return len(self.search(field, value))
+        column = _column(field)
+        return self._fetch_one(f"SELECT COUNT(*) FROM books WHERE {column} = ?", (value,))[0]
+
+    def facet(self, name: str, top=None) -> dict:
+        """
+        Количество книг по значениям фасета (GROUP BY по индексу)
+
+        :param name: Имя поля книги или 'decade'
+        :type name: str
+        :param top: Сколько самых частых значений вернуть (None — все)
+        :type top: int, optional
+        :return: Словарь {значение: количество книг} по убыванию количества
+        :rtype: dict
+        :raises KeyError: Если фасет неизвестен
+        """
+        column = _FACET_EXPRESSIONS[name] if name in _FACET_EXPRESSIONS else _column(name)
+        sql = (f"SELECT {column} AS value, COUNT(*) AS n FROM books GROUP BY value "
+               f"ORDER BY n DESC, CAST(value AS TEXT)")
+        parameters: tuple = ()
+        if top is not None:
+            sql += " LIMIT ?"
+            parameters = (top,)
+        with self._reader() as connection:
+            return dict(connection.execute(sql, parameters))
+
+    def facets(self, names=('genre', 'author', 'decade'), top=None) -> dict:
+        """
+        Несколько фасетов одним вызовом
+
+        :param names: Имена фасетов
+        :type names: tuple
+        :param top: Сколько самых частых значений вернуть для каждого фасета
+        :type top: int, optional
+        :return: Словарь {фасет: {значение: количество книг}}
+        :rtype: dict
+        :raises KeyError: Если какой-либо фасет неизвестен
+        """
+        return {name: self.facet(name, top) for name in names}
+
+    def _plan(self, conditions: dict) -> tuple:
+        """
+        Разбирает условия query
+
+        Если есть условие по подключённому индексу, которое он может выполнить
+        (равенство или диапазон по SortedIndex), книги берутся из индекса, а
+        остальные условия проверяются фильтром. Иначе условия по полям книги
+        выполняет SQLite, а фильтром проверяются условия по подключённым индексам.
+
+        :param conditions: Условия {поле или индекс: значение или (low, high)}
+        :type conditions: dict
+        :return: Кортеж (условие индекса в памяти или None, условия для SQL, условия фильтра)
+        :rtype: tuple
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        :raises ValueError: Если диапазон задан некорректно
+        """
+        parsed = [Condition(field, value) for field, value in conditions.items()]
+        for condition in parsed:
+            if condition.field not in self._registered:
+                _column(condition.field)
+        access = None
+        for condition in parsed:
+            index = self._registered.get(condition.field)
+            if index is not None and (not condition.is_range or isinstance(index, SortedIndex)):
+                access = condition
+                break
+        if access is not None:
+            return access, [], [condition for condition in parsed if condition is not access]
+        sql = [condition for condition in parsed if condition.field not in self._registered]
+        filters = [condition for condition in parsed if condition.field in self._registered]
+        return None, sql, filters
+
+    def _execute(self, access, sql: list, filters: list) -> tuple:
+        """
+        Выполняет разобранный запрос
+
+        :param access: Условие подключённого индекса или None
+        :type access: Condition or None
+        :param sql: Условия, выполняемые SQLite
+        :type sql: list
+        :param filters: Условия, проверяемые в памяти
+        :type filters: list
+        :return: Кортеж (найденные книги, количество книг до фильтра)
+        :rtype: tuple
+        """
+        if access is not None:
+            with self._lock:
+                index = self._index(access.field)
+                if access.is_range:
+                    candidates = list(index.range(*access.value))
+                else:
+                    candidates = list(index.lookup(access.value))
+        else:
+            where, parameters = _where(sql)
+            candidates = list(self._fetch_books(f"SELECT {_COLUMNS} FROM books {where}ORDER BY id",
+                                                parameters))
+        checks = [_matcher(condition, self._registered.get(condition.field))
+                  for condition in filters]
+        result = [book for book in candidates if all(check(book) for check in checks)]
+        return BookCollection(result), len(candidates)
+
+    def query(self, **conditions):
+        """
+        Поиск книг по нескольким условиям (см. _plan)
+
+        Значение условия — искомое значение или кортеж (low, high) для диапазона.
+
+        :param conditions: Условия {имя индекса или поля книги: значение}
+        :return: Коллекция найденных книг
+        :rtype: BookCollection
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        result, _ = self._execute(*self._plan(conditions))
+        return result
+
+    def explain(self, analyze: bool = True, **conditions) -> SQLiteExplanation:
+        """
+        План запроса query(): путь доступа по EXPLAIN QUERY PLAN и фактические значения
+
+        Фактически просмотренными считаются книги, выбранные индексом пути доступа
+        (для Seq Scan — все книги).
+
+        :param analyze: Выполнить запрос и измерить фактическое число просмотренных
+            и найденных книг
+        :type analyze: bool
+        :param conditions: Условия {имя индекса или поля книги: значение}
+        :return: Результат EXPLAIN (as_dict() и format())
+        :rtype: SQLiteExplanation
+        :raises KeyError: Если нет ни индекса, ни поля с таким именем
+        """
+        access, sql, filters = self._plan(conditions)
+        if access is not None:
+            kind = "Index Range Scan" if access.is_range else "Index Scan"
+            explanation = SQLiteExplanation(kind, access.field,
+                                            f"{kind} using {access.field} ({access})", filters)
+            scanned = None
+        else:
+            where, parameters = _where(sql)
+            with self._reader() as connection:
+                details = [row[-1] for row in connection.execute(
+                    f"EXPLAIN QUERY PLAN SELECT {_COLUMNS} FROM books {where}ORDER BY id",
+                    parameters)]
+            found = [match.group(1) for match in map(_PLAN_INDEX.search, details) if match]
+            scanned = next((c for c in sql if found and c.field == found[0]), None)
+            kind = "Seq Scan" if scanned is None else (
+                "Index Range Scan" if scanned.is_range else "Index Scan")
+            explanation = SQLiteExplanation(
+                kind, scanned.field if scanned is not None else None, "; ".join(details),
+                [condition for condition in sql if condition is not scanned] + filters)
+        if analyze:
+            started = time.perf_counter()
+            result, examined = self._execute(access, sql, filters)
+            explanation.elapsed = time.perf_counter() - started
+            if access is None:
+                where, parameters = _where([scanned] if scanned is not None else [])
+                examined = self._fetch_one(f"SELECT COUNT(*) FROM books {where}", parameters)[0]
+            explanation.actual_examined = examined
+            explanation.actual_rows = len(result)
+        return explanation
+
+    def __str__(self):
+        """
+        Строковое представление библиотеки
+
+        :return: Строка с информацией о количестве книг
+        :rtype: str
+        """
+        return (f"Общее количество книг: {self.inventory.total_copies},"
+                f" количество уникальных книг: {self.count()}")
+
+
+class SQLiteSnapshot(SQLiteLibrary):
+    """Неизменяемый снимок SQLiteLibrary: читающая транзакция на отдельном соединении."""
+
+    def __init__(self, library: SQLiteLibrary):
+        """
+        Открывает соединение и фиксирует снимок базы первым чтением
+
+        :param library: Библиотека, снимок которой создаётся
+        :type library: SQLiteLibrary
+        """
+        self.path = library.path
+        self.capacity = library.capacity
+        self._directory = None
+        self._database = library._database
+        self._connection = sqlite3.connect(library._database, check_same_thread=False)
+        self._connection.execute("BEGIN")
+        row = self._connection.execute(_VERSION).fetchone()
+        self._version = row[0] if row is not None else 0
+        self._connection_lock = threading.RLock()
+        self.books = SQLiteCatalog(self)
+        self.indexes = self.books
+        self.inventory = SQLiteInventory(self)
+        self.instrumentation = None
+        self._registered = dict(library._registered)
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    def close(self) -> None:
+        """Завершает читающую транзакцию и закрывает соединение снимка"""
+        self._connection.rollback()
+        self._connection.close()
+
+    @contextmanager
+    def _reader(self):
+        """
+        Соединение снимка на время блока with
+
+        :return: Менеджер контекста, выдающий соединение внутри транзакции снимка
+        """
+        with self._connection_lock:
+            yield self._connection
+
+    @property
+    def version(self) -> int:
+        """
+        Версия библиотеки на момент снимка
+
+        :return: Версия
+        :rtype: int
+        """
+        return self._version
+
+    def changes_since(self, version: int) -> list:
+        """
+        Снимок не читает ленту изменений
+
+        :raises TypeError: Всегда
+        """
+        raise TypeError("Снимок библиотеки не хранит ленту изменений")
+
+    def _read_only(self, *args, **kwargs):
+        """
+        Запрещает изменение снимка
+
+        :raises TypeError: Всегда
+        """
+        raise TypeError("Снимок библиотеки доступен только для чтения")
+
+    add_book = _read_only
+    add_books = _read_only
+    remove_book = _read_only
+    remove_books = _read_only
+    register_index = _read_only
+    unregister_index = _read_only
+    add_copies = _read_only
+    remove_copies = _read_only
+    checkout = _read_only
+    return_copies = _read_only
+
+    def snapshot(self) -> "SQLiteSnapshot":
+        """
+        Снимок неизменяем, поэтому возвращается он сам
+
+        :return: Этот же снимок
+        :rtype: SQLiteSnapshot
+        """
+        return self
@@ -0,0 +1,165 @@
+import json
+import pytest
+from io import StringIO
+from src.batch import execute_command, run_batch
+from src.book import Book
+from src.library import Library
+
+
+@pytest.fixture
+def library():
+    library = Library()
+    library.add_book(Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"))
+    library.add_book(Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"))
+    return library
+
+
+class TestExecuteCommand:
+    def test_add(self, library):
+        command = 'add "Мастер и Маргарита" "Михаил Булгаков" 1967 Фантастика 978-3'
+        result = execute_command(library, command)
+        assert result["ok"]
+        assert result["book"]["title"] == "Мастер и Маргарита"
+        assert library.search_by_isbn("978-3") is not None
+
+    def test_add_invalid_year(self, library):
+        result = execute_command(library, "add Книга Автор год Жанр 978-9")
+        assert not result["ok"]
+        assert "Год" in result["error"]
+
+    def test_add_duplicate(self, library):
+        result = execute_command(library, "add Книга Автор 2000 Жанр 978-1")
+        assert not result["ok"]
+        assert "уже существует" in result["error"]
+
+    def test_remove(self, library):
+        result = execute_command(library, "remove 978-1")
+        assert result["ok"]
+        assert len(library.books) == 1
+
+    def test_remove_missing(self, library):
+        assert not execute_command(library, "remove 999")["ok"]
+
+    def test_search_with_limit(self, library):
+        result = execute_command(library, 'search author "Лев Толстой" 1')
+        assert result["total"] == 2
+        assert result["next_offset"] == 1
+        assert len(result["books"]) == 1
+
+    def test_search_by_year(self, library):
+        result = execute_command(library, "search year 1877")
+        assert [book["isbn"] for book in result["books"]] == ["978-2"]
+
+    def test_search_unknown_field(self, library):
+        assert not execute_command(library, "search publisher АСТ")["ok"]
+
+    def test_explain(self, library):
+        result = execute_command(library, 'explain "author=Лев Толстой" year=1860..1870')
+        assert result["ok"]
+        assert result["access"] == "Index Scan"
+        assert result["index"] == "author"
+        assert result["actual"] == {**result["actual"], "examined": 2, "rows": 1}
+
+    def test_explain_unknown_field(self, library):
+        result = execute_command(library, "explain publisher=АСТ")
+        assert not result["ok"]
+        assert "publisher" in result["error"]
+
+    def test_checkout_and_return(self, library):
+        assert not execute_command(library, "checkout 978-1 2")["ok"]
+        assert execute_command(library, "checkout 978-1")["available"] == 0
+        result = execute_command(library, "checkout 978-1")
+        assert not result["ok"]
+        assert "Нет свободных" in result["error"]
+        assert execute_command(library, "return 978-1")["available"] == 1
+
+    def test_checkout_missing(self, library):
+        assert not execute_command(library, "checkout 999")["ok"]
+
+    def test_facet(self, library):
+        result = execute_command(library, "facet decade")
+        assert result["counts"] == [{"value": 1860, "count": 1}, {"value": 1870, "count": 1}]
+
+    def test_facet_unknown(self, library):
+        assert not execute_command(library, "facet publisher")["ok"]
+
+    def test_export(self, library):
+        result = execute_command(library, "export")
+        assert [book["isbn"] for book in result["books"]] == ["978-1", "978-2"]
+
+    def test_unknown_command(self, library):
+        result = execute_command(library, "drop all")
+        assert not result["ok"]
+        assert result["command"] == "drop"
+
+    def test_unbalanced_quotes(self, library):
+        assert not execute_command(library, 'search author "Лев')["ok"]
+
+    @pytest.mark.parametrize("line", ["", "   \t"])
+    def test_empty_command(self, library, line):
+        assert execute_command(library, line) == {"command": None, "ok": False,
+                                                  "error": "Пустая команда"}
+
+
+class TestRunBatch:
+    def test_json_lines_output(self, library):
+        output = StringIO()
+        lines = ["# комментарий", "", "remove 978-1", "export"]
+        exit_code = run_batch(lines, library, output)
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert exit_code == 0
+        assert [result["command"] for result in results] == ["remove", "export"]
+
+    def test_exit_code_on_error(self, library):
+        assert run_batch(["remove 999"], library, StringIO()) == 1
+
+
+class TestFileCommands:
+    def test_export_import_csv(self, library, tmp_path):
+        path = str(tmp_path / "books.csv")
+        assert execute_command(library, f"export {path}")["exported"] == 2
+        target = Library()
+        result = execute_command(target, f"import {path}")
+        assert result["ok"]
+        assert result["invalid"] == 2
+        assert result["errors"][0]["row"] == 2
+
+    def test_export_import_columnar(self, tmp_path):
+        library = Library()
+        library.add_book(Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-5-04-194951-8"))
+        path = str(tmp_path / "books.lbc")
+        execute_command(library, f"export {path}")
+        target = Library()
+        assert execute_command(target, f"import {path}")["imported"] == 1
+
+    def test_import_dedupe(self, tmp_path):
+        library = Library()
+        library.add_book(Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-0-306-40615-7"))
+        library.add_book(Book("Война и мир", "Лев Толстой", 1869, "Роман", "0-306-40615-2"))
+        path = str(tmp_path / "books.csv")
+        execute_command(library, f"export {path}")
+        result = execute_command(Library(), f"import {path} dedupe")
+        assert result["imported"] == 1
+        assert result["merged"] == 1
+        assert result["clusters"][0]["reasons"] == ["isbn", "key"]
+
+    def test_import_unknown_flag(self, library, tmp_path):
+        assert not execute_command(library, f"import {tmp_path / 'books.csv'} fast")["ok"]
+
+    def test_export_to_missing_directory(self, library, tmp_path):
+        result = execute_command(library, f"export {tmp_path / 'missing' / 'books.csv'}")
+        assert not result["ok"]
+        assert "books.csv" in result["error"]
+
+    def test_import_missing_file(self, library, tmp_path):
+        assert not execute_command(library, f"import {tmp_path / 'missing.csv'}")["ok"]
+
+    @pytest.mark.parametrize("name, body", [("bad.csv", b"title,author\n\xff\n"),
+                                            ("bad.lbc", b"LBC1garbage")], ids=["csv", "lbc"])
+    def test_import_corrupt_file(self, library, tmp_path, name, body):
+        path = tmp_path / name
+        path.write_bytes(body)
+        output = StringIO()
+        assert run_batch([f"import {path}", "facet genre"], library, output) == 1
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [result["ok"] for result in results] == [False, True]
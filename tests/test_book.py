@@ -1,3 +1,4 @@
+import pytest
 from src.book import Book
 
 
@@ -45,3 +46,16 @@ class TestBookRepr:
         assert "Book(" in result
         assert "title='Война и мир'" in result
         assert repr(book) != str(book)
+
+
+class TestBookSerialization:
+    def test_to_dict_from_dict_roundtrip(self):
+        book = Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1")
+        restored = Book.from_dict(book.to_dict())
+        assert restored == book
+        assert restored.title == book.title
+        assert restored.year == 1869
+
+    def test_from_dict_missing_field(self):
+        with pytest.raises(KeyError):
+            Book.from_dict({"title": "Идиот"})
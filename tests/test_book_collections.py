@@ -80,6 +80,21 @@ class TestBookCollectionMethods:
         assert len(filled_collection) == 3
         assert sample_books[0] not in filled_collection
 
+    def test_remove_many(self, filled_collection, sample_books):
+        filled_collection.add(sample_books[0])
+        assert filled_collection.remove_many([sample_books[0], sample_books[2]]) == 3
+        assert list(filled_collection) == [sample_books[1], sample_books[3]]
+        assert filled_collection.count(sample_books[0]) == 0
+        assert filled_collection == BookCollection([sample_books[1], sample_books[3]])
+        assert filled_collection.remove_many([sample_books[0]]) == 0
+
+    def test_remove_many_keeps_snapshot(self, filled_collection, sample_books):
+        snapshot = filled_collection.snapshot()
+        filled_collection.remove_many(sample_books[:2])
+        assert len(snapshot) == 4
+        assert sample_books[0] in snapshot
+        assert snapshot == BookCollection(sample_books)
+
 
 class TestBookCollectionContains:
     def test_contains_existing_book(self, filled_collection, sample_books):
@@ -89,6 +104,28 @@ class TestBookCollectionContains:
         nonexistent = Book("Несуществующая", "Неизвестный", 2000, "Фантастика", "999")
         assert nonexistent not in filled_collection
 
+    def test_contains_non_book(self, filled_collection):
+        assert "978-1" not in filled_collection
+
+    def test_contains_after_remove_of_duplicate(self, sample_books):
+        collection = BookCollection([sample_books[0], sample_books[0]])
+        assert collection.count(sample_books[0]) == 2
+        collection.remove(sample_books[0])
+        assert sample_books[0] in collection
+        collection.remove(sample_books[0])
+        assert sample_books[0] not in collection
+        assert len(collection) == 0
+
+    def test_remove_missing_keeps_collection(self, filled_collection):
+        filled_collection.remove(Book("Несуществующая", "Неизвестный", 2000, "Фантастика", "999"))
+        assert len(filled_collection) == 4
+
+    def test_membership_shared_with_snapshot(self, filled_collection, sample_books):
+        snapshot = filled_collection.snapshot()
+        filled_collection.remove(sample_books[0])
+        assert sample_books[0] in snapshot
+        assert sample_books[0] not in filled_collection
+
 
 class TestIndexDictCreation:
     def test_creation_empty(self):
@@ -211,3 +248,21 @@ class TestBookCollectionEquality:
         col1 = BookCollection(sample_books[:2])
         col2 = BookCollection(sample_books[2:4])
         assert col1 != col2
+
+    def test_equality_same_books_different_order(self, sample_books):
+        col1 = BookCollection(sample_books[:2])
+        col2 = BookCollection(sample_books[1::-1])
+        assert col1.fingerprint == col2.fingerprint
+        assert col1 != col2
+
+    def test_fingerprint_follows_changes(self, sample_books):
+        col1 = BookCollection(sample_books[:2])
+        col2 = BookCollection()
+        col2.extend(sample_books[:3])
+        col2.remove(sample_books[2])
+        assert col1.fingerprint == col2.fingerprint
+        assert col1 == col2
+
+    def test_fingerprint_is_stable(self, sample_books):
+        assert BookCollection(sample_books).fingerprint == BookCollection(sample_books).fingerprint
+        assert BookCollection().fingerprint == 0
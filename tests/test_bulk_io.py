@@ -0,0 +1,142 @@
+import struct
+import pytest
+from src.book import Book
+from src.bulk_io import (BulkImportError, export_columnar, export_csv, import_columnar,
+                         import_csv, is_valid_isbn, iter_csv_chunks, parse_book)
+from src.library import Library
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-5-04-194951-8"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-5-17-087888-8"),
+        Book("Мастер, и \"Маргарита\"", "Михаил Булгаков", 1967, "Фантастика", "978-5-389-02279-9"),
+    ]
+
+
+class TestValidation:
+    def test_isbn13(self):
+        assert is_valid_isbn("978-5-04-194951-8")
+        assert is_valid_isbn("978-5-04-194951-8", check_digit=True)
+        assert not is_valid_isbn("978-5-04-194951-0", check_digit=True)
+
+    def test_isbn10(self):
+        assert is_valid_isbn("0-306-40615-2", check_digit=True)
+        assert is_valid_isbn("080442957X", check_digit=True)
+
+    def test_invalid_isbn(self):
+        assert not is_valid_isbn("978-1")
+        assert not is_valid_isbn("abc-def-ghi-j")
+
+    def test_parse_book_invalid_year(self):
+        record = {"title": "T", "author": "A", "year": "3000", "genre": "G", "isbn": "0306406152"}
+        with pytest.raises(BulkImportError):
+            parse_book(record)
+
+    def test_parse_book_missing_field(self):
+        with pytest.raises(BulkImportError):
+            parse_book({"title": "T"})
+
+
+class TestCsv:
+    def test_roundtrip(self, tmp_path, sample_books):
+        path = tmp_path / "books.csv"
+        assert export_csv(sample_books, path) == 3
+        library = Library()
+        report = import_csv(library, path, chunk_size=2)
+        assert report.imported == 3
+        assert library.search_by_isbn("978-5-389-02279-9").title == sample_books[2].title
+
+    def test_tsv_with_invalid_rows(self, tmp_path):
+        path = tmp_path / "books.tsv"
+        path.write_text(
+            "isbn\ttitle\tauthor\tyear\tgenre\n"
+            "978-5-04-194951-8\tВойна и мир\tЛев Толстой\t1869\tРоман\n"
+            "bad\tКнига\tАвтор\t1900\tРоман\n"
+            "978-5-17-087888-8\tАнна Каренина\tЛев Толстой\tгод\tРоман\n"
+            "978-5-04-194951-8\tДубликат\tЛев Толстой\t1869\tРоман\n",
+            encoding="utf-8",
+        )
+        library = Library()
+        report = import_csv(library, path, delimiter="\t")
+        assert report.imported == 1
+        assert report.invalid == 2
+        assert report.duplicates == 1
+        assert [row for row, _ in report.errors] == [3, 4]
+
+    def test_chunks_are_bounded(self, tmp_path, sample_books):
+        path = tmp_path / "books.csv"
+        export_csv(sample_books, path)
+        assert [len(chunk) for chunk in iter_csv_chunks(path, chunk_size=2)] == [2, 1]
+
+    def test_missing_columns(self, tmp_path):
+        path = tmp_path / "books.csv"
+        path.write_text("title,author\nA,B\n", encoding="utf-8")
+        with pytest.raises(BulkImportError):
+            import_csv(Library(), path)
+
+    @pytest.mark.parametrize("row", [b"\xff\xfe,A,1900,G,1\n",
+                                     b"\"" + b"A" * 200000 + b"\",B,1900,G,1\n"],
+                             ids=["utf-8", "field-size"])
+    def test_corrupt_file(self, tmp_path, row):
+        path = tmp_path / "books.csv"
+        path.write_bytes(b"title,author,year,genre,isbn\n" + row)
+        with pytest.raises(BulkImportError):
+            import_csv(Library(), path)
+
+
+def _columnar_group(author_code: int, title: bytes = b"T") -> bytes:
+    def strings(*values):
+        return struct.pack(f"<{len(values)}I", *map(len, values)) + b"".join(values)
+
+    return (struct.pack("<I", 1) + strings(title)
+            + struct.pack("<I", 1) + strings(b"A") + struct.pack("<I", author_code)
+            + struct.pack("<i", 1900)
+            + struct.pack("<I", 1) + strings(b"G") + struct.pack("<I", 0)
+            + strings(b"978-5-04-194951-8"))
+
+
+class TestColumnar:
+    def test_roundtrip(self, tmp_path, sample_books):
+        path = tmp_path / "books.lbc"
+        assert export_columnar(sample_books, path, row_group_size=2) == 3
+        library = Library()
+        report = import_columnar(library, path)
+        assert report.imported == 3
+        restored = library.search_by_isbn("978-5-17-087888-8")
+        assert (restored.title, restored.author, restored.year) == ("Анна Каренина", "Лев Толстой", 1877)
+
+    def test_invalid_books_skipped(self, tmp_path):
+        path = tmp_path / "books.lbc"
+        export_columnar([Book("T", "A", 1900, "G", "bad")], path)
+        report = import_columnar(Library(), path)
+        assert report.imported == 0
+        assert report.invalid == 1
+
+    def test_not_columnar(self, tmp_path):
+        path = tmp_path / "books.lbc"
+        path.write_bytes(b"nope")
+        with pytest.raises(BulkImportError):
+            import_columnar(Library(), path)
+
+    def test_handmade_group(self, tmp_path):
+        path = tmp_path / "books.lbc"
+        path.write_bytes(b"LBC1" + _columnar_group(0))
+        assert import_columnar(Library(), path).imported == 1
+
+    @pytest.mark.parametrize("body", [b"garbage", _columnar_group(5),
+                                      _columnar_group(0, title=b"\xff")],
+                             ids=["garbage", "code", "utf-8"])
+    def test_corrupt_body(self, tmp_path, body):
+        path = tmp_path / "books.lbc"
+        path.write_bytes(b"LBC1" + body)
+        with pytest.raises(BulkImportError):
+            import_columnar(Library(), path)
+
+    def test_truncated(self, tmp_path, sample_books):
+        path = tmp_path / "books.lbc"
+        export_columnar(sample_books, path)
+        path.write_bytes(path.read_bytes()[:-3])
+        with pytest.raises(BulkImportError):
+            import_columnar(Library(), path)
@@ -0,0 +1,91 @@
+import pytest
+from src.book import Book
+from src.changefeed import Change, ChangeFeed, ChangeFeedOverflow
+from src.library import Library
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-3"),
+    ]
+
+
+class TestChangeFeed:
+    def test_versions_are_monotonic(self, sample_books):
+        feed = ChangeFeed()
+        first = feed.publish("add", sample_books[0])
+        second = feed.publish("remove", sample_books[0])
+        assert (first.version, second.version) == (1, 2)
+        assert feed.version == 2
+
+    def test_changes_since(self, sample_books):
+        feed = ChangeFeed()
+        for book in sample_books:
+            feed.publish("add", book)
+        assert [change.version for change in feed.changes_since(1)] == [2, 3]
+        assert feed.changes_since(3) == []
+
+    def test_overflow(self, sample_books):
+        feed = ChangeFeed(capacity=2)
+        for book in sample_books:
+            feed.publish("add", book)
+        expected = [Change(2, "add", sample_books[1]), Change(3, "add", sample_books[2])]
+        assert feed.changes_since(1) == expected
+        with pytest.raises(ChangeFeedOverflow):
+            feed.changes_since(0)
+
+    def test_invalid_version(self):
+        with pytest.raises(ValueError):
+            ChangeFeed().changes_since(1)
+
+    def test_subscribe_unsubscribe(self, sample_books):
+        feed = ChangeFeed()
+        received = []
+        callback = feed.subscribe(received.append)
+        feed.publish("add", sample_books[0])
+        feed.unsubscribe(callback)
+        feed.publish("add", sample_books[1])
+        assert [change.book for change in received] == [sample_books[0]]
+
+
+class TestLibraryChangeFeed:
+    def test_library_publishes_changes(self, sample_books):
+        library = Library()
+        library.add_book(sample_books[0])
+        library.add_books(sample_books[1:])
+        library.remove_book(sample_books[0])
+        changes = library.changes_since(0)
+        assert [(change.kind, change.book.isbn) for change in changes] == [
+            ("add", "978-1"), ("add", "978-2"), ("add", "978-3"), ("remove", "978-1"),
+        ]
+        assert library.version == 4
+
+    def test_removing_missing_book_is_not_a_change(self, sample_books):
+        library = Library()
+        library.remove_book(sample_books[0])
+        assert library.version == 0
+
+    def test_replica_catches_up_incrementally(self, sample_books):
+        library = Library()
+        library.add_books(sample_books)
+        replica = {book.isbn for book in library.books}
+        seen = library.version
+        library.remove_book(sample_books[1])
+        library.add_book(Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-4"))
+        for change in library.changes_since(seen):
+            if change.kind == "add":
+                replica.add(change.book.isbn)
+            else:
+                replica.discard(change.book.isbn)
+        assert replica == {book.isbn for book in library.books}
+
+    def test_snapshot_keeps_version(self, sample_books):
+        library = Library()
+        library.add_books(sample_books)
+        snapshot = library.snapshot()
+        library.remove_book(sample_books[0])
+        assert snapshot.version == 3
+        assert library.version == 4
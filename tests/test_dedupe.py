@@ -0,0 +1,205 @@
+import pytest
+from src.book import Book
+from src import bulk_io
+from src.bulk_io import export_csv, import_csv
+from src.changefeed import Change
+from src.dedupe import (DisjointSet, DuplicateIndex, MinHasher, find_duplicates,
+                        is_near_duplicate, normalize_isbn, normalized_key, shingles)
+from src.library import Library
+
+
+@pytest.fixture
+def feed():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-0-306-40615-7"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-5-04-194951-8"),
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "0-306-40615-2"),
+        Book("АННА КАРЕНИНА.", "Лев  Толстой", 1877, "Роман", "978-5-17-090630-1"),
+        Book("Преступление и наказание", "Фёдор Достоевский", 1866, "Роман",
+             "978-5-389-07435-4"),
+        Book("Преступление и наказанье", "Федор Достоевский", 1866, "Роман",
+             "978-5-699-12014-7"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-5-17-118366-9"),
+    ]
+
+
+class TestNormalization:
+    def test_isbn10_to_isbn13(self):
+        assert normalize_isbn("0-306-40615-2") == "9780306406157"
+        assert normalize_isbn("978-0-306-40615-7") == "9780306406157"
+
+    def test_non_isbn_kept(self):
+        assert normalize_isbn("978-1") == "9781"
+
+    def test_key_ignores_case_punctuation_and_yo(self):
+        first = Book("Анна Каренина", "Фёдор Достоевский", 1877, "Роман", "1")
+        second = Book("АННА, КАРЕНИНА!", "Федор  Достоевский", 1877, "Роман", "2")
+        assert normalized_key(first) == normalized_key(second)
+
+
+class TestMinHash:
+    def test_identical_sets(self):
+        hasher = MinHasher(32)
+        values = shingles("война и мир")
+        assert MinHasher.similarity(hasher.signature(values), hasher.signature(values)) == 1.0
+
+    def test_similar_closer_than_different(self):
+        hasher = MinHasher(128)
+        base = hasher.signature(shingles("преступление и наказание"))
+        near = hasher.signature(shingles("преступление и наказанье"))
+        far = hasher.signature(shingles("мастер и маргарита"))
+        assert MinHasher.similarity(base, near) > MinHasher.similarity(base, far)
+
+    def test_short_text(self):
+        assert len(shingles("ab")) == 1
+
+
+class TestDisjointSet:
+    def test_union_find(self):
+        sets = DisjointSet(4)
+        assert sets.union(0, 1)
+        assert sets.union(2, 3)
+        assert not sets.union(1, 0)
+        assert sets.find(0) == sets.find(1)
+        assert sets.find(1) != sets.find(2)
+
+
+class TestFindDuplicates:
+    def test_clusters_and_reasons(self, feed):
+        report = find_duplicates(feed)
+        assert report.total == 7
+        assert report.merged == 3
+        assert [book.isbn for book in report.unique] == [
+            "978-0-306-40615-7", "978-5-04-194951-8", "978-5-389-07435-4", "978-5-17-118366-9"]
+        reasons = {cluster.canonical.isbn: cluster.reasons for cluster in report.clusters}
+        assert reasons["978-0-306-40615-7"] == {"isbn", "key"}
+        assert reasons["978-5-04-194951-8"] == {"key"}
+        assert reasons["978-5-389-07435-4"] == {"minhash"}
+
+    def test_existing_books_stay_canonical(self, feed):
+        report = find_duplicates(feed[2:], existing=feed[:2])
+        assert report.total == 5
+        assert [book.isbn for book in report.unique] == ["978-5-389-07435-4",
+                                                          "978-5-17-118366-9"]
+        assert report.merged == 3
+
+    def test_no_duplicates(self, feed):
+        report = find_duplicates([feed[0], feed[1], feed[6]])
+        assert report.merged == 0
+        assert report.clusters == []
+        assert len(report.unique) == 3
+
+    def test_same_author_different_titles(self):
+        titles = ["Анна тихий", "Братья дети", "Преступление ивана", "Мастер дон", "Один день",
+                  "Капитанская дочка", "Мертвые души", "Тихий дон"]
+        books = [Book(title, "Лев Толстой", 1869, "Роман", str(number))
+                 for number, title in enumerate(titles)]
+        report = find_duplicates(books)
+        assert report.merged == 0
+        assert len(report.unique) == len(titles)
+
+    def test_merges_are_not_transitive(self):
+        words = ["Анна", "Братья", "Преступление", "Мастер", "Дети", "День", "Дочка", "Дон"]
+        books = [Book(f"{first} {second.lower()}", "Лев Толстой", 1869, "Роман", f"{i}-{j}")
+                 for i, first in enumerate(words) for j, second in enumerate(words)]
+        report = find_duplicates(books)
+        assert report.clusters
+        for cluster in report.clusters:
+            assert all(is_near_duplicate(book, cluster.canonical)
+                       for book in cluster.duplicates)
+
+    def test_near_duplicate_check(self, feed):
+        assert is_near_duplicate(feed[4], feed[5])
+        assert is_near_duplicate(feed[1], feed[3])
+        assert not is_near_duplicate(feed[0], feed[1])
+        assert not is_near_duplicate(Book("Тихий дон", "Лев Толстой", 1, "Роман", "1"),
+                                     Book("Тихий дон", "Михаил Шолохов", 1, "Роман", "2"))
+
+    def test_invalid_bands(self, feed):
+        with pytest.raises(ValueError):
+            find_duplicates(feed, num_perm=64, bands=10)
+
+    def test_report_output(self, feed):
+        report = find_duplicates(feed)
+        data = report.as_dict()
+        assert data["unique"] == 4
+        assert data["merged"] == 3
+        assert len(data["clusters"]) == 3
+        assert "объединено: 3" in report.format()
+
+
+class TestDuplicateIndex:
+    def test_matches(self, feed):
+        index = DuplicateIndex(feed[:2] + feed[4:5])
+        assert len(index) == 3
+
+        def reasons(book):
+            return [(match.isbn, reason)
+                    for match, reason in index.matches(book, index.signature(book))]
+
+        assert reasons(feed[2]) == [("978-0-306-40615-7", "isbn"), ("978-0-306-40615-7", "key"),
+                                    ("978-0-306-40615-7", "minhash")]
+        assert ("978-5-389-07435-4", "minhash") in reasons(feed[5])
+        assert reasons(feed[6]) == []
+
+    def test_apply_changes(self, feed):
+        index = DuplicateIndex(feed[:1])
+        index.apply(Change(1, "add", feed[1]))
+        index.apply(Change(2, "remove", feed[0]))
+        index.apply(Change(3, "remove", feed[0]))
+        assert feed[1] in index
+        assert feed[0] not in index
+        assert index.matches(feed[2], index.signature(feed[2])) == []
+
+    def test_same_result_as_existing(self, feed):
+        expected = find_duplicates(feed[2:], existing=feed[:2])
+        report = find_duplicates(feed[2:], index=DuplicateIndex(feed[:2]))
+        assert report.as_dict() == expected.as_dict()
+
+
+class TestImportDedupe:
+    def test_import_csv_merges(self, feed, tmp_path):
+        path = tmp_path / "feed.csv"
+        export_csv(feed, path)
+        library = Library()
+        report = import_csv(library, path, dedupe=True)
+        assert report.imported == 4
+        assert report.merged == 3
+        assert len(library.books) == 4
+
+    def test_import_against_library(self, feed, tmp_path):
+        path = tmp_path / "feed.csv"
+        export_csv(feed[2:], path)
+        library = Library()
+        library.add_books(feed[:2])
+        report = import_csv(library, path, dedupe=True)
+        assert report.imported == 2
+        assert report.merged == 3
+
+    def test_import_reuses_library_index(self, feed, tmp_path, monkeypatch):
+        library = Library()
+        library.add_books(feed[:2])
+        first, second = tmp_path / "first.csv", tmp_path / "second.csv"
+        export_csv([feed[4]], first)
+        export_csv([feed[5], feed[2]], second)
+        import_csv(library, first, dedupe=True)
+        index, _ = bulk_io._duplicate_indexes[library]
+        library.remove_book(feed[0])
+        signed = []
+        signature = DuplicateIndex.signature
+        monkeypatch.setattr(DuplicateIndex, "signature",
+                            lambda self, book: signed.append(book.isbn) or signature(self, book))
+        report = import_csv(library, second, dedupe=True)
+        assert bulk_io._duplicate_indexes[library][0] is index
+        assert feed[4] in index and feed[0] not in index
+        assert signed == [feed[4].isbn, feed[5].isbn, feed[2].isbn]
+        assert report.merged == 1
+        assert report.imported == 1
+        assert library.search_by_isbn(feed[2].isbn) is not None
+
+    def test_import_without_dedupe(self, feed, tmp_path):
+        path = tmp_path / "feed.csv"
+        export_csv(feed, path)
+        report = import_csv(Library(), path)
+        assert report.imported == 7
+        assert report.dedupe is None
@@ -0,0 +1,79 @@
+import pytest
+from src.book import Book
+from src.facets import FacetCounter, decade, rank
+from src.indexes import MultiValueIndex
+from src.library import Library
+
+
+@pytest.fixture
+def library():
+    library = Library()
+    library.add_books([
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-3"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-4"),
+        Book("Мёртвые души", "Николай Гоголь", 1842, "Поэма", "978-5"),
+    ])
+    return library
+
+
+class TestFacetCounter:
+    def test_add_and_remove(self):
+        book = Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-3")
+        counter = FacetCounter(decade, [book, book])
+        assert counter.get(1860) == 2
+        counter.remove(book)
+        counter.remove(book)
+        assert counter.get(1860) == 0
+        assert len(counter) == 0
+        assert counter.counts() == {}
+
+    def test_rank(self):
+        counts = {"Б": 2, "А": 2, "В": 5}
+        assert list(rank(counts)) == ["В", "А", "Б"]
+        assert rank(counts, top=1) == {"В": 5}
+
+
+class TestLibraryFacets:
+    def test_genre_facet(self, library):
+        assert library.facet("genre") == {"Роман": 3, "Поэма": 1, "Фантастика": 1}
+
+    def test_author_facet_from_index(self, library):
+        assert library.facet("author", top=1) == {"Лев Толстой": 2}
+
+    def test_decade_facet(self, library):
+        assert library.facet("decade") == {1860: 2, 1840: 1, 1870: 1, 1960: 1}
+
+    def test_facets_follow_changes(self, library):
+        assert library.facet("genre")["Роман"] == 3
+        library.remove_book(library.search_by_isbn("978-1"))
+        library.add_book(Book("Нос", "Николай Гоголь", 1836, "Повесть", "978-6"))
+        genres = library.facet("genre")
+        assert genres["Роман"] == 2
+        assert genres["Повесть"] == 1
+        assert library.facet("decade")[1830] == 1
+
+    def test_facets(self, library):
+        result = library.facets(("genre", "year"), top=1)
+        assert result == {"genre": {"Роман": 3}, "year": {1869: 2}}
+
+    def test_count(self, library):
+        assert library.count() == 5
+        assert library.count("author", "Лев Толстой") == 2
+        assert library.count("genre", "Роман") == 3
+        assert library.count("genre", "Детектив") == 0
+
+    def test_registered_index_used(self, library):
+        library.register_index("genre", MultiValueIndex("genre"))
+        assert library.facet("genre")["Роман"] == 3
+
+    def test_unknown_facet(self, library):
+        with pytest.raises(KeyError):
+            library.facet("publisher")
+
+    def test_snapshot_facets(self, library):
+        snapshot = library.snapshot()
+        library.remove_book(library.search_by_isbn("978-4"))
+        assert snapshot.facet("genre")["Фантастика"] == 1
+        assert "Фантастика" not in library.facet("genre")
@@ -0,0 +1,155 @@
+import threading
+import pytest
+import src.library
+from src.book import Book
+from src.book_collections import BookCollection
+from src.changefeed import ChangeFeedOverflow
+from src.fuzzy import FuzzyIndex, grams, levenshtein, normalize
+from src.library import Library
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-3"),
+        Book("Бесы", "Фёдор Достоевский", 1872, "Роман", "978-4"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-5"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    library = Library()
+    library.add_books(sample_books)
+    return library
+
+
+class TestNormalize:
+    def test_case_and_yo(self):
+        assert normalize("  Фёдор   ДОСТОЕВСКИЙ ") == "федор достоевский"
+
+    def test_unicode_composition(self):
+        assert normalize("Федор̆") == normalize("Федор̆")
+        assert normalize("Йошкар") == normalize("Йошкар")
+
+
+class TestLevenshtein:
+    def test_distances(self):
+        assert levenshtein("достоевский", "достоевский") == 0
+        assert levenshtein("достоевский", "дастоевский") == 1
+        assert levenshtein("достоевский", "достоевски") == 1
+        assert levenshtein("", "abc") == 3
+
+    def test_bounded(self):
+        assert levenshtein("достоевский", "дастаевский", 2) == 2
+        assert levenshtein("достоевский", "дастаевскиу", 2) == 3
+        assert levenshtein("толстой", "булгаков", 1) == 2
+        assert levenshtein("", "abc", 1) == 2
+        assert levenshtein("abc", "", 5) == 3
+
+    def test_bounded_matches_unbounded(self):
+        words = ["", "а", "ав", "ваа", "абвг", "гвба", "ааааа", "абвгабвг", "вгаб"]
+        for a in words:
+            for b in words:
+                exact = levenshtein(a, b)
+                for bound in range(4):
+                    assert levenshtein(a, b, bound) == min(exact, bound + 1)
+
+
+class TestGrams:
+    def test_padding(self):
+        assert grams("лев") == {"\0\0л", "\0ле", "лев", "ев\0", "в\0\0"}
+
+
+class TestFuzzyIndex:
+    def test_surname_match(self, sample_books):
+        index = FuzzyIndex("author")
+        for book in sample_books:
+            index.add(book)
+        assert index.search("Дастоевский")[0] == ("Фёдор Достоевский", 1)
+
+    def test_removed_values_not_returned(self, sample_books):
+        index = FuzzyIndex("author")
+        index.add(sample_books[4])
+        index.remove(sample_books[4])
+        assert index.search("Булгаков") == []
+
+    def test_ranking_by_popularity(self):
+        index = FuzzyIndex("author")
+        index.add(Book("A", "Толстый", 1900, "Роман", "1"))
+        for i in range(3):
+            index.add(Book("B", "Толстой", 1900, "Роман", f"2-{i}"))
+        assert [name for name, _ in index.search("Толст")] == ["Толстой", "Толстый"]
+
+    def test_short_query_scans_by_length(self):
+        index = FuzzyIndex("author")
+        index.add(Book("A", "Ян", 1900, "Роман", "1"))
+        index.add(Book("B", "Булгаков", 1900, "Роман", "2"))
+        assert index.search("Ин", 1) == [("Ян", 1)]
+
+    def test_stops_at_limit(self):
+        index = FuzzyIndex("author")
+        for i, name in enumerate(["Толстой", "Толстый", "Толстая"]):
+            index.add(Book("A", name, 1900, "Роман", str(i)))
+        assert index.search("Толстой", 2, limit=1) == [("Толстой", 0)]
+        assert index.search("Толстой", 2) == [("Толстой", 0), ("Толстый", 1), ("Толстая", 2)]
+
+
+class TestLibraryFuzzySearch:
+    def test_fuzzy_search_author(self, library):
+        assert library.fuzzy_search("author", "Достоевский")[0] == ("Фёдор Достоевский", 0)
+
+    def test_fuzzy_index_follows_changes(self, library, sample_books):
+        library.fuzzy_search("author", "Булгаков")
+        library.remove_book(sample_books[4])
+        library.add_book(Book("Мёртвые души", "Николай Гоголь", 1842, "Поэма", "978-6"))
+        assert library.fuzzy_search("author", "Булгаков") == []
+        assert library.fuzzy_search("author", "Гогаль")[0][0] == "Николай Гоголь"
+
+    def test_fuzzy_search_title(self, library):
+        assert library.fuzzy_search("title", "Мастер и Маргорита")[0][0] == "Мастер и Маргарита"
+
+    def test_unsupported_field(self, library):
+        with pytest.raises(KeyError):
+            library.fuzzy_search("year", "1869")
+
+    def test_search_by_author_fuzzy(self, library):
+        result = library.search_by_author_fuzzy("Толстоц")
+        assert isinstance(result, BookCollection)
+        assert {book.isbn for book in result} == {"978-1", "978-2"}
+
+    def test_snapshot_fuzzy_search(self, library, sample_books):
+        snapshot = library.snapshot()
+        library.remove_book(sample_books[4])
+        assert snapshot.fuzzy_search("author", "Булгаков")[0][0] == "Михаил Булгаков"
+
+    def test_index_built_without_lock(self, library, monkeypatch):
+        started, release = threading.Event(), threading.Event()
+
+        class SlowIndex(FuzzyIndex):
+            def add(self, book):
+                started.set()
+                release.wait(5)
+                super().add(book)
+
+        monkeypatch.setattr(src.library, "FuzzyIndex", SlowIndex)
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(library.fuzzy_search("author", "Гогаль")))
+        thread.start()
+        assert started.wait(5)
+        library.add_book(Book("Мёртвые души", "Николай Гоголь", 1842, "Поэма", "978-6"))
+        release.set()
+        thread.join(5)
+        assert results[0][0][0] == "Николай Гоголь"
+        library.remove_book(library.search_by_isbn("978-6"))
+        assert library.fuzzy_search("author", "Гогаль") == []
+
+    def test_index_rebuilt_when_changes_overflow(self, library, monkeypatch):
+        def overflow(version):
+            raise ChangeFeedOverflow("вытеснено")
+
+        monkeypatch.setattr(library, "changes_since", overflow)
+        assert library.fuzzy_search("author", "Булгаков")[0][0] == "Михаил Булгаков"
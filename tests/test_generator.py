@@ -0,0 +1,74 @@
+import random
+import pytest
+from collections import Counter
+from src.bulk_io import import_csv, is_valid_isbn
+from src.constants import AUTHORS, GENRES, YEARS
+from src.dedupe import find_duplicates, normalized_key
+from src.generator import (ZipfChoice, author_pool, generate_books, main, make_isbn,
+                           serial_word)
+from src.library import Library
+
+
+class TestZipfChoice:
+    def test_skew_orders_popularity(self):
+        choose = ZipfChoice(1.0, random.Random(1))
+        counts = Counter(choose("abcde") for _ in range(5000))
+        assert counts["a"] > counts["b"] > counts["e"]
+
+    def test_zero_skew_is_uniform(self):
+        choose = ZipfChoice(0, random.Random(1))
+        counts = Counter(choose("abcd") for _ in range(4000))
+        assert min(counts.values()) > 800
+
+    def test_weights_cached(self):
+        choose = ZipfChoice(2.0)
+        assert choose.weights(3) is choose.weights(3)
+        assert choose.weights(3) == pytest.approx([1, 1.25, 1.25 + 1 / 9])
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ZipfChoice(-1)
+        with pytest.raises(IndexError):
+            ZipfChoice(1.0)([])
+
+
+class TestCatalog:
+    def test_isbn_check_digit(self):
+        assert make_isbn(0) == "979-0-0000-0000-1"
+        assert all(is_valid_isbn(make_isbn(serial), check_digit=True)
+                   for serial in (1, 42, 999999999))
+
+    def test_author_pool(self):
+        assert author_pool() == AUTHORS
+        assert author_pool(3) == AUTHORS[:3]
+        pool = author_pool(60)
+        assert len(pool) == len(set(pool)) == 60
+        assert pool[:len(AUTHORS)] == AUTHORS
+
+    def test_generate_books(self):
+        books = list(generate_books(1000, seed=7))
+        assert len({book.isbn for book in books}) == 1000
+        assert {book.genre for book in books} <= set(GENRES)
+        assert {book.year for book in books} <= set(YEARS)
+        authors = Counter(book.author for book in books)
+        assert authors.most_common(1)[0][0] == AUTHORS[0]
+
+    def test_titles_distinct(self):
+        assert len({serial_word(serial) for serial in range(20000)}) == 20000
+        assert serial_word(10 ** 9 - 1) != serial_word(10 ** 9 - 1 - 65 ** 4)
+        books = list(generate_books(3000, seed=1))
+        assert len({normalized_key(book) for book in books}) == 3000
+        assert find_duplicates(books[:500]).merged == 0
+
+    def test_deterministic_and_disjoint_batches(self):
+        first = [repr(book) for book in generate_books(50, seed=3)]
+        assert first == [repr(book) for book in generate_books(50, seed=3)]
+        second = list(generate_books(50, seed=3, start=50))
+        assert not {book.isbn for book in second} & {book.isbn for book in generate_books(50)}
+
+    def test_main_writes_csv(self, tmp_path, capsys):
+        path = str(tmp_path / "catalog.csv")
+        assert main([path, "-n", "200", "--seed", "1", "--authors", "40"]) == 0
+        assert "200" in capsys.readouterr().out
+        library = Library()
+        assert import_csv(library, path, check_digit=True).imported == 200
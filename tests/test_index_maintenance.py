@@ -0,0 +1,99 @@
+import pytest
+from src.book import Book
+from src.book_collections import BookCollection
+from src.changefeed import ChangeFeed
+from src.indexes import MultiValueIndex
+from src.library import Library
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-3"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    library = Library()
+    library.add_books(sample_books)
+    return library
+
+
+class TestVerifyIndexes:
+    def test_consistent_library(self, library):
+        assert library.verify_indexes() == []
+
+    def test_detects_missing_bucket_entry(self, library, sample_books):
+        library.indexes.get_index("author").remove(sample_books[0])
+        problems = library.verify_indexes()
+        assert len(problems) == 1
+        assert "'author'" in problems[0]
+
+    def test_detects_extra_key(self, library):
+        stray = Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-9")
+        library.indexes.get_index("year").add(stray)
+        assert any("'year'" in problem for problem in library.verify_indexes())
+
+    def test_detects_duplicate_isbn(self, sample_books):
+        duplicate = Book("Война и мир (второе издание)", "Лев Толстой", 1869, "Роман", "978-1")
+        library = Library(BookCollection(sample_books + [duplicate]))
+        assert any("978-1" in problem for problem in library.verify_indexes())
+
+
+class TestRebuildIndexes:
+    def test_rebuild_repairs_drift(self, library, sample_books):
+        library.indexes.get_index("author").remove(sample_books[0])
+        library.rebuild_indexes()
+        assert library.verify_indexes() == []
+        assert len(library.search_by_author("Лев Толстой")) == 2
+
+    def test_rebuild_keeps_registered_indexes(self, library):
+        library.register_index("genre", MultiValueIndex("genre"))
+        library.rebuild_indexes()
+        assert library.indexes.has_index("genre")
+        assert len(library.search_by_genre("Роман")) == 2
+
+    def test_background_rebuild(self, library, sample_books):
+        library.indexes.get_index("year").remove(sample_books[2])
+        thread = library.rebuild_indexes(background=True)
+        thread.join()
+        assert library.verify_indexes() == []
+
+    def test_changes_during_rebuild_are_applied(self, library, sample_books, monkeypatch):
+        new_book = Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-4")
+        take_snapshot = library.snapshot
+
+        def snapshot_then_write():
+            snapshot = take_snapshot()
+            library.add_book(new_book)
+            library.remove_book(sample_books[0])
+            return snapshot
+
+        monkeypatch.setattr(library, "snapshot", snapshot_then_write)
+        library.rebuild_indexes()
+        monkeypatch.undo()
+        assert library.search_by_isbn("978-4") is new_book
+        assert library.search_by_isbn("978-1") is None
+        assert library.verify_indexes() == []
+
+    def test_overflow_falls_back_to_full_rebuild(self, library, sample_books, monkeypatch):
+        library.changes = ChangeFeed(capacity=0)
+        take_snapshot = library.snapshot
+
+        def snapshot_then_write():
+            snapshot = take_snapshot()
+            library.remove_book(sample_books[1])
+            return snapshot
+
+        monkeypatch.setattr(library, "snapshot", snapshot_then_write)
+        library.rebuild_indexes()
+        monkeypatch.undo()
+        assert library.search_by_isbn("978-2") is None
+        assert library.verify_indexes() == []
+
+    def test_snapshot_cannot_rebuild(self, library):
+        with pytest.raises(TypeError):
+            library.snapshot().rebuild_indexes()
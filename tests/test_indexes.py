@@ -0,0 +1,196 @@
+import pytest
+from src.book import Book
+from src.book_collections import BookCollection, IndexDict
+from src.indexes import HashIndex, MultiValueIndex, SortedIndex, TextIndex
+from src.library import Library
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-3"),
+        Book("Мир и война", "Неизвестный", 1900, "Сатира", "978-4"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    library = Library()
+    library.add_books(sample_books)
+    return library
+
+
+class TestHashIndex:
+    def test_add_lookup_remove(self, sample_books):
+        index = HashIndex("isbn")
+        index.build(sample_books)
+        assert index.lookup("978-2") == [sample_books[1]]
+        index.remove(sample_books[1])
+        assert index.lookup("978-2") == []
+        assert len(index) == 3
+
+    def test_copy_is_independent(self, sample_books):
+        index = HashIndex("isbn")
+        index.build(sample_books)
+        clone = index.copy()
+        index.clear()
+        assert len(clone) == 4
+
+
+    def test_remove_keeps_other_book_with_same_key(self, sample_books):
+        index = HashIndex("genre")
+        index.build(sample_books)
+        assert index.lookup("Роман") == [sample_books[1]]
+        index.remove(sample_books[0])
+        assert index.lookup("Роман") == [sample_books[1]]
+        index.remove(sample_books[1])
+        assert index.lookup("Роман") == []
+
+    def test_copy_keeps_subclass(self, sample_books):
+        for index in (HashIndex("isbn"), MultiValueIndex("genre"), SortedIndex("year"),
+                      TextIndex("title")):
+            index.build(sample_books)
+            clone = index.copy()
+            assert type(clone) is type(index)
+            assert clone.entries() == index.entries()
+
+
+class TestMultiValueIndex:
+    def test_buckets(self, sample_books):
+        index = MultiValueIndex("genre")
+        index.build(sample_books)
+        assert len(index.lookup("Роман")) == 2
+        assert index.bucket_sizes() == {"Роман": 2, "Фантастика": 1, "Сатира": 1}
+
+    def test_empty_bucket_removed(self, sample_books):
+        index = MultiValueIndex("genre")
+        index.add(sample_books[2])
+        index.remove(sample_books[2])
+        assert len(index) == 0
+
+    def test_custom_key(self, sample_books):
+        index = MultiValueIndex("decade", key=lambda book: book.year // 10 * 10)
+        index.build(sample_books)
+        assert len(index.lookup(1860)) == 1
+
+    def test_remove_many(self, sample_books):
+        index = MultiValueIndex("genre")
+        index.build(sample_books)
+        index.remove_many([sample_books[0], sample_books[2]])
+        assert index.bucket_sizes() == {"Роман": 1, "Сатира": 1}
+        assert index.lookup("Роман") == [sample_books[1]]
+
+
+class TestSortedIndex:
+    def test_range(self, sample_books):
+        index = SortedIndex("year")
+        index.build(sample_books)
+        assert [book.year for book in index.range(1870, 1950)] == [1877, 1900]
+        assert [book.year for book in index.range(high=1870)] == [1869]
+
+    def test_incremental_keys(self, sample_books):
+        index = SortedIndex("year")
+        for book in reversed(sample_books):
+            index.add(book)
+        assert index.keys() == [1869, 1877, 1900, 1967]
+        index.remove(sample_books[0])
+        assert index.keys() == [1877, 1900, 1967]
+
+    def test_remove_many_keys(self, sample_books):
+        index = SortedIndex("year")
+        index.build(sample_books)
+        index.remove_many(sample_books[1:3])
+        assert index.keys() == [1869, 1900]
+        assert [book.year for book in index.range()] == [1869, 1900]
+
+
+class TestTextIndex:
+    def test_all_words_must_match(self, sample_books):
+        index = TextIndex("title")
+        index.build(sample_books)
+        assert {book.isbn for book in index.lookup("ВОЙНА мир")} == {"978-1", "978-4"}
+        assert [book.isbn for book in index.lookup("маргарита")] == ["978-3"]
+        assert index.lookup("анна мир") == []
+
+    def test_remove(self, sample_books):
+        index = TextIndex("title")
+        index.build(sample_books)
+        index.remove(sample_books[0])
+        assert [book.isbn for book in index.lookup("война")] == ["978-4"]
+
+    def test_remove_many(self, sample_books):
+        index = TextIndex("title")
+        index.build(sample_books)
+        index.remove_many([sample_books[0], sample_books[3]])
+        assert index.lookup("война") == []
+        assert "мир" not in index.bucket_sizes()
+        assert [book.isbn for book in index.lookup("анна")] == ["978-2"]
+
+    def test_hash_index_remove_many(self, sample_books):
+        index = HashIndex("isbn")
+        index.build(sample_books)
+        index.remove_many(sample_books[:2])
+        assert sorted(index.bucket_sizes()) == ["978-3", "978-4"]
+
+
+class TestIndexDictRegistry:
+    def test_register_builds_from_existing_books(self, sample_books):
+        index_dict = IndexDict(sample_books)
+        index_dict.register("genre", MultiValueIndex("genre"))
+        results = index_dict["genre", "Роман"]
+        assert isinstance(results, BookCollection)
+        assert len(results) == 2
+
+    def test_register_duplicate(self, sample_books):
+        index_dict = IndexDict(sample_books)
+        with pytest.raises(ValueError):
+            index_dict.register("author", MultiValueIndex("author"))
+
+    def test_register_invalid_type(self):
+        with pytest.raises(TypeError):
+            IndexDict().register("genre", {})
+
+    def test_unregister(self, sample_books):
+        index_dict = IndexDict(sample_books)
+        index_dict.register("genre", MultiValueIndex("genre"))
+        index_dict.unregister("genre")
+        assert not index_dict.has_index("genre")
+        with pytest.raises(ValueError):
+            index_dict.unregister("isbn")
+
+    def test_snapshot_copies_registered_indexes(self, sample_books):
+        index_dict = IndexDict(sample_books)
+        index_dict.register("genre", MultiValueIndex("genre"))
+        snapshot = index_dict.snapshot()
+        index_dict.remove_book(sample_books[0])
+        assert len(snapshot["genre", "Роман"]) == 2
+        assert len(index_dict["genre", "Роман"]) == 1
+
+
+class TestLibraryIndexes:
+    def test_genre_index_is_maintained(self, library):
+        library.register_index("genre", MultiValueIndex("genre"))
+        library.add_book(Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-5"))
+        assert len(library.search_by_genre("Роман")) == 3
+        library.remove_book(library.search_by_isbn("978-1"))
+        assert len(library.search_by_genre("Роман")) == 2
+
+    def test_search_by_registered_index(self, library):
+        library.register_index("words", TextIndex("title"))
+        assert len(library.search("words", "мир")) == 2
+
+    def test_search_falls_back_to_scan(self, library):
+        assert len(library.search("title", "Анна Каренина")) == 1
+
+    def test_search_unknown_field(self, library):
+        with pytest.raises(KeyError):
+            library.search("publisher", "АСТ")
+
+    def test_search_range_with_and_without_index(self, library):
+        scanned = library.search_range("year", 1870, 1950)
+        library.register_index("published", SortedIndex("year"))
+        indexed = library.search_range("published", 1870, 1950)
+        assert [book.isbn for book in indexed] == ["978-2", "978-4"]
+        assert sorted(book.isbn for book in scanned) == ["978-2", "978-4"]
@@ -0,0 +1,84 @@
+import pytest
+from src.book import Book
+from src.instrumentation import Histogram, Instrumentation
+from src.library import Library
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-3"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    library = Library()
+    for book in sample_books:
+        library.add_book(book)
+    return library
+
+
+class TestHistogram:
+    def test_observe_cumulative(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 3, 7):
+            histogram.observe(value)
+        assert histogram.cumulative() == [(1, 1), (5, 2), (float("inf"), 3)]
+        assert histogram.count == 3
+        assert histogram.total == 10
+
+
+class TestInstrumentationDisabled:
+    def test_disabled_by_default(self, library):
+        assert library.instrumentation is None
+        assert len(library.search_by_author("Лев Толстой")) == 2
+
+    def test_disable_stops_recording(self, library):
+        stats = library.enable_instrumentation()
+        library.disable_instrumentation()
+        library.search_by_author("Лев Толстой")
+        assert stats.counters == {}
+
+
+class TestInstrumentationEnabled:
+    def test_search_counters_and_sizes(self, library):
+        stats = library.enable_instrumentation()
+        library.search_by_author("Лев Толстой")
+        library.search_by_author("Неизвестный")
+        library.search_by_isbn("978-3")
+        assert stats.counters["search_by_author"] == 2
+        assert stats.result_sizes["search_by_author"].total == 2
+        assert stats.result_sizes["search_by_isbn"].total == 1
+
+    def test_index_operations_recorded(self, library):
+        stats = library.enable_instrumentation()
+        book = Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-4")
+        library.add_book(book)
+        library.remove_book(book)
+        assert stats.counters["index_add_book"] == 1
+        assert stats.counters["index_remove_book"] == 1
+        assert "index_add_book" not in stats.result_sizes
+
+    def test_as_dict_with_index_stats(self, library):
+        stats = library.enable_instrumentation()
+        library.search_by_genre("Роман")
+        data = stats.as_dict(library.indexes)
+        assert data["counters"] == {"search_by_genre": 1}
+        assert data["indexes"]["author"]["max"] == 2
+        assert data["indexes"]["author"]["largest"][0] == ("Лев Толстой", 2)
+
+    def test_to_prometheus(self, library):
+        stats = library.enable_instrumentation()
+        library.search_by_year(1869)
+        text = stats.to_prometheus(library.indexes)
+        assert 'library_operations_total{operation="search_by_year"} 1' in text
+        assert 'library_result_size_bucket{operation="search_by_year",le="1"} 1' in text
+        assert 'library_index_buckets{index="year"} 3' in text
+
+    def test_shared_instrumentation(self, library):
+        shared = Instrumentation()
+        assert library.enable_instrumentation(shared) is shared
+        assert library.indexes.instrumentation is shared
@@ -0,0 +1,135 @@
+import threading
+import pytest
+from src.book import Book
+from src.book_collections import BookCollection
+from src.inventory import Inventory, InventoryError
+from src.library import Library
+
+
+@pytest.fixture
+def book():
+    return Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1")
+
+
+@pytest.fixture
+def library(book):
+    library = Library()
+    library.add_book(book, copies=3)
+    library.add_book(Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"))
+    return library
+
+
+class TestInventory:
+    def test_add_and_remove_copies(self):
+        inventory = Inventory()
+        assert inventory.add_copies("978-1", 2) == 2
+        assert inventory.add_copies("978-1") == 3
+        assert inventory.remove_copies("978-1", 3) == 0
+        assert "978-1" not in inventory
+        assert inventory.total_copies == 0
+
+    def test_checkout_and_return(self):
+        inventory = Inventory()
+        inventory.add_copies("978-1", 2)
+        assert inventory.checkout("978-1") == 1
+        assert inventory.checkout("978-1") == 0
+        with pytest.raises(InventoryError):
+            inventory.checkout("978-1")
+        assert inventory.total_checked_out == 2
+        assert inventory.return_copies("978-1", 2) == 2
+        with pytest.raises(InventoryError):
+            inventory.return_copies("978-1")
+
+    def test_cannot_remove_checked_out_copies(self):
+        inventory = Inventory()
+        inventory.add_copies("978-1", 2)
+        inventory.checkout("978-1")
+        with pytest.raises(InventoryError):
+            inventory.remove_copies("978-1", 2)
+        assert inventory.remove_copies("978-1") == 1
+
+    def test_invalid_count(self):
+        with pytest.raises(InventoryError):
+            Inventory().add_copies("978-1", 0)
+
+    def test_large_counts(self):
+        inventory = Inventory()
+        inventory.add_copies("978-1", 10 ** 12)
+        inventory.checkout("978-1", 10 ** 12 - 1)
+        assert inventory.available("978-1") == 1
+        assert len(inventory) == 1
+
+    def test_discard(self):
+        inventory = Inventory()
+        inventory.add_copies("978-1", 5)
+        inventory.checkout("978-1", 2)
+        inventory.discard("978-1")
+        assert inventory.total_copies == 0
+        assert inventory.total_checked_out == 0
+
+    def test_snapshot_copy_on_write(self):
+        inventory = Inventory()
+        inventory.add_copies("978-1", 2)
+        snapshot = inventory.snapshot()
+        inventory.checkout("978-1")
+        assert snapshot.available("978-1") == 2
+        assert inventory.available("978-1") == 1
+
+    def test_concurrent_checkout(self):
+        inventory = Inventory()
+        inventory.add_copies("978-1", 100)
+        successes = []
+
+        def worker():
+            for _ in range(50):
+                try:
+                    inventory.checkout("978-1")
+                    successes.append(1)
+                except InventoryError:
+                    pass
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(successes) == 100
+        assert inventory.available("978-1") == 0
+
+
+class TestLibraryInventory:
+    def test_str_counts_copies(self, library):
+        assert str(library) == "Общее количество книг: 4, количество уникальных книг: 2"
+        assert len(library.books) == 2
+
+    def test_initial_duplicates_counted_as_copies(self, book):
+        library = Library(BookCollection([book, book]))
+        assert library.inventory.copies("978-1") == 2
+
+    def test_checkout_unknown_isbn(self, library):
+        with pytest.raises(InventoryError):
+            library.checkout("999")
+
+    def test_add_copies_and_checkout(self, library):
+        assert library.add_copies("978-2", 2) == 3
+        assert library.checkout("978-2", 3) == 0
+        assert library.return_copies("978-2") == 1
+
+    def test_remove_book_discards_copies(self, library, book):
+        library.checkout("978-1")
+        library.remove_book(book)
+        assert library.inventory.total_copies == 1
+        assert library.inventory.total_checked_out == 0
+
+    def test_add_book_invalid_copies(self):
+        library = Library()
+        with pytest.raises(ValueError):
+            library.add_book(Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-3"), copies=0)
+        assert len(library.books) == 0
+
+    def test_snapshot_is_read_only(self, library):
+        snapshot = library.snapshot()
+        library.checkout("978-1")
+        assert snapshot.inventory.available("978-1") == 3
+        with pytest.raises(TypeError):
+            snapshot.checkout("978-1")
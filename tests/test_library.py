@@ -72,6 +72,53 @@ class TestLibraryRemoveBook:
         assert len(filled_library.books) == initial_count
 
 
+class TestLibraryRemoveBooks:
+    def test_remove_iterable(self, filled_library, sample_books):
+        assert filled_library.remove_books([sample_books[0], "978-3", "999"]) == 2
+        assert [book.isbn for book in filled_library.books] == ["978-2", "978-4", "978-5"]
+        assert filled_library.verify_indexes() == []
+        assert len(filled_library.search_by_author("Лев Толстой")) == 1
+        assert filled_library.inventory.total_copies == 3
+        assert filled_library.get_random_book().isbn in {"978-2", "978-4", "978-5"}
+
+    def test_remove_predicate(self, filled_library):
+        assert filled_library.remove_books(lambda book: book.genre == "Роман") == 3
+        assert len(filled_library.search_by_genre("Роман")) == 0
+        assert len(filled_library.indexes) == 2
+        assert filled_library.verify_indexes() == []
+
+    def test_remove_nothing(self, filled_library):
+        version = filled_library.version
+        assert filled_library.remove_books([]) == 0
+        assert filled_library.remove_books(lambda book: False) == 0
+        assert filled_library.version == version
+
+    def test_publishes_changes(self, filled_library, sample_books):
+        filled_library.facet("author")
+        filled_library.list_page(sort_by="title")
+        version = filled_library.version
+        filled_library.remove_books(sample_books[:2])
+        changes = filled_library.changes_since(version)
+        assert [(change.kind, change.book.isbn) for change in changes] == [
+            ("remove", "978-1"), ("remove", "978-2")]
+        assert "Лев Толстой" not in filled_library.facet("author")
+        assert filled_library.list_page(sort_by="title").total == 3
+
+    def test_duplicate_copies_removed(self, sample_books):
+        library = Library(BookCollection([sample_books[0], sample_books[1], sample_books[0]]))
+        assert library.remove_books([sample_books[0]]) == 1
+        assert [book.isbn for book in library.books] == ["978-2"]
+        assert library.books.fingerprint == BookCollection([sample_books[1]]).fingerprint
+
+    def test_snapshot_unchanged(self, filled_library, sample_books):
+        snapshot = filled_library.snapshot()
+        filled_library.remove_books(sample_books[:3])
+        assert len(snapshot.books) == 5
+        assert len(snapshot.search_by_author("Лев Толстой")) == 2
+        with pytest.raises(TypeError):
+            snapshot.remove_books(sample_books)
+
+
 class TestLibrarySearchByISBN:
     def test_search_existing_isbn(self, filled_library, sample_books):
         result = filled_library.search_by_isbn("978-1")
@@ -131,3 +178,22 @@ class TestLibraryGetRandomBook:
     def test_get_random_from_empty_library(self, empty_library):
         book = empty_library.get_random_book()
         assert book is None
+
+
+class TestLibraryAddBooks:
+    def test_add_books(self, empty_library, sample_books):
+        assert empty_library.add_books(sample_books) == 5
+        assert len(empty_library.books) == 5
+        assert len(empty_library.indexes) == 5
+
+    def test_add_books_duplicate_is_atomic(self, filled_library, sample_books):
+        new_book = Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-6")
+        with pytest.raises(ValueError):
+            filled_library.add_books([new_book, sample_books[0]])
+        assert len(filled_library.books) == 5
+
+    def test_add_books_skip_duplicates(self, filled_library, sample_books):
+        new_book = Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-6")
+        added = filled_library.add_books([new_book, sample_books[0], new_book], skip_duplicates=True)
+        assert added == 1
+        assert len(filled_library.books) == 6
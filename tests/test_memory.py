@@ -0,0 +1,85 @@
+import sys
+import pytest
+from src.book import Book
+from src.library import Library
+from src.memory import MemoryReport, deep_size, measure, string_duplication
+
+
+@pytest.fixture
+def library():
+    library = Library()
+    for i in range(10):
+        library.add_book(Book(f"Книга {i}", "Лев " + "Толстой", 1869 + i, "Ро" + "ман", f"978-{i}"))
+    return library
+
+
+class TestDeepSize:
+    def test_counts_nested_objects(self):
+        text = "x" * 100
+        size = deep_size([text, {"key": text}])
+        assert size >= sys.getsizeof(text) + sys.getsizeof([]) + sys.getsizeof({})
+
+    def test_shared_objects_counted_once(self):
+        text = "x" * 1000
+        seen = set()
+        first = deep_size([text], seen)
+        second = deep_size([text], seen)
+        assert first - second >= sys.getsizeof(text)
+
+    def test_slots_and_cycles(self):
+        items = []
+        items.append(items)
+        assert deep_size(items) == sys.getsizeof(items)
+        book = Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-3")
+        assert deep_size(book) > sys.getsizeof(book.title) + sys.getsizeof(book.author)
+
+
+class TestStringDuplication:
+    def test_duplicate_bytes(self):
+        books = [Book("Идиот", "".join(["Фёдор ", "Достоевский"]), 1869, "Роман", str(i))
+                 for i in range(3)]
+        stats = string_duplication(books)
+        assert stats["author"]["distinct"] == 1
+        assert stats["author"]["objects"] == 3
+        assert stats["author"]["duplicate_bytes"] == 2 * sys.getsizeof(books[0].author)
+        assert stats["title"]["duplicate_bytes"] == 0
+
+
+class TestMeasure:
+    def test_components(self, library):
+        report = measure(library)
+        assert report.books == 10
+        expected = {"books", "collection", "index:isbn", "index:author", "index:year"}
+        assert expected <= set(report.components)
+        assert report.total == sum(report.components.values())
+        assert report.bytes_per_book == report.total / 10
+
+    def test_registered_and_lazy_structures_reported(self, library):
+        library.facet("genre")
+        library.fuzzy_search("author", "Толстой")
+        report = measure(library)
+        assert "facet:genre" in report.components
+        assert "fuzzy:author" in report.components
+
+    def test_orderings_and_planner_reported(self, library):
+        list(library.iter_sorted("title"))
+        library.explain(genre="Роман")
+        report = measure(library)
+        assert report.components["ordering:title"] > 0
+        assert report.components["planner_statistics"] > 0
+
+    def test_extrapolate(self, library):
+        report = measure(library)
+        estimate = report.extrapolate(1000)
+        assert estimate["books"] == report.components["books"] * 100
+        assert estimate["total"] == sum(size for name, size in estimate.items() if name != "total")
+
+    def test_extrapolate_empty(self):
+        with pytest.raises(ValueError):
+            MemoryReport(0, {}, {}).extrapolate(10)
+
+    def test_format(self, library):
+        text = measure(library).format(1000)
+        assert "index:author" in text
+        assert "На 1000 книг" in text
+        assert "Дублирование строк" in text
@@ -0,0 +1,124 @@
+import random
+import pytest
+from src.book import Book
+from src.library import Library
+from src.orderings import BookOrdering, SortedList
+from src.sqlite_storage import SQLiteLibrary
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-3"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-4"),
+        Book("Бесы", "Фёдор Достоевский", 1872, "Роман", "978-5"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    library = Library()
+    library.add_books(sample_books)
+    return library
+
+
+class TestSortedList:
+    def test_matches_sorted_under_random_changes(self):
+        rng = random.Random(7)
+        values = SortedList(load=4)
+        expected = []
+        for _ in range(500):
+            if expected and rng.random() < 0.4:
+                value = rng.choice(expected)
+                expected.remove(value)
+                values.remove(value)
+            else:
+                value = rng.randint(0, 100)
+                expected.append(value)
+                values.add(value)
+        expected.sort()
+        assert list(values) == expected
+        assert len(values) == len(expected)
+        assert values.islice(10, 20) == expected[10:20]
+        assert values.islice(0, 5, reverse=True) == expected[::-1][:5]
+
+    def test_irange(self):
+        values = SortedList(range(0, 100, 2), load=4)
+        assert list(values.irange(11))[:3] == [12, 14, 16]
+        assert list(values.irange(12, inclusive=False))[:2] == [14, 16]
+        assert list(values.irange(11, reverse=True))[:3] == [10, 8, 6]
+        assert list(values.irange(10, reverse=True, inclusive=False))[:1] == [8]
+        assert list(values.irange(1000)) == []
+        assert list(values.irange(-1, reverse=True)) == []
+
+    def test_remove_missing(self):
+        values = SortedList([1, 2, 3])
+        with pytest.raises(ValueError):
+            values.remove(5)
+        assert 2 in values
+        assert 5 not in values
+
+
+class TestBookOrdering:
+    def test_ties_keep_insertion_order(self, sample_books):
+        ordering = BookOrdering("year", sample_books)
+        assert [book.isbn for book in ordering] == ["978-1", "978-3", "978-5", "978-2", "978-4"]
+
+    def test_chunk_from_start_key(self, sample_books):
+        ordering = BookOrdering("title", sample_books)
+        chunk = ordering.chunk(start="В", count=2)
+        assert [book.title for _, book in chunk] == ["Война и мир", "Идиот"]
+        rest = ordering.chunk(after=chunk[-1][0], count=10)
+        assert [book.title for _, book in rest] == ["Мастер и Маргарита"]
+        backwards = ordering.chunk(start="Бесы", reverse=True)
+        assert [book.title for _, book in backwards] == ["Бесы", "Анна Каренина"]
+
+    def test_unknown_sort_key(self):
+        with pytest.raises(ValueError):
+            BookOrdering("isbn")
+
+
+class TestLibraryOrderings:
+    def test_list_page_sorted(self, library):
+        page = library.list_page(limit=2, offset=1, sort_by="title")
+        assert [book.title for book in page] == ["Бесы", "Война и мир"]
+        assert page.total == 5
+        assert page.next_offset == 3
+        page = library.list_page(limit=1, sort_by="year", reverse=True)
+        assert [book.year for book in page] == [1967]
+
+    def test_iter_sorted_follows_changes(self, library, sample_books):
+        assert [b.year for b in library.iter_sorted("year")] == [1869, 1869, 1872, 1877, 1967]
+        library.remove_book(sample_books[3])
+        library.add_book(Book("Нос", "Николай Гоголь", 1836, "Повесть", "978-6"))
+        assert [b.isbn for b in library.iter_sorted("year", start=1870)] == ["978-5", "978-2"]
+        assert [b.year for b in library.iter_sorted("year", reverse=True)][:2] == [1877, 1872]
+
+    def test_iter_sorted_small_chunks_with_concurrent_removal(self, library, sample_books):
+        books = library.iter_sorted("title", chunk_size=1)
+        assert next(books).title == "Анна Каренина"
+        library.remove_book(sample_books[4])
+        assert [book.title for book in books] == ["Война и мир", "Идиот", "Мастер и Маргарита"]
+
+    def test_iter_sorted_export(self, library, tmp_path):
+        from src.bulk_io import export_csv
+        path = tmp_path / "books.csv"
+        assert export_csv(library.iter_sorted("author"), str(path)) == 5
+
+    def test_snapshot_ordering(self, library, sample_books):
+        snapshot = library.snapshot()
+        library.remove_book(sample_books[0])
+        assert len(list(snapshot.iter_sorted("title"))) == 5
+
+
+class TestSQLiteOrderings:
+    def test_iter_sorted_keyset(self, sample_books):
+        with SQLiteLibrary() as library:
+            library.add_books(sample_books)
+            years = [b.isbn for b in library.iter_sorted("year", chunk_size=2)]
+            assert years == ["978-1", "978-3", "978-5", "978-2", "978-4"]
+            reverse = [b.isbn for b in library.iter_sorted("year", reverse=True, chunk_size=1)]
+            assert reverse == years[::-1]
+            assert [b.year for b in library.iter_sorted("year", start=1872)] == [1872, 1877, 1967]
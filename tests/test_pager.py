@@ -0,0 +1,70 @@
+import pytest
+from io import StringIO
+from src.book import Book
+from src.library import Library
+from src.pager import Pager, format_book_rows, format_short_rows, write_buffered
+
+
+@pytest.fixture
+def library():
+    library = Library()
+    for i in range(1, 6):
+        library.add_book(Book(f"Книга {i}", "Лев Толстой", 1860 + i, "Роман", f"978-{i}"))
+    return library
+
+
+def scripted(commands):
+    iterator = iter(commands)
+    return lambda prompt="": next(iterator)
+
+
+class TestFormatting:
+    def test_format_book_rows(self, library):
+        rows = format_book_rows(library.books[:1], start=3)
+        assert rows == ["  3. Книга 1 - Лев Толстой (1861)\n", "     ISBN: 978-1, Жанр: Роман\n"]
+
+    def test_format_short_rows(self, library):
+        assert format_short_rows(library.books[:1]) == ["1. Книга 1 - Лев Толстой (1861)\n"]
+
+
+class TestWriteBuffered:
+    def test_writes_in_chunks(self):
+        class CountingStream(StringIO):
+            writes = 0
+
+            def write(self, text):
+                CountingStream.writes += 1
+                return super().write(text)
+
+        output = CountingStream()
+        write_buffered((f"{i}\n" for i in range(10)), output, chunk_size=4)
+        assert output.getvalue() == "".join(f"{i}\n" for i in range(10))
+        assert CountingStream.writes == 3
+
+
+class TestPager:
+    def test_single_page_without_prompt(self, library):
+        output = StringIO()
+        pager = Pager(page_size=10, output=output, input_func=scripted([]))
+        pager.browse(lambda offset, limit: library.list_page(limit, offset))
+        assert "Книга 5" in output.getvalue()
+        assert "Страница" not in output.getvalue()
+
+    def test_navigation(self, library):
+        output = StringIO()
+        pager = Pager(page_size=2, output=output, input_func=scripted(["n", "n", "p", "0"]))
+        pager.browse(lambda offset, limit: library.list_page(limit, offset))
+        text = output.getvalue()
+        assert text.count("Страница 1 из 3") == 1
+        assert text.count("Страница 2 из 3") == 2
+        assert text.count("Страница 3 из 3") == 1
+
+    def test_invalid_command(self, library):
+        output = StringIO()
+        pager = Pager(page_size=2, output=output, input_func=scripted(["x", "0"]))
+        pager.browse(lambda offset, limit: library.list_page(limit, offset))
+        assert "Неверная команда" in output.getvalue()
+
+    def test_invalid_page_size(self):
+        with pytest.raises(ValueError):
+            Pager(page_size=0)
@@ -0,0 +1,93 @@
+import pytest
+from src.book import Book
+from src.book_collections import BookCollection
+from src.library import Library
+from src.pagination import Page, paginate, top_k
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Воскресение", "Лев Толстой", 1899, "Роман", "978-3"),
+        Book("Детство", "Лев Толстой", 1852, "Повесть", "978-4"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-5"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    library = Library()
+    for book in sample_books:
+        library.add_book(book)
+    return library
+
+
+class TestTopK:
+    def test_top_k_by_year(self, sample_books):
+        result = top_k(sample_books, 2, "year")
+        assert [book.year for book in result] == [1852, 1869]
+
+    def test_top_k_reverse(self, sample_books):
+        result = top_k(sample_books, 1, "year", reverse=True)
+        assert result == [sample_books[4]]
+
+    def test_top_k_zero(self, sample_books):
+        assert top_k(sample_books, 0, "title") == []
+
+    def test_top_k_unknown_key(self, sample_books):
+        with pytest.raises(ValueError):
+            top_k(sample_books, 1, "isbn")
+
+
+class TestPaginate:
+    def test_first_page(self, sample_books):
+        page = paginate(sample_books, limit=2)
+        assert isinstance(page, Page)
+        assert isinstance(page.books, BookCollection)
+        assert len(page) == 2
+        assert page.total == 5
+        assert page.next_offset == 2
+
+    def test_last_page(self, sample_books):
+        page = paginate(sample_books, limit=2, offset=4)
+        assert len(page) == 1
+        assert not page.has_next
+
+    def test_sorted_page(self, sample_books):
+        page = paginate(sample_books, limit=2, offset=1, sort_by="title")
+        assert [book.title for book in page] == ["Война и мир", "Воскресение"]
+
+    def test_negative_limit(self, sample_books):
+        with pytest.raises(ValueError):
+            paginate(sample_books, limit=-1)
+
+
+class TestLibraryPagination:
+    def test_search_page_by_author(self, library):
+        page = library.search_page("author", "Лев Толстой", limit=3, sort_by="year")
+        assert [book.year for book in page] == [1852, 1869, 1877]
+        assert page.total == 4
+        assert page.next_offset == 3
+
+    def test_search_page_by_genre(self, library):
+        page = library.search_page("genre", "Роман", limit=10)
+        assert page.total == 3
+
+    def test_search_page_by_isbn(self, library, sample_books):
+        page = library.search_page("isbn", "978-5")
+        assert list(page) == [sample_books[4]]
+
+    def test_search_page_unknown_field(self, library):
+        with pytest.raises(KeyError):
+            library.search_page("publisher", "АСТ")
+
+    def test_list_page(self, library):
+        page = library.list_page(limit=2, offset=2)
+        assert [book.isbn for book in page] == ["978-3", "978-4"]
+
+    def test_top_k(self, library):
+        result = library.top_k("author", "Лев Толстой", 1, "year", reverse=True)
+        assert isinstance(result, BookCollection)
+        assert result[0].title == "Воскресение"
@@ -0,0 +1,120 @@
+import json
+import pstats
+import sys
+import time
+import pytest
+from io import StringIO
+from unittest.mock import patch
+from src.main import CLI, main
+from src.profiling import Profiler
+from src.simulation import run_simulation
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestProfiler:
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            Profiler("perf")
+
+    def test_start_twice(self):
+        profiler = Profiler()
+        with profiler:
+            with pytest.raises(RuntimeError):
+                profiler.start()
+        assert not profiler.running
+        profiler.stop()
+
+    def test_event_timing(self):
+        profiler = Profiler()
+        with profiler:
+            for _ in range(3):
+                with profiler.event("_event_add_book"):
+                    busy(0.001)
+        timer = profiler.events["_event_add_book"]
+        assert timer.count == 3
+        assert timer.total >= 0.003
+        assert timer.max <= timer.total
+        assert profiler.as_dict()["events"]["_event_add_book"]["count"] == 3
+
+    def test_waiting_excluded_from_events(self):
+        profiler = Profiler("sampling", interval=0.001)
+        with profiler:
+            with profiler.event("search_by_isbn"):
+                with profiler.waiting():
+                    time.sleep(0.05)
+                busy(0.005)
+        timer = profiler.events["search_by_isbn"]
+        assert 0.005 <= timer.total < 0.04
+        assert profiler.waited >= 0.05
+        assert sum(profiler.samples.values()) < 30
+        assert "ожидание ввода" in profiler.format()
+
+    def test_cli_input_not_timed(self, capsys):
+        profiler = Profiler("sampling")
+        answers = iter(["978-0", "0"])
+
+        def slow_input(prompt):
+            time.sleep(0.05)
+            return next(answers)
+
+        cli = CLI(profiler=profiler)
+        with profiler, patch("builtins.input", slow_input):
+            cli.selection_processing("4")
+        assert profiler.events["search_by_isbn"].total < 0.05
+        assert profiler.waited >= 0.1
+
+    def test_cprofile_output(self, tmp_path):
+        profiler = Profiler("cprofile")
+        with profiler:
+            busy(0.001)
+        paths = profiler.write(str(tmp_path / "run"))
+        assert paths == [str(tmp_path / "run.pstats"), str(tmp_path / "run.events.json")]
+        stats = pstats.Stats(paths[0])
+        assert any(name == "busy" for _, _, name in stats.stats)
+        assert "busy" in profiler.format()
+
+    def test_sampling_collapsed(self, tmp_path):
+        profiler = Profiler("sampling", interval=0.001)
+        with profiler:
+            with profiler.event("_event_search_by_genre"):
+                busy(0.1)
+        assert profiler.samples
+        stack = max(profiler.samples, key=profiler.samples.get)
+        assert stack.startswith("event:_event_search_by_genre;")
+        assert "test_profiling.py:busy" in stack
+        paths = profiler.write(str(tmp_path / "run"))
+        with open(paths[0], encoding="utf-8") as file:
+            line = file.readline()
+        assert line.rsplit(" ", 1)[1].strip().isdigit()
+        with open(paths[1], encoding="utf-8") as file:
+            assert json.load(file)["mode"] == "sampling"
+
+    def test_sample_frame(self):
+        profiler = Profiler("sampling")
+        profiler.sample(sys._getframe())
+        stack = list(profiler.samples)[0]
+        assert stack.endswith("test_profiling.py:TestProfiler.test_sample_frame")
+
+
+class TestIntegration:
+    def test_run_simulation_profiled(self):
+        profiler = Profiler()
+        with patch("sys.stdout", StringIO()):
+            run_simulation(steps=30, seed=1, profiler=profiler)
+        assert not profiler.running
+        assert sum(timer.count for timer in profiler.events.values()) == 30
+        assert all(name.startswith("_event_") for name in profiler.events)
+
+    def test_main_profile(self, tmp_path, capsys):
+        prefix = str(tmp_path / "sim")
+        assert main(["--simulate", "5", "--seed", "1", "--profile", "cprofile",
+                     "--profile-output", prefix]) == 0
+        assert "Профиль сохранён" in capsys.readouterr().err
+        with open(prefix + ".events.json", encoding="utf-8") as file:
+            events = json.load(file)["events"]
+        assert sum(event["count"] for event in events.values()) == 5
@@ -0,0 +1,152 @@
+import pytest
+from src.book import Book
+from src.generator import generate_books
+from src.indexes import TextIndex
+from src.library import Library
+from src.query_cache import DiskCache, LRUCache, QueryCache, decode, encode
+
+
+def make_library():
+    library = Library()
+    library.add_books(generate_books(500, seed=3))
+    library.register_index("words", TextIndex("title"))
+    return library
+
+
+@pytest.fixture
+def library():
+    return make_library()
+
+
+class TestEncoding:
+    def test_round_trip(self, library):
+        facets = library.facets(top=3)
+        assert decode(encode(facets), library) == facets
+        fuzzy = library.fuzzy_search("author", "Лев Толстои")
+        assert decode(encode(fuzzy), library) == fuzzy
+
+    def test_books(self, library):
+        books = library.search_by_year(1869)
+        decoded = decode(encode(books), library)
+        assert [book.isbn for book in decoded] == [book.isbn for book in books]
+
+    def test_unsupported(self):
+        with pytest.raises(TypeError):
+            encode(object())
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(0)
+
+
+class TestDiskCache:
+    def test_state_mismatch_is_miss(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "cache.db"))
+        cache.put("q", "v1", [1, 2])
+        assert cache.get("q", "v1") == [1, 2]
+        assert cache.get("q", "v2") is None
+        cache.put("other", "v2", 3)
+        assert len(cache) == 1
+        cache.close()
+
+    def test_prune(self):
+        cache = DiskCache(":memory:", maxsize=3)
+        for i in range(5):
+            cache.put(f"q{i}", "v", i)
+        assert len(cache) == 3
+        assert cache.get("q0", "v") is None
+        assert cache.get("q4", "v") == 4
+
+
+class TestQueryCache:
+    def test_memory_hit(self, library):
+        cache = QueryCache(library)
+        first = cache.call("facet", "genre")
+        assert cache.call("facet", "genre") == first
+        assert cache.as_dict()["hits"] == {"memory": 1, "disk": 0}
+        assert cache.misses == 1
+
+    def test_mutation_invalidates(self, library):
+        cache = QueryCache(library)
+        before = cache.call("count", "genre", "Роман")
+        library.add_book(Book("Новая книга", "Автор", 2000, "Роман", "978-0-000-00000-1"))
+        assert cache.call("count", "genre", "Роман") == before + 1
+        assert cache.misses == 2
+
+    def test_warm_restart_served_from_disk(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        with QueryCache(make_library(), path) as cache:
+            expected = cache.call("search", "words", "мир")
+        with QueryCache(make_library(), path) as cache:
+            result = cache.call("search", "words", "мир")
+            assert cache.as_dict()["hits"] == {"memory": 0, "disk": 1}
+            assert cache.misses == 0
+            assert [book.isbn for book in result] == [book.isbn for book in expected]
+            cache.call("search", "words", "мир")
+            assert cache.hits["memory"] == 1
+
+    def test_restart_with_changed_catalog(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        with QueryCache(make_library(), path) as cache:
+            cache.call("facet", "author", 5)
+        library = make_library()
+        library.remove_book(next(iter(library.books)))
+        with QueryCache(library, path) as cache:
+            assert cache.call("facet", "author", 5) == library.facet("author", 5)
+            assert cache.misses == 1
+
+    def test_restart_with_corrected_row(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        with QueryCache(make_library(), path) as cache:
+            cache.call("facet", "author", 5)
+        library = Library()
+        books = list(generate_books(500, seed=3))
+        first = books[0]
+        books[0] = Book(first.title, "Исправленный Автор", first.year, first.genre, first.isbn)
+        library.add_books(books)
+        library.register_index("words", TextIndex("title"))
+        assert library.version == make_library().version
+        with QueryCache(library, path) as cache:
+            assert cache.call("facet", "author", 5) == library.facet("author", 5)
+            assert cache.misses == 1
+
+    def test_content_hash_follows_changes(self, library):
+        cache = QueryCache(library)
+        cache.state()
+        book = next(iter(library.books))
+        library.remove_book(book)
+        library.add_book(Book(book.title, "Другой автор", book.year, book.genre, book.isbn))
+        incremental = cache.state()
+        assert incremental == QueryCache(library).state()
+        library.remove_book(library.search_by_isbn(book.isbn))
+        library.add_book(book)
+        assert cache.state() == QueryCache(library).state() != incremental
+
+    def test_keyword_arguments_and_query(self, library):
+        cache = QueryCache(library)
+        result = cache.call("query", genre="Роман", year=(1860, 1880))
+        assert len(result) == len(library.query(genre="Роман", year=(1860, 1880)))
+        cache.call("query", year=(1860, 1880), genre="Роман")
+        assert cache.hits["memory"] == 1
+
+    def test_mutating_method_rejected(self, library):
+        with pytest.raises(ValueError):
+            QueryCache(library).call("remove_books", [])
+
+    def test_clear(self, library, tmp_path):
+        with QueryCache(library, str(tmp_path / "cache.db")) as cache:
+            cache.call("facet", "genre")
+            cache.clear()
+            assert cache.as_dict()["memory"] == 0
+            assert cache.as_dict()["disk"] == 0
@@ -0,0 +1,144 @@
+import pytest
+from src.book import Book
+from src.generator import generate_books
+from src.indexes import MultiValueIndex, SortedIndex, TextIndex
+from src.library import Library
+from src.query_planner import ColumnStatistics, Condition
+
+
+@pytest.fixture
+def library():
+    library = Library()
+    library.add_books(generate_books(2000, seed=7))
+    return library
+
+
+def expected(library, **conditions):
+    return {book.isbn for book in library.books
+            if all(Condition(field, value).matches(getattr(book, field))
+                   for field, value in conditions.items())}
+
+
+class TestCondition:
+    def test_equality_and_range(self):
+        assert Condition("year", 1869).matches(1869)
+        assert Condition("year", (1860, 1870)).matches(1869)
+        assert Condition("year", (None, 1860)).matches(1850)
+        assert not Condition("year", (1870, None)).matches(1869)
+
+    def test_range_of_incomparable_values(self):
+        assert not Condition("year", (1860, 1870)).matches("1869")
+
+    def test_invalid_range(self):
+        with pytest.raises(ValueError):
+            Condition("year", (1, 2, 3))
+
+    def test_str(self):
+        assert str(Condition("author", "Лев Толстой")) == "author = 'Лев Толстой'"
+        assert str(Condition("year", (1860, 1870))) == "year BETWEEN 1860 AND 1870"
+        assert str(Condition("year", (1860, None))) == "year >= 1860"
+
+
+class TestColumnStatistics:
+    def test_most_common_and_uniform_estimate(self):
+        counts = {"a": 50, "b": 30, **{f"v{i}": 2 for i in range(20)}}
+        statistics = ColumnStatistics("genre", 120, counts, False)
+        assert statistics.distinct == 22
+        assert statistics.estimate("a") == 50
+        assert statistics.estimate("missing") == pytest.approx(2.0)
+
+    def test_unique(self):
+        statistics = ColumnStatistics("isbn", 10, {str(i): 1 for i in range(10)}, True, True)
+        assert statistics.estimate("3") == 1.0
+
+
+class TestPlanner:
+    def test_genre_without_index_is_seq_scan(self, library):
+        explanation = library.explain(genre="Роман")
+        data = explanation.as_dict()
+        assert data["access"] == "Seq Scan"
+        assert data["index"] is None
+        assert data["actual"]["examined"] == len(library.indexes)
+        assert data["actual"]["rows"] == len(library.search_by_genre("Роман"))
+
+    def test_genre_index_is_used(self, library):
+        library.register_index("genre", MultiValueIndex("genre"))
+        data = library.explain(genre="Роман").as_dict()
+        assert data["access"] == "Index Scan"
+        assert data["actual"]["examined"] == data["actual"]["rows"]
+        assert data["estimated"]["examined"] == data["actual"]["examined"]
+
+    def test_most_selective_index_drives(self, library):
+        author = next(iter(library.facet("author")))
+        rare = list(library.facet("year"))[-1]
+        data = library.explain(author=author, year=rare).as_dict()
+        assert data["index"] == "year"
+        assert data["filter"] == [str(Condition("author", author))]
+        assert data["actual"]["examined"] == len(library.search_by_year(rare))
+
+    def test_query_results_match_scan(self, library):
+        author = next(iter(library.facet("author")))
+        conditions = {"author": author, "genre": "Роман", "year": (1850, 1900)}
+        result = library.query(**conditions)
+        assert {book.isbn for book in result} == expected(library, **conditions)
+
+    def test_range_uses_sorted_index(self, library):
+        library.register_index("published", SortedIndex("year"))
+        data = library.explain(published=(1860, 1861)).as_dict()
+        assert data["access"] == "Index Range Scan"
+        assert data["actual"]["rows"] == len(expected(library, year=(1860, 1861)))
+
+    def test_text_index_condition(self, library):
+        library.add_book(Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-0-306-40615-7"))
+        library.register_index("words", TextIndex("title"))
+        result = library.query(words="мир война", author="Лев Толстой")
+        assert "978-0-306-40615-7" in {book.isbn for book in result}
+        assert library.explain(words="мир война").as_dict()["index"] == "words"
+
+    def test_without_analyze(self, library):
+        explanation = library.explain(analyze=False, genre="Роман")
+        assert "actual" not in explanation.as_dict()
+        assert "факт" not in explanation.format()
+
+    def test_format(self, library):
+        text = library.explain(author="Лев Толстой", genre="Роман").format()
+        assert text.startswith("Index Scan using author")
+        assert "Filter: genre = 'Роман'" in text
+
+    def test_unknown_field(self, library):
+        with pytest.raises(KeyError):
+            library.query(publisher="АСТ")
+
+    def test_empty_query_returns_all(self, library):
+        assert len(library.query()) == len(library.indexes)
+
+
+class TestStatistics:
+    def test_analyze(self, library):
+        statistics = library.analyze()
+        assert statistics["isbn"]["distinct"] == len(library.indexes)
+        assert statistics["genre"]["indexed"] is False
+        assert statistics["author"]["indexed"] is True
+        most_common = statistics["genre"]["most_common"]
+        assert most_common[0]["count"] >= most_common[-1]["count"]
+
+    def test_stale_statistics_until_threshold(self, library):
+        library.analyze()
+        library.add_books(generate_books(100, seed=8, start=2000))
+        data = library.explain(analyze=False, author="Лев Толстой").as_dict()
+        stale = data["estimated"]["examined"]
+        library.add_books(generate_books(200, seed=9, start=2100))
+        data = library.explain(author="Лев Толстой").as_dict()
+        assert data["estimated"]["examined"] > stale
+        assert data["estimated"]["examined"] == data["actual"]["examined"]
+
+    def test_new_index_triggers_analyze(self, library):
+        library.analyze()
+        library.register_index("genre", MultiValueIndex("genre"))
+        assert library.explain(genre="Роман").as_dict()["access"] == "Index Scan"
+
+    def test_snapshot_has_own_planner(self, library):
+        library.explain(genre="Роман")
+        snapshot = library.snapshot()
+        assert snapshot.explain(genre="Роман").as_dict()["actual"]["rows"] == \
+            library.explain(genre="Роман").as_dict()["actual"]["rows"]
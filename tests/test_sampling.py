@@ -0,0 +1,126 @@
+import random
+import threading
+import pytest
+from src.book import Book
+from src.book_collections import BookCollection
+from src.indexes import MultiValueIndex
+from src.library import Library
+from src.sampling import RandomPool, WeightedSampler, weighted_sample
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-3"),
+        Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-4"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    library = Library()
+    library.add_books(sample_books)
+    return library
+
+
+class TestRandomPool:
+    def test_swap_remove(self, sample_books):
+        pool = RandomPool(sample_books)
+        pool.remove(sample_books[0])
+        assert len(pool) == 3
+        assert sample_books[0] not in pool
+        assert set(book.isbn for book in pool) == {"978-2", "978-3", "978-4"}
+        pool.remove(sample_books[3])
+        assert set(book.isbn for book in pool) == {"978-2", "978-3"}
+
+    def test_duplicates_stored_once(self, sample_books):
+        pool = RandomPool(sample_books + sample_books[:1])
+        assert len(pool) == 4
+
+    def test_choice_empty(self):
+        assert RandomPool().choice() is None
+
+    def test_snapshot_copy_on_write(self, sample_books):
+        pool = RandomPool(sample_books)
+        snapshot = pool.snapshot()
+        pool.remove(sample_books[0])
+        assert len(snapshot) == 4
+
+
+class TestWeighted:
+    def test_sampler_respects_zero_weight(self, sample_books):
+        sampler = WeightedSampler(sample_books, lambda book: 1 if book.year == 1967 else 0)
+        rng = random.Random(1)
+        assert {book.isbn for book in sampler.draws(20, rng)} == {"978-3"}
+
+    def test_sampler_invalid_weights(self, sample_books):
+        with pytest.raises(ValueError):
+            WeightedSampler(sample_books, lambda book: 0)
+        with pytest.raises(ValueError):
+            WeightedSampler(sample_books, lambda book: -1)
+
+    def test_weighted_sample_without_replacement(self, sample_books):
+        result = weighted_sample(sample_books, 3, lambda book: book.year, random.Random(2))
+        assert len({book.isbn for book in result}) == 3
+
+    def test_weighted_sample_prefers_heavy(self, sample_books):
+        weights = {"978-1": 1000, "978-2": 0.001, "978-3": 0.001, "978-4": 0.001}
+        rng = random.Random(3)
+        picks = [weighted_sample(sample_books, 1, lambda b: weights[b.isbn], rng)[0] for _ in range(50)]
+        hits = sum(book.isbn == "978-1" for book in picks)
+        assert hits >= 45
+
+
+class TestLibrarySampling:
+    def test_get_random_book_tracks_removals(self, library, sample_books):
+        for book in sample_books[:3]:
+            library.remove_book(book)
+        assert library.get_random_book() is sample_books[3]
+
+    def test_get_random_book_with_initial_collection(self, sample_books):
+        library = Library(BookCollection(sample_books))
+        assert library.get_random_book() in sample_books
+
+    def test_sample_without_replacement(self, library):
+        result = library.sample(4, rng=random.Random(5))
+        assert isinstance(result, BookCollection)
+        assert len({book.isbn for book in result}) == 4
+
+    def test_sample_too_many(self, library):
+        with pytest.raises(ValueError):
+            library.sample(5)
+
+    def test_sample_with_filter(self, library):
+        result = library.sample(2, field="year", value=1869, rng=random.Random(7))
+        assert {book.isbn for book in result} == {"978-1", "978-4"}
+        library.register_index("genre", MultiValueIndex("genre"))
+        assert len(library.sample(1, field="genre", value="Фантастика")) == 1
+
+    def test_weighted_sample(self, library):
+        result = library.sample(1, weight=lambda book: 1 if book.author == "Михаил Булгаков" else 0)
+        assert result[0].isbn == "978-3"
+
+    def test_weighted_sampler(self, library):
+        sampler = library.weighted_sampler(lambda book: 1, field="author", value="Лев Толстой")
+        assert sampler.draw().author == "Лев Толстой"
+
+    def test_snapshot_sampling(self, library, sample_books):
+        snapshot = library.snapshot()
+        library.remove_book(sample_books[0])
+        assert len(snapshot.sample(4)) == 4
+
+    def test_concurrent_add_remove(self, library):
+        def writer():
+            for i in range(300):
+                book = Book(f"Книга {i}", "Автор", 1900, "Роман", f"isbn-{i}")
+                library.add_book(book)
+                library.remove_book(book)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        while thread.is_alive():
+            assert library.get_random_book() is not None
+        thread.join()
+        assert len(library.sample(4)) == 4
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import pytest
+from src.book import Book
+from src.library import Library
+from src.load_test import HTTPClient, run_load_test
+from src.server import LibraryServer
+
+
+@pytest.fixture
+def library():
+    library = Library()
+    library.add_book(Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-5-00-000001-1"))
+    library.add_book(Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-5-00-000002-2"))
+    return library
+
+
+def run_with_server(library, scenario):
+    async def main():
+        server = LibraryServer(library, port=0)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+class TestLibraryServer:
+    def test_keep_alive_requests(self, library):
+        async def scenario(server):
+            client = HTTPClient(server.host, server.port)
+            first = await client.request("GET", "/books/978-5-00-000001-1")
+            writer = client._writer
+            second = await client.request("GET", "/search?field=year&value=1877")
+            assert client._writer is writer
+            await client.close()
+            return first, second
+
+        first, second = run_with_server(library, scenario)
+        assert first == (200, library.search_by_isbn("978-5-00-000001-1").to_dict())
+        assert second[0] == 200
+        assert second[1]["total"] == 1
+        assert second[1]["books"][0]["title"] == "Анна Каренина"
+
+    def test_add_and_remove(self, library):
+        book = {"title": "Идиот", "author": "Фёдор Достоевский", "year": 1869,
+                "genre": "Роман", "isbn": "978-5-00-000003-3"}
+
+        async def scenario(server):
+            client = HTTPClient(server.host, server.port)
+            results = [
+                await client.request("POST", "/books", book),
+                await client.request("POST", "/books", book),
+                await client.request("POST", "/books", {**book, "year": "год"}),
+                await client.request("DELETE", "/books/978-5-00-000001-1"),
+                await client.request("DELETE", "/books/978-5-00-000001-1"),
+            ]
+            await client.close()
+            return [status for status, _ in results]
+
+        assert run_with_server(library, scenario) == [201, 409, 400, 200, 404]
+        assert library.search_by_isbn("978-5-00-000003-3") is not None
+        assert library.search_by_isbn("978-5-00-000001-1") is None
+
+    def test_facets_and_stats(self, library):
+        async def scenario(server):
+            client = HTTPClient(server.host, server.port)
+            facets = await client.request("GET", "/facets?name=genre,decade")
+            stats = await client.request("GET", "/stats")
+            await client.close()
+            return facets, stats
+
+        facets, stats = run_with_server(library, scenario)
+        assert facets[1]["genre"] == [{"value": "Роман", "count": 2}]
+        assert stats[1]["books"] == 2
+
+    def test_batch(self, library):
+        async def scenario(server):
+            client = HTTPClient(server.host, server.port)
+            commands = ['search author "Лев Толстой"', "facet genre", "", "search isbn"]
+            result = await client.request("POST", "/batch", commands)
+            await client.close()
+            return result
+
+        status, results = run_with_server(library, scenario)
+        assert status == 200
+        assert [result["ok"] for result in results] == [True, True, False, False]
+        assert results[0]["total"] == 2
+
+    def test_batch_rejects_file_and_write_commands(self, library, tmp_path):
+        path = str(tmp_path / "books.csv")
+
+        async def scenario(server):
+            client = HTTPClient(server.host, server.port)
+            results = [
+                await client.request("POST", "/batch", ["facet genre", f"export {path}"]),
+                await client.request("POST", "/batch", [f"import {path}"]),
+                await client.request("POST", "/batch", ["remove 978-5-00-000001-1"]),
+            ]
+            await client.close()
+            return [status for status, _ in results]
+
+        assert run_with_server(library, scenario) == [403, 403, 403]
+        assert not (tmp_path / "books.csv").exists()
+        assert len(library.books) == 2
+
+    def test_handlers_run_outside_event_loop(self, library):
+        threads = []
+        search_page = library.search_page
+
+        def recording_search_page(*args):
+            threads.append(threading.current_thread().name)
+            return search_page(*args)
+
+        library.search_page = recording_search_page
+
+        async def scenario(server):
+            client = HTTPClient(server.host, server.port)
+            status, _ = await client.request("GET", "/search?field=year&value=1869")
+            await client.close()
+            return status
+
+        assert run_with_server(library, scenario) == 200
+        assert threads and threads[0].startswith("library-server")
+
+    def test_errors(self, library):
+        async def scenario(server):
+            client = HTTPClient(server.host, server.port)
+            results = [
+                await client.request("GET", "/unknown"),
+                await client.request("PUT", "/search"),
+                await client.request("GET", "/search?field=publisher&value=x"),
+                await client.request("GET", "/search?field=year&value=abc"),
+                await client.request("POST", "/batch", {"command": "x"}),
+            ]
+            await client.close()
+            return [status for status, _ in results]
+
+        assert run_with_server(library, scenario) == [404, 405, 400, 400, 400]
+
+    def test_connection_close(self, library):
+        async def scenario(server):
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(b"GET /stats HTTP/1.0\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+        response = run_with_server(library, scenario)
+        assert response.startswith(b"HTTP/1.1 200 OK")
+        assert b"Connection: close" in response
+
+    def test_load_test(self, library):
+        async def scenario(server):
+            return await run_load_test(server.host, server.port, requests=60, concurrency=4)
+
+        result = run_with_server(library, scenario)
+        assert result["requests"] == 60
+        assert result["errors"] == 0
+        assert result["latency_ms"]["p50"] <= result["latency_ms"]["max"]
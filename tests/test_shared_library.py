@@ -0,0 +1,136 @@
+import multiprocessing
+import pytest
+from src.book import Book
+from src.library import Library
+from src.shared_library import BookView, SharedCatalog, SharedLibrary, build_layout
+
+
+@pytest.fixture
+def library():
+    library = Library()
+    library.add_books([
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-3"),
+        Book("Ревизор", "Николай Гоголь", 1836, "Комедия", "978-4"),
+    ])
+    return library
+
+
+@pytest.fixture
+def shared(library):
+    with SharedLibrary.create(library) as shared:
+        yield shared
+
+
+def _query_in_child(name, queue):
+    shared = SharedLibrary.attach(name)
+    try:
+        queue.put(([book.title for book in shared.search_by_author("Лев Толстой")],
+                   shared.count("year", 1869)))
+    finally:
+        shared.close()
+
+
+class TestLayout:
+    def test_catalog_from_bytes(self, library):
+        catalog = SharedCatalog(bytes(build_layout(library)))
+        assert len(catalog) == 4
+        assert [book.isbn for book in catalog] == ["978-1", "978-2", "978-3", "978-4"]
+        assert catalog.keys('year') == [1836, 1869, 1877]
+        assert catalog.keys('author') == sorted(catalog.keys('author'))
+        assert catalog.positions('year', 1869) == [0, 2]
+        catalog.release()
+
+    def test_duplicate_isbn_skipped(self):
+        books = [Book("A", "B", 1, "C", "1"), Book("D", "E", 2, "F", "1")]
+        catalog = SharedCatalog(bytes(build_layout(books)))
+        assert len(catalog) == 1
+        assert catalog['isbn', '1'].title == "A"
+
+    def test_invalid_buffer(self):
+        with pytest.raises(ValueError):
+            SharedCatalog(b"LBS0" + bytes(64))
+        with pytest.raises(ValueError):
+            SharedCatalog(b"")
+
+    def test_invalid_year(self):
+        with pytest.raises(TypeError):
+            build_layout([Book("A", "B", "1869", "C", "1")])
+
+
+class TestSharedLibrary:
+    def test_searches_match_library(self, library, shared):
+        for author in ("Лев Толстой", "Фёдор Достоевский", "Нет такого"):
+            assert shared.search_by_author(author) == library.search_by_author(author)
+        assert shared.search_by_year(1869) == library.search_by_year(1869)
+        assert shared.search_by_genre("Роман") == library.search_by_genre("Роман")
+        assert shared.search("title", "Идиот") == library.search("title", "Идиот")
+        assert shared.search_by_isbn("978-4") == library.search_by_isbn("978-4")
+        assert shared.search_by_isbn("999") is None
+        assert shared.search_by_year("1869") == library.search_by_year("1869")
+
+    def test_lazy_book_view(self, shared):
+        book = shared.search_by_isbn("978-3")
+        assert isinstance(book, BookView)
+        assert isinstance(book, Book)
+        assert str(book) == "Идиот - Фёдор Достоевский (1869)"
+        plain = book.materialize()
+        assert type(plain) is Book
+        assert plain.to_dict() == book.to_dict()
+
+    def test_counts_and_facets(self, library, shared):
+        assert len(shared) == 4
+        assert shared.count() == 4
+        assert shared.count("author", "Лев Толстой") == 2
+        assert shared.count("genre", "Драма") == 0
+        assert shared.facet("genre") == library.facet("genre")
+        assert shared.facet("year", top=1) == {1869: 2}
+
+    def test_contains(self, library, shared):
+        assert "978-1" in shared.books
+        assert library.search_by_isbn("978-2") in shared.indexes
+        assert "999" not in shared.books
+        assert 42 not in shared.books
+
+    def test_unknown_field(self, shared):
+        with pytest.raises(KeyError):
+            shared.count("publisher", "x")
+        with pytest.raises(KeyError):
+            shared.search("publisher", "x")
+        with pytest.raises(TypeError):
+            shared.books["isbn"]
+
+    def test_attach_in_other_process(self, shared):
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_query_in_child, args=(shared.name, queue))
+        process.start()
+        titles, count = queue.get(timeout=30)
+        process.join(timeout=30)
+        assert titles == ["Война и мир", "Анна Каренина"]
+        assert count == 2
+        assert process.exitcode == 0
+        assert shared.count() == 4
+
+    def test_attach_in_same_process(self, shared):
+        reader = SharedLibrary.attach(shared.name)
+        assert reader.search_by_isbn("978-1").title == "Война и мир"
+        reader.close()
+
+    def test_unlink(self, library):
+        shared = SharedLibrary.create(library)
+        name = shared.name
+        shared.close()
+        shared.unlink()
+        with pytest.raises(FileNotFoundError):
+            SharedLibrary.attach(name)
+
+    def test_mmap_file(self, library, tmp_path):
+        path = tmp_path / "catalog.lbs"
+        assert SharedLibrary.save(library, path) == path.stat().st_size
+        shared = SharedLibrary.open(path)
+        assert shared.name is None
+        assert shared.search_by_author("Николай Гоголь")[0].title == "Ревизор"
+        assert "файл" in str(shared)
+        shared.close()
@@ -2,6 +2,7 @@ import pytest
 from io import StringIO
 from unittest.mock import patch
 from src.simulation import (
+    READ_HEAVY_WEIGHTS,
     run_simulation,
     _event_add_book,
     _event_remove_book,
@@ -103,3 +104,25 @@ class TestRunSimulation:
         output_text = output.getvalue()
         assert "ПСЕВДОСЛУЧАЙНАЯ СИМУЛЯЦИЯ" in output_text
         assert "ФИНАЛЬНОЕ СОСТОЯНИЕ" in output_text
+
+    def test_run_simulation_event_weights(self):
+        output = StringIO()
+        with patch("sys.stdout", output):
+            run_simulation(steps=10, seed=1, event_weights={"search_by_year": 1})
+        assert "search_by_year=10" in output.getvalue()
+        assert "add_book=0" in output.getvalue()
+
+    def test_run_simulation_invalid_weights(self):
+        with pytest.raises(ValueError):
+            run_simulation(steps=1, event_weights={"fly": 1})
+        with pytest.raises(ValueError):
+            run_simulation(steps=1, event_weights={"add_book": 0})
+
+    def test_run_simulation_generated_catalog(self):
+        output = StringIO()
+        with patch("sys.stdout", output):
+            run_simulation(steps=20, seed=5, event_weights=READ_HEAVY_WEIGHTS,
+                           catalog_size=500, key_skew=1.0)
+        text = output.getvalue()
+        assert "Сгенерировано и загружено книг: 500" in text
+        assert "... и ещё" in text
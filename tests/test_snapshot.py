@@ -0,0 +1,85 @@
+import threading
+import pytest
+from src.book import Book
+from src.book_collections import BookCollection, IndexDict
+from src.library import Library, LibrarySnapshot
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-3"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    library = Library()
+    for book in sample_books:
+        library.add_book(book)
+    return library
+
+
+class TestCollectionSnapshots:
+    def test_book_collection_copy_on_write(self, sample_books):
+        collection = BookCollection(sample_books)
+        snapshot = collection.snapshot()
+        assert snapshot._books is collection._books
+        collection.remove(sample_books[0])
+        assert len(snapshot) == 3
+        assert len(collection) == 2
+
+    def test_index_dict_copy_on_write(self, sample_books):
+        index = IndexDict(sample_books)
+        snapshot = index.snapshot()
+        index.remove_book(sample_books[0])
+        assert len(snapshot["author", "Лев Толстой"]) == 2
+        assert len(index["author", "Лев Толстой"]) == 1
+
+
+class TestLibrarySnapshot:
+    def test_snapshot_is_point_in_time(self, library, sample_books):
+        snapshot = library.snapshot()
+        library.remove_book(sample_books[0])
+        library.add_book(Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-4"))
+        assert len(snapshot.books) == 3
+        assert snapshot.search_by_isbn("978-1") is not None
+        assert snapshot.search_by_isbn("978-4") is None
+        assert len(library.books) == 3
+        assert library.search_by_isbn("978-1") is None
+
+    def test_snapshot_is_read_only(self, library, sample_books):
+        snapshot = library.snapshot()
+        assert isinstance(snapshot, LibrarySnapshot)
+        with pytest.raises(TypeError):
+            snapshot.add_book(Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-4"))
+        with pytest.raises(TypeError):
+            snapshot.remove_book(sample_books[0])
+        assert snapshot.snapshot() is snapshot
+
+    def test_snapshot_searches(self, library):
+        snapshot = library.snapshot()
+        assert len(snapshot.search_by_author("Лев Толстой")) == 2
+        assert len(snapshot.search_by_genre("Роман")) == 2
+        assert snapshot.search_page("year", 1967).total == 1
+
+    def test_consistent_reads_under_concurrent_writes(self, library):
+        snapshots = []
+
+        def writer():
+            for i in range(200):
+                book = Book(f"Книга {i}", "Автор", 1900, "Роман", f"isbn-{i}")
+                library.add_book(book)
+                if i % 2:
+                    library.remove_book(book)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        while thread.is_alive():
+            snapshots.append(library.snapshot())
+        thread.join()
+        for snapshot in snapshots:
+            assert len(snapshot.books) == len(snapshot.indexes)
+            assert all(book.isbn in snapshot.indexes for book in snapshot.books)
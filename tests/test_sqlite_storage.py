@@ -0,0 +1,355 @@
+import random
+import threading
+import pytest
+from src.book import Book
+from src.book_collections import BookCollection
+import sqlite3
+from src.bulk_io import export_csv, import_csv
+from src.changefeed import Change, ChangeFeedOverflow
+from src.batch import READ_COMMANDS, execute_command
+from src.constants import create_sample_books
+from src.indexes import HashIndex, SortedIndex
+from src.inventory import InventoryError
+from src.library import Library
+from src.sqlite_storage import ConnectionPool, SQLiteLibrary
+
+
+@pytest.fixture
+def sample_books():
+    return [
+        Book("Война и мир", "Лев Толстой", 1869, "Роман", "978-1"),
+        Book("Анна Каренина", "Лев Толстой", 1877, "Роман", "978-2"),
+        Book("Идиот", "Фёдор Достоевский", 1869, "Роман", "978-3"),
+        Book("Мастер и Маргарита", "Михаил Булгаков", 1967, "Фантастика", "978-4"),
+    ]
+
+
+@pytest.fixture
+def library(sample_books):
+    with SQLiteLibrary() as library:
+        library.add_books(sample_books)
+        yield library
+
+
+class TestSQLiteLibrary:
+    def test_search_by_isbn(self, library, sample_books):
+        assert library.search_by_isbn("978-2") == sample_books[1]
+        assert library.search_by_isbn("999") is None
+
+    def test_search_by_author_year_genre(self, library):
+        assert isinstance(library.search_by_author("Лев Толстой"), BookCollection)
+        assert [b.isbn for b in library.search_by_author("Лев Толстой")] == ["978-1", "978-2"]
+        assert [b.isbn for b in library.search_by_year(1869)] == ["978-1", "978-3"]
+        assert len(library.search_by_genre("Фантастика")) == 1
+
+    def test_add_duplicate(self, library, sample_books):
+        with pytest.raises(ValueError):
+            library.add_book(sample_books[0])
+
+    def test_add_books_atomic(self, library):
+        new = Book("Бесы", "Фёдор Достоевский", 1872, "Роман", "978-5")
+        with pytest.raises(ValueError):
+            library.add_books([new, Book("Дубль", "Автор", 2000, "Роман", "978-1")])
+        assert library.search_by_isbn("978-5") is None
+        assert library.add_books([new, new], skip_duplicates=True) == 1
+        assert len(library.books) == 5
+
+    def test_remove_book(self, library, sample_books):
+        library.remove_book(sample_books[0])
+        assert sample_books[0] not in library.books
+        assert "978-2" in library.indexes
+        assert len(library.books) == 3
+
+    def test_iteration_in_insertion_order(self, library):
+        assert [book.isbn for book in library.books] == ["978-1", "978-2", "978-3", "978-4"]
+
+    def test_iteration_releases_connection(self, sample_books, monkeypatch):
+        monkeypatch.setattr("src.sqlite_storage.FETCH_SIZE", 1)
+        with SQLiteLibrary(pool_size=1) as library:
+            library.add_books(sample_books)
+            iterators = [iter(library.books) for _ in range(3)]
+            assert [next(iterator).isbn for iterator in iterators] == ["978-1"] * 3
+            assert library.count() == 4
+            assert [book.isbn for book in iterators[0]] == ["978-2", "978-3", "978-4"]
+
+    def test_readers_see_only_committed_rows(self, library):
+        seen = []
+
+        def books():
+            yield Book("Бесы", "Фёдор Достоевский", 1872, "Роман", "978-5")
+            seen.append((library.count(), "978-5" in library.books))
+            yield Book("Дубль", "Автор", 2000, "Роман", "978-1")
+
+        with pytest.raises(ValueError):
+            library.add_books(books())
+        assert seen == [(4, False)]
+        assert library.count() == 4
+
+    def test_index_dict_style_access(self, library, sample_books):
+        assert library.indexes['isbn', "978-3"] == sample_books[2]
+        assert len(library.indexes['author', "Лев Толстой"]) == 2
+        assert library.indexes['author', "Неизвестный"] == BookCollection()
+
+    def test_unknown_field(self, library):
+        with pytest.raises(KeyError):
+            library.search("publisher; DROP TABLE books", "x")
+
+    def test_search_range(self, library):
+        assert [b.isbn for b in library.search_range("year", 1870, 1970)] == ["978-2", "978-4"]
+
+    def test_pages(self, library):
+        page = library.search_page("year", 1869, limit=1)
+        assert page.total == 2
+        assert page.next_offset == 1
+        page = library.list_page(limit=2, offset=1, sort_by="title")
+        assert [b.title for b in page] == ["Война и мир", "Идиот"]
+        top = library.top_k("author", "Лев Толстой", 1, "year", reverse=True)
+        assert [b.isbn for b in top] == ["978-2"]
+        with pytest.raises(ValueError):
+            library.list_page(sort_by="isbn")
+
+    def test_count_and_facet(self, library):
+        assert library.count() == 4
+        assert library.count("genre", "Роман") == 3
+        assert library.facet("genre") == {"Роман": 3, "Фантастика": 1}
+        assert library.facet("author", top=1) == {"Лев Толстой": 2}
+
+    def test_decade_facets(self, library):
+        assert library.facet("decade") == {1860: 2, 1870: 1, 1960: 1}
+        assert library.facets(("genre", "decade"), top=1) == {
+            "genre": {"Роман": 3},
+            "decade": {1860: 2},
+        }
+        with pytest.raises(KeyError):
+            library.facet("publisher")
+
+    def test_copies(self, library):
+        book = Book("Бесы", "Фёдор Достоевский", 1872, "Роман", "978-5")
+        library.add_book(book, copies=3)
+        assert library.inventory.copies("978-5") == 3
+        assert library.checkout("978-5", 2) == 1
+        with pytest.raises(InventoryError):
+            library.checkout("978-5", 2)
+        with pytest.raises(InventoryError):
+            library.remove_copies("978-5", 2)
+        assert library.return_copies("978-5") == 2
+        assert library.add_copies("978-1", 2) == 3
+        assert library.remove_copies("978-1") == 2
+        assert library.inventory.total_copies == 8
+        assert library.inventory.total_checked_out == 1
+        assert str(library) == "Общее количество книг: 8, количество уникальных книг: 5"
+        with pytest.raises(InventoryError):
+            library.checkout("999")
+        with pytest.raises(ValueError):
+            library.add_book(Book("Идиот", "Ф. Д.", 1869, "Роман", "978-6"), copies=0)
+        assert "978-6" not in library.books
+
+    def test_changes_since(self, library, sample_books):
+        assert library.version == 4
+        library.remove_book(sample_books[0])
+        new = Book("Бесы", "Фёдор Достоевский", 1872, "Роман", "978-5")
+        library.add_books([new, new], skip_duplicates=True)
+        assert library.changes_since(4) == [
+            Change(5, "remove", sample_books[0]),
+            Change(6, "add", new),
+        ]
+        assert library.changes_since(6) == []
+        with pytest.raises(ValueError):
+            library.changes_since(7)
+
+    def test_failed_batch_keeps_version(self, library):
+        with pytest.raises(ValueError):
+            library.add_books([Book("Дубль", "Автор", 2000, "Роман", "978-1")])
+        assert library.version == 4
+        assert len(library.changes_since(0)) == 4
+
+    def test_changes_overflow(self, sample_books):
+        with SQLiteLibrary(capacity=2) as library:
+            library.add_books(sample_books)
+            assert [change.version for change in library.changes_since(2)] == [3, 4]
+            with pytest.raises(ChangeFeedOverflow):
+                library.changes_since(1)
+
+    def test_version_persists(self, tmp_path, sample_books):
+        path = str(tmp_path / "library.db")
+        with SQLiteLibrary(path) as library:
+            library.add_books(sample_books)
+        with SQLiteLibrary(path) as library:
+            assert library.version == 4
+            assert library.changes_since(3) == [Change(4, "add", sample_books[3])]
+
+    def test_upgrades_database_without_copies(self, tmp_path, sample_books):
+        path = str(tmp_path / "old.db")
+        with sqlite3.connect(path) as connection:
+            connection.execute("CREATE TABLE books (id INTEGER PRIMARY KEY, title TEXT NOT NULL,"
+                               " author TEXT NOT NULL, year INTEGER NOT NULL,"
+                               " genre TEXT NOT NULL, isbn TEXT NOT NULL UNIQUE)")
+            connection.execute("INSERT INTO books (title, author, year, genre, isbn)"
+                               " VALUES ('Война и мир', 'Лев Толстой', 1869, 'Роман', '978-1')")
+        connection.close()
+        with SQLiteLibrary(path) as library:
+            assert library.inventory.copies("978-1") == 1
+            assert library.checkout("978-1") == 0
+
+    def test_random_book(self, library):
+        assert library.get_random_book(random.Random(1)) in library.books
+        assert SQLiteLibrary().get_random_book() is None
+
+    def test_str(self, library):
+        assert str(library) == "Общее количество книг: 4, количество уникальных книг: 4"
+
+    def test_separate_memory_databases(self, library):
+        with SQLiteLibrary() as other:
+            assert len(other.books) == 0
+
+    def test_persistence(self, tmp_path, sample_books):
+        path = str(tmp_path / "library.db")
+        with SQLiteLibrary(path) as library:
+            library.add_books(sample_books)
+        with SQLiteLibrary(path) as library:
+            assert library.search_by_isbn("978-4") == sample_books[3]
+
+    def test_bulk_import(self, tmp_path):
+        books = create_sample_books()
+        path = str(tmp_path / "books.csv")
+        export_csv(books, path)
+        with SQLiteLibrary() as library:
+            report = import_csv(library, path)
+            assert report.imported == len(books)
+            assert library.count() == len(books)
+
+    def test_concurrent_readers(self, library):
+        errors = []
+
+        def reader():
+            try:
+                for _ in range(50):
+                    assert len(library.search_by_author("Лев Толстой")) == 2
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=reader) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+
+@pytest.fixture(params=[Library, SQLiteLibrary], ids=["memory", "sqlite"])
+def backend(request, sample_books):
+    library = request.param()
+    library.add_books(sample_books)
+    yield library
+    if isinstance(library, SQLiteLibrary):
+        library.close()
+
+
+class TestBackendParity:
+    def test_dict_style_lookup(self, backend, sample_books):
+        assert backend.indexes['isbn', "978-3"] == sample_books[2]
+        assert backend.indexes['isbn', "999"] is None
+        assert backend.indexes['author', "Неизвестный"] == BookCollection()
+        with pytest.raises(TypeError):
+            backend.indexes['author']
+        with pytest.raises(KeyError):
+            backend.indexes['publisher', "АСТ"]
+
+    def test_remove_books(self, backend, sample_books):
+        assert backend.remove_books(lambda book: book.year == 1869) == 2
+        assert backend.remove_books(["978-2", sample_books[3], "999"]) == 2
+        assert len(backend.books) == 0
+
+    def test_query_and_explain(self, backend):
+        assert [b.isbn for b in backend.query(author="Лев Толстой", year=(1870, None))] == ["978-2"]
+        data = backend.explain(author="Лев Толстой", year=(1860, 1870)).as_dict()
+        assert (data["access"], data["index"]) == ("Index Scan", "author")
+        assert data["actual"] == {**data["actual"], "examined": 2, "rows": 1}
+        with pytest.raises(KeyError):
+            backend.query(publisher="АСТ")
+
+    def test_registered_index(self, backend, sample_books):
+        backend.register_index("title_length",
+                               SortedIndex("title", key=lambda book: len(book.title)))
+        with pytest.raises(ValueError):
+            backend.register_index("author", HashIndex("author"))
+        assert [b.isbn for b in backend.search("title_length", 5)] == ["978-3"]
+        backend.add_book(Book("Бесы", "Фёдор Достоевский", 1872, "Роман", "978-5"))
+        backend.remove_book(sample_books[2])
+        assert [b.isbn for b in backend.query(title_length=(4, 10))] == ["978-5"]
+        data = backend.explain(title_length=(4, 10), genre="Роман").as_dict()
+        assert (data["access"], data["index"]) == ("Index Range Scan", "title_length")
+        backend.unregister_index("title_length")
+        with pytest.raises(KeyError):
+            backend.search("title_length", 5)
+
+    def test_sample_and_fuzzy_search(self, backend, sample_books):
+        books = backend.sample(2, "author", "Лев Толстой", rng=random.Random(1))
+        assert sorted(b.isbn for b in books) == ["978-1", "978-2"]
+        weighted = backend.sample(3, weight=lambda book: book.year - 1800, rng=random.Random(1))
+        assert len({book.isbn for book in weighted}) == 3
+        with pytest.raises(ValueError):
+            backend.sample(5)
+        assert backend.fuzzy_search("author", "Лев Толстый") == [("Лев Толстой", 1)]
+        backend.add_book(Book("Бесы", "Фёдор Достоевский", 1872, "Роман", "978-5"))
+        assert [b.isbn for b in backend.search_by_author_fuzzy("Федор Достоевский")] == [
+            "978-3", "978-5"]
+
+    def test_snapshot(self, backend, sample_books):
+        snapshot = backend.snapshot()
+        backend.remove_book(sample_books[0])
+        assert snapshot.version == 4
+        assert len(snapshot.books) == 4
+        assert len(snapshot.search_by_author("Лев Толстой")) == 2
+        assert snapshot.snapshot() is snapshot
+        with pytest.raises(TypeError):
+            snapshot.add_book(sample_books[0])
+        assert len(backend.books) == 3
+        if isinstance(snapshot, SQLiteLibrary):
+            snapshot.close()
+
+    def test_instrumentation(self, backend):
+        instrumentation = backend.enable_instrumentation()
+        backend.search_by_author("Лев Толстой")
+        assert instrumentation.counters == {"search_by_author": 1}
+        backend.disable_instrumentation()
+        assert backend.instrumentation is None
+
+    @pytest.mark.parametrize("command", READ_COMMANDS)
+    def test_read_commands(self, backend, command):
+        arguments = {"search": "author 'Лев Толстой'", "explain": "'author=Лев Толстой'",
+                     "facet": "genre", "fuzzy": "author 'Лев Толстый'"}
+        result = execute_command(backend, f"{command} {arguments.get(command, '')}")
+        assert result["ok"], result
+
+
+class TestConnectionPool:
+    def test_connections_reused(self, tmp_path):
+        pool = ConnectionPool(str(tmp_path / "pool.db"), size=2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is first
+        pool.close()
+
+    def test_blocks_at_capacity(self, tmp_path):
+        pool = ConnectionPool(str(tmp_path / "pool.db"), size=1)
+        acquired = []
+        with pool.connection() as connection:
+            thread = threading.Thread(target=lambda: acquired.append(pool.connection().__enter__()))
+            thread.start()
+            thread.join(0.1)
+            assert acquired == []
+        thread.join(1)
+        assert acquired == [connection]
+        pool.close()
+
+    def test_timeout_at_capacity(self, tmp_path):
+        pool = ConnectionPool(str(tmp_path / "pool.db"), size=1, timeout=0.05)
+        with pool.connection():
+            with pytest.raises(TimeoutError):
+                with pool.connection():
+                    pass
+        with pool.connection():
+            pass
+        pool.close()